@@ -17,6 +17,8 @@ except ImportError:
     print("Please install with: pip install google-genai")
     sys.exit(1)
 
+from gemini_metrics import instrument
+
 def read_file(filepath):
     """Read file content"""
     try:
@@ -29,7 +31,7 @@ def read_file(filepath):
 def analyze_with_gemini(api_key, analysis_input, schema_content, db_content_sample):
     """Send analysis request to Gemini Pro"""
     
-    client = genai.Client(api_key=api_key)
+    client = instrument(genai.Client(api_key=api_key))
     
     prompt = f"""You are an expert software architect and code reviewer specializing in full-stack web applications.
 
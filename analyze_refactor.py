@@ -1,45 +1,42 @@
 import json
 import re
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+from source_index import SourceIndex
+
 # Read the monolithic files
 db_file = Path('/home/ubuntu/construction_management_app/server/db.ts')
 routers_file = Path('/home/ubuntu/construction_management_app/server/routers.ts')
 
-db_content = db_file.read_text()
-routers_content = routers_file.read_text()
+db_index = SourceIndex.load(db_file)
+routers_index = SourceIndex.load(routers_file)
 
 # Extract functions that need transactions
-transaction_patterns = [
-    r'export async function (create\w+)\(',
-    r'export async function (update\w+)\(',
-    r'export async function (delete\w+)\(',
-]
+transaction_prefixes = ('create', 'update', 'delete')
 
 functions_needing_transactions = []
 
-for pattern in transaction_patterns:
-    matches = re.finditer(pattern, db_content)
-    for match in matches:
-        func_name = match.group(1)
-        start = match.start()
-        # Find function body
-        lines = db_content[:start].count('\n') + 1
-        functions_needing_transactions.append({
-            'name': func_name,
-            'line': lines,
-            'file': 'server/db.ts'
-        })
+for prefix in transaction_prefixes:
+    for symbol in db_index.symbols:
+        if symbol.kind == 'function' and symbol.exported and symbol.is_async \
+                and re.match(rf'{prefix}\w', symbol.name):
+            functions_needing_transactions.append({
+                'name': symbol.name,
+                'line': symbol.start_line,
+                'file': 'server/db.ts'
+            })
 
 # Find all @ts-ignore usages
 ts_ignore_pattern = r'// @ts-ignore'
 ts_ignores = []
 
-for match in re.finditer(ts_ignore_pattern, db_content):
-    line = db_content[:match.start()].count('\n') + 1
-    context_start = max(0, match.start() - 100)
-    context_end = min(len(db_content), match.end() + 100)
-    context = db_content[context_start:context_end]
+for start, end in db_index.comments:
+    if not db_index.source.startswith(ts_ignore_pattern.encode(), start):
+        continue
+    line = db_index.line_of(start)
+    context = db_index.slice(max(0, start - 100), min(len(db_index.source), end + 100))
     ts_ignores.append({
         'line': line,
         'file': 'server/db.ts',
@@ -47,15 +44,15 @@ for match in re.finditer(ts_ignore_pattern, db_content):
     })
 
 # Find N+1 query patterns
-n_plus_one_pattern = r'for\s*\([^)]+\)\s*\{[^}]*await\s+db\.'
+n_plus_one_pattern = rb'for\s*\([^)]+\)\s*\{[^}]*await\s+db\.'
 n_plus_ones = []
 
-for match in re.finditer(n_plus_one_pattern, routers_content, re.MULTILINE | re.DOTALL):
-    line = routers_content[:match.start()].count('\n') + 1
+for match in re.finditer(n_plus_one_pattern, routers_index.source, re.MULTILINE | re.DOTALL):
+    line = routers_index.line_of(match.start())
     n_plus_ones.append({
         'line': line,
         'file': 'server/routers.ts',
-        'snippet': match.group(0)[:100]
+        'snippet': match.group(0)[:100].decode('utf-8', 'replace')
     })
 
 # Generate analysis report
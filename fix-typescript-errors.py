@@ -3,9 +3,18 @@ import json
 import re
 import google.genai as genai
 
+from gemini_batching import (
+    Batch,
+    build_batch_prompt,
+    make_error_set,
+    pack_batches,
+    split_batch_response,
+)
+from gemini_metrics import instrument
+
 # Initialize Gemini
 api_key = os.environ.get('GEMINI_API_KEY')
-client = genai.Client(api_key=api_key)
+client = instrument(genai.Client(api_key=api_key))
 
 # Read analysis
 with open('gemini-analysis.json', 'r', encoding='utf-8') as f:
@@ -21,15 +30,20 @@ critical_files = [
     'client/src/lib/errorHandler.ts'
 ]
 
+# Token budget per batched request (override with GEMINI_TOKEN_BUDGET)
+token_budget = int(os.environ.get('GEMINI_TOKEN_BUDGET', '24000'))
+
 fixes_applied = []
 
+# Read the error log once and bucket lines per file
+with open('typescript-errors.log', 'r', encoding='utf-8') as f:
+    error_lines = f.readlines()
+
+error_sets = []
 for file_path in critical_files:
-    print(f"\n📝 Analyzing {file_path}...")
-    
-    # Get errors for this file
-    with open('typescript-errors.log', 'r', encoding='utf-8') as f:
-        file_errors = [line for line in f if file_path in line]
+    print(f"\n📝 Collecting {file_path}...")
     
+    file_errors = [line for line in error_lines if file_path in line]
     if not file_errors:
         print(f"   ✅ No errors found")
         continue
@@ -44,65 +58,51 @@ for file_path in critical_files:
         print(f"   ❌ File not found: {file_path}")
         continue
     
-    # Prepare prompt for Gemini
-    prompt = f"""คุณเป็น TypeScript Expert กำลังแก้ไข TypeScript errors ในไฟล์ {file_path}
-
-## Errors ที่พบ ({len(file_errors[:10])} errors แรก):
-```
-{chr(10).join(file_errors[:10])}
-```
-
-## ส่วนของโค้ดที่มีปัญหา (ตัวอย่าง):
-```typescript
-{content[:3000]}
-...
-```
-
-## คำถาม:
-1. วิเคราะห์สาเหตุของ errors เหล่านี้
-2. เสนอแนะวิธีแก้ไขที่มีประสิทธิภาพสูงสุด (แก้ที่ root cause)
-3. ให้ code snippet สำหรับแก้ไข (ถ้าเป็นไปได้)
-
-กรุณาตอบเป็นภาษาไทย ในรูปแบบ JSON:
-{{
-  "analysis": "การวิเคราะห์",
-  "root_cause": "สาเหตุหลัก",
-  "solution": "วิธีแก้ไข",
-  "fix_type": "manual/automatic",
-  "code_changes": [
-    {{
-      "line": 123,
-      "original": "โค้ดเดิม",
-      "fixed": "โค้ดที่แก้แล้ว",
-      "reason": "เหตุผล"
-    }}
-  ]
-}}
-"""
+    error_sets.append(make_error_set(file_path, file_errors, content))
+
+batches = pack_batches(error_sets, token_budget=token_budget)
+print(f"\n📦 Packed {len(error_sets)} files into {len(batches)} requests (budget {token_budget} tokens)")
+
+
+def request_batch(batch):
+    """Send one batched prompt and return (fixes, unanswered error sets)"""
+    response = client.models.generate_content(
+        model='gemini-2.0-flash-exp',
+        contents=build_batch_prompt(batch),
+        config={
+            'response_mime_type': 'application/json',
+            'temperature': 0.2,
+        }
+    )
+    return split_batch_response(batch, response.text)
+
+
+for index, batch in enumerate(batches, 1):
+    print(f"\n🤖 Request {index}/{len(batches)}: {', '.join(batch.files)} (~{batch.tokens} tokens)")
     
     try:
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt,
-            config={
-                'response_mime_type': 'application/json',
-                'temperature': 0.2,
-            }
-        )
-        
-        fix_info = json.loads(response.text)
-        fixes_applied.append({
-            'file': file_path,
-            'errors_count': len(file_errors),
-            'fix_info': fix_info
-        })
-        
-        print(f"   📋 Analysis: {fix_info['analysis'][:100]}...")
-        print(f"   🎯 Root Cause: {fix_info['root_cause'][:100]}...")
-        print(f"   ✅ Solution: {fix_info['solution'][:100]}...")
-        
+        fixes, missing = request_batch(batch)
     except Exception as e:
-        print(f"   ❌ Error analyzing: {e}")
+        print(f"   ❌ Error analyzing batch: {e}")
+        fixes, missing = [], batch.items
+
+    # Retry files the model skipped (or the whole failed batch), one per request
+    for item in missing:
+        print(f"   ↻ No result for {item.file}, retrying alone...")
+        try:
+            retry_fixes, _ = request_batch(Batch(items=[item], tokens=item.estimated_tokens()))
+            fixes.extend(retry_fixes)
+        except Exception as e:
+            print(f"   ❌ Error analyzing {item.file}: {e}")
+    
+    for fix in fixes:
+        fix_info = fix['fix_info']
+        fixes_applied.append(fix)
+        
+        print(f"   📝 {fix['file']}")
+        print(f"   📋 Analysis: {str(fix_info.get('analysis', ''))[:100]}...")
+        print(f"   🎯 Root Cause: {str(fix_info.get('root_cause', ''))[:100]}...")
+        print(f"   ✅ Solution: {str(fix_info.get('solution', ''))[:100]}...")
 
 # Save fixes
 with open('typescript-fixes.json', 'w', encoding='utf-8') as f:
@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 import re
 import subprocess
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+from tsserver_client import TsServerClient, TsServerError
+
+PROJECT_ROOT = '/home/ubuntu/construction_management_app'
+
 def get_ts_errors():
     """Get all TypeScript errors"""
     result = subprocess.run(
         ['pnpm', 'exec', 'tsc', '--noEmit'],
-        cwd='/home/ubuntu/construction_management_app',
+        cwd=PROJECT_ROOT,
         capture_output=True,
         text=True
     )
     return result.stderr
 
+def count_full_project_errors():
+    """Fallback: full type-check of the project"""
+    return len(re.findall(r'error TS\d+:', get_ts_errors()))
+
+def verify_touched_files(files):
+    """Re-check only the rewritten files through a persistent tsserver"""
+    with TsServerClient(Path(PROJECT_ROOT)) as client:
+        results = client.diagnostics(files)
+    return {file_path: [d for d in diags if d.category == 'error'] for file_path, diags in results.items()}
+
 def parse_unused_vars(errors):
     """Parse unused variable errors"""
     pattern = r"(.+?)\((\d+),(\d+)\): error TS6133: '(.+?)' is declared but its value is never read\."
@@ -86,25 +102,29 @@ def main():
     
     print(f"Found {sum(len(v) for v in files_vars.values())} unused variables in {len(files_vars)} files")
     
-    fixed_count = 0
+    touched_files = []
     for file_path, vars_list in files_vars.items():
         print(f"Fixing {file_path}...")
         if fix_unused_imports(file_path, vars_list):
-            fixed_count += 1
+            touched_files.append(file_path)
     
-    print(f"\nFixed {fixed_count} files")
-    print("Re-running TypeScript check...")
+    print(f"\nFixed {len(touched_files)} files")
+    if not touched_files:
+        return
     
-    # Re-run to see remaining errors
-    result = subprocess.run(
-        ['pnpm', 'exec', 'tsc', '--noEmit'],
-        cwd='/home/ubuntu/construction_management_app',
-        capture_output=True,
-        text=True
-    )
+    print("Re-checking touched files with tsserver...")
+    try:
+        remaining_by_file = verify_touched_files(touched_files)
+    except TsServerError as e:
+        print(f"tsserver unavailable ({e}), falling back to full tsc run...")
+        print(f"Remaining errors: {count_full_project_errors()}")
+        return
     
-    remaining = len(re.findall(r'error TS\d+:', result.stderr))
-    print(f"Remaining errors: {remaining}")
+    for file_path, diags in remaining_by_file.items():
+        if diags:
+            print(f"  {file_path}: {len(diags)} errors")
+    remaining = sum(len(diags) for diags in remaining_by_file.values())
+    print(f"Remaining errors in touched files: {remaining}")
 
 if __name__ == '__main__':
     main()
@@ -2,13 +2,15 @@ import os
 import json
 import google.genai as genai
 
+from gemini_metrics import instrument
+
 # Initialize Gemini
 api_key = os.environ.get('GEMINI_API_KEY')
 if not api_key:
     print("❌ GEMINI_API_KEY not found")
     exit(1)
 
-client = genai.Client(api_key=api_key)
+client = instrument(genai.Client(api_key=api_key))
 
 # Read errors data
 with open('errors-for-gemini.json', 'r', encoding='utf-8') as f:
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Gemini Request Batching
+
+Packs the error sets of several files into a single structured Gemini request
+(up to a token budget) and splits the per-file keyed response back into the
+`fixes_applied` entries used by fix-typescript-errors.py.
+
+The fixed instructions are sent once per batch instead of once per file, so a
+run over N small files costs ceil(N / files_per_batch) round trips.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Rough token estimate: Gemini averages ~4 bytes of UTF-8 per token for code,
+# and Thai text (3 bytes per character) lands close to the same ratio.
+BYTES_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGET = 24000
+DEFAULT_MAX_FILES_PER_BATCH = 8
+MAX_ERRORS_PER_FILE = 10
+SNIPPET_CHARS = 3000
+
+BATCH_INSTRUCTIONS = """คุณเป็น TypeScript Expert กำลังแก้ไข TypeScript errors ในหลายไฟล์พร้อมกัน
+
+สำหรับแต่ละไฟล์ด้านล่าง:
+1. วิเคราะห์สาเหตุของ errors เหล่านี้
+2. เสนอแนะวิธีแก้ไขที่มีประสิทธิภาพสูงสุด (แก้ที่ root cause)
+3. ให้ code snippet สำหรับแก้ไข (ถ้าเป็นไปได้)
+
+กรุณาตอบเป็นภาษาไทย ในรูปแบบ JSON โดยใช้ path ของไฟล์เป็น key ให้ครบทุกไฟล์:
+{
+  "files": {
+    "<file path>": {
+      "analysis": "การวิเคราะห์",
+      "root_cause": "สาเหตุหลัก",
+      "solution": "วิธีแก้ไข",
+      "fix_type": "manual/automatic",
+      "code_changes": [
+        {
+          "line": 123,
+          "original": "โค้ดเดิม",
+          "fixed": "โค้ดที่แก้แล้ว",
+          "reason": "เหตุผล"
+        }
+      ]
+    }
+  }
+}
+"""
+
+
+@dataclass
+class FileErrorSet:
+    """Errors reported for one file plus the code snippet sent with them"""
+    file: str
+    errors: List[str]
+    snippet: str
+    truncated: bool = False
+
+    def section(self) -> str:
+        """Render this file's part of the batched prompt"""
+        shown = self.errors[:MAX_ERRORS_PER_FILE]
+        errors_text = '\n'.join(line.rstrip('\n') for line in shown)
+        more = '\n...' if self.truncated else ''
+        return (
+            f"### FILE: {self.file}\n"
+            f"## Errors ที่พบ ({len(shown)} errors แรก จากทั้งหมด {len(self.errors)}):\n"
+            f"```\n{errors_text}\n```\n\n"
+            f"## ส่วนของโค้ดที่มีปัญหา:\n"
+            f"```typescript\n{self.snippet}{more}\n```\n"
+        )
+
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.section())
+
+
+@dataclass
+class Batch:
+    """A group of files sent in one request"""
+    items: List[FileErrorSet] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def files(self) -> List[str]:
+        return [item.file for item in self.items]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt fragment"""
+    return (len(text.encode('utf-8')) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def make_error_set(file_path: str, errors: List[str], content: str,
+                   snippet_chars: int = SNIPPET_CHARS) -> FileErrorSet:
+    """Build the error set for a file, keeping small files whole"""
+    return FileErrorSet(
+        file=file_path,
+        errors=errors,
+        snippet=content[:snippet_chars],
+        truncated=len(content) > snippet_chars,
+    )
+
+
+def pack_batches(items: List[FileErrorSet],
+                 token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 max_files: int = DEFAULT_MAX_FILES_PER_BATCH) -> List[Batch]:
+    """
+    Greedily pack error sets into batches that fit the token budget.
+
+    Input order is preserved so the most important files go out first. A file
+    whose section alone exceeds the budget still gets a batch of its own.
+    """
+    available = token_budget - estimate_tokens(BATCH_INSTRUCTIONS)
+    batches: List[Batch] = []
+    current = Batch()
+
+    for item in items:
+        cost = item.estimated_tokens()
+        if current.items and (current.tokens + cost > available or len(current.items) >= max_files):
+            batches.append(current)
+            current = Batch()
+        current.items.append(item)
+        current.tokens += cost
+
+    if current.items:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(batch: Batch) -> str:
+    """Build one prompt carrying the shared instructions and every file section"""
+    sections = '\n'.join(item.section() for item in batch.items)
+    return f"{BATCH_INSTRUCTIONS}\n## ไฟล์ทั้งหมด ({len(batch.items)} ไฟล์)\n\n{sections}"
+
+
+def split_batch_response(batch: Batch, response_text: str) -> Tuple[List[Dict], List[FileErrorSet]]:
+    """
+    Split a batched response into per-file `fixes_applied` entries.
+
+    Returns the entries plus the error sets the model did not answer, so the
+    caller can retry them (individually or in a smaller batch). A reply that
+    is not valid JSON, or whose `files` is not an object, answers nothing.
+    """
+    try:
+        payload = json.loads(response_text)
+    except (TypeError, ValueError):
+        return [], list(batch.items)
+
+    results = payload.get('files', payload) if isinstance(payload, dict) else None
+    if not isinstance(results, dict):
+        return [], list(batch.items)
+
+    fixes: List[Dict] = []
+    missing: List[FileErrorSet] = []
+    for item in batch.items:
+        fix_info: Optional[Dict] = results.get(item.file)
+        if not isinstance(fix_info, dict):
+            missing.append(item)
+            continue
+        fixes.append({
+            'file': item.file,
+            'errors_count': len(item.errors),
+            'fix_info': fix_info,
+        })
+    return fixes, missing
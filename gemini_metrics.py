@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Gemini Call Instrumentation
+
+Thin wrapper around a google.genai client that records, for every call:
+request size, estimated prompt/output tokens (plus the real usage metadata when
+the API returns it), time to first byte, total latency, retries, context-cache
+hits and an estimated cost. Records are appended to a JSONL metrics file.
+Failed calls are recorded and re-raised; retrying transient errors (429, 5xx,
+timeouts) is opt-in via GEMINI_MAX_RETRIES or instrument(max_retries=...).
+
+Usage in a script:
+    from gemini_metrics import instrument
+    client = instrument(genai.Client(api_key=api_key))
+
+Summary report:
+    python gemini_metrics.py [gemini-metrics.jsonl]
+"""
+
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from gemini_batching import estimate_tokens
+
+DEFAULT_METRICS_FILE = 'gemini-metrics.jsonl'
+DEFAULT_MAX_RETRIES = 0
+RETRY_BACKOFF_SECONDS = 2.0
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# USD per 1M tokens (input, output); longest matching model prefix wins.
+# Estimates only, update when the price list changes.
+PRICING = {
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+
+
+def contents_to_text(contents: Any) -> str:
+    """Flatten the `contents` argument (str, list of str/parts) for sizing"""
+    if contents is None:
+        return ''
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return '\n'.join(contents_to_text(c) for c in contents)
+    text = getattr(contents, 'text', None)
+    if isinstance(text, str):
+        return text
+    parts = getattr(contents, 'parts', None)
+    if parts:
+        return contents_to_text(list(parts))
+    return str(contents)
+
+
+def estimate_cost(model: str, prompt_tokens: int, output_tokens: int) -> Optional[float]:
+    """Estimate USD cost of a call, or None for unknown models"""
+    matches = [prefix for prefix in PRICING if model.startswith(prefix)]
+    if not matches:
+        return None
+    input_price, output_price = PRICING[max(matches, key=len)]
+    return (prompt_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def usage_counts(response: Any) -> Dict[str, Optional[int]]:
+    """Read usage_metadata token counts from a response, when present"""
+    usage = getattr(response, 'usage_metadata', None)
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+        'output_tokens': getattr(usage, 'candidates_token_count', None),
+        'cached_tokens': getattr(usage, 'cached_content_token_count', None),
+    }
+
+
+def is_transient(error: Exception) -> bool:
+    """Rate limits, server errors and timeouts; never auth, 400s or other client errors"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    for attr in ('code', 'status_code'):
+        code = getattr(error, attr, None)
+        if isinstance(code, int):
+            return code in TRANSIENT_STATUS_CODES
+    return 'timeout' in type(error).__name__.lower()
+
+
+class MetricsWriter:
+    """Appends one JSON object per call to the metrics file"""
+
+    def __init__(self, path: str, run_id: str, script: str):
+        self.path = Path(path)
+        self.run_id = run_id
+        self.script = script
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record = {
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'run_id': self.run_id,
+            'script': self.script,
+            **record,
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class InstrumentedModels:
+    """Mirrors client.models, timing and recording each call"""
+
+    def __init__(self, models: Any, writer: MetricsWriter, max_retries: int):
+        self._models = models
+        self._writer = writer
+        self._max_retries = max_retries
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+    def _base_record(self, model: str, contents: Any, streamed: bool) -> Dict[str, Any]:
+        text = contents_to_text(contents)
+        return {
+            'model': model,
+            'streamed': streamed,
+            'request_chars': len(text),
+            'request_bytes': len(text.encode('utf-8')),
+            'est_prompt_tokens': estimate_tokens(text),
+        }
+
+    def _finish(self, record: Dict[str, Any], output_text: str, usage: Dict[str, Optional[int]]) -> None:
+        record['est_output_tokens'] = estimate_tokens(output_text)
+        record.update(usage)
+        record['cache_hit'] = bool(usage.get('cached_tokens'))
+        prompt_tokens = usage.get('prompt_tokens') or record['est_prompt_tokens']
+        output_tokens = usage.get('output_tokens') or record['est_output_tokens']
+        record['est_cost_usd'] = estimate_cost(record['model'], prompt_tokens, output_tokens)
+        self._writer.write(record)
+
+    def generate_content(self, *, model: str, contents: Any, **kwargs: Any) -> Any:
+        """Non-streaming call: the whole body arrives at once, so TTFB == latency"""
+        record = self._base_record(model, contents, streamed=False)
+        retries = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                response = self._models.generate_content(model=model, contents=contents, **kwargs)
+                break
+            except Exception as e:
+                if retries >= self._max_retries or not is_transient(e):
+                    record.update({
+                        'status': 'error',
+                        'error': str(e)[:500],
+                        'retries': retries,
+                        'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                        'ttfb_ms': None,
+                    })
+                    self._writer.write(record)
+                    raise
+                retries += 1
+                time.sleep(RETRY_BACKOFF_SECONDS * (2 ** (retries - 1)))
+
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        record.update({'status': 'ok', 'retries': retries, 'latency_ms': latency_ms, 'ttfb_ms': latency_ms})
+        self._finish(record, getattr(response, 'text', '') or '', usage_counts(response))
+        return response
+
+    def generate_content_stream(self, *, model: str, contents: Any, **kwargs: Any) -> Iterator[Any]:
+        """Streaming call: TTFB is measured at the first chunk"""
+        record = self._base_record(model, contents, streamed=True)
+        start = time.perf_counter()
+        ttfb_ms = None
+        chunks: List[str] = []
+        usage: Dict[str, Optional[int]] = {}
+        status = 'partial'      # caller stopped early (GeneratorExit) unless set below
+        try:
+            for chunk in self._models.generate_content_stream(model=model, contents=contents, **kwargs):
+                if ttfb_ms is None:
+                    ttfb_ms = round((time.perf_counter() - start) * 1000, 1)
+                chunks.append(getattr(chunk, 'text', '') or '')
+                chunk_usage = usage_counts(chunk)
+                if any(v is not None for v in chunk_usage.values()):
+                    usage = chunk_usage
+                yield chunk
+            status = 'ok'
+        except Exception as e:
+            status = 'error'
+            record['error'] = str(e)[:500]
+            raise
+        finally:
+            record.update({
+                'status': status,
+                'retries': 0,
+                'chunks': len(chunks),
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'ttfb_ms': ttfb_ms,
+            })
+            self._finish(record, ''.join(chunks), usage or usage_counts(None))
+
+
+class InstrumentedClient:
+    """Drop-in wrapper exposing the same `.models` surface as genai.Client"""
+
+    def __init__(self, client: Any, metrics_path: str, run_id: str, script: str, max_retries: int):
+        self._client = client
+        self.run_id = run_id
+        self.models = InstrumentedModels(client.models, MetricsWriter(metrics_path, run_id, script), max_retries)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def instrument(client: Any, metrics_path: Optional[str] = None, run_id: Optional[str] = None,
+               max_retries: Optional[int] = None) -> InstrumentedClient:
+    """Wrap a genai client; settings fall back to GEMINI_METRICS_FILE / GEMINI_MAX_RETRIES"""
+    return InstrumentedClient(
+        client,
+        metrics_path=metrics_path or os.environ.get('GEMINI_METRICS_FILE', DEFAULT_METRICS_FILE),
+        run_id=run_id or uuid.uuid4().hex[:12],
+        script=Path(sys.argv[0]).name if sys.argv and sys.argv[0] else 'interactive',
+        max_retries=max_retries if max_retries is not None else int(
+            os.environ.get('GEMINI_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+    )
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate latency percentiles, token usage and cost overall and per run"""
+    def tokens(r: Dict[str, Any], real: str, est: str) -> int:
+        return r.get(real) or r.get(est) or 0
+
+    ok = [r for r in records if r.get('status') == 'ok']
+    latencies = [r['latency_ms'] for r in ok]
+    ttfbs = [r['ttfb_ms'] for r in ok if r.get('ttfb_ms') is not None]
+
+    runs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in records:
+        runs[r.get('run_id', '?')].append(r)
+
+    per_run = []
+    for run_id, run_records in runs.items():
+        run_ok = [r for r in run_records if r.get('status') == 'ok']
+        per_run.append({
+            'run_id': run_id,
+            'script': run_records[0].get('script'),
+            'started': run_records[0].get('ts'),
+            'calls': len(run_records),
+            'errors': len(run_records) - len(run_ok),
+            'prompt_tokens': sum(tokens(r, 'prompt_tokens', 'est_prompt_tokens') for r in run_ok),
+            'output_tokens': sum(tokens(r, 'output_tokens', 'est_output_tokens') for r in run_ok),
+            'est_cost_usd': round(sum(r.get('est_cost_usd') or 0 for r in run_ok), 6),
+            'latency_p50_ms': percentile([r['latency_ms'] for r in run_ok], 50),
+        })
+    per_run.sort(key=lambda r: r['started'] or '')
+
+    return {
+        'calls': len(records),
+        'errors': sum(1 for r in records if r.get('status') == 'error'),
+        'partial': sum(1 for r in records if r.get('status') == 'partial'),
+        'retries': sum(r.get('retries') or 0 for r in records),
+        'cache_hit_rate': round(sum(1 for r in ok if r.get('cache_hit')) / len(ok), 3) if ok else None,
+        'latency_p50_ms': percentile(latencies, 50),
+        'latency_p95_ms': percentile(latencies, 95),
+        'ttfb_p50_ms': percentile(ttfbs, 50),
+        'ttfb_p95_ms': percentile(ttfbs, 95),
+        'prompt_tokens': sum(r['prompt_tokens'] for r in per_run),
+        'output_tokens': sum(r['output_tokens'] for r in per_run),
+        'est_cost_usd': round(sum(r['est_cost_usd'] for r in per_run), 6),
+        'runs': per_run,
+    }
+
+
+def main():
+    metrics_path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('GEMINI_METRICS_FILE', DEFAULT_METRICS_FILE)
+    if not Path(metrics_path).exists():
+        print(f"❌ Metrics file not found: {metrics_path}")
+        sys.exit(1)
+
+    summary = summarize(load_records(metrics_path))
+
+    print("📊 Gemini Call Metrics")
+    print("=" * 80)
+    print(f"Calls: {summary['calls']}  Errors: {summary['errors']}  Partial streams: {summary['partial']}  "
+          f"Retries: {summary['retries']}")
+    print(f"Latency p50/p95: {summary['latency_p50_ms']} / {summary['latency_p95_ms']} ms")
+    print(f"TTFB p50/p95:    {summary['ttfb_p50_ms']} / {summary['ttfb_p95_ms']} ms")
+    print(f"Cache hit rate:  {summary['cache_hit_rate']}")
+    print(f"Tokens: {summary['prompt_tokens']} prompt / {summary['output_tokens']} output")
+    print(f"Estimated cost:  ${summary['est_cost_usd']:.4f}")
+
+    print("\nPer run:")
+    for run in summary['runs']:
+        print(f"  {run['started']}  {run['script']:<28} calls={run['calls']:<3} "
+              f"errors={run['errors']:<2} tokens={run['prompt_tokens']}+{run['output_tokens']} "
+              f"p50={run['latency_p50_ms']}ms cost=${run['est_cost_usd']:.4f}")
+
+    summary_file = Path(metrics_path).with_suffix('.summary.json')
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Summary saved to {summary_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,781 @@
+#!/usr/bin/env python3
+"""
+Aggregate Hotspot Finder
+
+The dashboard and analytics functions (getDashboardStats, getCEO*, the
+analytics service and repository) recount COUNT/SUM/GROUP BY over whole
+tables on every load. This script takes the aggregate queries of the static
+query catalog, reduces each to the table it counts and the dimensions it
+needs - group-by columns, filtered columns and the columns tested inside
+SUM(CASE WHEN ...) - and groups them into proposals for incrementally
+maintained summary tables:
+
+  * dimensions   base-table columns as they are; timestamps bucketed by day;
+                 IS NULL tests as a flag; joined-table columns (tasks.projectId
+                 for defects) are copied onto the base row, except IS NULL
+                 tests on a parent (projects.archivedAt), which stay a
+                 read-time join on the link column
+  * measures     rowCount, plus a running SUM for SUM/AVG columns;
+                 COUNT(DISTINCT), MIN/MAX and GROUP_CONCAT cannot be kept up
+                 incrementally and are reported, not summarized
+  * write paths  every insert/delete on the table and every update whose set()
+                 touches a dimension or measure (or is a spread), across db.ts,
+                 the repositories and the services - the places that must
+                 increment/decrement the summary in the same transaction
+
+Queries that join a child table on the base table's primary key (users.id =
+taskAssignments.userId) count the child rows; they are listed separately
+instead of being summarized on the wrong table.
+
+A query whose dimensions are a subset of a proposal with at most
+--max-dimensions columns is folded into it (it reads the summary with a
+coarser GROUP BY). Proposals are ranked by the dashboard procedures that
+reach their queries (through the router call graph, plus the functions
+benchmark-dashboard.mjs times), then by table row counts.
+
+Each proposal carries the CREATE TABLE, the backfill, the increment
+statement and a rewrite of every source query against the summary.
+Nullable dimensions are stored with a sentinel (so they can be part of the
+primary key) and read back through NULLIF().
+
+Usage:
+    python scripts/aggregate_hotspots.py
+    python scripts/aggregate_hotspots.py --stats db-stats.json --max-dimensions 2
+    python scripts/aggregate_hotspots.py --table tasks
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from db_query_log import LOG_DIR
+from ddl_risk import load_stats, row_counts_from_logs
+from drizzle_schema import Column, Schema, Table, load_schema
+from index_advisor import quote
+from query_catalog import DEFAULT_FILES, Join, Predicate, Query, build_catalog, resolve_files
+from unbounded_selects import DataLayer, function_key, load_procedures, table_rows
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPORT_FILE = PROJECT_ROOT / 'aggregate-hotspots.json'
+AGGREGATE_FILES = ('server/db.ts', 'server/services/analytics.service.ts', 'server/repositories/*.ts')
+WRITE_FILES = (*DEFAULT_FILES, 'server/services/*.ts')
+BENCHMARK_FILE = PROJECT_ROOT / 'benchmark-dashboard.mjs'
+MAX_DIMENSIONS = 3
+
+DASHBOARD = re.compile(r'dashboard|ceo|analytics|stats|overview|summary', re.IGNORECASE)
+BENCHMARK_IMPORT = re.compile(r'const\s*\{([^}]*)\}\s*=\s*await\s+import\(\s*[\'"]\./server/db(?:\.ts)?[\'"]\s*\)')
+SQL_COLUMN = re.compile(r'`(\w+)`\.`(\w+)`')
+AGGREGATE_CALL = re.compile(r'^\s*(\w+)\s*\(\s*(DISTINCT\s+)?(.*)\)\s*$', re.IGNORECASE | re.DOTALL)
+CASE_COUNT = re.compile(r'^CASE\s+WHEN\s+(.*?)\s+THEN\s+1\s+ELSE\s+0\s+END$', re.IGNORECASE | re.DOTALL)
+COMPARISON_SQL = {'eq': '=', 'ne': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+                  'inArray': 'IN', 'notInArray': 'NOT IN'}
+RANGE_OPS = {'gt', 'gte', 'lt', 'lte', 'between', 'notBetween'}
+UNSUMMARIZABLE_OPS = {'like', 'notLike', 'ilike', 'exists', 'notExists'}
+DAY_TYPES = {'timestamp', 'datetime', 'date'}
+SENTINELS = {'int': '-1', 'tinyint': '-1', 'timestamp': "'1000-01-01'"}
+DEFAULT_SENTINEL = "''"
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """A column of the summary table's key"""
+    column: str               # table.column (schema export names)
+    kind: str                 # value | day | null
+    via: Optional[str] = None  # joined table the column lives in (denormalized onto the base row)
+
+
+@dataclass
+class Measure:
+    function: str             # COUNT | SUM | AVG | MIN | MAX | COUNT DISTINCT | GROUP_CONCAT
+    column: Optional[str]     # table.column for SUM/AVG/MIN/MAX
+    maintainable: bool
+    expression: Optional[str] = None   # rendered SUM/AVG argument (COALESCE(`tasks`.`progress`, 0))
+
+
+@dataclass
+class SourceQuery:
+    """One aggregate query reduced to what a summary table must keep"""
+    query: Query
+    dimensions: Set[Dimension]
+    measures: List[Measure]
+    residual: List[Predicate]                 # filters applied through a read-time join
+    residual_joins: List[Join]
+    denormalized_joins: List[Join]            # joins needed to fill denormalized dimensions
+    problems: List[str] = field(default_factory=list)
+    fan_out: Optional[str] = None             # joined table whose rows are really being counted
+
+    @property
+    def function(self) -> str:
+        return f'{self.query.owner}.{self.query.function}' if self.query.owner else self.query.function
+
+    @property
+    def location(self) -> str:
+        return f'{self.query.file}:{self.query.line}'
+
+
+@dataclass
+class WritePath:
+    function: str
+    location: str
+    operation: str            # insert | update | delete
+    table: str
+    columns: List[str]        # set()/values() columns, ['*'] when spread
+    maintenance: str          # increment | decrement | move | relink
+    bulk: bool                # touches many rows: re-aggregate the affected groups instead
+
+
+@dataclass
+class Proposal:
+    name: str
+    table: str
+    dimensions: List[Dimension]
+    sources: List[SourceQuery]
+    measures: List[Measure] = field(default_factory=list)
+    write_paths: List[WritePath] = field(default_factory=list)
+    procedures: List[str] = field(default_factory=list)
+    benchmarked: List[str] = field(default_factory=list)
+    table_rows: Optional[int] = None
+    ddl: str = ''
+    backfill: str = ''
+    increment: str = ''
+    reads: List[Dict] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def dashboard_procedures(self) -> List[str]:
+        return [path for path in self.procedures if DASHBOARD.search(path)]
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'table': self.table,
+            'table_rows': self.table_rows,
+            'dimensions': [asdict(dimension) for dimension in self.dimensions],
+            'measures': [asdict(measure) for measure in self.measures],
+            'queries': [{'function': source.function, 'location': source.location,
+                         'aggregates': source.query.aggregates, 'group_by': source.query.group_by}
+                        for source in self.sources],
+            'procedures': self.procedures,
+            'dashboard_procedures': self.dashboard_procedures,
+            'benchmarked': self.benchmarked,
+            'write_paths': [asdict(path) for path in self.write_paths],
+            'ddl': self.ddl,
+            'backfill': self.backfill,
+            'increment': self.increment,
+            'reads': self.reads,
+            'notes': self.notes,
+        }
+
+
+# ----------------------------------------------------------------------
+# Reducing aggregate queries
+# ----------------------------------------------------------------------
+
+def _column(schema: Schema, qualified: str) -> Optional[Tuple[Table, Column]]:
+    owner, _, name = qualified.partition('.')
+    table = schema.tables.get(owner)
+    column = table.columns.get(name) if table else None
+    return (table, column) if column else None
+
+
+def _sql_columns(schema: Schema, text: str) -> List[str]:
+    """table.column (export names) for every `sqlTable`.`column` in rendered sql"""
+    found = []
+    for sql_table, sql_column in SQL_COLUMN.findall(text):
+        table = schema.by_sql_name(sql_table)
+        column = table.column_by_sql_name(sql_column) if table else None
+        if column is not None:
+            found.append(f'{table.name}.{column.name}')
+    return list(dict.fromkeys(found))
+
+
+def _primary_columns(table: Table) -> List[str]:
+    """SQL names of the primary key (declared or implied by AUTO_INCREMENT)"""
+    return next((index.columns for index in table.all_indexes() if index.primary), [])
+
+
+def _value_kind(schema: Schema, qualified: str) -> str:
+    resolved = _column(schema, qualified)
+    return 'day' if resolved and resolved[1].type in DAY_TYPES else 'value'
+
+
+def _link_column(query: Query, joined: str) -> Optional[Tuple[str, Join]]:
+    """Column on the query's side of the join that brings in the `joined` table"""
+    for join in query.joins:
+        if join.table != joined:
+            continue
+        for predicate in join.on:
+            if predicate.op != 'eq' or not predicate.column or not predicate.other_column:
+                continue
+            ours, theirs = predicate.column, predicate.other_column
+            if ours.split('.')[0] == joined:
+                ours, theirs = theirs, ours
+            return ours, join
+    return None
+
+
+def reduce_query(query: Query, schema: Schema) -> SourceQuery:
+    source = SourceQuery(query, set(), [], [], [], [])
+    base = query.table
+    table = schema.tables[base]
+    primary = _primary_columns(table)
+    links = {}                          # joined table -> (column on the near side, join)
+    for join in query.joins:
+        link = _link_column(query, join.table) if join.table else None
+        if link is None:
+            continue
+        links[join.table] = link
+        owner, name = link[0].split('.')
+        if owner == base and name in table.columns and table.columns[name].sql_name in primary:
+            # users.id = taskAssignments.userId: the aggregate counts the joined rows
+            source.fan_out = join.table
+
+    def place(column: str, kind: str, read_time: bool = False) -> None:
+        owner = column.split('.')[0]
+        if owner == base:
+            source.dimensions.add(Dimension(column, kind))
+            return
+        if owner not in links:
+            source.problems.append(f'{column} is not reachable through a join')
+            return
+        if not read_time:
+            # copied onto the base row, kept in step by the joined table's write paths
+            source.dimensions.add(Dimension(column, kind, via=owner))
+            join = links[owner][1]
+            if join not in source.denormalized_joins:
+                source.denormalized_joins.append(join)
+            return
+        near, join = links[owner]
+        if join not in source.residual_joins:
+            source.residual_joins.append(join)
+        place(near, 'value')
+
+    for predicate in query.filters:
+        if not predicate.column:
+            continue
+        if predicate.op in UNSUMMARIZABLE_OPS:
+            source.problems.append(f'{predicate.op} on {predicate.column}')
+            continue
+        columns = [predicate.column] + ([predicate.other_column] if predicate.other_column else [])
+        if predicate.op == 'sql' and predicate.value:
+            columns = _sql_columns(schema, predicate.value.replace('${', '`').replace('}', '`')) or columns
+            columns = [c if '.' in c else predicate.column for c in columns]
+        for column in columns:
+            # IS NULL on a joined table (projects.archivedAt) is a lifecycle flag of the
+            # parent row: keep it a read-time join instead of relinking every child on archive
+            read_time = (predicate.op in ('isNull', 'isNotNull') and column.split('.')[0] != base
+                         and not any(near == column for near, _ in links.values()))
+            if read_time:
+                if predicate not in source.residual:
+                    source.residual.append(predicate)
+                place(column, 'null', read_time=True)
+            elif predicate.op in ('isNull', 'isNotNull'):
+                place(column, 'null')
+            elif predicate.op in RANGE_OPS or predicate.op == 'sql':
+                place(column, _value_kind(schema, column))
+            else:
+                place(column, 'value')
+
+    for column in query.group_by:
+        if _column(schema, column):
+            place(column, 'value')
+        else:
+            source.problems.append(f'GROUP BY {column}')
+
+    for aggregate in query.aggregates:
+        source.measures.append(_measure(aggregate, schema, source, place))
+    return _merge_null_flags(source)
+
+
+def _measure(aggregate: str, schema: Schema, source: SourceQuery, place) -> Measure:
+    match = AGGREGATE_CALL.match(aggregate)
+    if not match:
+        source.problems.append(f'aggregate {aggregate}')
+        return Measure(aggregate, None, False)
+    function, distinct, argument = match.group(1).upper(), bool(match.group(2)), match.group(3).strip()
+    columns = _sql_columns(schema, argument)
+    if not columns and re.match(r'^\w+\.\w+$', argument) and _column(schema, argument):
+        columns = [argument]
+    if function == 'COUNT' and distinct:
+        return Measure('COUNT DISTINCT', columns[0] if columns else None, False)
+    if function == 'COUNT':
+        return Measure('COUNT', None, True)
+    if function in ('MIN', 'MAX', 'GROUP_CONCAT'):
+        return Measure(function, columns[0] if columns else None, False)
+    if function == 'SUM' and argument.upper().startswith('CASE'):
+        # conditional counts: every column tested becomes a dimension
+        for column in columns:
+            place(column, _value_kind(schema, column))
+        return Measure('COUNT' if CASE_COUNT.match(argument) else 'SUM', None, True)
+    if function in ('SUM', 'AVG') and len(columns) == 1:
+        expression = argument if SQL_COLUMN.search(argument) else None
+        return Measure(function, columns[0], True, expression)
+    source.problems.append(f'aggregate {aggregate}')
+    return Measure(function, None, False)
+
+
+def _merge_null_flags(source: SourceQuery) -> SourceQuery:
+    """A column kept by value (or day) already answers IS NULL"""
+    kept = {d.column for d in source.dimensions if d.kind != 'null'}
+    source.dimensions = {d for d in source.dimensions if d.kind != 'null' or d.column not in kept}
+    return source
+
+
+# ----------------------------------------------------------------------
+# Grouping into proposals
+# ----------------------------------------------------------------------
+
+def _summary_name(table: str, dimensions: Sequence[Dimension]) -> str:
+    parts = []
+    for dimension in dimensions:
+        name = dimension.column.split('.')[1]
+        parts.append(name[0].upper() + name[1:] + ('Day' if dimension.kind == 'day' else
+                                                   'IsNull' if dimension.kind == 'null' else ''))
+    return f"{table}Summary{'By' + ''.join(parts) if parts else ''}"
+
+
+def _sorted_dimensions(dimensions: Set[Dimension]) -> List[Dimension]:
+    return sorted(dimensions, key=lambda d: (d.via is not None, d.kind != 'value', d.column))
+
+
+def group_sources(sources: Sequence[SourceQuery], max_dimensions: int = MAX_DIMENSIONS) -> List[Proposal]:
+    groups: Dict[Tuple[str, frozenset], List[SourceQuery]] = {}
+    for source in sources:
+        groups.setdefault((source.query.table, frozenset(source.dimensions)), []).append(source)
+
+    # fold each dimension set into the smallest small-enough superset on the same table
+    keys = sorted(groups, key=lambda key: (key[0], len(key[1])))
+    target = {key: key for key in keys}
+    for key in keys:
+        supersets = [other for other in keys if other[0] == key[0] and other != key
+                     and key[1] < other[1] and len(other[1]) <= max_dimensions]
+        if supersets:
+            target[key] = min(supersets, key=lambda other: (len(other[1]), sorted(d.column for d in other[1])))
+    for key in keys:
+        while target[target[key]] != target[key]:
+            target[key] = target[target[key]]
+
+    proposals: Dict[Tuple[str, frozenset], Proposal] = {}
+    for key in keys:
+        home = target[key]
+        if home not in proposals:
+            dimensions = _sorted_dimensions(set(home[1]))
+            proposals[home] = Proposal(_summary_name(home[0], dimensions), home[0], dimensions, [])
+        proposals[home].sources.extend(groups[key])
+    return list(proposals.values())
+
+
+# ----------------------------------------------------------------------
+# Write paths
+# ----------------------------------------------------------------------
+
+def _bulk(query: Query, schema: Schema) -> bool:
+    if query.operation == 'insert':
+        return query.bulk_insert
+    table = schema.tables[query.table]
+    primary = {column.name for column in table.columns.values() if column.sql_name in _primary_columns(table)}
+    return not any(p.op == 'eq' and not p.conditional and p.column and p.column.split('.', 1)[1] in primary
+                   for p in query.filters)
+
+
+def write_paths(proposal: Proposal, writes: Sequence[Query], schema: Schema) -> List[WritePath]:
+    watched: Dict[str, Set[str]] = {proposal.table: set()}      # table -> columns whose change matters
+    for dimension in proposal.dimensions:
+        table, name = dimension.column.split('.')
+        watched.setdefault(table, set()).add(name)
+    for measure in proposal.measures:
+        if measure.column:
+            watched[proposal.table].add(measure.column.split('.')[1])
+    for source in proposal.sources:
+        for join in source.denormalized_joins:
+            for predicate in join.on:
+                for column in (predicate.column, predicate.other_column):
+                    if column and column.split('.')[0] in watched:
+                        watched[column.split('.')[0]].add(column.split('.')[1])
+
+    paths = []
+    for query in sorted(writes, key=lambda q: (q.table != proposal.table, q.file, q.line)):
+        if query.table not in watched:
+            continue
+        base = query.table == proposal.table
+        columns = [c.split('.')[-1] for c in query.set_columns]
+        if query.operation == 'update':
+            if columns and not set(columns) & watched[query.table]:
+                continue
+            maintenance = 'move' if base else 'relink'
+        elif not base:
+            continue            # rows of a denormalized table come and go with their own base rows
+        else:
+            maintenance = 'increment' if query.operation == 'insert' else 'decrement'
+        function = f'{query.owner}.{query.function}' if query.owner else query.function
+        paths.append(WritePath(function=function, location=f'{query.file}:{query.line}', operation=query.operation,
+                               table=query.table, columns=columns or ['*'], maintenance=maintenance,
+                               bulk=_bulk(query, schema)))
+    return paths
+
+
+# ----------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------
+
+def _literal(value: Optional[str]) -> str:
+    """A compared value as SQL: string and number literals kept, anything else a parameter"""
+    if value and re.fullmatch(r'-?\d+(?:\.\d+)?', value):
+        return value
+    if value and len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"' and value[0] not in value[1:-1]:
+        return f"'{value[1:-1]}'"
+    return '?'
+
+
+class SummarySql:
+    """DDL, backfill, increment and read rewrites for one proposal"""
+
+    def __init__(self, proposal: Proposal, schema: Schema):
+        self.proposal = proposal
+        self.schema = schema
+        self.base = schema.tables[proposal.table]
+        names: Dict[Dimension, str] = {}
+        taken: Set[str] = set()
+        for dimension in proposal.dimensions:
+            table, column = dimension.column.split('.')
+            name = self.base.columns[column].sql_name if table == proposal.table else column
+            if dimension.via and (name in taken or name in self.base.columns):
+                name = table + name[0].upper() + name[1:]
+            name += 'Day' if dimension.kind == 'day' else 'IsNull' if dimension.kind == 'null' else ''
+            names[dimension] = name
+            taken.add(name)
+        self.names = names
+
+    def _source_column(self, dimension: Dimension) -> Tuple[Table, Column]:
+        return _column(self.schema, dimension.column)
+
+    def _sql_ref(self, qualified: str) -> str:
+        table, column = _column(self.schema, qualified)
+        return f'{quote(table.sql_name)}.{quote(column.sql_name)}'
+
+    def _nullable(self, dimension: Dimension) -> bool:
+        return dimension.kind != 'null' and not self._source_column(dimension)[1].not_null
+
+    def _sentinel(self, dimension: Dimension) -> str:
+        column = self._source_column(dimension)[1]
+        return SENTINELS.get(column.type, DEFAULT_SENTINEL)
+
+    def _column_type(self, dimension: Dimension) -> str:
+        column = self._source_column(dimension)[1]
+        if dimension.kind == 'null':
+            return 'TINYINT(1)'
+        if dimension.kind == 'day':
+            return 'DATE'
+        if column.type in ('int', 'tinyint'):
+            return column.type.upper()
+        return 'VARCHAR(64)'      # enums and short strings; enums cannot hold the '' sentinel
+
+    def _expression(self, dimension: Dimension) -> str:
+        ref = self._sql_ref(dimension.column)
+        if dimension.kind == 'null':
+            return f'({ref} IS NULL)'
+        value = f'DATE({ref})' if dimension.kind == 'day' else ref
+        return f'COALESCE({value}, {self._sentinel(dimension)})' if self._nullable(dimension) else value
+
+    def _measure_columns(self) -> List[Tuple[str, str]]:
+        """(summary column, source expression) of the running sums"""
+        found = []
+        for measure in self.proposal.measures:
+            if measure.maintainable and measure.function in ('SUM', 'AVG') and measure.column:
+                name = measure.column.split('.')[1] + 'Sum'
+                if all(name != other for other, _ in found):
+                    found.append((name, measure.expression or self._sql_ref(measure.column)))
+        return found
+
+    def ddl(self) -> str:
+        lines = [f'  {quote(name)} {self._column_type(dimension)} NOT NULL'
+                 + (f' DEFAULT {self._sentinel(dimension)}' if self._nullable(dimension) else '')
+                 for dimension, name in self.names.items()]
+        lines.append('  `rowCount` BIGINT NOT NULL DEFAULT 0')
+        lines.extend(f'  {quote(name)} DECIMAL(20, 4) NOT NULL DEFAULT 0' for name, _ in self._measure_columns())
+        lines.append('  `updatedAt` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')
+        key = ', '.join(quote(name) for name in self.names.values())
+        if key:
+            lines.append(f'  PRIMARY KEY ({key})')
+        else:
+            lines.append('  `id` TINYINT NOT NULL DEFAULT 1 PRIMARY KEY')
+        return f"CREATE TABLE {quote(self.proposal.name)} (\n" + ',\n'.join(lines) + '\n);'
+
+    def _joins(self) -> List[str]:
+        clauses = []
+        for source in self.proposal.sources:
+            for join in source.denormalized_joins:
+                on = ' AND '.join(f'{self._sql_ref(p.column)} = {self._sql_ref(p.other_column)}'
+                                  for p in join.on if p.column and p.other_column)
+                clause = f'JOIN {quote(self.schema.tables[join.table].sql_name)} ON {on}'
+                if clause not in clauses:
+                    clauses.append(clause)
+        return clauses
+
+    def backfill(self) -> str:
+        columns = list(self.names.values()) + ['rowCount'] + [name for name, _ in self._measure_columns()]
+        select = [self._expression(dimension) for dimension in self.names]
+        select.append('COUNT(*)')
+        select.extend(f'COALESCE(SUM({expression}), 0)' for _, expression in self._measure_columns())
+        sql = (f"INSERT INTO {quote(self.proposal.name)} ({', '.join(quote(c) for c in columns)})\n"
+               f"SELECT {', '.join(select)}\nFROM {quote(self.base.sql_name)}")
+        for join in self._joins():
+            sql += f'\n{join}'
+        if self.names:
+            sql += f"\nGROUP BY {', '.join(str(n + 1) for n in range(len(self.names)))}"
+        return sql + ';'
+
+    def increment(self) -> str:
+        """Applied with +1/-1 (and the row's values) by every write path; a move is -1 old, +1 new"""
+        columns = list(self.names.values()) + ['rowCount'] + [name for name, _ in self._measure_columns()]
+        values = ', '.join('?' for _ in columns)
+        updates = [f'{quote(c)} = {quote(c)} + VALUES({quote(c)})'
+                   for c in ['rowCount'] + [name for name, _ in self._measure_columns()]]
+        return (f"INSERT INTO {quote(self.proposal.name)} ({', '.join(quote(c) for c in columns)})\n"
+                f"VALUES ({values})\nON DUPLICATE KEY UPDATE {', '.join(updates)};")
+
+    def _read_ref(self, dimension: Dimension) -> str:
+        ref = f's.{quote(self.names[dimension])}'
+        return f'NULLIF({ref}, {self._sentinel(dimension)})' if self._nullable(dimension) else ref
+
+    def _dimension(self, column: str) -> Optional[Dimension]:
+        for dimension in self.names:
+            if dimension.column == column:
+                return dimension
+        return None
+
+    def _rewrite_sql(self, text: str) -> str:
+        def replace(match: re.Match) -> str:
+            table = self.schema.by_sql_name(match.group(1))
+            column = table.column_by_sql_name(match.group(2)) if table else None
+            dimension = self._dimension(f'{table.name}.{column.name}') if column else None
+            if dimension is None:
+                return match.group(0)
+            if dimension.kind == 'day':
+                return f'/* day */ {self._read_ref(dimension)}'
+            return self._read_ref(dimension)
+        return SQL_COLUMN.sub(replace, text)
+
+    def _read_measure(self, aggregate: str, measure: Measure) -> str:
+        if measure.function == 'COUNT' and measure.maintainable and 'CASE' in aggregate.upper():
+            match = AGGREGATE_CALL.match(aggregate)
+            condition = CASE_COUNT.match(match.group(3).strip()).group(1)
+            return f'SUM(CASE WHEN {self._rewrite_sql(condition)} THEN s.`rowCount` ELSE 0 END)'
+        if measure.function == 'COUNT' and measure.maintainable:
+            return 'SUM(s.`rowCount`)'
+        if measure.function == 'SUM' and measure.column:
+            return f"SUM(s.{quote(measure.column.split('.')[1] + 'Sum')})"
+        if measure.function == 'AVG' and measure.column:
+            return f"SUM(s.{quote(measure.column.split('.')[1] + 'Sum')}) / NULLIF(SUM(s.`rowCount`), 0)"
+        if measure.function == 'SUM' and measure.maintainable:
+            match = AGGREGATE_CALL.match(aggregate)
+            return f"SUM(({self._rewrite_sql(match.group(3))}) * s.`rowCount`)"
+        return f'/* live: {aggregate} */'
+
+    def _read_filter(self, predicate: Predicate) -> Optional[str]:
+        if predicate.op == 'sql' and predicate.value:
+            text = re.sub(r'\$\{(\w+)\.(\w+)\}', lambda m: self._ts_ref(m.group(1), m.group(2)), predicate.value.strip('`'))
+            return re.sub(r'\$\{[^}]*\}', '?', text)
+        dimension = self._dimension(predicate.column)
+        if dimension is None:
+            return None
+        if dimension.kind == 'null':
+            return f"s.{quote(self.names[dimension])} = {1 if predicate.op == 'isNull' else 0}"
+        ref = self._read_ref(dimension)
+        if predicate.op in ('isNull', 'isNotNull'):
+            return f"{ref} IS {'NOT ' if predicate.op == 'isNotNull' else ''}NULL"
+        if predicate.op in COMPARISON_SQL:
+            value = '(?)' if predicate.op in ('inArray', 'notInArray') else _literal(predicate.value)
+            return f'{ref} {COMPARISON_SQL[predicate.op]} {value}'
+        if predicate.op in ('between', 'notBetween'):
+            return f"{ref} {'NOT ' if predicate.op == 'notBetween' else ''}BETWEEN ? AND ?"
+        return None
+
+    def _ts_ref(self, table: str, column: str) -> str:
+        dimension = self._dimension(f'{table}.{column}')
+        return self._read_ref(dimension) if dimension else f'{table}.{column}'
+
+    def read(self, source: SourceQuery) -> Dict:
+        query = source.query
+        group = [self._dimension(column) for column in query.group_by]
+        select = [f'{self._read_ref(d)} AS {quote(d.column.split(".")[1])}' for d in group if d]
+        select += [self._read_measure(aggregate, measure) for aggregate, measure in zip(query.aggregates, source.measures)]
+        sql = f"SELECT {', '.join(select)}\nFROM {quote(self.proposal.name)} s"
+        joined = set()
+        for join in source.residual_joins:
+            link = _link_column(query, join.table)
+            target = self.schema.tables[join.table]
+            dimension = self._dimension(link[0]) if link else None
+            if dimension is None or join.table in joined:
+                continue
+            joined.add(join.table)
+            far = next((p.other_column if p.column == link[0] else p.column for p in join.on
+                        if link[0] in (p.column, p.other_column)), None)
+            sql += (f'\nJOIN {quote(target.sql_name)} ON {self._sql_ref(far)} = {self._read_ref(dimension)}'
+                    if far else '')
+        conditions = []
+        for predicate in query.filters:
+            if predicate in source.residual:
+                table, column = _column(self.schema, predicate.column)
+                op = COMPARISON_SQL.get(predicate.op)
+                if predicate.op in ('isNull', 'isNotNull'):
+                    conditions.append(f"{self._sql_ref(predicate.column)} IS {'NOT ' if predicate.op == 'isNotNull' else ''}NULL")
+                elif op:
+                    conditions.append(f'{self._sql_ref(predicate.column)} {op} {_literal(predicate.value)}')
+                continue
+            condition = self._read_filter(predicate)
+            if condition:
+                conditions.append(condition + ('  /* optional */' if predicate.conditional else ''))
+        if conditions:
+            sql += '\nWHERE ' + '\n  AND '.join(conditions)
+        if any(group):
+            sql += f"\nGROUP BY {', '.join(self._read_ref(d) for d in group if d)}"
+        return {'function': source.function, 'location': source.location, 'sql': sql + ';'}
+
+
+# ----------------------------------------------------------------------
+# Report
+# ----------------------------------------------------------------------
+
+def benchmarked_functions(path: Path = BENCHMARK_FILE) -> Set[str]:
+    """db.ts functions timed by the dashboard benchmark"""
+    if not path.exists():
+        return set()
+    names = set()
+    for match in BENCHMARK_IMPORT.finditer(path.read_text(encoding='utf-8')):
+        names.update(name.strip().split(':')[0].strip() for name in match.group(1).split(',') if name.strip())
+    return names
+
+
+def _finish(proposal: Proposal, schema: Schema, writes: Sequence[Query], reached: Dict[str, List[str]],
+            benchmarked: Set[str], stats: Dict[str, int]) -> None:
+    for source in proposal.sources:
+        for measure in source.measures:
+            if measure.maintainable and all((m.function, m.column, m.expression) !=
+                                            (measure.function, measure.column, measure.expression)
+                                            for m in proposal.measures):
+                proposal.measures.append(measure)
+        key = function_key(source.query.file, source.query.owner, source.query.function)
+        for path in reached.get(key, []):
+            if path not in proposal.procedures:
+                proposal.procedures.append(path)
+        if source.query.file == 'server/db.ts' and source.query.function in benchmarked:
+            if source.function not in proposal.benchmarked:
+                proposal.benchmarked.append(source.function)
+        for measure in source.measures:
+            if not measure.maintainable:
+                note = f'{measure.function}({measure.column or ""}) in {source.function} stays a live query'
+                if note not in proposal.notes:
+                    proposal.notes.append(note)
+        for problem in source.problems:
+            note = f'{source.function}: {problem} is not covered by the summary'
+            if note not in proposal.notes:
+                proposal.notes.append(note)
+    proposal.table_rows = table_rows(proposal.table, schema, stats)
+    proposal.write_paths = write_paths(proposal, writes, schema)
+
+    builder = SummarySql(proposal, schema)
+    proposal.ddl = builder.ddl()
+    proposal.backfill = builder.backfill()
+    proposal.increment = builder.increment()
+    proposal.reads = [builder.read(source) for source in proposal.sources]
+    sentinels = [f"{builder.names[d]} NULL -> {builder._sentinel(d)}" for d in proposal.dimensions if builder._nullable(d)]
+    if sentinels:
+        proposal.notes.append('nullable dimensions stored as sentinels: ' + ', '.join(sentinels))
+    if any(d.kind == 'day' for d in proposal.dimensions):
+        proposal.notes.append('day buckets: comparisons against a timestamp parameter are rounded to whole days')
+    if any(d.via for d in proposal.dimensions):
+        vias = ', '.join(f'{d.column}' for d in proposal.dimensions if d.via)
+        proposal.notes.append(f'{vias} is copied from the joined row; updates to it relink every dependent {proposal.table} row')
+    if any(path.bulk for path in proposal.write_paths):
+        proposal.notes.append('bulk write paths: re-aggregate the affected groups from the base table in the same transaction')
+
+
+def build_report(stats_file: Optional[Path] = None, log_dir: Path = LOG_DIR, max_dimensions: int = MAX_DIMENSIONS,
+                 table: Optional[str] = None) -> Dict:
+    schema = load_schema()
+    catalog = build_catalog(AGGREGATE_FILES, schema)
+    aggregates = [query for query in catalog.queries
+                  if query.operation == 'select' and query.table in schema.tables
+                  and (query.aggregates or query.group_by) and (table is None or query.table == table)]
+    reduced = [reduce_query(query, schema) for query in aggregates]
+    sources = [source for source in reduced if source.fan_out is None]
+    writes = [query for query in build_catalog(WRITE_FILES, schema).queries
+              if query.operation in ('insert', 'update', 'delete')]
+
+    layer = DataLayer(resolve_files((*AGGREGATE_FILES, *WRITE_FILES)))
+    reached: Dict[str, List[str]] = {}
+    for procedure in load_procedures(layer):
+        for key in layer.reachable(procedure.calls):
+            reached.setdefault(key, []).append(procedure.path)
+    stats = load_stats(stats_file) if stats_file else row_counts_from_logs(log_dir)
+    benchmarked = benchmarked_functions()
+
+    proposals = group_sources(sources, max_dimensions)
+    for proposal in proposals:
+        _finish(proposal, schema, writes, reached, benchmarked, stats)
+    proposals.sort(key=lambda p: (-len(p.dashboard_procedures) - 2 * len(p.benchmarked), -(p.table_rows or 0),
+                                  -len(p.sources), p.name))
+    return {
+        'row_counts': str(stats_file) if stats_file else 'query log COUNT(*) captures',
+        'aggregate_queries': len(aggregates),
+        'write_queries': len(writes),
+        'benchmarked': sorted(benchmarked),
+        'proposals': [proposal.to_dict() for proposal in proposals],
+        'fan_out': [{'function': source.function, 'location': source.location, 'table': source.query.table,
+                     'counts': source.fan_out} for source in reduced if source.fan_out],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Group aggregate queries into summary-table proposals')
+    parser.add_argument('--stats', type=Path, help='table row counts (getDatabaseStats / information_schema JSON)')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='captures for COUNT(*) row counts')
+    parser.add_argument('--max-dimensions', type=int, default=MAX_DIMENSIONS,
+                        help='largest key a coarser query is folded into')
+    parser.add_argument('--table', help='only aggregates over this table (export name)')
+    parser.add_argument('--limit', type=int, default=10, help='proposals to print')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Collecting aggregate queries...")
+    report = build_report(args.stats, args.log_dir, args.max_dimensions, args.table)
+    proposals = report['proposals']
+    print(f"   {report['aggregate_queries']} aggregate queries, {report['write_queries']} write queries")
+    print(f"   row counts from {report['row_counts']}")
+
+    if not proposals:
+        print("\n✅ No aggregate queries found")
+    else:
+        print(f"\n📊 {len(proposals)} summary table proposals:")
+        for proposal in proposals[:args.limit]:
+            rows = f"{proposal['table_rows']:,} rows" if proposal['table_rows'] is not None else 'rows unknown'
+            keys = ', '.join(f"{d['column']}{'/day' if d['kind'] == 'day' else ' is null' if d['kind'] == 'null' else ''}"
+                             for d in proposal['dimensions']) or '(single row)'
+            print(f"\n   {proposal['name']}  [{proposal['table']}, {rows}]")
+            print(f"      key: {keys}")
+            print(f"      replaces {len(proposal['queries'])} queries in "
+                  f"{', '.join(dict.fromkeys(q['function'] for q in proposal['queries']))}")
+            if proposal['dashboard_procedures'] or proposal['benchmarked']:
+                print(f"      📈 dashboard: {', '.join(proposal['dashboard_procedures'] + proposal['benchmarked'])}")
+            writers = proposal['write_paths']
+            print(f"      maintained by {len(writers)} write paths: "
+                  + ', '.join(f"{w['function']} ({w['maintenance']})" for w in writers[:6])
+                  + (' ...' if len(writers) > 6 else ''))
+            for note in proposal['notes']:
+                print(f"      ⚠️  {note}")
+    if report['fan_out']:
+        print(f"\n⚠️  {len(report['fan_out'])} aggregates count joined child rows (summarize the child table):")
+        for entry in report['fan_out']:
+            print(f"   {entry['location']} {entry['function']}: {entry['table']} -> {entry['counts']}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick Automaton
+
+Multi-pattern string matcher used by the codemod rules: all keywords are
+found in one linear scan of the text, independent of how many keywords there
+are. `find_non_overlapping` resolves overlaps leftmost-longest, which is what
+a rewriter needs to splice replacements in a single pass.
+"""
+
+from collections import deque
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class Automaton(Generic[T]):
+    """Keyword automaton mapping each pattern to a payload value"""
+
+    def __init__(self, patterns: Optional[Iterable[Tuple[str, T]]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, T]]] = [[]]
+        self._built = False
+        if patterns is not None:
+            for pattern, value in patterns:
+                self.add(pattern, value)
+            self.build()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def add(self, pattern: str, value: T) -> None:
+        if not pattern:
+            raise ValueError('Empty patterns are not supported')
+        if self._built:
+            raise RuntimeError('Automaton already built')
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+
+    def build(self) -> 'Automaton[T]':
+        """Compute failure links breadth-first and merge output sets"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, T]]:
+        """Yield (start, end, value) for every occurrence, in order of end position"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                end = index + 1
+                for length, value in out[state]:
+                    yield end - length, end, value
+
+    def find_non_overlapping(self, text: str, accept: Any = None) -> List[Tuple[int, int, T]]:
+        """
+        Leftmost-longest non-overlapping matches.
+
+        `accept(text, start, end, value)` may veto a candidate (e.g. identifier
+        boundary checks); vetoed candidates do not block shorter ones.
+        """
+        candidates = [
+            match for match in self.iter(text)
+            if accept is None or accept(text, *match)
+        ]
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected: List[Tuple[int, int, T]] = []
+        last_end = 0
+        for start, end, value in candidates:
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Sequential-Await Waterfall Detector
+
+Finds straight-line runs of `await`s in tRPC procedures and services where a
+later call does not use an earlier call's result:
+
+    const task = await db.getTaskById(input.taskId);
+    const project = await db.getProjectById(input.projectId);   // independent
+    const members = await db.getProjectMembers(input.projectId); // independent
+
+Each await is at least one database round trip, so the run costs three round
+trips on every request where one `Promise.all` would cost one. This is the
+straight-line counterpart of the N+1 detectors: blocks inside loops and
+`.map()` callbacks are skipped.
+
+Dataflow is deliberately light. Every statement of a block records the names
+it declares or assigns and the identifiers it reads; a name carries the set
+of awaits it was derived from, through intervening synchronous statements.
+An await depends on the earlier awaits whose results it reads, and the run is
+levelled by that dependency: awaits on the same level can share one
+`Promise.all`. The run is cut at
+
+  * writes      awaits that call create/update/delete/insert/send/... style
+                functions, or `insert`/`update`/`delete`/`execute` builders:
+                a later read may rely on them, so they keep their order
+  * tx          awaits on a transaction handle (one connection, no overlap)
+  * control     if/for/try/switch statements that await or exit early,
+                except `if (...) throw/return` guards, which are reported
+                because Promise.all would run later calls before the guard
+  * returns     `return await f()` joins the run and ends it
+
+Usage:
+    python scripts/await_waterfalls.py
+    python scripts/await_waterfalls.py --min-saving 2
+    python scripts/await_waterfalls.py server/routers/taskRouter.ts --output /tmp/waterfalls.json
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from query_catalog import DEFAULT_FILES, resolve_files
+from source_index import IDENT, SourceIndex
+from transaction_scope import loop_spans
+from unbounded_selects import DataLayer, load_procedures
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCAN_FILES = ('server/routers/*.ts', 'server/services/*.ts')
+REPORT_FILE = PROJECT_ROOT / 'await-waterfalls.json'
+
+DECLARATIONS = {'const', 'let', 'var'}
+CONTROL = {'if', 'for', 'while', 'do', 'switch', 'try', 'with'}
+EXITS = {'return', 'throw', 'break', 'continue'}
+BLOCK_OPENERS = {'=>', ')', 'else', 'try', 'finally', 'do'}
+ASSIGNMENTS = {b'=', b'+=', b'-=', b'*=', b'/=', b'%=', b'||=', b'&&=', b'??='}
+DB_WRITES = {'insert', 'update', 'delete', 'execute'}
+WRITE_NAME = re.compile(
+    r'^(?:create|insert|update|delete|remove|add|save|mark|upsert|bulk|log|record|send|notify|emit|assign'
+    r'|complete|approve|reject|submit|archive|restore|move|reorder|increment|decrement|reset|clear'
+    r'|invalidate|set|upload|revoke|grant|toggle|cancel|escalate|register|enqueue|publish|track|store'
+    r'|write|put|apply|process|import|sync)(?![a-z])'
+    r'|(?:Put|Delete|Upload)$'
+)
+ORDERED_CALLS = {'next', 'sleep', 'delay', 'wait', 'setTimeout'}
+FREE_CALLS = {'getDb', 'import'}     # pooled handle / cached module: no round trip of their own
+TRANSACTION_HANDLES = {'tx', 'trx'}
+
+
+@dataclass
+class Statement:
+    first: int
+    last: int
+    kind: str                         # await | sync | guard | barrier
+    defs: Set[str] = field(default_factory=set)
+    uses: Set[str] = field(default_factory=set)
+    sources: Set[int] = field(default_factory=set)    # ids of the awaits its values derive from
+    value: Optional[int] = None       # first token of the awaited expression
+    call: str = ''
+    pattern: str = ''                 # declared binding text (`[task]`, `{ items }`, `project`)
+    ends_run: bool = False
+    reason: str = ''                  # why a barrier or write cuts the run
+
+
+@dataclass
+class Await:
+    line: int
+    call: str
+    level: int
+    depends_on: List[int] = field(default_factory=list)    # lines of awaits whose results it reads
+    binds: str = ''
+    expression: str = ''
+
+
+@dataclass
+class Waterfall:
+    file: str
+    function: str
+    line: int
+    end_line: int
+    awaits: List[Await]
+    guards: List[int] = field(default_factory=list)
+
+    @property
+    def serialized(self) -> int:
+        return len(self.awaits)
+
+    @property
+    def parallel(self) -> int:
+        return max(a.level for a in self.awaits)
+
+    @property
+    def saving(self) -> int:
+        return self.serialized - self.parallel
+
+    def groups(self) -> List[List[Await]]:
+        return [[a for a in self.awaits if a.level == level] for level in range(1, self.parallel + 1)]
+
+    def suggestion(self) -> List[str]:
+        lines = []
+        for group in self.groups():
+            if len(group) == 1:
+                only = group[0]
+                binding = f'const {only.binds} = ' if only.binds else ''
+                lines.append(f'{binding}await {only.expression};')
+                continue
+            names = ', '.join(a.binds for a in group)
+            binding = f'const [{names}] = ' if any(a.binds for a in group) else ''
+            lines.append(f"{binding}await Promise.all([{', '.join(a.expression for a in group)}]);")
+        return lines
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.update(location=f'{self.file}:{self.line}', serialized_round_trips=self.serialized,
+                    parallel_round_trips=self.parallel, saved_round_trips=self.saving,
+                    groups=[[a.line for a in group] for group in self.groups()],
+                    suggestion=self.suggestion())
+        return data
+
+
+# ----------------------------------------------------------------------
+# Statements
+# ----------------------------------------------------------------------
+
+def _skip(index: SourceIndex, j: int) -> int:
+    """Index after the token at j, jumping over a bracket group"""
+    return index.match(j) + 1 if index.match(j) > j else j + 1
+
+
+def statement_end(index: SourceIndex, j: int, close: int) -> int:
+    """Last token of the statement starting at j (block statements end at their `}`)"""
+    word = index.text(j) if index.kinds[j] == IDENT else ''
+    if index.is_punct(j, b'{'):
+        return index.match(j)
+    if word in ('if', 'for', 'while', 'switch', 'with'):
+        j += 1
+        if index.is_ident(j, b'await'):
+            j += 1
+        end = statement_end(index, index.match(j) + 1, close)
+        if word == 'if' and index.is_ident(end + 1, b'else'):
+            end = statement_end(index, end + 2, close)
+        return end
+    if word == 'do':
+        end = statement_end(index, j + 1, close)
+        return statement_end(index, end + 1, close)      # while (...);
+    if word == 'try':
+        end = index.match(j + 1)
+        while index.is_ident(end + 1, b'catch') or index.is_ident(end + 1, b'finally'):
+            k = end + 2
+            if index.is_punct(k, b'('):
+                k = index.match(k) + 1
+            end = index.match(k)
+        return end
+    if word in ('function', 'class') or (word == 'async' and index.is_ident(j + 1, b'function')):
+        while j < close and not index.is_punct(j, b'{'):
+            j = _skip(index, j)
+        return index.match(j)
+    while j < close:
+        if index.is_punct(j, b';'):
+            return j
+        j = _skip(index, j)
+    return close - 1
+
+
+def block_statements(index: SourceIndex, open_brace: int) -> List[Tuple[int, int]]:
+    close = index.match(open_brace)
+    spans = []
+    j = open_brace + 1
+    while j < close:
+        if index.is_punct(j, b';'):
+            j += 1
+            continue
+        end = statement_end(index, j, close)
+        spans.append((j, end))
+        j = end + 1
+    return spans
+
+
+def _identifiers(index: SourceIndex, first: int, last: int) -> Set[str]:
+    """Variables read in a span (property names after `.`/`?.` and object keys are not variables)"""
+    names = set()
+    for i in range(first, last + 1):
+        if index.kinds[i] != IDENT or index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.'):
+            continue
+        if index.is_punct(i + 1, b':') and (index.is_punct(i - 1, b'{') or index.is_punct(i - 1, b',')):
+            continue
+        names.add(index.text(i))
+    return names
+
+
+def _pattern_names(index: SourceIndex, first: int, last: int) -> Set[str]:
+    """Names bound by a declaration pattern (`x`, `{ a, b: c }`, `[d, ...e]`)"""
+    names = set()
+    for i in range(first, last + 1):
+        if index.kinds[i] == IDENT and not index.is_punct(i + 1, b':') and not index.is_punct(i - 1, b'='):
+            names.add(index.text(i))
+    return names
+
+
+def _top_level(index: SourceIndex, first: int, last: int, tokens: Set[bytes]) -> int:
+    """First token in `tokens` outside any bracket group, or -1"""
+    j = first
+    while j <= last:
+        if any(index.is_punct(j, token) for token in tokens):
+            return j
+        j = _skip(index, j)
+    return -1
+
+
+def _called(index: SourceIndex, first: int, last: int) -> List[str]:
+    return [index.text(i) for i in range(first, last + 1)
+            if index.kinds[i] == IDENT and index.is_punct(i + 1, b'(')]
+
+
+def _has_await(index: SourceIndex, first: int, last: int) -> bool:
+    return any(index.is_ident(i, b'await') for i in range(first, last + 1))
+
+
+def _callee(index: SourceIndex, j: int) -> Tuple[str, str]:
+    """(dotted callee, receiver root) of the call expression starting at j"""
+    parts = []
+    while index.kinds[j] == IDENT:
+        parts.append(index.text(j))
+        if not (index.is_punct(j + 1, b'.') or index.is_punct(j + 1, b'?.')):
+            break
+        j += 2
+    return '.'.join(parts), parts[0] if parts else ''
+
+
+def classify(index: SourceIndex, first: int, last: int) -> Statement:
+    word = index.text(first) if index.kinds[first] == IDENT else ''
+    if word in CONTROL or index.is_punct(first, b'{'):
+        body_exits = any(index.kinds[i] == IDENT and index.text(i) in EXITS for i in range(first, last + 1))
+        if word == 'if' and body_exits and not _has_await(index, first, last):
+            then = index.match(first + 1) + 1
+            body = then + 1 if index.is_punct(then, b'{') else then
+            if index.text(body) in ('throw', 'return') and not index.is_ident(statement_end(index, then, last + 1) + 1,
+                                                                            b'else'):
+                return Statement(first, last, 'guard', uses=_identifiers(index, first, last))
+        if body_exits or _has_await(index, first, last):
+            return Statement(first, last, 'barrier', reason=word or 'block')
+        statement = Statement(first, last, 'sync', uses=_identifiers(index, first, last))
+        for i in range(first, last):
+            if index.kinds[i] == IDENT and any(index.is_punct(i + 1, op) for op in ASSIGNMENTS):
+                statement.defs.add(index.text(i))
+        return statement
+    if word in ('function', 'class') or word in EXITS - {'return'}:
+        return Statement(first, last, 'barrier', reason=word)
+
+    defs: Set[str] = set()
+    pattern = ''
+    value = first
+    ends_run = False
+    if word in DECLARATIONS:
+        eq = _top_level(index, first + 1, last, {b'='})
+        if eq < 0:
+            return Statement(first, last, 'sync', defs=_pattern_names(index, first + 1, last))
+        colon = _top_level(index, first + 1, eq - 1, {b':'})
+        pattern_last = (colon if colon > 0 else eq) - 1
+        defs = _pattern_names(index, first + 1, pattern_last)
+        pattern = index.token_span_text(first + 1, pattern_last)
+        value = eq + 1
+    elif word == 'return':
+        value, ends_run = first + 1, True
+    else:
+        eq = _top_level(index, first, last, ASSIGNMENTS)
+        if eq > 0:
+            if index.kinds[first] == IDENT:
+                defs = {index.text(first)}
+            value = eq + 1
+    end = last - 1 if index.is_punct(last, b';') else last
+    uses = _identifiers(index, value, end) | (_identifiers(index, first, value - 1) - defs if word not in DECLARATIONS
+                                              else set())
+    if not index.is_ident(value, b'await'):
+        if _has_await(index, value, end):
+            return Statement(first, last, 'barrier', reason='nested await')
+        return Statement(first, last, 'sync', defs=defs, uses=uses, ends_run=ends_run)
+
+    call, root = _callee(index, value + 1)
+    statement = Statement(first, last, 'await', defs=defs, uses=uses, value=value + 1, call=call or 'await',
+                          pattern=pattern if word in DECLARATIONS else '', ends_run=ends_run)
+    called = _called(index, value + 1, end)
+    if call.split('.')[-1] in FREE_CALLS:
+        return Statement(first, last, 'sync', defs=defs, uses=uses, ends_run=ends_run)
+    if root in TRANSACTION_HANDLES:
+        statement.kind, statement.reason = 'barrier', 'transaction'
+    elif index.is_ident(value + 1, b'new') or any(name in ORDERED_CALLS for name in called):
+        statement.kind, statement.reason = 'barrier', 'ordered'
+    elif _has_await(index, value + 1, end) and not index.is_ident(value + 1, b'Promise'):
+        statement.kind, statement.reason = 'barrier', 'nested await'
+    elif any(name in DB_WRITES or WRITE_NAME.search(name) for name in called):
+        statement.kind, statement.reason = 'barrier', 'write'
+    return statement
+
+
+# ----------------------------------------------------------------------
+# Runs
+# ----------------------------------------------------------------------
+
+def _compact(text: str) -> str:
+    text = re.sub(r'\s+([.)\]])', r'\1', text)
+    return re.sub(r'\s+', ' ', re.sub(r'([(\[])\s+', r'\1', text)).strip()
+
+
+def runs(index: SourceIndex, open_brace: int) -> List[Tuple[List[Statement], List[Statement]]]:
+    """(awaits, guards) of each straight-line run in a block"""
+    found = []
+    origins: Dict[str, Set[int]] = {}        # name -> ids of the awaits it derives from
+    awaits: List[Statement] = []
+    guards: List[Statement] = []
+
+    def flush():
+        if len(awaits) > 1:
+            found.append((list(awaits), list(guards)))
+        awaits.clear()
+        guards.clear()
+
+    for first, last in block_statements(index, open_brace):
+        statement = classify(index, first, last)
+        sources = set().union(*(origins.get(name, set()) for name in statement.uses))
+        if statement.kind == 'barrier':
+            flush()
+            for name in statement.defs:
+                origins[name] = set()
+            continue
+        if statement.kind == 'guard':
+            if awaits:
+                guards.append(statement)
+            continue
+        if statement.kind == 'await':
+            awaits.append(statement)
+            sources = sources | {id(statement)}
+        for name in statement.defs:
+            origins[name] = sources
+        statement.sources = sources
+        if statement.ends_run:
+            flush()
+    flush()
+    return found
+
+
+def level(index: SourceIndex, statements: Sequence[Statement]) -> List[Await]:
+    levels: Dict[int, int] = {}
+    lines: Dict[int, int] = {}
+    result = []
+    for statement in statements:
+        deps = [s for s in statement.sources - {id(statement)} if s in levels]
+        levels[id(statement)] = 1 + max((levels[d] for d in deps), default=0)
+        line = index.line_of(index.starts[statement.first])
+        lines[id(statement)] = line
+        end = statement.last - 1 if index.is_punct(statement.last, b';') else statement.last
+        result.append(Await(line=line, call=statement.call, level=levels[id(statement)],
+                            depends_on=sorted(lines[d] for d in deps), binds=statement.pattern,
+                            expression=_compact(index.token_span_text(statement.value, end))))
+    return result
+
+
+# ----------------------------------------------------------------------
+# Files
+# ----------------------------------------------------------------------
+
+def _blocks(index: SourceIndex) -> List[int]:
+    bodies = {symbol.body_token for _, symbol in index.iter_functions()}
+    loops = loop_spans(index, 0, len(index) - 1)
+    blocks = []
+    for i in range(1, len(index)):
+        if not index.is_punct(i, b'{') or any(a <= i <= b for a, b in loops):
+            continue
+        if i in bodies or index.text(i - 1) in BLOCK_OPENERS:
+            blocks.append(i)
+    return blocks
+
+
+def scan_file(path: Path, rel_path: str, procedures: Sequence[Tuple[int, int, str]] = (),
+              root: Path = PROJECT_ROOT) -> List[Waterfall]:
+    index = SourceIndex.load(path, root)
+    found = []
+    for open_brace in _blocks(index):
+        for statements, guards in runs(index, open_brace):
+            awaits = level(index, statements)
+            offset = index.starts[statements[0].first]
+            name = next((label for start, end, label in procedures if start <= offset < end), None)
+            if name is None:
+                enclosing = index.enclosing_function(statements[0].first)
+                name = (f'{enclosing[0].name}.{enclosing[1].name}' if enclosing and enclosing[0]
+                        else enclosing[1].name if enclosing else '?')
+            waterfall = Waterfall(file=rel_path, function=name, line=awaits[0].line,
+                                  end_line=index.line_of(index.starts[statements[-1].last]), awaits=awaits,
+                                  guards=[index.line_of(index.starts[g.first]) for g in guards])
+            if waterfall.saving > 0:
+                found.append(waterfall)
+    return found
+
+
+def scan_files(patterns: Sequence[str] = SCAN_FILES, root: Path = PROJECT_ROOT) -> List[Waterfall]:
+    files = [p for p in dict.fromkeys(p.resolve() for p in resolve_files(patterns, root))
+             if not p.name.endswith(('.test.ts', '.spec.ts'))]
+    procedures: Dict[str, List[Tuple[int, int, str]]] = {}
+    for procedure in load_procedures(DataLayer(resolve_files(DEFAULT_FILES, root), root), root=root):
+        procedures.setdefault(procedure.file, []).append((procedure.start, procedure.end, procedure.path))
+    found = []
+    for path in files:
+        rel_path = path.relative_to(root.resolve()).as_posix()
+        found.extend(scan_file(path, rel_path, procedures.get(rel_path, ()), root))
+    return sorted(found, key=lambda w: (-w.saving, w.file, w.line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find independent awaits that run one after another')
+    parser.add_argument('files', nargs='*', help=f"files or globs (default: {' '.join(SCAN_FILES)})")
+    parser.add_argument('--min-saving', type=int, default=1, help='minimum round trips saved to report')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Scanning sequential awaits...")
+    waterfalls = [w for w in scan_files(args.files or SCAN_FILES) if w.saving >= args.min_saving]
+    saved = sum(w.saving for w in waterfalls)
+    print(f"   {len(waterfalls)} waterfalls, {saved} serialized round trips removable")
+
+    if not waterfalls:
+        print("\n✅ No sequential-await waterfalls")
+    for waterfall in waterfalls:
+        print(f"\n   {waterfall.file}:{waterfall.line} {waterfall.function}: "
+              f"{waterfall.serialized} round trips -> {waterfall.parallel} (saves {waterfall.saving})")
+        for item in waterfall.awaits:
+            after = f"  (after line {', '.join(map(str, item.depends_on))})" if item.depends_on else ''
+            print(f"      line {item.line} [{item.level}] {item.call}{after}")
+        if waterfall.guards:
+            print(f"      ⚠️  guard at line {', '.join(map(str, waterfall.guards))} would run after the grouped calls")
+        for line in waterfall.suggestion():
+            print(f"      💡 {line if len(line) <= 110 else line[:107] + '...'}")
+
+    report = {
+        'waterfalls': [waterfall.to_dict() for waterfall in waterfalls],
+        'saved_round_trips': saved,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
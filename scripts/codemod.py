@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+One-Pass Codemod Engine
+
+Applies every selected rule from scripts/codemod_rules.py to each target file
+in a single read -> rewrite -> write pass, processing files in parallel.
+Writes are atomic (temp file + rename), changes are reported per rule, and
+--dry-run prints a unified diff instead of touching the tree.
+
+Usage:
+    python scripts/codemod.py --list
+    python scripts/codemod.py --dry-run
+    python scripts/codemod.py --rule logger-error-arg --rule logger-broken-quote
+    python scripts/codemod.py --rule paginated-items client/src/pages/Reports.tsx
+    python scripts/codemod.py --verify        # re-check changed files with tsserver
+"""
+
+import argparse
+import difflib
+import fnmatch
+import os
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from codemod_rules import RULES, Rule
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@dataclass
+class FileResult:
+    """Outcome of running the selected rules over one file"""
+    path: str
+    counts: Dict[str, int] = field(default_factory=dict)
+    changed: bool = False
+    diff: Optional[str] = None
+    error: Optional[str] = None
+
+
+def rules_for_file(rel_path: str, rules: Sequence[Rule], explicit: bool) -> List[Rule]:
+    """Rules that apply to a file: all of them for explicit paths, else by include glob"""
+    if explicit:
+        return list(rules)
+    return [rule for rule in rules if any(fnmatch.fnmatch(rel_path, pattern) for pattern in rule.include)]
+
+
+def collect_targets(root: Path, rules: Sequence[Rule]) -> List[str]:
+    """Union of every selected rule's include globs, relative to the project root"""
+    targets = set()
+    for rule in rules:
+        for pattern in rule.include:
+            for path in root.glob(pattern):
+                if path.is_file():
+                    targets.add(path.relative_to(root).as_posix())
+    return sorted(targets)
+
+
+def atomic_write(path: Path, content: str) -> None:
+    """Write via a temp file in the same directory, then rename over the original"""
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, path.stat().st_mode & 0o7777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def process_file(root: str, rel_path: str, rule_names: Sequence[str], explicit: bool, dry_run: bool) -> FileResult:
+    """Read once, apply each applicable rule in order, write once"""
+    result = FileResult(path=rel_path)
+    path = Path(root) / rel_path
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            original = f.read()
+    except OSError as e:
+        result.error = str(e)
+        return result
+
+    content = original
+    for rule in rules_for_file(rel_path, [RULES[name] for name in rule_names], explicit):
+        try:
+            content, count = rule.apply(rel_path, content)
+        except Exception as e:
+            result.error = f'{rule.name}: {e}'
+            return result
+        if count:
+            result.counts[rule.name] = count
+
+    if content == original:
+        return result
+
+    result.changed = True
+    if dry_run:
+        result.diff = ''.join(difflib.unified_diff(
+            original.splitlines(keepends=True),
+            content.splitlines(keepends=True),
+            fromfile=f'a/{rel_path}',
+            tofile=f'b/{rel_path}',
+        ))
+    else:
+        atomic_write(path, content)
+    return result
+
+
+def run(rule_names: Sequence[str], files: Sequence[str], dry_run: bool, jobs: int,
+        root: Path = PROJECT_ROOT) -> List[FileResult]:
+    explicit = bool(files)
+    targets = list(files) if explicit else collect_targets(root, [RULES[name] for name in rule_names])
+    if jobs <= 1 or len(targets) <= 1:
+        return [process_file(str(root), rel, rule_names, explicit, dry_run) for rel in targets]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_file, str(root), rel, rule_names, explicit, dry_run) for rel in targets]
+        return [future.result() for future in futures]
+
+
+def verify_with_tsserver(root: Path, files: List[str]) -> None:
+    """Type-check only the rewritten files through a persistent tsserver"""
+    from tsserver_client import TsServerClient, TsServerError
+
+    try:
+        with TsServerClient(root) as client:
+            results = client.diagnostics(files)
+    except TsServerError as e:
+        print(f"⚠️  Verification skipped: {e}")
+        return
+    errors = 0
+    for file_path, diags in results.items():
+        file_errors = [d for d in diags if d.category == 'error']
+        errors += len(file_errors)
+        for diag in file_errors:
+            print(f"   {diag.format(client.project_root)}")
+    print(f"🔎 {errors} type errors in {len(files)} changed files")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply codemod rules in one pass per file')
+    parser.add_argument('files', nargs='*', help='files to rewrite (default: each rule\'s own targets)')
+    parser.add_argument('--rule', action='append', dest='rules', help='rule to apply (repeatable, default: all)')
+    parser.add_argument('--list', action='store_true', help='list registered rules and exit')
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff instead of writing')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--verify', action='store_true', help='re-check changed files with tsserver')
+    args = parser.parse_args()
+
+    if args.list:
+        for rule in RULES.values():
+            print(f"{rule.name:<22} {rule.description}")
+            print(f"{'':<22} targets: {', '.join(rule.include)}")
+        return
+
+    rule_names = args.rules or list(RULES)
+    unknown = [name for name in rule_names if name not in RULES]
+    if unknown:
+        print(f"❌ Unknown rule(s): {', '.join(unknown)} (see --list)")
+        sys.exit(1)
+    # Keep registration order regardless of the order given on the command line
+    rule_names = [name for name in RULES if name in rule_names]
+
+    results = run(rule_names, args.files, args.dry_run, args.jobs)
+
+    totals: Counter = Counter()
+    changed_files = []
+    for result in results:
+        if result.error:
+            print(f"❌ {result.path}: {result.error}")
+            continue
+        if not result.changed:
+            continue
+        changed_files.append(result.path)
+        totals.update(result.counts)
+        detail = ', '.join(f"{name}={count}" for name, count in result.counts.items())
+        print(f"{'📝' if args.dry_run else '✅'} {result.path}: {detail}")
+        if result.diff:
+            sys.stdout.write(result.diff)
+
+    print("\n" + "=" * 60)
+    print(f"{'Would change' if args.dry_run else 'Changed'} {len(changed_files)} of {len(results)} files")
+    for name in rule_names:
+        print(f"   {name:<22} {totals.get(name, 0)}")
+
+    if args.verify and changed_files and not args.dry_run:
+        verify_with_tsserver(PROJECT_ROOT, changed_files)
+
+
+if __name__ == '__main__':
+    main()
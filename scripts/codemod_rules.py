@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Codemod Rules
+
+Rule registry for scripts/codemod.py. Each rule is a pure function
+`(path, content) -> (new_content, change_count)` registered with the glob
+patterns of the files it targets by default. These rules replace the one-off
+fix-all-logger.py, fix-logger-calls.py, fix-syntax.py, fix_ts_ignore.py,
+fix-pagination.py and fix-all-pagination.py scripts.
+
+Rules run in registration order, so repair rules are registered before the
+rules whose output they would otherwise interfere with.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from aho_corasick import Automaton
+
+RuleFn = Callable[[str, str], Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A registered rewrite rule"""
+    name: str
+    description: str
+    include: Tuple[str, ...]
+    apply: RuleFn
+
+
+RULES: Dict[str, Rule] = {}
+
+SERVER_LOGGER_FILES = (
+    'server/routers.ts',
+    'server/routers/*.ts',
+    'server/db.ts',
+    'server/services/*.service.ts',
+)
+
+
+def register(name: str, description: str, include: Tuple[str, ...]) -> Callable[[RuleFn], RuleFn]:
+    """Decorator adding a rule function to the registry"""
+    def decorator(fn: RuleFn) -> RuleFn:
+        if name in RULES:
+            raise ValueError(f'Duplicate codemod rule: {name}')
+        RULES[name] = Rule(name=name, description=description, include=include, apply=fn)
+        return fn
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Logger calls
+# ----------------------------------------------------------------------
+
+# Damage left by an earlier regex that dropped the closing quote:
+#   logger.error("message, undefined, error);  ->  logger.error("message", undefined, error);
+BROKEN_DOUBLE_QUOTE = re.compile(r'logger\.(error|warn|info)\(("[^"\n]+), undefined, error\);')
+BROKEN_COLON_TEMPLATE = re.compile(r'logger\.(error|warn|info)\((`[^`]+):`, undefined, error\);')
+BROKEN_COLON_SINGLE = re.compile(r"logger\.(error|warn|info)\(('[^'\n]+):', undefined, error\);")
+
+
+@register(
+    'logger-broken-quote',
+    'Repair logger messages whose closing quote or trailing colon was mangled',
+    SERVER_LOGGER_FILES,
+)
+def fix_broken_logger_quotes(path: str, content: str) -> Tuple[str, int]:
+    content, count1 = BROKEN_DOUBLE_QUOTE.subn(r'logger.\1(\2", undefined, error);', content)
+    content, count2 = BROKEN_COLON_TEMPLATE.subn(r'logger.\1(\2`, undefined, error);', content)
+    content, count3 = BROKEN_COLON_SINGLE.subn(r"logger.\1(\2', undefined, error);", content)
+    return content, count1 + count2 + count3
+
+
+# logger.error("message:", error) / logger.error(`message`, error) / logger.error('message', error)
+# The optional trailing colon is dropped from the message, keeping its quote.
+LOGGER_ERROR_ARG = re.compile(
+    r'logger\.(error|warn|info)\('
+    r'(?:"([^"\n]*?):?"|\'([^\'\n]*?):?\'|`([^`]*?):?`)'
+    r',\s*(?:undefined,\s*)?error\)'
+)
+
+
+@register(
+    'logger-error-arg',
+    'Pass caught errors as the third logger argument: logger.x(msg, undefined, error)',
+    SERVER_LOGGER_FILES,
+)
+def fix_logger_error_arg(path: str, content: str) -> Tuple[str, int]:
+    def replace(match: 're.Match[str]') -> str:
+        level = match.group(1)
+        if match.group(2) is not None:
+            message = f'"{match.group(2)}"'
+        elif match.group(3) is not None:
+            message = f"'{match.group(3)}'"
+        else:
+            message = f'`{match.group(4)}`'
+        return f'logger.{level}({message}, undefined, error)'
+
+    count = 0
+
+    def counted(match: 're.Match[str]') -> str:
+        nonlocal count
+        replacement = replace(match)
+        if replacement != match.group(0):
+            count += 1
+        return replacement
+
+    return LOGGER_ERROR_ARG.sub(counted, content), count
+
+
+# ----------------------------------------------------------------------
+# @ts-ignore around insertId conversions
+# ----------------------------------------------------------------------
+
+TS_IGNORE_INSERT_ID = re.compile(
+    r'// @ts-ignore.*\n(\s*)const (\w+) = parseInt\(String\(result\.insertId\)\);'
+)
+TS_IGNORE_BATCH_INSERT_ID = re.compile(
+    r'// @ts-ignore.*\n(\s*)const (\w+) = parseInt\(String\(insertedResults\[([^\]]+)\]\[0\]\??\.insertId\)\);'
+)
+DRIZZLE_IMPORT = re.compile(r'import.*from.*drizzle.*\n')
+
+
+@register(
+    'bigint-insert-id',
+    'Replace @ts-ignore + parseInt(String(insertId)) with bigIntToNumber()',
+    ('server/db.ts',),
+)
+def fix_ts_ignore_insert_id(path: str, content: str) -> Tuple[str, int]:
+    content, count1 = TS_IGNORE_INSERT_ID.subn(r'\1const \2 = bigIntToNumber(result.insertId);', content)
+    content, count2 = TS_IGNORE_BATCH_INSERT_ID.subn(
+        r'\1const \2 = bigIntToNumber(insertedResults[\3][0].insertId);', content)
+    count = count1 + count2
+
+    if count and 'import { bigIntToNumber }' not in content:
+        import_match = DRIZZLE_IMPORT.search(content)
+        if import_match:
+            insert_pos = import_match.end()
+            content = (content[:insert_pos] + 'import { bigIntToNumber } from "./utils/bigint";\n'
+                       + content[insert_pos:])
+    return content, count
+
+
+# ----------------------------------------------------------------------
+# Paginated list queries
+# ----------------------------------------------------------------------
+
+PAGINATED_QUERY = re.compile(
+    r'const\s+{\s*data:\s*(\w+)\s*(?:,\s*isLoading[^}]*)?\}\s*=\s*trpc\.(\w+)\.(list|getAll|search)\.useQuery'
+)
+
+
+def find_paginated_query_vars(content: str) -> List[str]:
+    """Variables bound to the `data` of list/getAll/search queries, in first-seen order"""
+    return list(dict.fromkeys(match.group(1) for match in PAGINATED_QUERY.finditer(content)))
+
+
+# Member accesses that break once a list query returns { items, total } instead of an array
+PAGINATION_SUFFIXES = ('.map(', '.filter(', '.find(', '.some(', '.every(', '.forEach(', '.reduce(', '.length', '[')
+INDEX_ACCESS = re.compile(r'(\d+|\w+)\]')
+
+
+def _is_ident_char(char: str) -> bool:
+    return char.isalnum() or char in '_$'
+
+
+def _accept_member_access(text: str, start: int, end: int, match: Tuple[str, str]) -> bool:
+    """Whole-identifier check plus suffix-specific lookahead"""
+    if start > 0 and (_is_ident_char(text[start - 1]) or text[start - 1] == '.'):
+        return False
+    suffix = match[1]
+    if suffix == '.length':
+        return end >= len(text) or not (_is_ident_char(text[end]) or text[end] == '(')
+    if suffix == '[':
+        return INDEX_ACCESS.match(text, end) is not None
+    return True
+
+
+def build_pagination_automaton(var_names) -> 'Automaton[Tuple[str, str]]':
+    """One automaton over every `<variable><suffix>` keyword"""
+    return Automaton((name + suffix, (name, suffix)) for name in var_names for suffix in PAGINATION_SUFFIXES)
+
+
+def rewrite_paginated_access(content: str, automaton: 'Automaton[Tuple[str, str]]') -> Tuple[str, int]:
+    """Rewrite every matched access in a single linear scan"""
+    pieces = []
+    last = 0
+    changes = 0
+    for start, end, (name, suffix) in automaton.find_non_overlapping(content, _accept_member_access):
+        if start < last:
+            continue  # inside an index expression consumed by the previous match
+        pieces.append(content[last:start])
+        if suffix == '[':
+            index_match = INDEX_ACCESS.match(content, end)
+            pieces.append(f'{name}?.items?.[{index_match.group(1)}]')
+            last = index_match.end()
+        else:
+            pieces.append(f'{name}?.items?{suffix}')
+            last = end
+        changes += 1
+    if not changes:
+        return content, 0
+    pieces.append(content[last:])
+    return ''.join(pieces), changes
+
+
+@register(
+    'paginated-items',
+    'Read paginated list query results through .items (x.map -> x?.items?.map)',
+    ('client/src/pages/*.tsx',),
+)
+def fix_paginated_items(path: str, content: str) -> Tuple[str, int]:
+    var_names = find_paginated_query_vars(content)
+    if not var_names:
+        return content, 0
+    return rewrite_paginated_access(content, build_pagination_automaton(var_names))
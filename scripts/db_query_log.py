@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+.manus/db Query Log Reader
+
+Each file in .manus/db records one statement run against the project database
+(`db-query-<epoch ms>.json` with the query text, the mysql command line and
+either the returned rows or the process output; failed runs are written as
+`db-query-error-<epoch ms>.json`). This module reads them in timestamp order
+for the database analyzers in scripts/.
+
+scan_entry() is the streaming variant: it walks the file in chunks, decodes
+only the small scalar fields and counts `rows` without materializing it, so
+captures with large result sets cost no more memory than small ones.
+
+Usage:
+    python scripts/db_query_log.py [db-query-*.json ...]
+
+Run directly, it checks the streaming scanner against json.load on built-in
+samples split at every chunk boundary and on the log files (all of .manus/db
+by default).
+"""
+
+import io
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+LOG_DIR = PROJECT_ROOT / '.manus' / 'db'
+LOG_FILE = re.compile(r'db-query-(?:error-)?(\d+)\.json$')
+
+
+@dataclass
+class LogEntry:
+    """One logged statement"""
+    path: Path
+    timestamp: datetime
+    query: str
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    execution_time_ms: Optional[float] = None
+    failed: bool = False
+
+
+def log_files(directory: Path = LOG_DIR) -> List[Path]:
+    """Log files ordered by the epoch-millisecond timestamp in their names"""
+    files = []
+    for path in directory.glob('db-query-*.json'):
+        match = LOG_FILE.search(path.name)
+        if match:
+            files.append((int(match.group(1)), path))
+    return [path for _, path in sorted(files)]
+
+
+def read_entry(path: Path) -> Optional[LogEntry]:
+    match = LOG_FILE.search(path.name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or not data.get('query'):
+        return None
+    return LogEntry(
+        path=path,
+        timestamp=datetime.fromtimestamp(int(match.group(1)) / 1000) if match else datetime.fromtimestamp(0),
+        query=data['query'],
+        rows=data.get('rows') or [],
+        execution_time_ms=data.get('execution_time_ms'),
+        failed=bool(data.get('returncode')) or bool((data.get('stderr') or '').strip()),
+    )
+
+
+def iter_entries(directory: Path = LOG_DIR) -> Iterator[LogEntry]:
+    """Yield every readable log entry in timestamp order"""
+    for path in log_files(directory):
+        entry = read_entry(path)
+        if entry is not None:
+            yield entry
+
+
+# ----------------------------------------------------------------------
+# Streaming reader
+# ----------------------------------------------------------------------
+
+CHUNK_SIZE = 64 * 1024
+SCALAR_KEYS = {'query', 'execution_time_ms', 'returncode', 'stderr'}
+_DECODER = json.JSONDecoder()
+_CONTAINER_SPECIAL = re.compile(r'["\[\]{},]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NUMBER_END = ',}] \t\r\n'
+
+
+@dataclass
+class LogSummary:
+    """The scalar fields of one log file plus the size of its result set"""
+    path: Path
+    timestamp: datetime
+    query: str
+    row_count: int = 0                # elements of `rows` (or its value when it is a number)
+    result_chars: int = 0             # size of the `rows` payload as written
+    execution_time_ms: Optional[float] = None
+    failed: bool = False
+
+
+class _ChunkReader:
+    """Cursor over a JSON text stream that refills its buffer on demand"""
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0     # stream position of buf[0]
+        self.eof = False
+
+    @property
+    def position(self) -> int:
+        return self.offset + self.pos
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping what lies before the cursor"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f'expected {char!r} at {self.position}')
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the complete value at the cursor"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and (end == len(self.buf) or self.buf[end] not in _NUMBER_END)
+                    and self.fill()):
+                continue    # the number may continue in the next chunk (`1500` + `.0`)
+            self.pos = end
+            return value
+
+    def _skip_string(self) -> None:
+        self.pos += 1
+        while True:
+            match = _STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError('unterminated string')
+                continue
+            self.pos = match.end()
+            if match.group() == '"':
+                return
+            if self.pos >= len(self.buf) and not self.fill():
+                raise ValueError('unterminated string')
+            self.pos += 1   # the escaped character
+
+    def skip(self) -> int:
+        """Skip the value at the cursor; returns its direct element count when it is an array"""
+        first = self.peek()
+        if first == '"':
+            self._skip_string()
+            return 0
+        if first not in '[{':
+            self.decode()
+            return 0
+        self.pos += 1
+        depth = 1
+        elements = 0
+        empty = True
+        while True:
+            match = _CONTAINER_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError('unterminated container')
+                continue
+            char = match.group()
+            if depth == 1 and empty and (char not in ']}' or self.buf[self.pos:match.start()].strip()):
+                empty = False
+            self.pos = match.start()
+            if char == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            if char in '[{':
+                depth += 1
+            elif char in ']}':
+                depth -= 1
+                if depth == 0:
+                    return 0 if empty or first == '{' else elements + 1
+            elif depth == 1:
+                elements += 1
+
+
+def _scan_fields(reader: _ChunkReader) -> Tuple[Dict[str, Any], int, int]:
+    """Scalar fields, row count and `rows` payload size of the object at the cursor"""
+    fields: Dict[str, Any] = {}
+    row_count = result_chars = 0
+    reader.expect('{')
+    first = True
+    while reader.peek() != '}':
+        if not first:
+            reader.expect(',')
+        first = False
+        key = reader.decode()
+        reader.expect(':')
+        if key in SCALAR_KEYS:
+            fields[key] = reader.decode()
+        elif key == 'rows':
+            start = reader.position
+            if reader.peek() in '[{':
+                row_count = reader.skip()
+            else:
+                value = reader.decode()
+                row_count = value if isinstance(value, int) else 0
+            result_chars = reader.position - start
+        else:
+            reader.skip()
+    return fields, row_count, result_chars
+
+
+def scan_entry(path: Path) -> Optional[LogSummary]:
+    """Streaming counterpart of read_entry(): scalar fields plus the row count and payload size"""
+    match = LOG_FILE.search(path.name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            fields, row_count, result_chars = _scan_fields(_ChunkReader(f))
+    except (OSError, ValueError):
+        return None
+    query = fields.get('query')
+    if not isinstance(query, str) or not query:
+        return None
+    return LogSummary(
+        path=path,
+        timestamp=datetime.fromtimestamp(int(match.group(1)) / 1000) if match else datetime.fromtimestamp(0),
+        query=query,
+        row_count=row_count,
+        result_chars=result_chars,
+        execution_time_ms=fields.get('execution_time_ms'),
+        failed=bool(fields.get('returncode')) or bool((fields.get('stderr') or '').strip()),
+    )
+
+
+# ----------------------------------------------------------------------
+# Self-check
+# ----------------------------------------------------------------------
+
+SELF_CHECK_SAMPLES = [
+    '{"query":"q","execution_time_ms":1500.0}',
+    '{"query": "q", "rows": [{"a": 1}, {"a": [2, 3]}], "execution_time_ms": 1.5e3, "returncode": 0}',
+    '{"query":"q \\"x\\"","rows":42,"stderr":"","execution_time_ms":-12}',
+    '{"rows": [], "query": "q", "execution_time_ms": 7}',
+]
+
+
+def self_check(paths: List[Path]) -> List[str]:
+    """
+    Compare the streaming scanner with json.load on the built-in samples (at
+    every small chunk size, so each number straddles a chunk boundary) and on
+    the given log files. Returns one message per mismatch.
+    """
+    failures = []
+    for text in SELF_CHECK_SAMPLES:
+        data = json.loads(text)
+        rows = data.get('rows')
+        expected = (
+            {key: data[key] for key in SCALAR_KEYS if key in data},
+            len(rows) if isinstance(rows, list) else rows or 0,
+        )
+        for chunk_size in (1, 2, 3, 5, CHUNK_SIZE):
+            try:
+                fields, row_count, _ = _scan_fields(_ChunkReader(io.StringIO(text), chunk_size))
+            except ValueError as e:
+                failures.append(f'chunk size {chunk_size}: {text}: {e}')
+                continue
+            if (fields, row_count) != expected:
+                failures.append(f'chunk size {chunk_size}: {text}: got {(fields, row_count)}, expected {expected}')
+
+    for path in paths:
+        entry = read_entry(path)
+        summary = scan_entry(path)
+        if entry is None or summary is None:
+            if (entry is None) != (summary is None):
+                failures.append(f'{path.name}: only one reader accepted the file')
+            continue
+        row_count = len(entry.rows) if isinstance(entry.rows, list) else entry.rows
+        if (summary.query, summary.execution_time_ms, summary.row_count, summary.failed) != \
+                (entry.query, entry.execution_time_ms, row_count, entry.failed):
+            failures.append(f'{path.name}: streaming scan disagrees with json.load')
+    return failures
+
+
+def main():
+    paths = [Path(arg) for arg in sys.argv[1:]] or log_files()
+    failures = self_check(paths)
+    print(f"🔎 Checked {len(SELF_CHECK_SAMPLES)} samples and {len(paths)} log files")
+    for failure in failures:
+        print(f"   ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Streaming reader matches json.load")
+
+
+if __name__ == '__main__':
+    main()
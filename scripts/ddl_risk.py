@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Online-DDL Risk Estimator
+
+Classifies every DDL statement in the migration scripts (migrations/*.sql,
+drizzle/*.sql and the *.sql files in the project root) the way the server
+will execute it:
+
+  instant     metadata-only change (ALGORITHM=INSTANT / TiDB metadata DDL)
+  in-place    no table copy; concurrent DML keeps running, but the table is
+              rebuilt or an index is built, which takes time proportional to
+              the row count
+  table-copy  the table is copied row by row and writes are blocked for the
+              whole copy (MySQL) or every row is rewritten (TiDB reorg)
+
+Previous column definitions come from the live schema reconstructed from
+the .manus/db captures (scripts/schema_timeline.py), falling back to the
+replayed drizzle migrations and drizzle/schema.ts. Row counts come from a
+stats file (monitoring.getDatabaseStats output, information_schema.TABLES
+rows or a plain {table: rows} map) or, without one, from the latest
+`SELECT COUNT(*) FROM <table>` capture. Several ALTERs of one table in the
+same script are reported with a merged statement, since each ALTER pays its
+own rebuild and metadata lock.
+
+Usage:
+    python scripts/ddl_risk.py
+    python scripts/ddl_risk.py --stats table-stats.json --target tidb
+    python scripts/ddl_risk.py update-activity-log-schema.sql
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db_query_log import LOG_DIR, iter_entries
+from drizzle_schema import load_schema
+from schema_timeline import MIGRATIONS_DIR, migration_files, replay_logs, schema_tables
+from sql_ddl import ColumnDef, DdlOp, DdlStatement, TableState, apply_op, parse_statement, split_statements
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPORT_FILE = PROJECT_ROOT / 'ddl-risk.json'
+
+INSTANT, IN_PLACE, TABLE_COPY = 'instant', 'in-place', 'table-copy'
+SEVERITY = {INSTANT: 0, IN_PLACE: 1, TABLE_COPY: 2}
+TARGETS = ('mysql', 'tidb')
+
+# Rough single-server throughput; only the order of magnitude matters
+COPY_ROWS_PER_SECOND = 20_000
+REBUILD_ROWS_PER_SECOND = 50_000
+INDEX_ROWS_PER_SECOND = 100_000
+LARGE_TABLE_ROWS = 100_000
+# Tables whose ALTERs have stalled deploys before
+HOT_TABLES = {'tasks', 'activityLog'}
+UTF8MB4_BYTES = 4
+COUNT_QUERY = re.compile(r'^\s*SELECT\s+COUNT\(\s*(?:\*|1|id)\s*\)(?:\s+AS\s+\w+)?\s+FROM\s+`?(\w+)`?\s*;?\s*$', re.I)
+
+
+@dataclass
+class OpRisk:
+    kind: str
+    detail: str
+    algorithm: str
+    rebuild: bool
+    reason: str
+    seconds: float = 0.0
+    scan: bool = False          # reads every row without rewriting it (index build, FK validation)
+
+
+@dataclass
+class StatementRisk:
+    file: str
+    number: int                 # statement number within the file
+    table: str
+    verb: str
+    text: str
+    algorithm: str
+    rows: Optional[int]
+    seconds: float              # estimated run time
+    blocked_seconds: float      # estimated time writes are blocked
+    risk: str                   # low / medium / high
+    ops: List[OpRisk] = field(default_factory=list)
+
+
+@dataclass
+class MergeSuggestion:
+    file: str
+    table: str
+    statements: List[int]
+    seconds: float              # separate statements
+    merged_seconds: float
+    sql: str
+    note: Optional[str] = None
+
+
+# ----------------------------------------------------------------------
+# Inputs
+# ----------------------------------------------------------------------
+
+def default_sources() -> List[Path]:
+    return (sorted((PROJECT_ROOT / 'migrations').glob('*.sql')) + migration_files()
+            + sorted(PROJECT_ROOT.glob('*.sql')))
+
+
+def load_stats(path: Path) -> Dict[str, int]:
+    """table -> rows from getDatabaseStats output, information_schema.TABLES rows or {table: rows}"""
+    data = json.loads(path.read_text(encoding='utf-8'))
+    while isinstance(data, dict) and len(data) == 1 and next(iter(data)) in ('result', 'data', 'json'):
+        data = next(iter(data.values()))
+    if isinstance(data, dict) and isinstance(data.get('tables'), list):
+        data = data['tables']
+    rows: Dict[str, int] = {}
+    if isinstance(data, dict):
+        for name, value in data.items():
+            count = value.get('rowCount', value.get('rows')) if isinstance(value, dict) else value
+            if count is not None:
+                rows[name] = int(count)
+    elif isinstance(data, list):
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            lowered = {key.lower(): value for key, value in item.items()}
+            name = lowered.get('name') or lowered.get('table_name') or lowered.get('table')
+            count = lowered.get('rowcount', lowered.get('table_rows', lowered.get('rows')))
+            if name and count not in (None, 'NULL'):
+                rows[name] = int(count)
+    return rows
+
+
+def row_counts_from_logs(log_dir: Path = LOG_DIR) -> Dict[str, int]:
+    """Latest unfiltered `SELECT COUNT(*) FROM t` result per table"""
+    rows: Dict[str, int] = {}
+    for entry in iter_entries(log_dir):
+        match = COUNT_QUERY.match(entry.query)
+        if match and not entry.failed and isinstance(entry.rows, list) and entry.rows:
+            values = list(entry.rows[0].values()) if isinstance(entry.rows[0], dict) else []
+            if values and str(values[0]).isdigit():
+                rows[match.group(1)] = int(values[0])
+    return rows
+
+
+class SchemaContext:
+    """
+    Previous column definitions. Numbered drizzle migrations are judged
+    against the migrations before them; everything else against the live
+    schema from the captures, then drizzle/schema.ts.
+    """
+
+    def __init__(self, log_dir: Path = LOG_DIR):
+        self.layers: List[Dict[str, TableState]] = [
+            replay_logs(iter_entries(log_dir)).tables,
+            schema_tables(load_schema()),
+        ]
+        self.migrated: Dict[str, TableState] = {}
+
+    def table(self, name: str, migration: bool = False) -> Optional[TableState]:
+        layers = [self.migrated] + self.layers if migration else self.layers
+        for layer in layers:
+            if name in layer:
+                return layer[name].copy()
+        return None
+
+    def advance(self, statements: List[DdlStatement]) -> None:
+        """Apply a migration so the next one sees its result"""
+        for statement in statements:
+            for op in statement.ops:
+                apply_op(self.migrated, op)
+
+
+# ----------------------------------------------------------------------
+# Classification
+# ----------------------------------------------------------------------
+
+def _enum_values(column_type: str) -> Optional[List[str]]:
+    match = re.fullmatch(r"(?:enum|set)\((.*)\)", column_type)
+    return re.findall(r"'((?:[^']|'')*)'", match.group(1)) if match else None
+
+
+def _varchar_length(column_type: str) -> Optional[int]:
+    match = re.fullmatch(r'varchar\((\d+)\)', column_type)
+    return int(match.group(1)) if match else None
+
+
+def classify_column_change(old: Optional[ColumnDef], new: ColumnDef, target: str) -> Tuple[str, bool, str]:
+    """(algorithm, rebuild, reason) for MODIFY/CHANGE COLUMN"""
+    if old is None or not old.type:
+        return TABLE_COPY, True, 'previous definition unknown; assuming a type change'
+    if '(' not in old.type and '(' in new.type and old.type == new.family:
+        return TABLE_COPY, True, f'previous {old.type} arguments unknown; assuming a rewrite'
+    same_type = old.type == new.type
+    if same_type and old.nullable == new.nullable:
+        return INSTANT, False, 'only default, comment or name changes'
+    if same_type:
+        if target == 'tidb':
+            return (INSTANT, False, 'NOT NULL -> NULL is metadata-only') if new.nullable else \
+                (TABLE_COPY, True, 'NULL -> NOT NULL checks every row (reorg)')
+        return IN_PLACE, True, f"nullability {'NOT NULL -> NULL' if new.nullable else 'NULL -> NOT NULL'} rebuilds the table"
+
+    old_values, new_values = _enum_values(old.type), _enum_values(new.type)
+    if old_values is not None and new_values is not None and old.nullable == new.nullable:
+        if new_values[:len(old_values)] == old_values and (len(new_values) <= 255) == (len(old_values) <= 255):
+            return INSTANT, False, f'{len(new_values) - len(old_values)} member(s) appended at the end'
+        return TABLE_COPY, True, 'members reordered, renamed or removed'
+
+    old_length, new_length = _varchar_length(old.type), _varchar_length(new.type)
+    if old_length is not None and new_length is not None and new_length >= old_length and old.nullable == new.nullable:
+        if target == 'tidb':
+            return INSTANT, False, 'VARCHAR widened'
+        if (old_length * UTF8MB4_BYTES < 256) == (new_length * UTF8MB4_BYTES < 256):
+            return IN_PLACE, False, 'VARCHAR widened within the same length-prefix size'
+        return TABLE_COPY, True, 'VARCHAR crosses 255 bytes, the length prefix grows'
+    return TABLE_COPY, True, f'type change {old.type} -> {new.type}'
+
+
+def classify_op(op: DdlOp, state: Optional[TableState], target: str) -> OpRisk:
+    kind = op.kind
+    detail = op.text or op.name or ''
+    if kind in ('create_table', 'drop_table', 'rename_table', 'rename_column', 'rename_index', 'alter_default'):
+        return OpRisk(kind, detail, INSTANT, False, 'metadata only')
+    if kind == 'add_column':
+        if op.column is not None and op.column.auto_increment:
+            return OpRisk(kind, detail, TABLE_COPY, True, 'AUTO_INCREMENT column')
+        return OpRisk(kind, detail, INSTANT, False,
+                      'instant ADD COLUMN (MySQL 8.0.29+ at any position)' if target == 'mysql' else 'metadata only')
+    if kind == 'drop_column':
+        return OpRisk(kind, detail, INSTANT, False,
+                      'instant DROP COLUMN (MySQL 8.0.29+)' if target == 'mysql' else 'metadata only')
+    if kind in ('modify_column', 'change_column') and op.column is not None:
+        old = state.columns.get(op.name or op.column.name) if state is not None else None
+        algorithm, rebuild, reason = classify_column_change(old, op.column, target)
+        return OpRisk(kind, detail, algorithm, rebuild, reason)
+    if kind == 'add_index' and op.index is not None:
+        if op.index.primary:
+            return OpRisk(kind, detail, IN_PLACE, True, 'adding a primary key rebuilds the clustered index')
+        return OpRisk(kind, detail, IN_PLACE, False, 'secondary index build scans and sorts the table',
+                      scan=True)
+    if kind == 'drop_index':
+        if op.name == 'PRIMARY':
+            return OpRisk(kind, detail, TABLE_COPY, True, 'dropping the primary key copies the table')
+        return OpRisk(kind, detail, INSTANT if target == 'tidb' else IN_PLACE, False, 'metadata only')
+    if kind == 'add_foreign_key':
+        if target == 'tidb':
+            return OpRisk(kind, detail, IN_PLACE, False, 'validates existing rows', scan=True)
+        return OpRisk(kind, detail, TABLE_COPY, True, 'copies the table unless foreign_key_checks=0 (then in-place)')
+    if kind == 'drop_foreign_key':
+        return OpRisk(kind, detail, IN_PLACE, False, 'metadata only')
+    words = detail.upper()
+    if any(word in words for word in ('CONVERT', 'CHARACTER SET', 'CHARSET', 'ENGINE', 'ROW_FORMAT', 'FORCE')):
+        return OpRisk(kind, detail, TABLE_COPY, True, 'table option rewrites every row')
+    if any(word in words for word in ('COMMENT', 'AUTO_INCREMENT')):
+        return OpRisk(kind, detail, INSTANT, False, 'metadata only')
+    return OpRisk(kind, detail, TABLE_COPY, True, 'not recognised; assuming a table copy')
+
+
+def _op_seconds(risk: OpRisk, rows: int) -> float:
+    if risk.algorithm == TABLE_COPY:
+        return rows / COPY_ROWS_PER_SECOND
+    if risk.rebuild:
+        return rows / REBUILD_ROWS_PER_SECOND
+    if risk.scan:
+        return rows / INDEX_ROWS_PER_SECOND
+    return 0.0
+
+
+def estimate(ops: List[OpRisk], rows: Optional[int], target: str) -> Tuple[str, float, float]:
+    """(algorithm, seconds, write-blocked seconds) for ops run as one statement"""
+    algorithm = max((risk.algorithm for risk in ops), key=SEVERITY.__getitem__, default=INSTANT)
+    count = rows or 0
+    for risk in ops:
+        risk.seconds = round(_op_seconds(risk, count), 1)
+    # one table pass for the rebuild/copy, plus a pass per index built or constraint validated
+    seconds = max((risk.seconds for risk in ops if not risk.scan), default=0.0)
+    seconds += sum(risk.seconds for risk in ops if risk.scan)
+    blocked = seconds if algorithm == TABLE_COPY and target == 'mysql' else 0.0
+    return algorithm, round(seconds, 1), round(blocked, 1)
+
+
+def risk_level(algorithm: str, table: str, rows: Optional[int], seconds: float) -> str:
+    if algorithm == INSTANT:
+        return 'low'
+    large = rows is None or rows >= LARGE_TABLE_ROWS
+    if algorithm == TABLE_COPY and (large or table in HOT_TABLES):
+        return 'high'
+    if algorithm == TABLE_COPY or table in HOT_TABLES or seconds >= 60:
+        return 'medium'
+    return 'low'
+
+
+# ----------------------------------------------------------------------
+# Analysis
+# ----------------------------------------------------------------------
+
+def _alter_spec(op: DdlOp) -> Optional[str]:
+    """The op as an ALTER TABLE clause, None when it cannot be merged"""
+    if op.kind == 'add_index' and op.index is not None and not op.text.upper().startswith(('ADD', 'CONSTRAINT')):
+        unique = 'UNIQUE ' if op.index.unique else ''
+        return f"ADD {unique}INDEX `{op.index.name}` ({', '.join(f'`{c}`' for c in op.index.columns)})"
+    if op.kind == 'drop_index' and op.text.upper().startswith('DROP INDEX') and ' ON ' in op.text.upper():
+        return f"DROP INDEX `{op.name}`"
+    if op.kind in ('create_table', 'drop_table', 'rename_table'):
+        return None
+    return op.text
+
+
+def analyze_file(path: Path, context: SchemaContext, rows: Dict[str, int], target: str
+                 ) -> Tuple[List[StatementRisk], List[MergeSuggestion]]:
+    try:
+        source = str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        source = str(path)
+    migration = path.parent == MIGRATIONS_DIR and path.name[:1].isdigit()
+    tables: Dict[str, TableState] = {}
+    created = set()     # tables this script creates are empty when it alters them
+    results: List[StatementRisk] = []
+    statements: List[DdlStatement] = []
+    for number, tokens in enumerate(split_statements(path.read_text(encoding='utf-8')), 1):
+        statement = parse_statement(tokens)
+        if statement is None or not statement.ops:
+            continue
+        statements.append(statement)
+        ops = []
+        for op in statement.ops:
+            if op.table not in tables:
+                state = context.table(op.table, migration)
+                if state is not None:
+                    tables[op.table] = state
+            ops.append(classify_op(op, tables.get(op.table), target))
+            apply_op(tables, op)
+        table = statement.table
+        if statement.verb == 'CREATE TABLE':
+            created.add(table)
+        count = 0 if table in created else rows.get(table)
+        algorithm, seconds, blocked = estimate(ops, count, target)
+        results.append(StatementRisk(
+            file=source, number=number, table=table, verb=statement.verb,
+            text=statement.text if len(statement.text) <= 160 else statement.text[:157] + '...',
+            algorithm=algorithm, rows=count, seconds=seconds, blocked_seconds=blocked,
+            risk=risk_level(algorithm, table, count, seconds), ops=ops,
+        ))
+    if migration:
+        context.advance(statements)
+    return results, merge_suggestions(source, statements, results, rows, target, created)
+
+
+def merge_suggestions(source: str, statements: List[DdlStatement], results: List[StatementRisk],
+                      rows: Dict[str, int], target: str, created: set) -> List[MergeSuggestion]:
+    """One ALTER per table when a script alters an existing table more than once with non-instant changes"""
+    groups: Dict[str, List[Tuple[DdlStatement, StatementRisk]]] = {}
+    for statement, result in zip(statements, results):
+        if statement.verb in ('ALTER TABLE', 'CREATE INDEX', 'DROP INDEX') and statement.table not in created:
+            groups.setdefault(statement.table, []).append((statement, result))
+    suggestions = []
+    for table, group in groups.items():
+        if len(group) < 2 or sum(result.algorithm != INSTANT for _, result in group) < 2:
+            continue
+        specs = [_alter_spec(op) for statement, _ in group for op in statement.ops]
+        if any(spec is None for spec in specs):
+            continue
+        guarded = any(op.if_exists and op.kind in ('add_index', 'drop_index')
+                      for statement, _ in group for op in statement.ops)
+        ops = [OpRisk(**asdict(risk)) for _, result in group for risk in result.ops]
+        _, merged_seconds, _ = estimate(ops, rows.get(table), target)
+        suggestions.append(MergeSuggestion(
+            file=source, table=table, statements=[result.number for _, result in group],
+            seconds=round(sum(result.seconds for _, result in group), 1), merged_seconds=merged_seconds,
+            sql=f"ALTER TABLE `{table}`\n  " + ',\n  '.join(specs) + ';',
+            note='IF NOT EXISTS guards on CREATE INDEX are dropped; check the indexes first' if guarded else None,
+        ))
+    return suggestions
+
+
+def _format_seconds(seconds: float, rows: Optional[int]) -> str:
+    if rows is None:
+        return 'rows unknown'
+    if seconds < 1:
+        return f'{rows:,} rows, <1s'
+    return f'{rows:,} rows, ~{seconds:,.0f}s'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify migration DDL as instant, in-place or table-copy')
+    parser.add_argument('files', nargs='*', type=Path, help='SQL files (default: migrations/, drizzle/, root *.sql)')
+    parser.add_argument('--target', choices=TARGETS, default='mysql', help='server rules to apply (default: mysql)')
+    parser.add_argument('--stats', type=Path, help='row counts: getDatabaseStats JSON, information_schema rows or {table: rows}')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='capture directory (default: .manus/db)')
+    parser.add_argument('--min-risk', choices=('low', 'medium', 'high'), default='medium', help='lowest risk to print')
+    parser.add_argument('--limit', type=int, default=40, help='statements and merge suggestions to print')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Loading schema context and row counts...")
+    context = SchemaContext(args.log_dir)
+    rows = row_counts_from_logs(args.log_dir)
+    if args.stats:
+        rows.update(load_stats(args.stats))
+    print(f"   row counts for {len(rows)} tables ({'stats file + ' if args.stats else ''}captured COUNT(*) queries)")
+
+    statements: List[StatementRisk] = []
+    suggestions: List[MergeSuggestion] = []
+    files = [path.resolve() for path in args.files] or default_sources()
+    for path in files:
+        results, merges = analyze_file(path, context, rows, args.target)
+        statements.extend(results)
+        suggestions.extend(merges)
+    counts = {algorithm: sum(result.algorithm == algorithm for result in statements) for algorithm in SEVERITY}
+    print(f"   {len(statements)} DDL statements in {len(files)} files: "
+          + ', '.join(f'{count} {algorithm}' for algorithm, count in counts.items()))
+
+    levels = ['low', 'medium', 'high']
+    shown = [result for result in statements if levels.index(result.risk) >= levels.index(args.min_risk)]
+    print(f"\n⚠️  {len(shown)} statements at {args.min_risk} risk or above ({args.target}):")
+    for result in sorted(shown, key=lambda item: (-levels.index(item.risk), -item.seconds))[:args.limit]:
+        print(f"   [{result.risk}] {result.file}#{result.number} {result.table}: {result.algorithm} "
+              f"({_format_seconds(result.seconds, result.rows)}"
+              f"{f', writes blocked ~{result.blocked_seconds:,.0f}s' if result.blocked_seconds >= 1 else ''})")
+        for risk in result.ops:
+            if risk.algorithm != INSTANT:
+                print(f"      {risk.algorithm:<10} {risk.kind}: {risk.reason}")
+
+    if suggestions:
+        print(f"\n🔗 {len(suggestions)} tables are altered several times in one script:")
+        for suggestion in sorted(suggestions, key=lambda item: item.merged_seconds - item.seconds)[:args.limit]:
+            estimate_text = (f" (~{suggestion.seconds:,.0f}s -> ~{suggestion.merged_seconds:,.0f}s)"
+                             if suggestion.seconds >= 1 else '')
+            print(f"   {suggestion.file} {suggestion.table}: statements "
+                  f"{', '.join(f'#{n}' for n in suggestion.statements)} -> one ALTER{estimate_text}")
+            if suggestion.note:
+                print(f"      note: {suggestion.note}")
+
+    report = {
+        'target': args.target,
+        'row_counts': rows,
+        'statements': [asdict(result) for result in statements],
+        'merge_suggestions': [asdict(suggestion) for suggestion in suggestions],
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
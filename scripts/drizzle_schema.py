@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Drizzle Schema Model
+
+Parses the `mysqlTable(...)` definitions in drizzle/schema.ts (via the shared
+SourceIndex) into a small model: table export name -> SQL name, columns and
+the index()/uniqueIndex()/primaryKey() declarations of the extras callback.
+Used by the query catalog and the database analyzers in scripts/.
+
+Usage:
+    python scripts/drizzle_schema.py     # print tables, columns and indexes
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from source_index import IDENT, STRING, SourceIndex
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCHEMA_FILE = PROJECT_ROOT / 'drizzle' / 'schema.ts'
+
+
+@dataclass
+class Column:
+    """A column declared in a mysqlTable definition"""
+    name: str                 # property name used in TypeScript (tasks.projectId)
+    sql_name: str             # column name in the database
+    type: str                 # drizzle builder: int, varchar, mysqlEnum, ...
+    not_null: bool = False
+    auto_increment: bool = False
+    primary_key: bool = False
+    unique: bool = False
+    has_default: bool = False
+    line: int = 0
+
+
+@dataclass
+class Index:
+    """An index declared in the mysqlTable extras callback (or implied by a column)"""
+    name: str
+    columns: List[str]
+    unique: bool = False
+    primary: bool = False
+    line: int = 0
+
+
+@dataclass
+class Table:
+    """A mysqlTable definition"""
+    name: str                 # export name (tasks)
+    sql_name: str             # table name in the database
+    columns: Dict[str, Column] = field(default_factory=dict)
+    indexes: List[Index] = field(default_factory=list)
+    line: int = 0
+    # token index of the third mysqlTable argument (index callback), -1 if absent
+    extras_token: int = -1
+
+    @property
+    def primary_key(self) -> Optional[Index]:
+        for index in self.indexes:
+            if index.primary:
+                return index
+        return None
+
+    def all_indexes(self) -> List[Index]:
+        """Declared indexes plus the primary key and `.unique()` column indexes"""
+        implied = []
+        if self.primary_key is None:
+            # MySQL requires AUTO_INCREMENT columns to be a key; drizzle-kit pulls them as the primary key
+            auto = [column.sql_name for column in self.columns.values() if column.auto_increment]
+            if auto:
+                implied.append(Index(name='PRIMARY', columns=auto, unique=True, primary=True))
+        for column in self.columns.values():
+            if column.unique and not any(index.columns == [column.sql_name] for index in self.indexes):
+                implied.append(Index(name=f'{self.sql_name}_{column.sql_name}_unique', columns=[column.sql_name],
+                                     unique=True, line=column.line))
+        return implied + self.indexes
+
+    def column_by_sql_name(self, sql_name: str) -> Optional[Column]:
+        for column in self.columns.values():
+            if column.sql_name == sql_name:
+                return column
+        return None
+
+
+@dataclass
+class Schema:
+    """All tables in drizzle/schema.ts"""
+    tables: Dict[str, Table]
+    index: SourceIndex
+
+    def by_sql_name(self, sql_name: str) -> Optional[Table]:
+        for table in self.tables.values():
+            if table.sql_name == sql_name:
+                return table
+        return None
+
+
+def _parse_columns(index: SourceIndex, open_brace: int, table: Table) -> None:
+    close = index.match(open_brace)
+    depth = index.depths[open_brace] + 1
+    i = open_brace + 1
+    while i < close:
+        if index.depths[i] != depth or index.kinds[i] not in (IDENT, STRING) or not index.is_punct(i + 1, b':'):
+            i += 1
+            continue
+        name = index.text(i).strip('\'"')
+        builder = i + 2
+        if index.kinds[builder] != IDENT or not index.is_punct(builder + 1, b'('):
+            i += 1
+            continue
+        call_close = index.match(builder + 1)
+        sql_name = name
+        if index.kinds[builder + 2] == STRING:
+            sql_name = index.text(builder + 2)[1:-1]
+
+        # the modifier chain runs to the next `,` at this depth
+        end = call_close + 1
+        while end < close and not (index.depths[end] == depth and index.is_punct(end, b',')):
+            end += 1
+        chain = {index.text(j) for j in range(call_close + 1, end)
+                 if index.kinds[j] == IDENT and index.is_punct(j - 1, b'.')}
+
+        table.columns[name] = Column(
+            name=name,
+            sql_name=sql_name,
+            type=index.text(builder),
+            not_null='notNull' in chain or 'primaryKey' in chain,
+            auto_increment='autoincrement' in chain,
+            primary_key='primaryKey' in chain,
+            unique='unique' in chain,
+            has_default=bool(chain & {'default', 'defaultNow', 'defaultRandom', '$defaultFn', 'autoincrement'}),
+            line=index.line_of(index.starts[i]),
+        )
+        i = end
+
+
+def _column_refs(index: SourceIndex, first: int, last: int, table: Table) -> List[str]:
+    """SQL column names of `t.column` references in a token range"""
+    columns = []
+    for i in range(first, last - 1):
+        if index.kinds[i] == IDENT and index.is_punct(i + 1, b'.') and not index.is_punct(i - 1, b'.'):
+            column = table.columns.get(index.text(i + 2))
+            if column is not None:
+                columns.append(column.sql_name)
+    return columns
+
+
+def _parse_indexes(index: SourceIndex, first: int, last: int, table: Table) -> None:
+    """index("name").on(...), uniqueIndex("name").on(...) and primaryKey({ columns: [...] })"""
+    i = first
+    while i < last:
+        name = index.text(i)
+        if index.kinds[i] == IDENT and name in ('index', 'uniqueIndex') and index.is_punct(i + 1, b'('):
+            close = index.match(i + 1)
+            if (index.kinds[i + 2] == STRING and index.is_punct(close + 1, b'.')
+                    and index.is_ident(close + 2, b'on') and index.is_punct(close + 3, b'(')):
+                on_close = index.match(close + 3)
+                table.indexes.append(Index(
+                    name=index.text(i + 2)[1:-1],
+                    columns=_column_refs(index, close + 4, on_close, table),
+                    unique=name == 'uniqueIndex',
+                    line=index.line_of(index.starts[i]),
+                ))
+                i = on_close
+        elif index.kinds[i] == IDENT and name == 'primaryKey' and index.is_punct(i + 1, b'('):
+            close = index.match(i + 1)
+            table.indexes.append(Index(name='PRIMARY', columns=_column_refs(index, i + 2, close, table),
+                                       unique=True, primary=True, line=index.line_of(index.starts[i])))
+            i = close
+        i += 1
+
+
+def load_schema(schema_file: Path = SCHEMA_FILE) -> Schema:
+    """Parse every exported mysqlTable definition"""
+    index = SourceIndex.load(schema_file)
+    tables: Dict[str, Table] = {}
+    for symbol in index.symbols:
+        if symbol.kind != 'const':
+            continue
+        call = symbol.start_token
+        while call < symbol.end_token and not index.is_ident(call, b'mysqlTable'):
+            call += 1
+        if not index.is_ident(call, b'mysqlTable') or not index.is_punct(call + 1, b'('):
+            continue
+        args_open = call + 1
+        args_close = index.match(args_open)
+        name_token = args_open + 1
+        if index.kinds[name_token] != STRING:
+            continue
+        table = Table(name=symbol.name, sql_name=index.text(name_token)[1:-1], line=symbol.start_line)
+
+        columns_open = name_token + 2
+        if index.is_punct(columns_open, b'{'):
+            _parse_columns(index, columns_open, table)
+            extras = index.match(columns_open) + 1
+            if index.is_punct(extras, b',') and extras + 1 < args_close:
+                table.extras_token = extras + 1
+                _parse_indexes(index, extras + 1, args_close, table)
+            for column in table.columns.values():
+                if column.primary_key:
+                    table.indexes.insert(0, Index(name='PRIMARY', columns=[column.sql_name], unique=True,
+                                                  primary=True, line=column.line))
+        tables[table.name] = table
+    return Schema(tables=tables, index=index)
+
+
+def main():
+    schema = load_schema()
+    print(f"📄 drizzle/schema.ts: {len(schema.tables)} tables")
+    for table in schema.tables.values():
+        print(f"   {table.name} ({table.sql_name}) L{table.line}: {len(table.columns)} columns")
+        for column in table.columns.values():
+            flags = ' '.join(flag for flag, on in (
+                ('NOT NULL', column.not_null), ('AUTO_INCREMENT', column.auto_increment),
+                ('UNIQUE', column.unique), ('DEFAULT', column.has_default)) if on)
+            print(f"      {column.sql_name:<28} {column.type:<10} {flags}")
+        for index in table.all_indexes():
+            kind = 'PRIMARY KEY' if index.primary else 'UNIQUE' if index.unique else 'INDEX'
+            print(f"      {kind} {index.name} ({', '.join(index.columns)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Event-Loop Blocker Detector
+
+Node serves every request on one thread: a handler that spends 800 ms
+building an Excel workbook or gzipping a buffer synchronously freezes every
+other user for those 800 ms. This walks the request paths of the server -
+tRPC procedures (server/routers*.ts, server/*Router.ts) and Express routes
+(`app.get("/api/...", handler)`, `router.post(...)` in server/_core,
+server/routes, server/sse.ts) - through the call graph of server/**/*.ts and
+reports synchronous or CPU-heavy work reachable from each entry point:
+
+  * pdf / excel      in-memory document generation (`new PDFDocument`,
+                     `new ExcelJS.Workbook`, `workbook.xlsx.writeBuffer`, XLSX)
+  * document         HTML/PDF/Excel renderers reached by name
+                     (generate*PDF, export*Excel, ...) that build the whole
+                     document in a string or buffer
+  * fs / process     `fs.*Sync`, `execSync`/`spawnSync`
+  * zlib / crypto    `gzipSync`/`deflateSync`/..., `pbkdf2Sync`, `scryptSync`,
+                     bcrypt `hashSync`/`compareSync`; `createHash`/`randomBytes`
+                     without a callback are listed as light
+  * json / encode    `JSON.parse`/`JSON.stringify` and `toString('base64')` of
+                     whole buffers; light unless inside a loop
+
+Each finding carries the call path from the entry point, e.g.
+`exportRouter.exportTasksExcel -> createExcelWorkbook (server/export.ts:17)
+-> new ExcelJS.Workbook`, and the report also lists every blocking site with
+the number of endpoints that reach it.
+
+Usage:
+    python scripts/event_loop_blockers.py
+    python scripts/event_loop_blockers.py --min-severity low
+    python scripts/event_loop_blockers.py --output /tmp/blockers.json
+"""
+
+import argparse
+import json
+import re
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from query_catalog import DEFAULT_FILES, resolve_files
+from source_index import IDENT, STRING, TEMPLATE, SourceIndex
+from transaction_scope import CallGraph, Function, loop_spans
+from unbounded_selects import DataLayer, load_procedures
+
+PROJECT_ROOT = Path(__file__).parent.parent
+EXPRESS_FILES = ('server/*.ts', 'server/_core/*.ts', 'server/routes/*.ts', 'server/routers/*.ts')
+REPORT_FILE = PROJECT_ROOT / 'event-loop-blockers.json'
+
+HTTP_METHODS = {'get', 'post', 'put', 'patch', 'delete', 'all', 'use'}
+MAX_DEPTH = 8
+SEVERITIES = ('high', 'medium', 'low')
+
+ZLIB_SYNC = re.compile(r'^(?:gzip|gunzip|deflate|deflateRaw|inflate|inflateRaw|unzip|brotliCompress'
+                       r'|brotliDecompress)Sync$')
+CRYPTO_SYNC = re.compile(r'^(?:pbkdf2|scrypt|generateKeyPair|hash|compare|randomFill|generatePrime)Sync$')
+PROCESS_SYNC = re.compile(r'^(?:exec|execFile|spawn)Sync$')
+DOCUMENT_NAME = re.compile(r'PDF|Pdf|Excel|Xlsx|Workbook|ProgressReport')
+DOCUMENT_CONSTRUCTORS = {'PDFDocument': 'pdf', 'jsPDF': 'pdf', 'Workbook': 'excel'}
+CATEGORY_SEVERITY = {
+    'pdf': 'high', 'excel': 'high', 'zlib': 'high', 'crypto': 'high', 'process': 'high',
+    'fs': 'medium', 'document': 'medium',
+    'json': 'low', 'encode': 'low', 'crypto-light': 'low',
+}
+
+
+@dataclass
+class Blocker:
+    category: str
+    call: str
+    file: str
+    line: int
+    in_loop: bool = False
+    path: List[str] = field(default_factory=list)    # hops from the entry point to the call
+
+    @property
+    def severity(self) -> str:
+        severity = CATEGORY_SEVERITY[self.category]
+        if self.in_loop and severity == 'low':
+            return 'medium'
+        return severity
+
+    @property
+    def site(self) -> str:
+        return f'{self.file}:{self.line}'
+
+
+@dataclass
+class Entry:
+    kind: str                 # trpc | express
+    name: str                 # router.procedure or "GET /api/..."
+    file: str
+    line: int
+    blockers: List[Blocker] = field(default_factory=list)
+
+    @property
+    def severity(self) -> Optional[str]:
+        found = {blocker.severity for blocker in self.blockers}
+        return next((severity for severity in SEVERITIES if severity in found), None)
+
+    def to_dict(self) -> Dict:
+        return {
+            'kind': self.kind, 'name': self.name, 'location': f'{self.file}:{self.line}',
+            'severity': self.severity,
+            'blockers': [dict(asdict(blocker), severity=blocker.severity) for blocker in self.blockers],
+        }
+
+
+# ----------------------------------------------------------------------
+# Blocking calls
+# ----------------------------------------------------------------------
+
+def _arguments(index: SourceIndex, open_paren: int) -> List[Tuple[int, int]]:
+    """Token spans of the top-level arguments of a call"""
+    close = index.match(open_paren)
+    spans = []
+    j = start = open_paren + 1
+    while j < close:
+        if index.is_punct(j, b','):
+            spans.append((start, j - 1))
+            start = j + 1
+        j = index.match(j) + 1 if index.match(j) > j else j + 1
+    if start < close:
+        spans.append((start, close - 1))
+    return spans
+
+
+def blocking_call(index: SourceIndex, i: int) -> Optional[Tuple[str, str]]:
+    """(category, label) when the call or construction at token i blocks the event loop"""
+    name = index.text(i)
+    member = index.is_punct(i - 1, b'.')
+    receiver = index.text(i - 2) if member else ''
+    label = f'{receiver}.{name}' if member and index.kinds[i - 2] == IDENT else name
+    if index.is_ident(i - 1, b'new') or (member and index.is_ident(i - 3, b'new')):
+        category = DOCUMENT_CONSTRUCTORS.get(name)
+        return (category, f'new {label}') if category else None
+    if not index.is_punct(i + 1, b'('):
+        return None
+    if name.endswith('Sync'):
+        if ZLIB_SYNC.match(name):
+            return 'zlib', label
+        if CRYPTO_SYNC.match(name):
+            return 'crypto', label
+        if PROCESS_SYNC.match(name):
+            return 'process', label
+        return 'fs', label
+    if receiver == 'JSON' and name in ('parse', 'stringify'):
+        return 'json', label
+    if name == 'writeBuffer' and index.is_ident(i - 2, b'xlsx'):
+        return 'excel', 'xlsx.writeBuffer'
+    if receiver == 'XLSX' and name in ('write', 'writeFile', 'utils'):
+        return 'excel', label
+    if name == 'toString' and member and index.kinds[i + 2] == STRING and index.text(i + 2)[1:-1] == 'base64':
+        return 'encode', f"{receiver}.toString('base64')"
+    if name in ('createHash', 'createHmac') or (name == 'randomBytes' and len(_arguments(index, i + 1)) < 2):
+        return 'crypto-light', label
+    return None
+
+
+class BlockerWalker:
+    """Blocking calls reachable from a function, with the hops to reach them"""
+
+    def __init__(self, graph: CallGraph):
+        self.graph = graph
+        self._found: Dict[str, List[Blocker]] = {}
+        self._loops: Dict[str, List[Tuple[int, int]]] = {}
+
+    def _in_loop(self, function: Function, i: int) -> bool:
+        if function.rel_path not in self._loops:
+            self._loops[function.rel_path] = loop_spans(function.index, 0, len(function.index) - 1)
+        return any(a <= i <= b and a >= function.first for a, b in self._loops[function.rel_path])
+
+    def walk(self, function: Function, depth: int = 0, stack: Optional[Set[str]] = None) -> List[Blocker]:
+        if function.key in self._found:
+            return self._found[function.key]
+        stack = (stack or set()) | {function.key}
+        index = function.index
+        found: List[Blocker] = []
+        for i in range(function.first, function.last + 1):
+            if index.kinds[i] != IDENT:
+                continue
+            blocking = blocking_call(index, i)
+            line = index.line_of(index.starts[i])
+            if blocking:
+                category, label = blocking
+                found.append(Blocker(category, label, function.rel_path, line, self._in_loop(function, i), [label]))
+                continue
+            if not index.is_punct(i + 1, b'(') or depth >= MAX_DEPTH:
+                continue
+            key = self.graph.resolve(function, i)
+            if not key or key in stack:
+                continue
+            callee = self.graph.functions[key]
+            hop = f'{callee.name} ({callee.rel_path}:{callee.index.line_of(callee.index.starts[callee.first])})'
+            in_loop = self._in_loop(function, i)
+            for blocker in self.walk(callee, depth + 1, stack):
+                found.append(Blocker(blocker.category, blocker.call, blocker.file, blocker.line,
+                                     blocker.in_loop or in_loop, [hop] + blocker.path))
+        if function.key in self.graph.functions and DOCUMENT_NAME.search(function.name) and not any(b.category in ('pdf', 'excel') for b in found):
+            found.append(Blocker('document', function.name, function.rel_path,
+                                 index.line_of(index.starts[function.first]), path=[]))
+        unique: Dict[Tuple[str, int], Blocker] = {}
+        for blocker in found:
+            unique.setdefault((blocker.file, blocker.line), blocker)
+        result = list(unique.values())
+        if depth == 0:
+            self._found[function.key] = result
+        return result
+
+
+# ----------------------------------------------------------------------
+# Entry points
+# ----------------------------------------------------------------------
+
+def _token_at(index: SourceIndex, offset: int) -> int:
+    return bisect_left(index.starts, offset)
+
+
+def trpc_entries(graph: CallGraph, root: Path = PROJECT_ROOT) -> List[Tuple[Entry, Function]]:
+    entries = []
+    for procedure in load_procedures(DataLayer(resolve_files(DEFAULT_FILES, root), root), root=root):
+        index = SourceIndex.load(root / procedure.file, root)
+        first, last = _token_at(index, procedure.start), _token_at(index, procedure.end) - 1
+        function = Function(f'{procedure.file}:{procedure.path}', procedure.file, index, None, procedure.path,
+                            first, last)
+        entries.append((Entry('trpc', procedure.path, procedure.file, procedure.line), function))
+    return entries
+
+
+def express_entries(graph: CallGraph, patterns: Sequence[str] = EXPRESS_FILES,
+                    root: Path = PROJECT_ROOT) -> List[Tuple[Entry, Function]]:
+    """`app.get("/path", ...handlers)` / `router.post(...)` registrations and their handlers"""
+    registrations = []
+    mounts: Dict[str, str] = {}          # router variable -> path it is mounted at
+    for path in dict.fromkeys(p.resolve() for p in resolve_files(patterns, root)):
+        if path.name.endswith(('.test.ts', '.spec.ts')):
+            continue
+        index = SourceIndex.load(path, root)
+        for i in range(2, len(index) - 2):
+            if (index.kinds[i] != IDENT or index.text(i) not in HTTP_METHODS or not index.is_punct(i - 1, b'.')
+                    or not index.is_punct(i + 1, b'(') or index.kinds[i + 2] not in (STRING, TEMPLATE)):
+                continue
+            args = _arguments(index, i + 1)
+            if index.text(i) == 'use' and len(args) == 2 and args[1][0] == args[1][1]:
+                mounts[index.text(args[1][0])] = index.text(i + 2)[1:-1].rstrip('/')
+            registrations.append((path, index, i, args))
+
+    entries = []
+    for path, index, i, args in registrations:
+        rel_path = path.relative_to(root.resolve()).as_posix()
+        route = mounts.get(index.text(i - 2), '') + index.text(i + 2)[1:-1]
+        name = f'{index.text(i).upper()} {route}'
+        line = index.line_of(index.starts[i])
+        scope = graph.function_at(rel_path, i) or Function(f'{rel_path}:<module>', rel_path, index, None,
+                                                           '<module>', 0, len(index) - 1)
+        for first, last in args[1:]:
+            if index.kinds[first] == IDENT and first == last:
+                key = graph.resolve(scope, first)
+                if key:
+                    entries.append((Entry('express', name, rel_path, line), graph.functions[key]))
+            elif any(index.is_punct(j, b'=>') for j in range(first, min(last, first + 12) + 1)) \
+                    or index.is_ident(first, b'function') or index.is_ident(first + 1, b'function'):
+                function = Function(f'{rel_path}:{name}', rel_path, index, None, name, first, last)
+                entries.append((Entry('express', name, rel_path, line), function))
+    return entries
+
+
+def scan(root: Path = PROJECT_ROOT) -> List[Entry]:
+    graph = CallGraph(root=root)
+    walker = BlockerWalker(graph)
+    found = []
+    for entry, function in trpc_entries(graph, root) + express_entries(graph, root=root):
+        # a handler that is itself a named function contributes its own hop
+        head = [] if function.key.endswith(f':{entry.name}') else [
+            f'{function.name} ({function.rel_path}:{function.index.line_of(function.index.starts[function.first])})']
+        entry.blockers = [Blocker(b.category, b.call, b.file, b.line, b.in_loop, head + b.path)
+                          for b in walker.walk(function)]
+        found.append(entry)
+    order = {severity: rank for rank, severity in enumerate(SEVERITIES)}
+    return sorted(found, key=lambda e: (order.get(e.severity, len(SEVERITIES)), e.file, e.line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find synchronous / CPU-heavy work on request paths')
+    parser.add_argument('--min-severity', choices=SEVERITIES, default='medium',
+                        help='lowest severity to print (the report keeps all)')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Following request paths...")
+    entries = scan()
+    limit = SEVERITIES.index(args.min_severity)
+    blocked = [e for e in entries if e.severity and SEVERITIES.index(e.severity) <= limit]
+    print(f"   {len(entries)} entry points, {len(blocked)} reach blocking work")
+
+    sites: Dict[str, Dict] = {}
+    for entry in entries:
+        for blocker in entry.blockers:
+            site = sites.setdefault(blocker.site, {'site': blocker.site, 'call': blocker.call,
+                                                   'category': blocker.category, 'severity': blocker.severity,
+                                                   'entries': []})
+            if entry.name not in site['entries']:
+                site['entries'].append(entry.name)
+    ranked_sites = sorted(sites.values(), key=lambda s: (SEVERITIES.index(s['severity']), -len(s['entries']),
+                                                         s['site']))
+
+    if not blocked:
+        print("\n✅ No blocking work on request paths")
+    for entry in blocked:
+        print(f"\n   [{entry.severity}] {entry.name} ({entry.kind}, {entry.file}:{entry.line})")
+        for blocker in entry.blockers:
+            if SEVERITIES.index(blocker.severity) > limit:
+                continue
+            loop = ' in loop' if blocker.in_loop else ''
+            print(f"      ⚠️  {blocker.category}{loop}: {' -> '.join([entry.name] + blocker.path)}  [{blocker.site}]")
+
+    print("\n📊 Blocking sites by endpoints reached:")
+    for site in ranked_sites:
+        if SEVERITIES.index(site['severity']) <= limit:
+            print(f"   [{site['severity']}] {site['site']} {site['call']}: {len(site['entries'])} endpoints")
+
+    report = {
+        'entries': [entry.to_dict() for entry in entries if entry.blockers],
+        'sites': ranked_sites,
+        'entry_points': len(entries),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,22 +4,64 @@ Repository Extraction Script
 
 This script extracts database functions from server/db.ts and organizes them
 into domain-specific repository classes following the Repository Pattern.
+
+Single-row and by-foreign-key getters (getTaskById, getDefectsByTask) also get
+a batched `...ByIds(ids[])` variant using inArray, plus a `load...` method that
+goes through BaseRepository.load()/loadMany() so concurrent single-key calls
+are coalesced into one batched query.
+
+Hot functions (listed by hand or ranked from queryPerformance metrics) get
+their query as a module-level prepared statement with sql.placeholder()
+bindings; the method executes the statement cached for its connection.
+`--bench` writes a micro-benchmark comparing the builder and prepared paths.
+
+Usage:
+    python scripts/extract_repositories.py
+    python scripts/extract_repositories.py --hot getTaskById,getDefectsByTask
+    python scripts/extract_repositories.py --hot query-metrics.json --bench
+    python scripts/extract_repositories.py --plan repository-plan.json
 """
 
+import argparse
+import json
 import re
 from pathlib import Path
-from typing import Dict, List, Set
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 
-@dataclass
+from drizzle_schema import Schema, load_schema
+from query_catalog import AGGREGATE_FUNCTIONS, PREDICATE_OPS, FileCatalog, Query
+from source_index import (IDENT, PUNCT, TEMPLATE, TEMPLATE_HEAD, TEMPLATE_MIDDLE, TEMPLATE_TAIL,
+                          SourceIndex)
+
+@dataclass(slots=True, eq=False)
 class FunctionInfo:
-    """Information about a database function"""
+    """
+    Information about a database function.
+
+    Only spans are stored: offsets index into the SourceIndex (and its shared
+    memoryview) of server/db.ts, and text is materialized on demand.
+    """
     name: str
-    signature: str
-    body: str
+    domain: str
+    start: int                # byte offset of the declaration
+    end: int                  # byte offset just past the declaration
+    body_start: int           # byte offset of the `{` block, or of the expression after `=>`
     start_line: int
     end_line: int
-    domain: str
+    start_token: int
+    end_token: int
+    kind: str                 # 'function' or 'arrow' (export const x = (...) => ...)
+    is_async: bool
+    index: SourceIndex = field(repr=False)
+
+    @property
+    def body(self) -> str:
+        return self.index.view[self.start:self.end].tobytes().decode('utf-8')
+
+    @property
+    def signature(self) -> str:
+        return self.index.view[self.start:self.body_start].tobytes().decode('utf-8').strip()
 
 # Domain classification based on function names
 DOMAIN_PATTERNS = {
@@ -44,68 +86,662 @@ def classify_function(func_name: str) -> str:
             return domain
     return 'misc'
 
+SKIP_FUNCTIONS = {
+    'upsertUser', 'getUserByOpenId', 'getUserById', 'getAllUsers',
+    'updateUserRole', 'updateUserProfile', 'updateUserNotificationSettings',
+    'generateProjectCode', 'createProject', 'getProjectById', 'getAllProjects',
+    'getProjectsPaginated', 'getProjectsByUser', 'validateProjectCompleteness',
+    'openProject', 'getProjectStats', 'getBatchProjectStats', 'updateProject',
+    'deleteProject', 'archiveProject', 'unarchiveProject', 'getArchivedProjects',
+    'addProjectMember', 'getProjectMembers', 'removeProjectMember',
+    'updateProjectMemberRole', 'getUserProjects', 'bulkCreateUsers',
+    'getDb', 'closeDbConnection'
+}
+
 def extract_functions_from_db(db_file: Path) -> List[FunctionInfo]:
-    """Extract all exported functions from server/db.ts"""
-    content = db_file.read_text()
-    
-    # Use regex to find all function blocks
-    # Match: export async function name(...) { ... }
-    pattern = r'export async function (\w+)\([^)]*\)(?:[^{]*){([^}]|{[^}]*})*}'
-    
+    """
+    Extract all exported functions from server/db.ts.
+
+    Uses the shared SourceIndex lexer, so braces inside strings, template SQL,
+    regex literals and comments do not affect the spans. Covers
+    `export [async] function` as well as `export const x = [async] (...) => ...`.
+    """
+    index = SourceIndex.load(db_file)
+
     functions = []
-    skip_functions = [
-        'upsertUser', 'getUserByOpenId', 'getUserById', 'getAllUsers',
-        'updateUserRole', 'updateUserProfile', 'updateUserNotificationSettings',
-        'generateProjectCode', 'createProject', 'getProjectById', 'getAllProjects',
-        'getProjectsPaginated', 'getProjectsByUser', 'validateProjectCompleteness',
-        'openProject', 'getProjectStats', 'getBatchProjectStats', 'updateProject',
-        'deleteProject', 'archiveProject', 'unarchiveProject', 'getArchivedProjects',
-        'addProjectMember', 'getProjectMembers', 'removeProjectMember',
-        'updateProjectMemberRole', 'getUserProjects', 'bulkCreateUsers',
-        'getDb', 'closeDbConnection'
-    ]
-    
-    # Split content by 'export async function' to get individual functions
-    parts = content.split('export async function ')
-    
-    for part in parts[1:]:  # Skip first empty part
-        # Get function name
-        match = re.match(r'(\w+)', part)
-        if not match:
+    for symbol in index.symbols:
+        if not symbol.exported or symbol.kind not in ('function', 'arrow'):
             continue
-        
-        func_name = match.group(1)
-        if func_name in skip_functions:
+        if symbol.name in SKIP_FUNCTIONS:
             continue
-        
-        # Find the complete function body by counting braces
-        lines = part.split('\n')
-        brace_count = 0
-        func_lines = []
-        started = False
-        
-        for line in lines:
-            func_lines.append(line)
-            if '{' in line:
-                started = True
-            if started:
-                brace_count += line.count('{') - line.count('}')
-                if brace_count == 0:
-                    break
-        
-        func_body = 'export async function ' + '\n'.join(func_lines)
-        
+        if symbol.kind == 'function' and symbol.body_token == -1:
+            continue  # overload signature
+
+        if symbol.body_token != -1:
+            body_start = index.starts[symbol.body_token]
+        else:
+            # expression-bodied arrow: the expression starts after `=>`
+            arrow = symbol.start_token
+            while arrow < symbol.end_token and not index.is_punct(arrow, b'=>'):
+                arrow += 1
+            body_start = index.starts[arrow + 1]
+
         functions.append(FunctionInfo(
-            name=func_name,
-            signature=lines[0] if lines else '',
-            body=func_body,
-            start_line=0,
-            end_line=0,
-            domain=classify_function(func_name)
+            name=symbol.name,
+            domain=classify_function(symbol.name),
+            start=symbol.start,
+            end=symbol.end,
+            body_start=body_start,
+            start_line=symbol.start_line,
+            end_line=symbol.end_line,
+            start_token=symbol.start_token,
+            end_token=symbol.end_token,
+            kind=symbol.kind,
+            is_async=symbol.is_async,
+            index=index,
         ))
-    
+
     return functions
 
+# ----------------------------------------------------------------------
+# Span-based emission
+# ----------------------------------------------------------------------
+
+Edit = Tuple[int, int, str]   # (start byte, end byte, replacement)
+
+# Identifiers the db-access pass reacts to
+DB_ACCESS_WORD = re.compile(rb'(?<![\w$])(?:const|db|from|inArray|like|or|gte?|lte?|\w*Join)(?![\w$])')
+
+DB_UNAVAILABLE_GUARD = 'if (!this.db) { this.warnDatabaseUnavailable("operation"); return undefined; }'
+
+def method_header_edits(func: FunctionInfo) -> List[Edit]:
+    """Edits turning the top-level declaration header into a class method header"""
+    index = func.index
+    name_token = func.start_token
+    while not index.is_ident(name_token, func.name.encode()):
+        name_token += 1
+    method_name = ('async ' if func.is_async else '') + func.name
+
+    if func.kind == 'function':
+        return [(func.start, index.ends[name_token], method_name)]
+
+    # export const name[: T] = async (params): R => body
+    edits: List[Edit] = []
+    params = name_token + 1
+    while params <= func.end_token and not (index.is_punct(params, b'=') and index.depths[params] == index.depths[name_token]):
+        params += 1
+    params += 1
+    while index.is_ident(params, b'async') or index.is_ident(params, b'function'):
+        params += 1
+    edits.append((func.start, index.starts[params], method_name))
+    if index.kinds[params] == IDENT:
+        # single bare parameter: `x => ...`
+        edits.append((index.starts[params], index.ends[params], f'({index.text(params)})'))
+
+    arrow = params
+    while arrow < func.end_token and not index.is_punct(arrow, b'=>'):
+        arrow += 1
+    if index.is_punct(arrow, b'=>'):
+        edits.append((index.ends[arrow - 1], func.body_start, ' '))
+        if not index.is_punct(arrow + 1, b'{'):
+            last = func.end_token
+            if index.is_punct(last, b';'):
+                last -= 1
+            edits.append((func.body_start, func.body_start, '{\n  return '))
+            edits.append((index.ends[last], func.end, ';\n}'))
+            return edits
+    if index.is_punct(func.end_token, b';'):
+        edits.append((index.starts[func.end_token], func.end, ''))
+    return edits
+
+def db_access_edits(func: FunctionInfo, imports: Set[str], tables: Set[str]) -> List[Edit]:
+    """
+    Single pass over the function: rewrite the getDb() guard and `db.`
+    accesses, and collect drizzle helpers and tables used along the way.
+    """
+    index = func.index
+    kinds = index.kinds
+    edits: List[Edit] = []
+    last = func.end_token
+    resume = func.start
+    # The C-level regex finds candidate words; the token table then confirms
+    # each one is a real identifier (not inside a string, comment or template)
+    for match in DB_ACCESS_WORD.finditer(index.source, func.start, func.end):
+        if match.start() < resume:
+            continue
+        i = index.token_at(match.start())
+        if index.starts[i] != match.start() or kinds[i] != IDENT:
+            continue
+        word = match.group(0)
+        after_dot = index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.')
+
+        # const db = await getDb(); if (!db) throw ... | return ...;
+        if word == b'const' and index.is_ident(i + 1, b'db') and index.is_punct(i + 2, b'=') \
+                and index.is_ident(i + 3, b'await') and index.is_ident(i + 4, b'getDb'):
+            j = i + 7 if index.is_punct(i + 7, b';') else i + 6
+            if index.is_ident(j + 1, b'if') and index.is_punct(j + 2, b'(') and index.is_punct(j + 3, b'!') \
+                    and index.is_ident(j + 4, b'db') and index.is_punct(j + 5, b')'):
+                k = j + 6
+                guard_end = -1
+                if index.is_ident(k, b'throw') and index.is_ident(k + 1, b'new') and index.is_ident(k + 2, b'Error') \
+                        and index.text(k + 4) == '"Database not available"' and index.is_punct(k + 5, b')'):
+                    guard_end = k + 5
+                elif index.is_ident(k, b'return'):
+                    guard_end = k
+                    while guard_end < last and not (index.is_punct(guard_end + 1, b';') and index.depths[guard_end + 1] == index.depths[k]):
+                        guard_end += 1
+                if guard_end != -1:
+                    if index.is_punct(guard_end + 1, b';'):
+                        guard_end += 1
+                    edits.append((index.starts[i], index.ends[guard_end], DB_UNAVAILABLE_GUARD))
+                    resume = index.ends[guard_end]
+                    continue
+
+        if word == b'db':
+            if not after_dot and index.is_punct(i + 1, b'.'):
+                edits.append((index.starts[i], index.ends[i], 'this.db'))
+        elif index.is_punct(i + 1, b'('):
+            if word in (b'inArray', b'like', b'or') and not after_dot:
+                imports.add(word.decode())
+            elif word in (b'gt', b'gte') and not after_dot:
+                imports.update(('gt', 'gte'))
+            elif word in (b'lt', b'lte') and not after_dot:
+                imports.update(('lt', 'lte'))
+            elif after_dot and (word == b'from' or word.endswith(b'Join')) and kinds[i + 2] == IDENT \
+                    and (index.is_punct(i + 3, b')') if word == b'from' else index.is_punct(i + 3, b',')):
+                tables.add(index.text(i + 2))
+    return edits
+
+def emit(func: FunctionInfo, edits: List[Edit], out: List[str], indent: str = '') -> None:
+    """Stream the function text with edits applied, adding `indent` after each newline"""
+    view = func.index.view
+    pos = func.start
+    for start, end, replacement in sorted(edits, key=lambda e: (e[0], e[1])):
+        if start < pos:
+            continue
+        out.append(view[pos:start].tobytes().decode('utf-8').replace('\n', '\n' + indent))
+        out.append(replacement.replace('\n', '\n' + indent))
+        pos = end
+    out.append(view[pos:func.end].tobytes().decode('utf-8').replace('\n', '\n' + indent))
+
+# ----------------------------------------------------------------------
+# Batched getters
+# ----------------------------------------------------------------------
+
+# Tokens allowed after the query in a single-row getter:
+#   return result.length > 0 ? result[0] : undefined;  /  return result[0] || null;
+SINGLE_ROW_TAIL = {'return', 'length', '>', '0', '?', ':', '[', ']', '.', 'undefined', 'null', '||', '??', ';', '}'}
+
+@dataclass
+class BatchSpec:
+    """A getter that gets a batched `...ByIds` variant and a coalescing `load...` method"""
+    func: FunctionInfo
+    batch_name: str           # getTasksByIds
+    loader_name: str          # loadTaskById
+    table: str
+    column: str               # property name on the table (id, projectId)
+    param: str
+    param_type: str
+    keys: str                 # parameter name of the batched getter (ids, taskIds)
+    single: bool              # one row per key (primary key / unique column)
+    chain: str                # batched query chain, starting at `this.db`
+
+def _plural(word: str) -> str:
+    if word.endswith('s'):
+        return word
+    if word.endswith('y') and word[-2:-1] not in 'aeiou':
+        return word[:-1] + 'ies'
+    return word + 's'
+
+def batch_names(name: str) -> Optional[Tuple[str, str]]:
+    """getTaskById -> (getTasksByIds, loadTaskById); getDefectsByTask -> (getDefectsByTaskIds, loadDefectsByTask)"""
+    match = re.fullmatch(r'get(\w+?)By(\w+)', name)
+    if not match:
+        return None
+    entity, key = match.groups()
+    key = key + 's' if key.endswith('Id') else key + 'Ids'
+    return f'get{_plural(entity)}By{key}', 'load' + name[3:]
+
+def _single_param(func: FunctionInfo) -> Optional[Tuple[str, str]]:
+    """(name, type) when the function takes exactly one `name: number|string` parameter"""
+    index = func.index
+    i = func.start_token
+    while i < func.end_token and not index.is_punct(i, b'('):
+        i += 1
+    close = index.match(i)
+    if close != i + 4 or index.kinds[i + 1] != IDENT or not index.is_punct(i + 2, b':'):
+        return None
+    param_type = index.text(i + 3)
+    if param_type not in ('number', 'string'):
+        return None
+    return index.text(i + 1), param_type
+
+def _batched_chain(catalog: FileCatalog, query: Query, table: str, column: str, keys: str) -> str:
+    """The query chain with `where(inArray(table.column, keys))` and without `.limit()`"""
+    index = catalog.index
+    handle = index.token_at(query.start)
+    calls, _ = catalog.walk_chain(handle)
+    parts = ['this.db']
+    for method, first, last in calls:
+        if method == 'limit':
+            continue
+        if method == 'where':
+            parts.append(f'.where(inArray({table}.{column}, {keys}))')
+            continue
+        args = index.token_span_text(first, last) if first <= last else ''
+        parts.append(f'.{method}({args})')
+    return ''.join(parts)
+
+def find_batch_getters(functions: List[FunctionInfo], schema: Optional[Schema] = None) -> Dict[str, BatchSpec]:
+    """
+    Getters that look up rows by one key column: a single select on one table
+    with exactly one `eq(table.column, param)` filter on the sole parameter.
+    By-id getters must use a primary/unique column and `.limit(1)`; by-foreign-key
+    getters must return the query result directly.
+    """
+    if not functions:
+        return {}
+    schema = schema or load_schema()
+    index = functions[0].index
+    catalog = FileCatalog(index, 'server/db.ts', schema)
+    queries: Dict[str, List[Query]] = {}
+    for query in catalog.queries():
+        queries.setdefault(query.function, []).append(query)
+    taken = {symbol.name for symbol in index.symbols} | {func.name for func in functions}
+
+    specs: Dict[str, BatchSpec] = {}
+    for func in functions:
+        names = batch_names(func.name)
+        param = _single_param(func)
+        found = queries.get(func.name, [])
+        if names is None or param is None or len(found) != 1:
+            continue
+        batch_name, loader_name = names
+        query = found[0]
+        if (batch_name in taken or query.operation != 'select' or query.joins or query.aggregates
+                or query.dynamic or len(query.filters) != 1 or query.table not in schema.tables):
+            continue
+        predicate = query.filters[0]
+        if predicate.op != 'eq' or predicate.conditional or predicate.value != param[0] or not predicate.column:
+            continue
+        table_name, column_name = predicate.column.split('.', 1)
+        table = schema.tables[table_name]
+        column = table.columns.get(column_name)
+        if table_name != query.table or column is None:
+            continue
+        if query.selected != ['*'] and predicate.column not in query.selected:
+            continue   # the loader needs the key column to route rows back
+
+        single = column.auto_increment or column.unique or column.primary_key
+        end_token = index.token_at(query.end - 1)
+        if single:
+            if query.limit != '1':
+                continue
+            tail = {index.text(i) for i in range(end_token + 1, func.end_token + 1)}
+            result_var = index.text(index.token_at(query.start) - 3)
+            if not tail <= SINGLE_ROW_TAIL | {result_var}:
+                continue
+        else:
+            if column.type != 'int' or query.limit is not None:
+                continue
+            root = index.token_at(query.start)
+            if not (index.is_ident(root - 1, b'await') and index.is_ident(root - 2, b'return')):
+                continue
+
+        keys = f'{param[0]}s' if param[0].endswith('Id') else 'ids'
+        specs[func.name] = BatchSpec(
+            func=func,
+            batch_name=batch_name,
+            loader_name=loader_name,
+            table=table_name,
+            column=column_name,
+            param=param[0],
+            param_type=param[1],
+            keys=keys,
+            single=single,
+            chain=_batched_chain(catalog, query, table_name, column_name, keys),
+        )
+        taken.add(batch_name)
+    return specs
+
+def batch_methods_source(spec: BatchSpec) -> str:
+    """Batched getter plus the coalescing loader for one single-key getter"""
+    load = 'load' if spec.single else 'loadMany'
+    ids = spec.keys
+    return f'''/**
+   * Batched variant of {spec.func.name}: one query for many keys
+   */
+  async {spec.batch_name}({ids}: {spec.param_type}[]) {{
+    if ({ids}.length === 0) return [];
+    if (!this.db) {{ this.warnDatabaseUnavailable("{spec.batch_name}"); return []; }}
+
+    return await {spec.chain};
+  }}
+
+  /**
+   * {spec.func.name} through the coalescing loader: concurrent calls share one {spec.batch_name} query
+   */
+  {spec.loader_name}({spec.param}: {spec.param_type}) {{
+    return this.{load}("{spec.batch_name}", {spec.param}, (keys) => this.{spec.batch_name}(keys), (row) => row.{spec.column});
+  }}'''
+
+# ----------------------------------------------------------------------
+# Prepared statements for hot queries
+# ----------------------------------------------------------------------
+
+# Calls that only build SQL; anything else in a chain (new Date(), helpers)
+# would be evaluated once at prepare time instead of on every call
+SQL_BUILDER_CALLS = PREDICATE_OPS | AGGREGATE_FUNCTIONS | {'and', 'or', 'not', 'asc', 'desc', 'sql'}
+# Operators whose bound value is a list; a placeholder binds a single value
+LIST_OPS = {'inArray', 'notInArray'}
+SAMPLE_VALUES = {'number': '1', 'string': '"bench"', 'boolean': 'true', 'Date': 'new Date()'}
+BENCHMARK_FILE = Path(__file__).parent / 'prepared-statements.bench.ts'
+
+@dataclass
+class PreparedSpec:
+    """A hot getter whose query becomes a module-level prepared statement"""
+    func: FunctionInfo
+    prepare_name: str         # prepareGetTaskById
+    cache_name: str           # getTaskByIdStatements
+    operation: str
+    params: Dict[str, str]    # placeholder name -> TypeScript type, in first-use order
+    prepared_chain: str       # chain with sql.placeholder() bindings, starting at `db`
+    builder_chain: str        # original chain text, for the benchmark
+    start: int                # byte span of the chain in server/db.ts
+    end: int
+
+def load_hot_functions(source: str, limit: int = 10) -> List[str]:
+    """
+    Hot function names from a comma-separated list, a text file (one name per
+    line, `#` comments) or a runtime-metrics JSON export.
+
+    Metrics come from server/monitoring/queryPerformance.ts, where
+    monitoredQuery()/monitoredRepo() record the function name as the query:
+    getSlowQueriesByPattern() / getPerformanceReport() ({name: {count,
+    avgDuration}}) or getQueryStats() / raw QueryMetrics lists ({query,
+    duration}). tRPC envelopes are unwrapped. Names are ranked by total time.
+    """
+    path = Path(source)
+    if not path.is_file():
+        return [name.strip() for name in source.split(',') if name.strip()]
+    if path.suffix != '.json':
+        names = [line.split('#', 1)[0].strip() for line in path.read_text(encoding='utf-8').splitlines()]
+        return [name for name in names if name]
+
+    data = json.loads(path.read_text(encoding='utf-8'))
+    while isinstance(data, dict) and len(data) == 1 and next(iter(data)) in ('result', 'data', 'json'):
+        data = next(iter(data.values()))
+    if isinstance(data, dict) and 'slowQueriesByPattern' in data:
+        data = data['slowQueriesByPattern']
+    elif isinstance(data, dict) and 'slowQueries' in data:
+        data = data['slowQueries']
+
+    totals: Dict[str, float] = {}
+    if isinstance(data, dict):
+        for name, stats in data.items():
+            if isinstance(stats, dict):
+                totals[name] = float(stats.get('count', 1)) * float(stats.get('avgDuration', 0))
+    elif isinstance(data, list):
+        for metric in data:
+            if isinstance(metric, dict) and 'query' in metric:
+                totals[metric['query']] = totals.get(metric['query'], 0.0) + float(metric.get('duration', 0))
+    ranked = sorted((name for name in totals if re.fullmatch(r'[A-Za-z_$][\w$]*', name)),
+                    key=lambda name: -totals[name])
+    return ranked[:limit]
+
+def _params(func: FunctionInfo) -> Optional[Dict[str, str]]:
+    """name -> type for a plain `(a: T, b?: U = x)` list; None for destructured parameters"""
+    index = func.index
+    i = func.start_token
+    while i < func.end_token and not index.is_punct(i, b'('):
+        i += 1
+    close = index.match(i)
+    params: Dict[str, str] = {}
+    depth = index.depths[i] + 1
+    j = i + 1
+    while j < close:
+        if index.kinds[j] != IDENT:
+            return None
+        name = index.text(j)
+        required = not index.is_punct(j + 1, b'?')
+        k = j + 1
+        while k < close and not (index.depths[k] == depth and index.is_punct(k, b',')):
+            if index.is_punct(k, b'='):
+                required = False
+            k += 1
+        type_first = j + 3 if index.is_punct(j + 1, b'?') else j + 2
+        type_text = index.token_span_text(type_first, k - 1) if index.is_punct(type_first - 1, b':') else 'any'
+        # optional parameters would bind `undefined`; they cannot become placeholders
+        params[name] = type_text if required else ''
+        j = k + 1
+    return params
+
+def _prepared_chain(catalog: FileCatalog, query: Query, params: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    The chain with every parameter reference replaced by sql.placeholder(),
+    or None when the chain reads locals, computes values or binds lists.
+    """
+    index = catalog.index
+    first = index.token_at(query.start)
+    last = index.token_at(query.end - 1)
+    list_args: Set[int] = set()
+    edits: List[Edit] = []
+    used: Dict[str, str] = {}
+    generic_end = -1
+    for i in range(first + 1, last + 1):
+        kind = index.kinds[i]
+        text = index.text(i)
+        if i <= generic_end:
+            continue
+        if kind == PUNCT and text in ('?', '...', '=>', '&&', '||', '??'):
+            return None
+        if kind != IDENT or index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.'):
+            continue
+        if text == 'sql' and index.is_punct(i + 1, b'<'):
+            generic_end = i + 1   # sql<number>`...`: skip the type argument
+            while generic_end < last and not index.is_punct(generic_end, b'>'):
+                generic_end += 1
+            continue
+        if text == 'sql' and index.kinds[i + 1] in (TEMPLATE, TEMPLATE_HEAD):
+            continue
+        if index.is_punct(i + 1, b'('):
+            if text not in SQL_BUILDER_CALLS:
+                return None
+            if text in LIST_OPS:
+                list_args.update(range(i + 2, index.match(i + 1)))
+            continue
+        if index.is_punct(i + 1, b':') and (index.is_punct(i - 1, b'{') or index.is_punct(i - 1, b',')):
+            continue   # object key
+        if catalog.table_at(i) is not None or text in ('true', 'false', 'null'):
+            continue
+        if text not in params or not params[text] or i in list_args:
+            return None
+        before, after = index.text(i - 1), index.text(i + 1)
+        whole = (before in ('(', ',', '{') or index.kinds[i - 1] in (TEMPLATE_HEAD, TEMPLATE_MIDDLE)) and \
+                (after in (')', ',', '}') or index.kinds[i + 1] in (TEMPLATE_MIDDLE, TEMPLATE_TAIL))
+        if not whole:
+            return None
+        placeholder = f'sql.placeholder("{text}")'
+        if index.is_punct(index.enclosing_bracket(i), b'{'):
+            placeholder = f'{text}: {placeholder}'   # `{ status }` shorthand in set({...})
+        edits.append((index.starts[i], index.ends[i], placeholder))
+        used.setdefault(text, params[text])
+    if not used:
+        return None
+
+    parts: List[str] = []
+    pos = index.starts[first]
+    for start, end, replacement in edits:
+        parts.append(index.slice(pos, start))
+        parts.append(replacement)
+        pos = end
+    parts.append(index.slice(pos, index.ends[last]))
+    return ''.join(parts) + '.prepare()', used
+
+def find_prepared_statements(functions: List[FunctionInfo], hot: List[str],
+                             schema: Optional[Schema] = None) -> Dict[str, PreparedSpec]:
+    """
+    Hot functions whose single select/update/delete builder chain can be
+    prepared: awaited directly on `db`, every value bound from a required
+    parameter (or a constant), no builder continuations and no list bindings.
+    Raw db.execute(sql`...`) calls are skipped, they have no prepare().
+    """
+    if not functions or not hot:
+        return {}
+    schema = schema or load_schema()
+    index = functions[0].index
+    catalog = FileCatalog(index, 'server/db.ts', schema)
+    queries: Dict[str, List[Query]] = {}
+    for query in catalog.queries():
+        queries.setdefault(query.function, []).append(query)
+
+    by_name = {func.name: func for func in functions}
+    specs: Dict[str, PreparedSpec] = {}
+    for name in hot:
+        func = by_name.get(name)
+        found = queries.get(name, [])
+        if func is None or len(found) != 1:
+            continue
+        query = found[0]
+        root = index.token_at(query.start)
+        if (query.operation not in ('select', 'update', 'delete') or query.dynamic or query.handle != 'db'
+                or index.is_ident(root + 2, b'execute') or not index.is_ident(root - 1, b'await')):
+            continue
+        params = _params(func)
+        prepared = _prepared_chain(catalog, query, params) if params else None
+        if prepared is None:
+            continue
+        chain, used = prepared
+        stem = name[0].upper() + name[1:]
+        specs[name] = PreparedSpec(
+            func=func,
+            prepare_name=f'prepare{stem}',
+            cache_name=f'{name}Statements',
+            operation=query.operation,
+            params=used,
+            prepared_chain=chain,
+            builder_chain=index.slice(query.start, query.end),
+            start=query.start,
+            end=query.end,
+        )
+    return specs
+
+def prepared_statement_source(spec: PreparedSpec) -> str:
+    """Module-level prepare function and per-connection statement cache"""
+    return f'''const {spec.prepare_name} = (db: Database) =>
+  {spec.prepared_chain};
+const {spec.cache_name} = new WeakMap<Database, ReturnType<typeof {spec.prepare_name}>>();'''
+
+def prepared_execute_edit(spec: PreparedSpec) -> Edit:
+    """Replace the builder chain in the method body with the cached statement's execute()"""
+    args = ', '.join(spec.params)
+    return (spec.start, spec.end,
+            f'this.prepared({spec.cache_name}, {spec.prepare_name}).execute({{ {args} }})')
+
+def render_benchmark(specs: Dict[str, PreparedSpec]) -> str:
+    """Micro-benchmark comparing the builder and prepared paths of each hot select"""
+    cases: List[str] = []
+    skipped: List[str] = []
+    tables: Set[str] = set()
+    for spec in specs.values():
+        if spec.operation != 'select' or not all(t in SAMPLE_VALUES for t in spec.params.values()):
+            skipped.append(spec.func.name)
+            continue
+        db_access_edits(spec.func, set(), tables)
+        values = '\n'.join(f'  const {name} = {SAMPLE_VALUES[t]};' for name, t in spec.params.items())
+        args = ', '.join(spec.params)
+        cases.append(f'''async function bench{spec.prepare_name[len('prepare'):]}(db: Database) {{
+{values}
+  const statement = {spec.prepared_chain};
+  return [
+    await measure("{spec.func.name} (builder)", () => {spec.builder_chain}),
+    await measure("{spec.func.name} (prepared)", () => statement.execute({{ {args} }})),
+  ];
+}}''')
+    calls = '\n'.join(f'    ...(await bench{spec.prepare_name[len("prepare"):]}(db)),'
+                      for spec in specs.values() if spec.func.name not in skipped)
+    skipped_note = f'\n * Not benchmarked (writes or non-primitive parameters): {", ".join(skipped)}' if skipped else ''
+    used_calls: Set[str] = set()
+    for spec in specs.values():
+        used_calls.update(re.findall(r'(?<![\w$.])([A-Za-z]\w*)\s*[(`<]', spec.prepared_chain + spec.builder_chain))
+    imports = ', '.join(sorted(SQL_BUILDER_CALLS & used_calls | {'sql'}))
+    tables_str = ',\n  '.join(sorted(tables))
+    cases_str = '\n\n'.join(cases)
+    return f'''/**
+ * Prepared Statement Micro-Benchmark
+ *
+ * Generated by `python scripts/extract_repositories.py --hot ... --bench`.
+ * Runs each hot query through the query builder (rebuilt on every call) and
+ * through its prepared statement against a local MySQL stand-in, e.g.
+ *
+ *   docker run -d --name bench-mysql -p 3307:3306 -e MYSQL_ALLOW_EMPTY_PASSWORD=yes -e MYSQL_DATABASE=bench mysql:8
+ *   DATABASE_URL=mysql://root@127.0.0.1:3307/bench pnpm db:push
+ *   BENCH_DATABASE_URL=mysql://root@127.0.0.1:3307/bench npx tsx scripts/prepared-statements.bench.ts{skipped_note}
+ */
+
+import {{ performance }} from "perf_hooks";
+import mysql from "mysql2/promise";
+import {{ drizzle }} from "drizzle-orm/mysql2";
+import {{ {imports} }} from "drizzle-orm";
+import {{
+  {tables_str}
+}} from "../drizzle/schema";
+
+type Database = ReturnType<typeof drizzle>;
+
+const DATABASE_URL = process.env.BENCH_DATABASE_URL ?? "mysql://root@127.0.0.1:3307/bench";
+const ITERATIONS = Number(process.env.BENCH_ITERATIONS ?? 2000);
+const WARMUP = 100;
+
+async function measure(label: string, run: () => Promise<unknown>) {{
+  for (let i = 0; i < WARMUP; i++) await run();
+  const times: number[] = [];
+  for (let i = 0; i < ITERATIONS; i++) {{
+    const start = performance.now();
+    await run();
+    times.push(performance.now() - start);
+  }}
+  times.sort((a, b) => a - b);
+  const mean = times.reduce((sum, t) => sum + t, 0) / times.length;
+  return {{
+    label,
+    meanMs: Number(mean.toFixed(4)),
+    p50Ms: Number(times[Math.floor(times.length * 0.5)].toFixed(4)),
+    p95Ms: Number(times[Math.floor(times.length * 0.95)].toFixed(4)),
+  }};
+}}
+
+{cases_str}
+
+async function main() {{
+  const pool = mysql.createPool({{ uri: DATABASE_URL, connectionLimit: 1 }});
+  const db = drizzle(pool);
+  console.log(`🚀 Prepared vs builder: ${{ITERATIONS}} iterations per query\\n`);
+  const results = [
+{calls}
+  ];
+  console.table(results);
+  await pool.end();
+}}
+
+main().catch((error) => {{
+  console.error("❌ Benchmark failed:", error);
+  process.exit(1);
+}});
+'''
+
+def apply_plan(functions: List[FunctionInfo], plan_file: Path) -> int:
+    """Take domains from a plan_repositories.py plan; returns how many functions changed domain"""
+    from plan_repositories import load_plan   # plan_repositories imports this module
+    assignments = load_plan(plan_file)
+    moved = 0
+    for func in functions:
+        domain = assignments.get(func.name, func.domain)
+        if domain != func.domain:
+            func.domain = domain
+            moved += 1
+    return moved
+
 def group_functions_by_domain(functions: List[FunctionInfo]) -> Dict[str, List[FunctionInfo]]:
     """Group functions by their domain"""
     domains: Dict[str, List[FunctionInfo]] = {}
@@ -115,77 +751,59 @@ def group_functions_by_domain(functions: List[FunctionInfo]) -> Dict[str, List[F
         domains[func.domain].append(func)
     return domains
 
-def generate_repository_class(domain: str, functions: List[FunctionInfo]) -> str:
+def generate_repository_class(domain: str, functions: List[FunctionInfo],
+                              batch_specs: Optional[Dict[str, BatchSpec]] = None,
+                              prepared_specs: Optional[Dict[str, PreparedSpec]] = None) -> str:
     """Generate repository class code for a domain"""
+    batch_specs = batch_specs or {}
+    prepared_specs = prepared_specs or {}
     
-    # Determine imports needed
+    # Drizzle helpers and tables are collected during the same token pass
+    # that rewrites db access, instead of separate substring/regex scans
     imports = set(['eq', 'and', 'desc', 'asc', 'count', 'isNull', 'sql'])
+    tables: Set[str] = set()
+    
+    class_name = f"{domain.capitalize()}Repository"
     
-    # Check if we need specific imports
+    # Generate method bodies straight from the source spans
+    methods: List[str] = []
+    statements: List[str] = []
     for func in functions:
-        if 'inArray' in func.body:
+        edits = method_header_edits(func) + db_access_edits(func, imports, tables)
+        prepared = prepared_specs.get(func.name)
+        if prepared is not None:
+            # the chain moves to module level; drop the `db.` -> `this.db.` edits inside it
+            edits = [edit for edit in edits if not prepared.start <= edit[0] < prepared.end]
+            edits.append(prepared_execute_edit(prepared))
+            statements.append(prepared_statement_source(prepared))
+        if methods:
+            methods.append('\n\n')
+        methods.append('  ')
+        emit(func, edits, methods, indent='  ')
+        spec = batch_specs.get(func.name)
+        if spec is not None:
             imports.add('inArray')
-        if 'like' in func.body:
-            imports.add('like')
-        if 'or(' in func.body:
-            imports.add('or')
-        if 'gt(' in func.body or 'gte(' in func.body:
-            imports.add('gt')
-            imports.add('gte')
-        if 'lt(' in func.body or 'lte(' in func.body:
-            imports.add('lt')
-            imports.add('lte')
+            tables.add(spec.table)
+            methods.append('\n\n  ')
+            methods.append(batch_methods_source(spec))
     
+    methods_str = ''.join(methods)
     imports_str = ', '.join(sorted(imports))
-    
-    # Extract table imports from function bodies
-    tables = set()
-    for func in functions:
-        # Find table references
-        table_matches = re.findall(r'from\(([\w]+)\)', func.body)
-        tables.update(table_matches)
-        join_matches = re.findall(r'Join\(([\w]+),', func.body)
-        tables.update(join_matches)
-    
     tables_str = ',\n  '.join(sorted(tables)) if tables else ''
-    
-    class_name = f"{domain.capitalize()}Repository"
-    
-    # Generate method bodies
-    methods = []
-    for func in functions:
-        # Convert function to method
-        method_body = func.body
-        
-        # Remove 'export async function' and replace with method syntax
-        method_body = re.sub(r'export async function (\w+)', r'async \1', method_body)
-        
-        # Replace 'const db = await getDb()' with 'this.db'
-        method_body = re.sub(
-            r'const db = await getDb\(\);?\n\s*if \(!db\) (throw new Error\("Database not available"\)|return [^;]+);?',
-            'if (!this.db) { this.warnDatabaseUnavailable("operation"); return undefined; }',
-            method_body
-        )
-        
-        # Replace 'db.' with 'this.db.'
-        method_body = re.sub(r'\bdb\.', 'this.db.', method_body)
-        
-        # Add proper indentation
-        method_lines = method_body.split('\n')
-        indented_method = '\n  '.join(method_lines)
-        
-        methods.append(f"  {indented_method}")
-    
-    methods_str = '\n\n'.join(methods)
+    base_import = 'BaseRepository, type Database' if statements else 'BaseRepository'
+    statements_str = ''
+    if statements:
+        statements_str = ('\n// Prepared statements for hot queries, built once per connection\n'
+                          + '\n'.join(statements) + '\n')
     
     template = f'''import {{ {imports_str} }} from "drizzle-orm";
 import {{
   {tables_str}
 }} from "../../drizzle/schema";
-import {{ BaseRepository }} from "./base.repository";
+import {{ {base_import} }} from "./base.repository";
 import {{ bigIntToNumber }} from "../utils/bigint";
 import {{ boolToInt }} from "../utils/typeHelpers";
-
+{statements_str}
 /**
  * {class_name}
  * 
@@ -200,6 +818,14 @@ export class {class_name} extends BaseRepository {{
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='Extract server/db.ts functions into repository classes')
+    parser.add_argument('--hot', help='hot functions: comma-separated names, a text file or a metrics JSON export')
+    parser.add_argument('--hot-limit', type=int, default=10, help='functions taken from a metrics export (default 10)')
+    parser.add_argument('--bench', action='store_true', help=f'write {BENCHMARK_FILE.name} for the prepared statements')
+    parser.add_argument('--plan', help='repository plan from scripts/plan_repositories.py (overrides name-based domains)')
+    parser.add_argument('--verbose', action='store_true', help='list the line and byte span of every extracted function')
+    args = parser.parse_args()
+
     base_dir = Path(__file__).parent.parent
     db_file = base_dir / 'server' / 'db.ts'
     repo_dir = base_dir / 'server' / 'repositories'
@@ -207,7 +833,30 @@ def main():
     print("Extracting functions from server/db.ts...")
     functions = extract_functions_from_db(db_file)
     print(f"Found {len(functions)} functions to extract")
+    if args.plan:
+        moved = apply_plan(functions, Path(args.plan))
+        print(f"Applied {args.plan}: {moved} functions moved from their name-based domain")
+    if args.verbose:
+        for func in functions:
+            print(f"  {func.name}: lines {func.start_line}-{func.end_line} (bytes {func.start}-{func.end})")
     
+    print("\nDetecting single-key getters for batched variants...")
+    batch_specs = find_batch_getters(functions)
+    for spec in batch_specs.values():
+        print(f"  {spec.func.name} -> {spec.batch_name}, {spec.loader_name}")
+
+    prepared_specs: Dict[str, PreparedSpec] = {}
+    if args.hot:
+        hot = load_hot_functions(args.hot, args.hot_limit)
+        print(f"\nPreparing statements for {len(hot)} hot functions...")
+        prepared_specs = find_prepared_statements(functions, hot)
+        for name in hot:
+            spec = prepared_specs.get(name)
+            if spec is not None:
+                print(f"  {name} -> {spec.prepare_name}({', '.join(spec.params)})")
+            else:
+                print(f"  ⚠️  {name}: not preparable (dynamic chain, computed values or list bindings)")
+
     print("\nGrouping functions by domain...")
     domains = group_functions_by_domain(functions)
     
@@ -222,11 +871,15 @@ def main():
         repo_file = repo_dir / f"{domain}.repository.ts"
         print(f"  Creating {repo_file.name}...")
         
-        repo_code = generate_repository_class(domain, funcs)
+        repo_code = generate_repository_class(domain, funcs, batch_specs, prepared_specs)
         repo_file.write_text(repo_code)
     
     print("\n✅ Repository extraction complete!")
     print(f"Created {len(domains) - 1} repository files in {repo_dir}")
 
+    if args.bench and prepared_specs:
+        BENCHMARK_FILE.write_text(render_benchmark(prepared_specs))
+        print(f"📊 Benchmark written to {BENCHMARK_FILE.relative_to(base_dir)}")
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Leading-Wildcard LIKE Detector and FULLTEXT Planner
+
+`like(column, '%term%')` cannot use a B-tree index, so every search on
+tasks, defects or projects scans the table. This script finds the
+substring searches and plans full-text indexes for them:
+
+  * like()/ilike() predicates in the static query catalog (server/db.ts, the
+    repositories and services) whose pattern starts with `%`, including
+    patterns built in a local (`const pattern = `%${q}%``);
+  * LIKE '%...' / LIKE CONCAT('%', ...) in raw sql`...` fragments and in the
+    statements captured in .manus/db;
+  * list procedures that filter the fetched rows in memory
+    (`task.name.toLowerCase().includes(q)`), resolved against the tables the
+    procedure reads (see unbounded_selects.py).
+
+Columns searched together (same pattern, OR'd) get one composite index,
+because MATCH(a, b) needs a FULLTEXT index on exactly (a, b). The MySQL plan
+uses the ngram parser, which tokenizes unsegmented Thai text into n-grams;
+the TiDB plan uses the full-text search of TiDB Cloud. Each plan comes with
+the rewritten MATCH ... AGAINST query shape, raw and as a Drizzle sql``
+fragment. --probe writes a self-contained script (scratch table, sample
+rows built from the captured search terms, LIKE vs MATCH row counts and
+EXPLAIN) for a local MySQL container; --verify runs it against DATABASE_URL.
+
+Usage:
+    python scripts/fulltext_advisor.py
+    python scripts/fulltext_advisor.py --target tidb --sql /tmp/fulltext.sql
+    docker run -d --name ft -e MYSQL_ROOT_PASSWORD=pw -p 3307:3306 mysql:8.0 --ngram-token-size=2
+    DATABASE_URL=mysql://root:pw@127.0.0.1:3307/mysql python scripts/fulltext_advisor.py --verify
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from db_query_log import LOG_DIR, iter_entries
+from drizzle_schema import Schema, Table, load_schema
+from index_advisor import mysql_command, quote
+from query_catalog import DEFAULT_FILES, Query, build_catalog, resolve_files
+from source_index import IDENT, SourceIndex
+from sql_access import read_access
+from unbounded_selects import DataLayer, Procedure, function_key, load_procedures
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CATALOG_FILES = (*DEFAULT_FILES, 'server/services/*.ts')
+REPORT_FILE = PROJECT_ROOT / 'fulltext-plan.json'
+SQL_FILE = PROJECT_ROOT / 'migrations' / 'add_fulltext_ngram_indexes.sql'
+PROBE_FILE = PROJECT_ROOT / 'fulltext-probe.sql'
+TARGETS = ('mysql', 'tidb')
+
+LIKE_OPS = {'like', 'ilike'}
+TEXT_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext'}
+NGRAM_TOKEN_SIZE = 2
+LEADING_WILDCARD = re.compile(r'''^(?:[`'"]%|['"]%['"]\s*\+|CONCAT\s*\(\s*['"]%)''', re.IGNORECASE)
+SQL_LIKE = re.compile(r"`(\w+)`\.`(\w+)`\s+(?:NOT\s+)?LIKE\s+(?:'%|CONCAT\s*\(\s*'%)", re.IGNORECASE)
+PROBE_TERMS = ['ทดสอบ', 'test']
+PROBE_FILLER = ['งานโครงสร้าง', 'ตรวจสอบคุณภาพ', 'Inspection report', 'Foundation pour', 'ระบบไฟฟ้า']
+
+
+@dataclass
+class SearchSite:
+    """One substring search in the code or the captures"""
+    source: str                       # catalog | sql | log | memory
+    location: str                     # file:line or capture path
+    function: Optional[str]
+    table: str                        # schema export name
+    columns: List[str]                # property names searched with the same term
+    term: Optional[str] = None        # literal search term (captures only)
+
+
+@dataclass
+class FulltextPlan:
+    """A FULLTEXT index for one column set and the query shape that uses it"""
+    table: str
+    sql_table: str
+    columns: List[str]                # property names
+    sql_columns: List[str]
+    eligible: bool = True
+    reason: Optional[str] = None
+    sites: List[str] = field(default_factory=list)
+    terms: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"ft_{self.sql_table}_{'_'.join(self.sql_columns)}"[:64]
+
+    def create_sql(self, target: str = 'mysql') -> str:
+        columns = ', '.join(quote(column) for column in self.sql_columns)
+        if target == 'tidb':
+            # one column per full-text index; MATCH over several columns becomes an OR of fts_match_word()
+            return '\n'.join(f'ALTER TABLE {quote(self.sql_table)} ADD FULLTEXT INDEX '
+                             f'{quote(f"ft_{self.sql_table}_{column}"[:64])} ({quote(column)}) '
+                             f'WITH PARSER MULTILINGUAL ADD_COLUMNAR_REPLICA_ON_DEMAND;'
+                             for column in self.sql_columns)
+        return (f'ALTER TABLE {quote(self.sql_table)} ADD FULLTEXT INDEX {quote(self.name)} ({columns}) '
+                f'WITH PARSER ngram, ALGORITHM=INPLACE, LOCK=SHARED;')
+
+    def match_sql(self, target: str = 'mysql', term: str = '?') -> str:
+        if target == 'tidb':
+            return ' OR '.join(f'fts_match_word({term}, {quote(column)})' for column in self.sql_columns)
+        columns = ', '.join(quote(column) for column in self.sql_columns)
+        return f'MATCH({columns}) AGAINST ({term} IN BOOLEAN MODE)'
+
+    def drizzle(self, target: str = 'mysql') -> str:
+        refs = [f'${{{self.table}.{column}}}' for column in self.columns]
+        if target == 'tidb':
+            return ' OR '.join(f'fts_match_word(${{term}}, {ref})' for ref in refs)
+        # a quoted phrase keeps substring semantics: the term's n-grams must be adjacent
+        return f"sql`MATCH({', '.join(refs)}) AGAINST (${{`\"${{term.replace(/\"/g, '')}}\"`}} IN BOOLEAN MODE)`"
+
+    def to_dict(self, target: str = 'mysql') -> Dict:
+        data = asdict(self)
+        data['index'] = self.name
+        if self.eligible:
+            data['sql'] = self.create_sql(target)
+            data['query'] = (f'SELECT * FROM {quote(self.sql_table)} WHERE {self.match_sql(target)}')
+            data['drizzle'] = self.drizzle(target)
+        return data
+
+
+# ----------------------------------------------------------------------
+# Detection
+# ----------------------------------------------------------------------
+
+def _local_value(index: SourceIndex, start: int, name: str) -> Optional[str]:
+    """Source text assigned to a local of the function enclosing byte offset `start`"""
+    enclosing = index.enclosing_function(index.token_at(start))
+    if enclosing is None:
+        return None
+    _, symbol = enclosing
+    body = index.slice(symbol.start, start)
+    matches = re.findall(rf'\b{re.escape(name)}\s*=\s*([^;\n]+)', body)
+    return matches[-1].strip() if matches else None
+
+
+def is_leading_wildcard(value: Optional[str], index: Optional[SourceIndex] = None, start: int = 0) -> bool:
+    """Pattern text (or a local holding it) that starts with %"""
+    if not value:
+        return False
+    if re.fullmatch(r'[A-Za-z_$][\w$]*', value) and index is not None:
+        return is_leading_wildcard(_local_value(index, start, value))
+    return bool(LEADING_WILDCARD.match(value.strip()))
+
+
+def sites_from_catalog(queries: Sequence[Query], schema: Schema, root: Path = PROJECT_ROOT) -> List[SearchSite]:
+    sites = []
+    for query in queries:
+        index = SourceIndex.load(root / query.file, root)
+        by_term: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)    # (source, table, pattern)
+        lines: Dict[Tuple[str, str, str], int] = {}
+        for predicate in query.filters:
+            if predicate.op not in LIKE_OPS or not predicate.column:
+                continue
+            if not is_leading_wildcard(predicate.value, index, query.start):
+                continue
+            table, column = predicate.column.split('.', 1)
+            key = ('catalog', table, predicate.value or '')
+            by_term[key].append(column)
+            lines.setdefault(key, predicate.line)
+        for fragment in query.sql:
+            for sql_table, sql_column in SQL_LIKE.findall(fragment.text):
+                table = schema.by_sql_name(sql_table)
+                column = table.column_by_sql_name(sql_column) if table else None
+                if column is not None:
+                    key = ('sql', table.name, fragment.text)
+                    by_term[key].append(column.name)
+                    lines.setdefault(key, fragment.line)
+        owner = f'{query.owner}.' if query.owner else ''
+        for (source, table, _), columns in by_term.items():
+            sites.append(SearchSite(source=source, location=f'{query.file}:{lines[(source, table, _)]}',
+                                    function=f'{owner}{query.function}', table=table,
+                                    columns=list(dict.fromkeys(columns))))
+    return sites
+
+
+def sites_from_log(schema: Schema, directory: Path = LOG_DIR) -> List[SearchSite]:
+    sites = []
+    for entry in iter_entries(directory):
+        if entry.failed:
+            continue
+        access = read_access(entry.query, schema)
+        if access is None or access.verb not in ('SELECT', 'UPDATE', 'DELETE'):
+            continue
+        by_term: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for predicate in access.predicates:
+            if (predicate.op != 'LIKE' or predicate.negated or predicate.table not in schema.tables
+                    or not is_leading_wildcard(predicate.value)):
+                continue
+            column = schema.tables[predicate.table].column_by_sql_name(predicate.column)
+            if column is not None:
+                by_term[(predicate.table, predicate.value)].append(column.name)
+        for (table, value), columns in by_term.items():
+            term = value[1:-1].strip('%') if value[:1] in '\'"' else None
+            sites.append(SearchSite(source='log', location=f'.manus/db/{entry.path.name}', function=None,
+                                    table=table, columns=list(dict.fromkeys(columns)), term=term or None))
+    return sites
+
+
+def _includes_field(index: SourceIndex, i: int) -> Optional[str]:
+    """Field name when token i starts `.field[?].toLowerCase().includes(` or `.field.includes(`"""
+    if index.kinds[i] != IDENT or not (index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.')):
+        return None
+    j = i + 1
+    if (index.is_punct(j, b'.') or index.is_punct(j, b'?.')) and index.text(j + 1) in ('toLowerCase', 'toLocaleLowerCase') \
+            and index.is_punct(j + 2, b'(') and index.is_punct(j + 3, b')'):
+        j += 4
+    if (index.is_punct(j, b'.') or index.is_punct(j, b'?.')) and index.is_ident(j + 1, b'includes') \
+            and index.is_punct(j + 2, b'('):
+        return index.text(i)
+    return None
+
+
+def sites_from_memory(procedures: Sequence[Procedure], layer: DataLayer, queries: Sequence[Query],
+                      schema: Schema, root: Path = PROJECT_ROOT) -> List[SearchSite]:
+    """List procedures that filter fetched rows with String.includes()"""
+    tables_by_function: Dict[str, List[str]] = defaultdict(list)
+    for query in queries:
+        if query.operation == 'select':
+            tables_by_function[function_key(query.file, query.owner, query.function)].extend(query.tables)
+    sites = []
+    for procedure in procedures:
+        index = SourceIndex.load(root / procedure.file, root)
+        fields: Dict[str, Tuple[str, int]] = {}     # field -> (row variable, line)
+        for i in range(index.token_at(procedure.start), index.token_at(procedure.end - 1) + 1):
+            name = _includes_field(index, i)
+            if name:
+                fields.setdefault(name, (index.text(i - 2), index.line_of(index.starts[i])))
+        if not fields:
+            continue
+        reached = dict.fromkeys(table for key in layer.reachable(procedure.calls)
+                                for table in tables_by_function.get(key, ()))
+        by_table: Dict[str, List[str]] = defaultdict(list)
+        for name, (variable, _) in fields.items():
+            owners = [table for table in reached if table in schema.tables and name in schema.tables[table].columns]
+            if len(owners) > 1:
+                # task.name with both tasks and projects reached: the row variable names the table
+                owners = [table for table in owners if table.lower().startswith(variable.lower())]
+            if len(owners) == 1:
+                by_table[owners[0]].append(name)
+        for table, columns in by_table.items():
+            sites.append(SearchSite(source='memory', location=f'{procedure.file}:{fields[columns[0]][1]}',
+                                    function=procedure.path, table=table, columns=columns))
+    return sites
+
+
+# ----------------------------------------------------------------------
+# Plans
+# ----------------------------------------------------------------------
+
+def _eligibility(table: Table, columns: List[str]) -> Optional[str]:
+    for name in columns:
+        column = table.columns.get(name)
+        if column is None:
+            return f'{name} is not a column of {table.name}'
+        if column.type not in TEXT_TYPES:
+            return f'{name} is {column.type}; FULLTEXT needs CHAR, VARCHAR or TEXT'
+    return None
+
+
+def build_plans(sites: Sequence[SearchSite], schema: Schema) -> List[FulltextPlan]:
+    plans: Dict[Tuple[str, Tuple[str, ...]], FulltextPlan] = {}
+    for site in sites:
+        table = schema.tables[site.table]
+        key = (site.table, tuple(site.columns))
+        plan = plans.get(key)
+        if plan is None:
+            reason = _eligibility(table, site.columns)
+            plan = plans[key] = FulltextPlan(
+                table=site.table, sql_table=table.sql_name, columns=list(site.columns),
+                sql_columns=[table.columns[name].sql_name if name in table.columns else name for name in site.columns],
+                eligible=reason is None, reason=reason)
+        if site.location not in plan.sites:
+            plan.sites.append(site.location)
+        if site.term and site.term not in plan.terms:
+            plan.terms.append(site.term)
+    return sorted(plans.values(), key=lambda plan: (not plan.eligible, -len(plan.sites), plan.table, plan.columns))
+
+
+def render_migration(plans: Sequence[FulltextPlan], target: str = 'mysql') -> str:
+    lines = [
+        f'-- Migration: Add FULLTEXT Indexes for Substring Search ({target})',
+        "-- Purpose: Replace leading-wildcard LIKE '%term%' scans with MATCH ... AGAINST",
+        f'-- Date: {date.today().isoformat()}',
+        '-- Generated by scripts/fulltext_advisor.py',
+    ]
+    if target == 'tidb':
+        lines += [
+            '-- Full-text search runs on TiFlash (TiDB Cloud); self-managed TiDB does not build FULLTEXT',
+            '-- indexes. The MULTILINGUAL parser segments Thai and mixed-language text.',
+        ]
+    else:
+        lines += [
+            f'-- Requires ngram_token_size={NGRAM_TOKEN_SIZE} (server startup option, the default): search terms',
+            '-- shorter than the token size match nothing, keep LIKE for them.',
+            '-- The first FULLTEXT index on a table rebuilds it (hidden FTS_DOC_ID); writes are blocked',
+            '-- while an index builds (LOCK=SHARED) - run scripts/ddl_risk.py on this file first.',
+            '',
+            '-- n-grams containing a stopword are not indexed; the default list is English',
+            'SET SESSION innodb_ft_enable_stopword = OFF;',
+        ]
+    lines.append('')
+    emitted = set()
+    for plan in plans:
+        if not plan.eligible:
+            continue
+        lines += ['-- ============================================',
+                  f"-- {plan.sql_table}({', '.join(plan.sql_columns)})",
+                  '-- ============================================',
+                  f"-- searched at: {', '.join(plan.sites[:3])}" + (' ...' if len(plan.sites) > 3 else ''),
+                  f'-- query: WHERE {plan.match_sql(target)}']
+        # TiDB indexes are per column, so column sets can share them
+        for statement in plan.create_sql(target).splitlines():
+            lines.append(statement if statement not in emitted else f'-- (above) {statement}')
+            emitted.add(statement)
+        lines.append('')
+    skipped = [plan for plan in plans if not plan.eligible]
+    if skipped:
+        lines += ['-- Not indexable:']
+        lines += [f"--   {plan.table}({', '.join(plan.columns)}): {plan.reason}" for plan in skipped]
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def _sql_string(text: str) -> str:
+    return "'" + text.replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+def _phrase(term: str) -> str:
+    """Boolean-mode phrase: with ngram the term's n-grams must appear adjacent, like LIKE '%term%'"""
+    return _sql_string('"' + term.replace('"', '') + '"')
+
+
+def render_probe(plans: Sequence[FulltextPlan], schema: Schema) -> str:
+    """Scratch tables with sample rows; LIKE and MATCH row counts must agree"""
+    lines = [
+        '-- FULLTEXT ngram probe generated by scripts/fulltext_advisor.py',
+        f'-- docker run -d --name ft -e MYSQL_ROOT_PASSWORD=pw -p 3307:3306 mysql:8.0 --ngram-token-size={NGRAM_TOKEN_SIZE}',
+        '-- mysql -h127.0.0.1 -P3307 -uroot -ppw < fulltext-probe.sql',
+        'CREATE DATABASE IF NOT EXISTS fulltext_probe CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;',
+        'USE fulltext_probe;',
+        'SET SESSION innodb_ft_enable_stopword = OFF;',
+        '',
+    ]
+    for plan in plans:
+        if not plan.eligible:
+            continue
+        table = schema.tables[plan.table]
+        scratch = quote(f'probe_{plan.sql_table}'[:64])
+        definitions = []
+        for name, sql_name in zip(plan.columns, plan.sql_columns):
+            kind = table.columns[name].type
+            definitions.append(f"{quote(sql_name)} {'TEXT' if 'text' in kind else 'VARCHAR(255)'}")
+        terms = [term for term in plan.terms if len(term) >= NGRAM_TOKEN_SIZE][:5] or PROBE_TERMS
+        values = []
+        for n, text in enumerate([f'{filler} {term}' for term in terms for filler in PROBE_FILLER[:2]] + PROBE_FILLER):
+            row = [text if i == n % len(plan.sql_columns) else PROBE_FILLER[(n + i) % len(PROBE_FILLER)]
+                   for i in range(len(plan.sql_columns))]
+            values.append('(' + ', '.join(_sql_string(value) for value in row) + ')')
+        column_list = ', '.join(quote(column) for column in plan.sql_columns)
+        lines += [
+            f"-- {plan.sql_table}({', '.join(plan.sql_columns)})",
+            f'DROP TABLE IF EXISTS {scratch};',
+            f"CREATE TABLE {scratch} (`id` INT AUTO_INCREMENT PRIMARY KEY, {', '.join(definitions)}) "
+            'DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;',
+            f"INSERT INTO {scratch} ({column_list}) VALUES\n  " + ',\n  '.join(values) + ';',
+            plan.create_sql('mysql').replace(quote(plan.sql_table), scratch, 1),
+        ]
+        for term in terms:
+            like = ' OR '.join(f'{quote(column)} LIKE {_sql_string(f"%{term}%")}' for column in plan.sql_columns)
+            match = plan.match_sql('mysql', _phrase(term))
+            lines.append(f"SELECT {_sql_string(plan.sql_table + '.' + '+'.join(plan.sql_columns))} AS plan, "
+                         f"{_sql_string(term)} AS term, "
+                         f'(SELECT COUNT(*) FROM {scratch} WHERE {like}) AS like_rows, '
+                         f'(SELECT COUNT(*) FROM {scratch} WHERE {match}) AS match_rows;')
+        lines += [f"EXPLAIN SELECT `id` FROM {scratch} WHERE {plan.match_sql('mysql', _phrase(terms[0]))};",
+                  f'DROP TABLE {scratch};', '']
+    lines.append('DROP DATABASE fulltext_probe;')
+    return '\n'.join(lines)
+
+
+def run_probe(probe: str) -> List[Dict[str, str]]:
+    """Run the probe against DATABASE_URL; returns the LIKE/MATCH comparison rows"""
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url or not shutil.which('mysql'):
+        raise RuntimeError('--verify needs DATABASE_URL and the mysql client on PATH')
+    env = dict(os.environ)
+    password = unquote(urlparse(database_url).password or '')
+    if password:
+        env['MYSQL_PWD'] = password
+    command = mysql_command(database_url)
+    if '--database' in command:     # the probe creates its own scratch database
+        position = command.index('--database')
+        del command[position:position + 2]
+    result = subprocess.run(command, input=probe, capture_output=True, text=True, env=env, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[:400])
+    rows = []
+    header: List[str] = []
+    for line in result.stdout.splitlines():
+        values = line.split('\t')
+        if values[:2] == ['plan', 'term']:
+            header = values
+        elif header and len(values) == len(header) and len(values) == 4:
+            rows.append(dict(zip(header, values)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find leading-wildcard LIKE searches and plan FULLTEXT indexes')
+    parser.add_argument('--target', choices=TARGETS, default='mysql', help='database flavour (default: mysql)')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE, help='JSON report path')
+    parser.add_argument('--sql', type=Path, default=SQL_FILE, help='migration SQL path')
+    parser.add_argument('--probe', type=Path, help=f'write the MySQL probe script (e.g. {PROBE_FILE.name})')
+    parser.add_argument('--verify', action='store_true', help='run the probe against DATABASE_URL')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='query captures (default: .manus/db)')
+    args = parser.parse_args()
+
+    print("🔍 Looking for substring searches...")
+    schema = load_schema()
+    catalog = build_catalog(CATALOG_FILES, schema)
+    layer = DataLayer(resolve_files(DEFAULT_FILES))
+    sites = (sites_from_catalog(catalog.queries, schema)
+             + sites_from_memory(load_procedures(layer), layer, catalog.queries, schema)
+             + sites_from_log(schema, args.log_dir))
+    by_source = defaultdict(int)
+    for site in sites:
+        by_source[site.source] += 1
+    print(f"   {len(sites)} searches: " + ', '.join(f'{count} {source}' for source, count in sorted(by_source.items())))
+
+    plans = build_plans(sites, schema)
+    print(f"\n📈 {len(plans)} column sets:")
+    for plan in plans:
+        flag = f'  ({plan.reason})' if not plan.eligible else ''
+        terms = f"  terms: {', '.join(plan.terms[:3])}" if plan.terms else ''
+        print(f"   {plan.table}({', '.join(plan.columns)})  {len(plan.sites)} sites{terms}{flag}")
+        if plan.eligible:
+            print(f"      WHERE {plan.match_sql(args.target)}")
+
+    args.sql.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.sql, 'w', encoding='utf-8') as f:
+        f.write(render_migration(plans, args.target))
+    probe = render_probe(plans, schema)
+    if args.probe:
+        with open(args.probe, 'w', encoding='utf-8') as f:
+            f.write(probe)
+        print(f"\n🔎 Probe script saved to: {args.probe}")
+    if args.verify:
+        try:
+            results = run_probe(probe)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"\n❌ Probe failed: {e}")
+            results = []
+        for row in results:
+            mark = '✅' if row['like_rows'] == row['match_rows'] else '⚠️ '
+            print(f"   {mark} {row['plan']} '{row['term']}': LIKE {row['like_rows']} rows, MATCH {row['match_rows']}")
+
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'target': args.target,
+        'sites': [asdict(site) for site in sites],
+        'plans': [plan.to_dict(args.target) for plan in plans],
+    }
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Migration SQL saved to: {args.sql}")
+    print(f"✅ Report saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
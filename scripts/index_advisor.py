@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Missing-Index Advisor
+
+Matches the index()/uniqueIndex() declarations in drizzle/schema.ts against
+the filter, join and sort columns of every query in the static query catalog
+(scripts/query_catalog.py) and of the SELECT/UPDATE/DELETE statements in the
+.manus/db query logs. It recommends composite indexes (equality columns
+first, then the sort or range column), flags redundant and unused indexes,
+and writes migration SQL in the style of add-foreign-keys.sql plus the
+matching Drizzle index() declarations for schema.ts.
+
+Everything runs offline. With --explain the candidate queries are also run
+through EXPLAIN against DATABASE_URL (e.g. a local MySQL/TiDB container) with
+the `mysql` command line client.
+
+Usage:
+    python scripts/index_advisor.py
+    python scripts/index_advisor.py --sql migrations/add_recommended_indexes.sql
+    DATABASE_URL=mysql://root:pw@127.0.0.1:3306/app python scripts/index_advisor.py --explain
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from db_query_log import LOG_DIR, iter_entries
+from drizzle_schema import Schema, Table, load_schema
+from query_catalog import Catalog, Query, build_catalog
+from sql_access import read_access
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPORT_FILE = PROJECT_ROOT / 'index-advice.json'
+SQL_FILE = PROJECT_ROOT / 'migrations' / 'add_recommended_indexes.sql'
+
+MAX_INDEX_COLUMNS = 4
+EQUALITY_OPS = {'eq', 'inArray', 'isNull', '=', '<=>', 'IN', 'IS'}
+RANGE_OPS = {'gt', 'gte', 'lt', 'lte', 'between', 'like', '<', '>', '<=', '>=', 'BETWEEN', 'LIKE'}
+LOW_SELECTIVITY_TYPES = {'mysqlEnum', 'boolean', 'tinyint'}
+RESERVED_WORDS = {'order', 'group', 'key', 'index', 'range', 'rank', 'desc', 'asc', 'condition', 'interval', 'read'}
+# Conditional filters (conditions.push inside an if) only apply on some calls
+CONDITIONAL_WEIGHT = 0.5
+
+
+@dataclass
+class AccessPattern:
+    """How one query reaches one table"""
+    table: str
+    equality: List[str]
+    ranges: List[str] = field(default_factory=list)
+    sort: List[str] = field(default_factory=list)
+    source: str = ''
+    weight: float = 1.0
+    limited: bool = False            # has a LIMIT, so an index can stop the sort early
+    sql: Optional[str] = None        # statement for EXPLAIN, when known
+
+
+@dataclass
+class Recommendation:
+    table: str
+    name: str
+    columns: List[str]
+    weight: float
+    sources: List[str]
+    low_selectivity: bool = False
+    supersedes: List[str] = field(default_factory=list)   # existing indexes that become prefixes
+    sample_sql: Optional[str] = None
+    explain: Optional[Dict] = None
+
+    def create_sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table}({', '.join(map(quote, self.columns))});"
+
+    def drizzle(self) -> str:
+        return f'index("{self.name}").on({", ".join("table." + column for column in self.columns)}),'
+
+
+def quote(identifier: str) -> str:
+    """Backquote MySQL reserved words (tasks.order)"""
+    return f'`{identifier}`' if identifier.lower() in RESERVED_WORDS else identifier
+
+
+@dataclass
+class IndexFinding:
+    table: str
+    index: str
+    columns: List[str]
+    reason: str
+
+
+# ----------------------------------------------------------------------
+# Access patterns
+# ----------------------------------------------------------------------
+
+def _selectivity_rank(table: Table, column: str) -> int:
+    """Lower sorts first: unique/foreign-key-like columns before dates, text and enums"""
+    info = table.column_by_sql_name(column)
+    if info is None:
+        return 3
+    if info.unique:
+        return 0
+    if info.type in LOW_SELECTIVITY_TYPES:
+        return 4
+    if info.type == 'int' and (column.endswith('Id') or column.endswith('By') or column.endswith('To')):
+        return 1
+    if info.type in ('timestamp', 'datetime', 'date'):
+        return 3
+    return 2
+
+
+def _is_sargable_like(value: Optional[str]) -> bool:
+    """LIKE 'abc%' can use an index, LIKE '%abc' cannot"""
+    if not value:
+        return False
+    return value[:1] in ('"', "'", '`') and not value[1:].startswith('%')
+
+
+def _column(schema: Schema, reference: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(table, sql column) for a catalog `table.column` reference"""
+    if not reference or '.' not in reference:
+        return None
+    table_name, column_name = reference.split('.', 1)
+    table = schema.tables.get(table_name)
+    if table is None or column_name not in table.columns:
+        return None
+    return table_name, table.columns[column_name].sql_name
+
+
+def patterns_from_query(query: Query, schema: Schema) -> List[AccessPattern]:
+    if query.operation not in ('select', 'update', 'delete'):
+        return []
+    source = f"{query.file}:{query.line} {query.owner + '.' if query.owner else ''}{query.function}"
+    required: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: {'eq': [], 'range': []})
+    optional: Dict[str, List[str]] = defaultdict(list)
+
+    for predicate in query.filters:
+        column = _column(schema, predicate.column)
+        if column is None or predicate.other_column:
+            continue
+        table, name = column
+        if predicate.op in EQUALITY_OPS:
+            (optional[table] if predicate.conditional else required[table]['eq']).append(name)
+        elif predicate.op in RANGE_OPS and not predicate.conditional:
+            if predicate.op != 'like' or _is_sargable_like(predicate.value):
+                required[table]['range'].append(name)
+
+    # the joined side of an ON clause is looked up by its join column
+    for join in query.joins:
+        for predicate in join.on:
+            for reference in (predicate.column, predicate.other_column):
+                column = _column(schema, reference)
+                if column and column[0] == join.table and column[0] != query.table:
+                    required[column[0]]['eq'].append(column[1])
+
+    sort_tables = {key.column.split('.', 1)[0] for key in query.order_by}
+    sort: List[str] = []
+    if len(sort_tables) == 1:
+        directions = {key.direction for key in query.order_by}
+        columns = [_column(schema, key.column) for key in query.order_by]
+        if len(directions) == 1 and all(columns):
+            sort = [column[1] for column in columns]
+    sort_table = next(iter(sort_tables)) if sort else None
+
+    tables = set(required) | set(optional) | ({sort_table} if sort_table else set())
+    patterns = []
+    for table in tables:
+        equality = list(dict.fromkeys(required[table]['eq']))
+        ranges = list(dict.fromkeys(required[table]['range']))
+        table_sort = sort if table == sort_table and table == query.table else []
+        limited = query.limit is not None
+        if equality or ranges or table_sort:
+            patterns.append(AccessPattern(table, equality, ranges, table_sort, source, limited=limited))
+        for column in dict.fromkeys(optional.get(table, [])):
+            if column not in equality:
+                patterns.append(AccessPattern(table, equality + [column], ranges, table_sort, source,
+                                              CONDITIONAL_WEIGHT, limited=limited))
+    return patterns
+
+
+def patterns_from_log(schema: Schema, directory: Path = LOG_DIR) -> List[AccessPattern]:
+    patterns = []
+    for entry in iter_entries(directory):
+        if entry.failed:
+            continue
+        access = read_access(entry.query, schema)
+        if access is None:
+            continue
+        source = f'.manus/db/{entry.path.name}'
+        sort_tables = {table for table, _, _ in access.order_by}
+        by_table: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: {'eq': [], 'range': []})
+        for predicate in access.predicates:
+            if predicate.table not in schema.tables or predicate.negated:
+                continue
+            if predicate.op in EQUALITY_OPS:
+                by_table[predicate.table]['eq'].append(predicate.column)
+            elif predicate.op in RANGE_OPS and (predicate.op != 'LIKE' or _is_sargable_like(predicate.value)):
+                by_table[predicate.table]['range'].append(predicate.column)
+        first_table = access.table_names[0] if access.table_names else None
+        for table, column in access.join_columns:
+            if table in schema.tables and table != first_table:
+                by_table[table]['eq'].append(column)
+        sort_table = next(iter(sort_tables)) if len(sort_tables) == 1 else None
+        tables = set(by_table) | ({sort_table} if sort_table in schema.tables else set())
+        for table in tables:
+            columns = by_table[table]
+            sort = ([column for _, column, _ in access.order_by]
+                    if table == sort_table and len({d for _, _, d in access.order_by}) == 1 else [])
+            known = {column.sql_name for column in schema.tables[table].columns.values()}
+            patterns.append(AccessPattern(
+                table,
+                [column for column in dict.fromkeys(columns['eq']) if column in known],
+                [column for column in dict.fromkeys(columns['range']) if column in known],
+                sort if all(column in known for column in sort) else [],
+                source,
+                limited=access.limit is not None,
+                sql=' '.join(entry.query.split()),
+            ))
+    return patterns
+
+
+# ----------------------------------------------------------------------
+# Index matching
+# ----------------------------------------------------------------------
+
+def candidate_columns(pattern: AccessPattern, table: Table) -> Tuple[List[str], int]:
+    """Equality columns (most selective first), then the sort or the first range column"""
+    equality = sorted(pattern.equality, key=lambda column: _selectivity_rank(table, column))
+    tail = [column for column in pattern.sort if column not in equality]
+    if tail and not equality and not pattern.ranges and not pattern.limited:
+        tail = []   # every row is read anyway; an index would only replace the filesort
+    if pattern.ranges and not tail:
+        tail = [column for column in pattern.ranges if column not in equality][:1]
+    columns = (equality + tail)[:MAX_INDEX_COLUMNS]
+    return columns, min(len(equality), len(columns))
+
+
+def serves(index_columns: List[str], columns: List[str], equality_count: int) -> bool:
+    """True when an index can seek on every equality column and continue with the tail in order"""
+    if sorted(index_columns[:equality_count]) != sorted(columns[:equality_count]):
+        return False
+    return index_columns[equality_count:len(columns)] == columns[equality_count:]
+
+
+def is_served(table: Table, columns: List[str], equality_count: int) -> bool:
+    equality = set(columns[:equality_count])
+    indexes = table.all_indexes()
+    primary = next((index.columns for index in indexes if index.primary), [])
+    for index in indexes:
+        if index.unique and index.columns and set(index.columns) <= equality:
+            return True   # at most one row
+        # InnoDB secondary indexes carry the primary key as trailing columns
+        index_columns = index.columns + [column for column in primary if column not in index.columns]
+        if serves(index_columns, columns, equality_count):
+            return True
+    return False
+
+
+def index_name(table: Table, columns: List[str]) -> str:
+    """camelCase name in the schema.ts style (projectStatusIdx), unique within the table"""
+    parts = [column[:-2] if column.endswith('Id') and len(columns) > 1 else column for column in columns]
+    base = parts[0] + ''.join(part[:1].upper() + part[1:] for part in parts[1:]) + 'Idx'
+    taken = {index.name for index in table.all_indexes()}
+    name = base
+    suffix = 2
+    while name in taken:
+        name = f'{base}{suffix}'
+        suffix += 1
+    return name
+
+
+def recommend(schema: Schema, patterns: Iterable[AccessPattern]) -> List[Recommendation]:
+    grouped: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+    for pattern in patterns:
+        table = schema.tables.get(pattern.table)
+        if table is None:
+            continue
+        columns, equality_count = candidate_columns(pattern, table)
+        if not columns or is_served(table, columns, equality_count):
+            continue
+        key = (table.name, tuple(columns))
+        entry = grouped.setdefault(key, {'weight': 0.0, 'sources': [], 'sql': None})
+        entry['weight'] += pattern.weight
+        if pattern.source not in entry['sources']:
+            entry['sources'].append(pattern.source)
+        entry['sql'] = entry['sql'] or pattern.sql or sample_query(table.sql_name, pattern, columns, equality_count)
+
+    # a candidate that is a left prefix of another candidate is served by it
+    keys = sorted(grouped, key=lambda key: -len(key[1]))
+    for key in list(keys):
+        for longer in keys:
+            if longer != key and longer[0] == key[0] and longer[1][:len(key[1])] == key[1] and longer in grouped:
+                if key in grouped:
+                    grouped[longer]['weight'] += grouped[key]['weight']
+                    grouped[longer]['sources'].extend(s for s in grouped[key]['sources']
+                                                      if s not in grouped[longer]['sources'])
+                    del grouped[key]
+                break
+
+    recommendations = []
+    for (table_name, columns), entry in grouped.items():
+        table = schema.tables[table_name]
+        columns = list(columns)
+        sql_table = table.sql_name
+        recommendations.append(Recommendation(
+            table=sql_table,
+            name=index_name(table, columns),
+            columns=columns,
+            weight=round(entry['weight'], 1),
+            sources=entry['sources'],
+            low_selectivity=all(_selectivity_rank(table, column) == 4 for column in columns),
+            supersedes=[index.name for index in table.indexes
+                        if not index.unique and index.columns == columns[:len(index.columns)]],
+            sample_sql=entry['sql'],
+        ))
+    recommendations.sort(key=lambda rec: (rec.low_selectivity, -rec.weight, rec.table))
+    return recommendations
+
+
+def sample_query(table: str, pattern: AccessPattern, columns: List[str], equality_count: int) -> str:
+    """Synthetic SELECT used for EXPLAIN when a recommendation came from the static catalog"""
+    conditions = [f'{quote(column)} = 1' for column in columns[:equality_count]]
+    conditions += [f'{quote(column)} > 1' for column in columns[equality_count:] if column in pattern.ranges]
+    sql = f'SELECT * FROM {table}'
+    if conditions:
+        sql += f" WHERE {' AND '.join(conditions)}"
+    if pattern.sort:
+        sql += f" ORDER BY {', '.join(map(quote, pattern.sort))}"
+    return sql + (' LIMIT 20' if pattern.limited else '')
+
+
+def find_redundant(schema: Schema) -> List[IndexFinding]:
+    findings = []
+    for table in schema.tables.values():
+        indexes = table.all_indexes()
+        for position, index in enumerate(indexes):
+            if index.unique or index.primary or not index.columns:
+                continue
+            for other_position, other in enumerate(indexes):
+                if other is index or other.columns[:len(index.columns)] != index.columns:
+                    continue
+                if other.columns == index.columns and other_position > position:
+                    continue   # report the later of two duplicates only
+                reason = ('duplicate of' if other.columns == index.columns else 'left prefix of')
+                findings.append(IndexFinding(table.sql_name, index.name, index.columns,
+                                             f"{reason} {other.name} ({', '.join(other.columns)})"))
+                break
+    return findings
+
+
+def find_unused(schema: Schema, patterns: Sequence[AccessPattern]) -> List[IndexFinding]:
+    """Declared indexes whose leading column no known query filters, joins or sorts on"""
+    used: Dict[str, set] = defaultdict(set)
+    for pattern in patterns:
+        used[pattern.table].update(pattern.equality, pattern.ranges, pattern.sort)
+    findings = []
+    for table in schema.tables.values():
+        for index in table.indexes:
+            if index.primary or index.unique or not index.columns:
+                continue
+            if index.columns[0] not in used.get(table.name, set()):
+                findings.append(IndexFinding(table.sql_name, index.name, index.columns,
+                                             'leading column not used by any cataloged or logged query'))
+    return findings
+
+
+# ----------------------------------------------------------------------
+# EXPLAIN (optional)
+# ----------------------------------------------------------------------
+
+def mysql_command(database_url: str) -> List[str]:
+    url = urlparse(database_url)
+    command = ['mysql', '--batch', '--raw', '--column-names', '--default-character-set=utf8mb4',
+               '--host', url.hostname or '127.0.0.1', '--port', str(url.port or 3306)]
+    if url.username:
+        command += ['--user', unquote(url.username)]
+    if url.path.strip('/'):
+        command += ['--database', url.path.strip('/')]
+    return command
+
+
+def explain(command: List[str], password: Optional[str], statement: str) -> Dict:
+    env = dict(os.environ)
+    if password:
+        env['MYSQL_PWD'] = password
+    result = subprocess.run(command + ['--execute', f'EXPLAIN {statement}'], capture_output=True,
+                            text=True, env=env, timeout=30)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip()[:200]}
+    lines = [line.split('\t') for line in result.stdout.strip().splitlines()]
+    if len(lines) < 2:
+        return {}
+    rows = [dict(zip(lines[0], values)) for values in lines[1:]]
+    return {'key': [row.get('key') for row in rows], 'rows': [row.get('rows') or row.get('estRows') for row in rows]}
+
+
+def run_explain(recommendations: List[Recommendation]) -> None:
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url or not shutil.which('mysql'):
+        print("⚠️  --explain needs DATABASE_URL and the mysql client on PATH; skipped")
+        return
+    command = mysql_command(database_url)
+    password = unquote(urlparse(database_url).password or '')
+    for rec in recommendations:
+        try:
+            rec.explain = explain(command, password, rec.sample_sql)
+        except subprocess.TimeoutExpired:
+            rec.explain = {'error': 'timeout'}
+        print(f"   EXPLAIN {rec.table}.{rec.name}: {rec.explain}")
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+
+def render_migration(recommendations: List[Recommendation], redundant: List[IndexFinding]) -> str:
+    lines = [
+        '-- Migration: Add Recommended Composite Indexes',
+        '-- Purpose: Cover the filter/sort columns of the cataloged and logged queries',
+        f'-- Date: {date.today().isoformat()}',
+        '-- Generated by scripts/index_advisor.py; mirror each index in drizzle/schema.ts',
+        '',
+    ]
+    by_table: Dict[str, List[Recommendation]] = defaultdict(list)
+    for rec in recommendations:
+        if not rec.low_selectivity:
+            by_table[rec.table].append(rec)
+    for table in sorted(by_table):
+        lines += ['-- ============================================',
+                  f'-- {table.upper()} TABLE',
+                  '-- ============================================', '']
+        for rec in by_table[table]:
+            lines.append(f"-- weight {rec.weight:g}: {', '.join(rec.sources[:3])}"
+                         + (' ...' if len(rec.sources) > 3 else ''))
+            lines.append(f'-- drizzle: {rec.drizzle()}')
+            lines.append(rec.create_sql())
+            lines.append('')
+
+    superseded: Dict[Tuple[str, str], str] = {}
+    for rec in recommendations:
+        if not rec.low_selectivity:
+            for name in rec.supersedes:
+                superseded.setdefault((rec.table, name), rec.name)
+    if redundant or superseded:
+        lines += ['-- ============================================',
+                  '-- REDUNDANT INDEXES (review before dropping)',
+                  '-- ============================================', '']
+        for finding in redundant:
+            lines.append(f'-- {finding.table}.{finding.index}: {finding.reason}')
+            lines.append(f'-- DROP INDEX IF EXISTS {finding.index} ON {finding.table};')
+        for (table, name), replacement in superseded.items():
+            lines.append(f'-- {table}.{name}: left prefix of the new {replacement}')
+            lines.append(f'-- DROP INDEX IF EXISTS {name} ON {table};')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recommend MySQL indexes from the query catalog and logs')
+    parser.add_argument('--report', type=Path, default=REPORT_FILE, help='JSON report path')
+    parser.add_argument('--sql', type=Path, default=SQL_FILE, help='migration SQL path')
+    parser.add_argument('--no-logs', action='store_true', help='ignore the .manus/db query logs')
+    parser.add_argument('--explain', action='store_true', help='EXPLAIN candidates against DATABASE_URL')
+    args = parser.parse_args()
+
+    print("🔍 Loading schema and query catalog...")
+    schema = load_schema()
+    catalog: Catalog = build_catalog(schema=schema)
+    patterns = [pattern for query in catalog.queries for pattern in patterns_from_query(query, schema)]
+    catalog_count = len(patterns)
+    if not args.no_logs:
+        patterns += patterns_from_log(schema)
+    declared = sum(len(table.indexes) for table in schema.tables.values())
+    print(f"   {len(schema.tables)} tables, {declared} declared indexes")
+    print(f"   {catalog_count} access patterns from {len(catalog.queries)} cataloged queries, "
+          f"{len(patterns) - catalog_count} from query logs")
+
+    recommendations = recommend(schema, patterns)
+    redundant = find_redundant(schema)
+    unused = find_unused(schema, patterns)
+
+    if args.explain:
+        run_explain(recommendations)
+
+    print(f"\n📈 {len(recommendations)} recommended indexes:")
+    for rec in recommendations:
+        flag = ' (low selectivity, not emitted)' if rec.low_selectivity else ''
+        print(f"   {rec.table}({', '.join(rec.columns)})  weight={rec.weight:g}{flag}")
+        if rec.supersedes:
+            print(f"      supersedes: {', '.join(rec.supersedes)}")
+    print(f"\n♻️  {len(redundant)} redundant indexes:")
+    for finding in redundant:
+        print(f"   {finding.table}.{finding.index}: {finding.reason}")
+    print(f"\n💤 {len(unused)} indexes unused by known queries")
+
+    args.sql.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.sql, 'w', encoding='utf-8') as f:
+        f.write(render_migration(recommendations, redundant))
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'recommendations': [dict(asdict(rec), sql=rec.create_sql(), drizzle=rec.drizzle()) for rec in recommendations],
+        'redundant': [asdict(finding) for finding in redundant],
+        'unused': [asdict(finding) for finding in unused],
+    }
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Migration SQL saved to: {args.sql}")
+    print(f"✅ Report saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Non-Sargable Predicate Detector
+
+Raw sql`...` fragments in WHERE and JOIN conditions (and the WHERE/ON parts
+of db.execute(sql`...`) statements) that wrap an indexed column in a
+function or in arithmetic - `DATE(createdAt) = ?`, `LOWER(name) = ?`,
+`COALESCE(progress, 0) < 100`, `dueDate + 1 > ?` - make MySQL evaluate the
+expression for every row instead of seeking the index. This script finds
+them in server/db.ts, the repositories, services and jobs, using the
+fragments of the static query catalog and the indexes of drizzle/schema.ts,
+and proposes a sargable rewrite for each:
+
+  * range      DATE/YEAR/DATEDIFF comparisons become half-open ranges on the
+               bare column (col >= ? AND col < ? + INTERVAL 1 DAY)
+  * drop       LOWER/UPPER: the utf8mb4 *_ci collations already compare
+               case-insensitively
+  * null-split COALESCE/IFNULL(col, d) op v -> (col op v OR col IS NULL)
+               when the default satisfies the comparison, else col op v
+  * solve      col + k op v -> col op v - k
+  * functional anything else: an index on the expression itself (MySQL
+               8.0.13+ functional key part, TiDB expression index)
+
+Rewrites of template fragments are also given in sql`` form with the
+original interpolations, ready to paste.
+
+Usage:
+    python scripts/nonsargable_predicates.py
+    python scripts/nonsargable_predicates.py --all-columns
+    python scripts/nonsargable_predicates.py server/db.ts --output /tmp/sargable.json
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from drizzle_schema import Column, Schema, Table, load_schema
+from query_catalog import AGGREGATE_FUNCTIONS, DEFAULT_FILES, FileCatalog, Query, resolve_files
+from source_index import TEMPLATE, SourceIndex
+from sql_access import COMPARISON_OPS, OPERAND_KEYWORDS, SQL_TOKEN, read_access
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCAN_FILES = (*DEFAULT_FILES, 'server/services/*.ts', 'server/jobs/*.ts', 'server/*Job.ts')
+REPORT_FILE = PROJECT_ROOT / 'nonsargable-predicates.json'
+
+CONDITION_CLAUSES = {'where', 'join'}
+CONDITION_STOP = {'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'UNION', 'FOR', 'SET', 'VALUES',
+                  'JOIN', 'INNER', 'LEFT', 'RIGHT', 'CROSS', 'STRAIGHT_JOIN', 'NATURAL'}
+NOT_FUNCTIONS = OPERAND_KEYWORDS | {'IN', 'EXISTS', 'VALUES', 'USING', 'ON', 'WHERE', 'AS'}
+AGGREGATES = {name.upper() for name in AGGREGATE_FUNCTIONS} | {'GROUP_CONCAT'}
+COMPARISONS = COMPARISON_OPS | {'BETWEEN', 'IN', 'LIKE'}
+CASE_FUNCTIONS = {'LOWER', 'UPPER', 'LCASE', 'UCASE'}
+NULL_FUNCTIONS = {'COALESCE', 'IFNULL'}
+FLIPPED = {'<': '>', '>': '<', '<=': '>=', '>=': '<=', '=': '=', '<>': '<>', '!=': '!=', '<=>': '<=>'}
+SOLVE = {'+': '-', '-': '+'}
+NUMBER = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+
+@dataclass
+class SqlToken:
+    kind: str             # string | word | number | variable | param | op (backquotes stripped)
+    text: str
+    start: int            # offset in the fragment text
+    param: int = -1       # ordinal of a ? placeholder
+
+
+@dataclass
+class ColumnRef:
+    table: Table
+    column: Column
+    first: int            # token range of the reference
+    last: int
+
+
+@dataclass
+class Finding:
+    """A function or arithmetic around an indexed column in a condition"""
+    file: str
+    line: int
+    function: str
+    table: str
+    column: str
+    index: Optional[str]              # an index containing the column
+    leading: bool                     # the column leads that index
+    kind: str                         # function | arithmetic
+    wrapper: str                      # DATE, LOWER, +, ...
+    expression: str                   # the predicate as written (sql form)
+    strategy: str                     # range | drop | null-split | solve | functional
+    rewrite: str
+    template: Optional[str] = None    # rewrite in sql`` form with the original interpolations
+    note: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['location'] = f'{self.file}:{self.line}'
+        return data
+
+
+def sql_tokens(text: str) -> List[SqlToken]:
+    tokens = []
+    params = 0
+    for match in SQL_TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        value = match.group()
+        if kind == 'quoted':
+            kind, value = 'word', value[1:-1]
+        token = SqlToken(kind, value, match.start())
+        if kind == 'param':
+            token.param = params
+            params += 1
+        tokens.append(token)
+    return tokens
+
+
+def _upper(tokens: List[SqlToken], i: int) -> str:
+    if 0 <= i < len(tokens):
+        return tokens[i].text.upper() if tokens[i].kind == 'word' else tokens[i].text
+    return ''
+
+
+def _close(tokens: List[SqlToken], i: int) -> int:
+    """Index of the `)` matching the `(` at i"""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].text == '(':
+            depth += 1
+        elif tokens[j].text == ')':
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def condition_mask(tokens: List[SqlToken], whole: bool) -> List[bool]:
+    """Which tokens belong to a WHERE/ON condition (all of them for a where/join fragment)"""
+    if whole:
+        return [True] * len(tokens)
+    mask = []
+    depth = 0
+    stack: List[int] = []       # depths of the open WHERE/ON conditions
+    for i, token in enumerate(tokens):
+        word = _upper(tokens, i)
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+            while stack and stack[-1] > depth:
+                stack.pop()
+        elif word in ('WHERE', 'ON'):
+            if not stack or stack[-1] != depth:
+                stack.append(depth)
+        elif stack and stack[-1] == depth and (word in CONDITION_STOP or token.text == ';'):
+            stack.pop()
+        mask.append(bool(stack) and word not in ('WHERE', 'ON'))
+    return mask
+
+
+class FragmentScanner:
+    """Finds non-sargable comparisons in one rendered fragment"""
+
+    def __init__(self, tokens: List[SqlToken], schema: Schema, aliases: Dict[str, str], tables: List[str]):
+        self.tokens = tokens
+        self.schema = schema
+        self.aliases = aliases          # SQL alias or table name -> schema export name
+        self.tables = tables            # tables a bare column may belong to
+
+    def column_at(self, i: int) -> Optional[ColumnRef]:
+        tokens = self.tokens
+        if i >= len(tokens) or tokens[i].kind != 'word' or _upper(tokens, i) in NOT_FUNCTIONS:
+            return None
+        if i + 1 < len(tokens) and tokens[i + 1].text == '(':
+            return None
+        if i + 2 < len(tokens) and tokens[i + 1].text == '.' and tokens[i + 2].kind == 'word':
+            name = self.aliases.get(tokens[i].text)
+            table = self.schema.tables.get(name) if name else self.schema.by_sql_name(tokens[i].text)
+            column = table.column_by_sql_name(tokens[i + 2].text) if table else None
+            return ColumnRef(table, column, i, i + 2) if column else None
+        if i > 0 and tokens[i - 1].text == '.':
+            return None
+        owners = [self.schema.tables[name] for name in self.tables
+                  if name in self.schema.tables and self.schema.tables[name].column_by_sql_name(tokens[i].text)]
+        if len(owners) == 1:
+            return ColumnRef(owners[0], owners[0].column_by_sql_name(tokens[i].text), i, i)
+        return None
+
+    def comparison(self, first: int, last: int) -> Optional[Tuple[str, int, int, bool]]:
+        """(op, value first, value last, reversed) for the comparison around tokens first..last"""
+        tokens = self.tokens
+        op = _upper(tokens, last + 1)
+        if op == 'NOT' and _upper(tokens, last + 2) in ('BETWEEN', 'IN', 'LIKE'):
+            return None     # negations are not sargable either way
+        if op in COMPARISONS:
+            return op, last + 2, self._operand_end(last + 2, op == 'BETWEEN'), False
+        before = _upper(tokens, first - 1)
+        if before in COMPARISON_OPS:
+            start = first - 2
+            depth = 0
+            while start >= 0:
+                text = tokens[start].text
+                if text == ')':
+                    depth += 1
+                elif text == '(':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif depth == 0 and _upper(tokens, start) in ('AND', 'OR', 'NOT', 'WHERE', 'ON', 'WHEN'):
+                    break
+                start -= 1
+            return FLIPPED.get(before, before), start + 1, first - 2, True
+        return None
+
+    def _operand_end(self, i: int, between: bool) -> int:
+        tokens = self.tokens
+        depth = 0
+        seen_and = False
+        j = i
+        while j < len(tokens):
+            text = tokens[j].text
+            word = _upper(tokens, j)
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0 and (word in ('OR', 'THEN', ';') or word in CONDITION_STOP or text == ';'):
+                break
+            elif depth == 0 and word == 'AND':
+                if between and not seen_and:
+                    seen_and = True
+                else:
+                    break
+            j += 1
+        return j - 1
+
+    def candidates(self, mask: List[bool]) -> List[Tuple[str, str, ColumnRef, int, int, List[int]]]:
+        """(kind, wrapper, column, expression first, expression last, argument starts)"""
+        tokens = self.tokens
+        found = []
+        i = 0
+        while i < len(tokens):
+            if not mask[i]:
+                i += 1
+                continue
+            word = _upper(tokens, i)
+            if (tokens[i].kind == 'word' and i + 1 < len(tokens) and tokens[i + 1].text == '('
+                    and word not in NOT_FUNCTIONS and (i == 0 or tokens[i - 1].text != '.')):
+                close = _close(tokens, i + 1)
+                if word in AGGREGATES:
+                    i = close + 1
+                    continue
+                args = self._arguments(i + 2, close - 1)
+                refs = [self.column_at(j) for j in range(i + 2, close)]
+                refs = [ref for ref in refs if ref is not None]
+                if refs:
+                    found.append(('function', word, refs[0], i, close, args))
+                i = close + 1
+                continue
+            ref = self.column_at(i)
+            if ref is not None:
+                op = tokens[ref.last + 1].text if ref.last + 1 < len(tokens) else ''
+                before = tokens[i - 1].text if i > 0 else ''
+                if op in ('+', '-', '*', '/', '%') and ref.last + 2 < len(tokens):
+                    found.append(('arithmetic', op, ref, i, ref.last + 2, []))
+                    i = ref.last + 3
+                    continue
+                if before in ('+', '-', '*', '/', '%') and i >= 2 and tokens[i - 2].kind in ('number', 'param', 'word'):
+                    found.append(('arithmetic', before, ref, i - 2, ref.last, []))
+                i = ref.last + 1
+                continue
+            i += 1
+        return found
+
+    def _arguments(self, first: int, last: int) -> List[int]:
+        starts = [first]
+        depth = 0
+        for j in range(first, last + 1):
+            if self.tokens[j].text == '(':
+                depth += 1
+            elif self.tokens[j].text == ')':
+                depth -= 1
+            elif depth == 0 and self.tokens[j].text == ',':
+                starts.append(j + 1)
+        return starts
+
+
+def _indexed(table: Table, column: Column) -> Tuple[Optional[str], bool]:
+    """(index name, leads it) for the best index containing the column"""
+    best = None
+    for index in table.all_indexes():
+        if column.sql_name in index.columns:
+            leading = index.columns[0] == column.sql_name
+            if best is None or (leading and not best[1]):
+                best = (index.name, leading)
+    return best if best else (None, False)
+
+
+def _plus(value: str, amount: str) -> str:
+    if NUMBER.match(value) and NUMBER.match(amount):
+        result = float(value) + float(amount)
+        return str(int(result)) if result.is_integer() else str(result)
+    return f'{value} + {amount}'
+
+
+def _compare(left: str, op: str, right: str) -> Optional[bool]:
+    if not (NUMBER.match(left) and NUMBER.match(right)):
+        return None
+    a, b = float(left), float(right)
+    return {'=': a == b, '<=>': a == b, '<': a < b, '>': a > b, '<=': a <= b, '>=': a >= b,
+            '<>': a != b, '!=': a != b}.get(op)
+
+
+def _day_range(col: str, op: str, values: List[str], interval: Callable[[str, int], str]) -> Optional[str]:
+    """Half-open range on col for DAY(col) op value(s); interval(v, n) renders v shifted by n days"""
+    if op == 'BETWEEN' and len(values) == 2:
+        return f'{col} >= {interval(values[0], 0)} AND {col} < {interval(values[1], 1)}'
+    if len(values) != 1:
+        return None
+    value = values[0]
+    return {
+        '=': f'{col} >= {interval(value, 0)} AND {col} < {interval(value, 1)}',
+        '<=>': f'{col} >= {interval(value, 0)} AND {col} < {interval(value, 1)}',
+        '>=': f'{col} >= {interval(value, 0)}',
+        '>': f'{col} >= {interval(value, 1)}',
+        '<': f'{col} < {interval(value, 0)}',
+        '<=': f'{col} < {interval(value, 1)}',
+    }.get(op)
+
+
+def suggest(kind: str, wrapper: str, col: str, args: List[str], op: str,
+            values: List[str]) -> Tuple[str, Optional[str], Optional[str]]:
+    """(strategy, rewrite or None, note) for `wrapper(col, args...) op values`"""
+    first_is_column = bool(args) and args[0] == col
+    if kind == 'arithmetic':
+        if wrapper in SOLVE and len(args) == 1 and len(values) == 1 and op in FLIPPED:
+            return 'solve', f'{col} {op} {values[0]} {SOLVE[wrapper]} {args[0]}', None
+        return 'functional', None, None
+    if wrapper == 'DATE' and first_is_column:
+        def shift(value: str, days: int) -> str:
+            return value if days == 0 else f'{value} + INTERVAL {days} DAY'
+        return 'range', _day_range(col, op, values, shift), None
+    if wrapper == 'YEAR' and first_is_column:
+        def year_start(value: str, years: int) -> str:
+            year = _plus(value, str(years)) if years else value
+            return f"'{year}-01-01'" if NUMBER.match(year) else f'MAKEDATE({year}, 1)'
+        return 'range', _day_range(col, op, values, year_start), None
+    if wrapper == 'DATEDIFF' and first_is_column and len(args) == 2:
+        # DATEDIFF(col, x) op n  <=>  DATE(col) op DATE(x) + n
+        def from_base(value: str, days: int) -> str:
+            return f'DATE({args[1]}) + INTERVAL {_plus(value, str(days)) if days else value} DAY'
+        return 'range', _day_range(col, op, values, from_base), None
+    if wrapper in CASE_FUNCTIONS and first_is_column and len(args) == 1:
+        return 'drop', f'{col} {op} {" AND ".join(values)}', 'relies on a case-insensitive (_ci) collation'
+    if wrapper in NULL_FUNCTIONS and first_is_column and len(args) == 2 and len(values) == 1 and op in FLIPPED:
+        matches_default = _compare(args[1], op, values[0])
+        if matches_default is False:
+            return 'null-split', f'{col} {op} {values[0]}', f'{args[1]} {op} {values[0]} is false, NULL rows never match'
+        if matches_default is True:
+            return 'null-split', f'({col} {op} {values[0]} OR {col} IS NULL)', 'OR IS NULL can use index_merge or a union'
+        return 'null-split', f'({col} {op} {values[0]} OR ({col} IS NULL AND {args[1]} {op} {values[0]}))', None
+    return 'functional', None, None
+
+
+class FileScanner:
+    """Condition fragments of one source file"""
+
+    def __init__(self, path: Path, rel_path: str, schema: Schema, all_columns: bool = False):
+        self.catalog = FileCatalog(SourceIndex.load(path), rel_path, schema)
+        self.schema = schema
+        self.all_columns = all_columns
+
+    def interpolations(self, i: int) -> List[str]:
+        """Source text of the ${...} parts that render_sql turned into ? (in order)"""
+        index = self.catalog.index
+        if index.kinds[i] == TEMPLATE:
+            return []
+        parts = index.template_parts(i)
+        found = []
+        for n in range(len(parts) - 1):
+            first, last = parts[n] + 1, parts[n + 1] - 1
+            column = self.catalog.column_at(first) if last - first == 2 else None
+            table = self.catalog.table_at(first) if first == last else None
+            if column is None and table is None:
+                found.append(index.token_span_text(first, last))
+        return found
+
+    def findings(self) -> List[Finding]:
+        catalog = self.catalog
+        index = catalog.index
+        fragments: Dict[Tuple[int, str], Tuple[str, Query]] = {}
+        for query in catalog.queries():
+            for fragment in query.sql:
+                fragments.setdefault((fragment.line, fragment.text), (fragment.clause, query))
+        found = []
+        for i in range(len(index)):
+            if not catalog.is_sql_tag(i):
+                continue
+            text, _, _ = catalog.render_sql(i)
+            line = index.line_of(index.starts[i])
+            clause, query = fragments.get((line, text), (None, None))
+            if clause not in CONDITION_CLAUSES and clause != 'execute':
+                continue
+            found.extend(self.scan(text, line, clause, query, self.interpolations(i)))
+        return found
+
+    def scan(self, text: str, line: int, clause: str, query: Query, params: List[str]) -> List[Finding]:
+        catalog = self.catalog
+        schema = self.schema
+        tokens = sql_tokens(text)
+        if clause == 'execute':
+            access = read_access(text, schema)
+            aliases = dict(access.tables) if access else {}
+            tables = access.table_names if access else []
+        else:
+            tables = query.tables
+            aliases = {schema.tables[name].sql_name: name for name in tables if name in schema.tables}
+        scanner = FragmentScanner(tokens, schema, aliases, tables)
+        owner = f'{query.owner}.' if query.owner else ''
+        found = []
+        for kind, wrapper, ref, first, last, arg_starts in scanner.candidates(condition_mask(tokens, clause != 'execute')):
+            index_name, leading = _indexed(ref.table, ref.column)
+            if index_name is None and not self.all_columns:
+                continue
+            comparison = scanner.comparison(first, last)
+            if comparison is None:
+                continue
+            op, value_first, value_last, _ = comparison
+            findings = []
+            for template in (False, True):
+                if template and not params:
+                    break
+                render = _Renderer(tokens, ref, params if template else None, template, clause == 'execute')
+                col = render.column()
+                args = ([render.span(start, end) for start, end in
+                         zip(arg_starts, [s - 2 for s in arg_starts[1:]] + [last - 1])]
+                        if kind == 'function' else [render.span(last, last) if first == ref.first
+                                                    else render.span(first, first)])
+                values = render.values(value_first, value_last, op)
+                findings.append(suggest(kind, wrapper, col, args, op, values))
+            strategy, rewrite, note = findings[0]
+            expression = _Renderer(tokens, ref, None, False).span(*sorted((first, value_last) if value_first > last
+                                                                         else (value_first, last)))
+            if strategy == 'functional':
+                target = _Renderer(tokens, ref, None, False).span(first, last)
+                rewrite = (f'ALTER TABLE {ref.table.sql_name} ADD INDEX '
+                           f'{ref.table.sql_name}_{ref.column.sql_name}_expr_idx (({target}));')
+                note = 'index the expression itself (MySQL 8.0.13+ functional key part, TiDB expression index)'
+            found.append(Finding(
+                file=catalog.rel_path, line=line + text[:tokens[first].start].count('\n'),
+                function=f'{owner}{query.function}', table=ref.table.name, column=ref.column.name,
+                index=index_name, leading=leading, kind=kind, wrapper=wrapper, expression=expression,
+                strategy=strategy, rewrite=rewrite or '', note=note,
+                template=findings[1][1] if len(findings) > 1 and strategy != 'functional' else None,
+            ))
+        return found
+
+
+class _Renderer:
+    """Token spans as SQL text (params as ?) or as sql`` template text (params as ${expr})"""
+
+    def __init__(self, tokens: List[SqlToken], ref: ColumnRef, params: Optional[List[str]], template: bool,
+                 raw_columns: bool = False):
+        self.tokens = tokens
+        self.ref = ref
+        self.params = params
+        self.template = template
+        self.raw_columns = raw_columns      # execute() text names columns itself, possibly through aliases
+
+    def column(self) -> str:
+        if self.template and self.params is not None and not self.raw_columns:
+            return f'${{{self.ref.table.name}.{self.ref.column.name}}}'
+        return ''.join(token.text for token in self.tokens[self.ref.first:self.ref.last + 1])
+
+    def span(self, first: int, last: int) -> str:
+        out: List[str] = []
+        i = first
+        while i <= last:
+            token = self.tokens[i]
+            if i == self.ref.first:
+                out.append(self.column())
+                i = self.ref.last + 1
+                continue
+            if token.kind == 'param' and self.params is not None and token.param < len(self.params):
+                out.append(f'${{{self.params[token.param]}}}')
+            else:
+                out.append(token.text)
+            i += 1
+        text = ' '.join(out)
+        text = re.sub(r'\s*([(.])\s*', r'\1', text)
+        text = re.sub(r'\s*,\s*', ', ', text)
+        return re.sub(r'\s+\)', ')', text).strip()
+
+    def values(self, first: int, last: int, op: str) -> List[str]:
+        if op != 'BETWEEN':
+            return [self.span(first, last)]
+        for j in range(first, last + 1):
+            if _upper(self.tokens, j) == 'AND':
+                return [self.span(first, j - 1), self.span(j + 1, last)]
+        return [self.span(first, last)]
+
+
+def scan_files(patterns: Sequence[str] = SCAN_FILES, schema: Optional[Schema] = None,
+               all_columns: bool = False, root: Path = PROJECT_ROOT) -> List[Finding]:
+    schema = schema or load_schema()
+    found = []
+    for path in resolve_files(patterns, root):
+        if path.name.endswith(('.test.ts', '.spec.ts')):
+            continue
+        rel_path = path.resolve().relative_to(root.resolve()).as_posix()
+        found.extend(FileScanner(path, rel_path, schema, all_columns).findings())
+    return sorted(found, key=lambda f: (f.index is None, not f.leading, f.file, f.line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find functions and arithmetic around indexed columns in sql`` conditions')
+    parser.add_argument('files', nargs='*', help=f"files or globs (default: {' '.join(SCAN_FILES)})")
+    parser.add_argument('--all-columns', action='store_true', help='also report columns without an index')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Scanning sql`` condition fragments...")
+    findings = scan_files(args.files or SCAN_FILES, all_columns=args.all_columns)
+    if not findings:
+        print("\n✅ No non-sargable predicates on indexed columns")
+    else:
+        print(f"\n⚠️  {len(findings)} non-sargable predicates:")
+        for finding in findings:
+            index = f"{finding.index}{'' if finding.leading else ' (not leading)'}" if finding.index else 'no index'
+            print(f"   {finding.file}:{finding.line} {finding.function}: {finding.expression}  [{index}]")
+            print(f"      {finding.strategy}: {finding.template or finding.rewrite}")
+            if finding.note:
+                print(f"      note: {finding.note}")
+
+    report = {'findings': [finding.to_dict() for finding in findings]}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Repository Partition Planner
+
+classify_function() assigns server/db.ts functions to repositories by name
+alone, so functions that call each other or work on the same tables can end
+up in different repositories (and everything unmatched lands in 'misc').
+This planner builds a weighted graph over the functions extracted from db.ts:
+
+  - call edges: f calls g directly (a cross-repository call needs an import)
+  - table affinity: f and g reference the same schema table (each repository
+    referencing a table imports it), scaled down for widely used tables
+
+and partitions it with seeded label propagation: every function starts in
+its name-based domain, then repeatedly moves to the partition with the
+strongest connections, under a size cap, until nothing moves. The plan and
+cut metrics (cross-partition calls, duplicated table imports) for both the
+name-based baseline and the planned split are written to repository-plan.json,
+which extract_repositories.py --plan consumes.
+
+Usage:
+    python scripts/plan_repositories.py
+    python scripts/plan_repositories.py --max-size 50 --output plan.json
+"""
+
+import argparse
+import json
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from drizzle_schema import load_schema
+from extract_repositories import FunctionInfo, extract_functions_from_db
+from source_index import IDENT
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_FILE = PROJECT_ROOT / 'server' / 'db.ts'
+OUTPUT_FILE = PROJECT_ROOT / 'repository-plan.json'
+
+CALL_WEIGHT = 4.0      # a cross-partition call costs an import between repositories
+TABLE_WEIGHT = 2.0     # spread over the other functions that reference the table
+DOMAIN_PRIOR = 4.0     # pull towards the name-based domain, keeps partitions recognisable
+MAX_ROUNDS = 25
+UNASSIGNED = 'misc'
+
+
+@dataclass
+class FunctionNode:
+    """A db.ts function with its outgoing calls and referenced tables"""
+    name: str
+    domain: str                                   # name-based domain (classify_function)
+    calls: Set[str] = field(default_factory=set)
+    tables: Set[str] = field(default_factory=set)
+    line: int = 0
+
+
+@dataclass
+class PlanMetrics:
+    partitions: Dict[str, int]
+    cross_calls: int                  # call edges between partitions
+    cross_imports: int                # distinct (caller partition, callee partition) pairs
+    table_imports: int                # sum over tables of the partitions importing them
+    duplicated_table_imports: int     # table_imports minus distinct tables
+
+    def to_dict(self) -> Dict:
+        return {
+            'partitions': dict(sorted(self.partitions.items(), key=lambda item: -item[1])),
+            'cross_calls': self.cross_calls,
+            'cross_imports': self.cross_imports,
+            'table_imports': self.table_imports,
+            'duplicated_table_imports': self.duplicated_table_imports,
+        }
+
+
+def build_graph(functions: List[FunctionInfo], tables: Set[str]) -> Dict[str, FunctionNode]:
+    """Call and table references of each function, from one pass over its tokens"""
+    names = {func.name for func in functions}
+    nodes: Dict[str, FunctionNode] = {}
+    for func in functions:
+        index = func.index
+        node = FunctionNode(name=func.name, domain=func.domain, line=func.start_line)
+        for i in range(func.start_token, func.end_token + 1):
+            if index.kinds[i] != IDENT or index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.'):
+                continue
+            text = index.text(i)
+            if text in names and text != func.name and index.is_punct(i + 1, b'('):
+                node.calls.add(text)
+            elif text in tables:
+                node.tables.add(text)
+        nodes[func.name] = node
+    return nodes
+
+
+def _table_users(nodes: Dict[str, FunctionNode]) -> Dict[str, Set[str]]:
+    users: Dict[str, Set[str]] = defaultdict(set)
+    for node in nodes.values():
+        for table in node.tables:
+            users[table].add(node.name)
+    return users
+
+
+def _neighbours(nodes: Dict[str, FunctionNode]) -> Dict[str, Dict[str, float]]:
+    """Symmetric edge weights: calls in either direction plus shared-table affinity"""
+    weights: Dict[str, Dict[str, float]] = {name: defaultdict(float) for name in nodes}
+    for node in nodes.values():
+        for callee in node.calls:
+            weights[node.name][callee] += CALL_WEIGHT
+            weights[callee][node.name] += CALL_WEIGHT
+    for table, users in _table_users(nodes).items():
+        if len(users) < 2:
+            continue
+        share = TABLE_WEIGHT / (len(users) - 1)
+        for a in users:
+            for b in users:
+                if a != b:
+                    weights[a][b] += share
+    return weights
+
+
+def propagate_labels(nodes: Dict[str, FunctionNode], max_size: int,
+                     prior: float = DOMAIN_PRIOR) -> Tuple[Dict[str, str], int]:
+    """
+    Seeded label propagation; returns (function -> partition, rounds run).
+
+    A function moves only when another partition scores strictly higher than
+    its current one and that partition is below max_size, so the result is
+    deterministic and stable.
+    """
+    weights = _neighbours(nodes)
+    labels = {name: node.domain for name, node in nodes.items()}
+    sizes = Counter(labels.values())
+    order = sorted(nodes, key=lambda name: nodes[name].line)
+
+    for round_number in range(1, MAX_ROUNDS + 1):
+        moved = 0
+        for name in order:
+            node = nodes[name]
+            scores: Dict[str, float] = defaultdict(float)
+            for other, weight in weights[name].items():
+                scores[labels[other]] += weight
+            if node.domain != UNASSIGNED:
+                scores[node.domain] += prior
+            scores.pop(UNASSIGNED, None)    # nothing is pulled into misc
+            current = labels[name]
+            best, best_score = current, scores.get(current, 0.0)
+            for label, score in sorted(scores.items()):
+                if score > best_score and (sizes[label] < max_size or label == current):
+                    best, best_score = label, score
+            if best != current:
+                sizes[current] -= 1
+                sizes[best] += 1
+                labels[name] = best
+                moved += 1
+        if not moved:
+            return labels, round_number
+    return labels, MAX_ROUNDS
+
+
+def plan_metrics(nodes: Dict[str, FunctionNode], labels: Dict[str, str]) -> PlanMetrics:
+    cross_calls = 0
+    import_pairs: Set[Tuple[str, str]] = set()
+    for node in nodes.values():
+        for callee in node.calls:
+            if labels[callee] != labels[node.name]:
+                cross_calls += 1
+                import_pairs.add((labels[node.name], labels[callee]))
+    table_partitions: Dict[str, Set[str]] = defaultdict(set)
+    for node in nodes.values():
+        for table in node.tables:
+            table_partitions[table].add(labels[node.name])
+    table_imports = sum(len(partitions) for partitions in table_partitions.values())
+    return PlanMetrics(
+        partitions=dict(Counter(labels.values())),
+        cross_calls=cross_calls,
+        cross_imports=len(import_pairs),
+        table_imports=table_imports,
+        duplicated_table_imports=table_imports - len(table_partitions),
+    )
+
+
+def build_plan(db_file: Path = DB_FILE, max_size: Optional[int] = None, prior: float = DOMAIN_PRIOR) -> Dict:
+    schema = load_schema()
+    functions = extract_functions_from_db(db_file)
+    nodes = build_graph(functions, set(schema.tables))
+    baseline = {name: node.domain for name, node in nodes.items()}
+    if max_size is None:
+        largest = max(Counter(label for label in baseline.values() if label != UNASSIGNED).values(), default=1)
+        max_size = math.ceil(largest * 1.2)
+    labels, rounds = propagate_labels(nodes, max_size, prior)
+
+    moves = [
+        {'function': name, 'from': baseline[name], 'to': labels[name]}
+        for name in sorted(nodes, key=lambda name: nodes[name].line) if labels[name] != baseline[name]
+    ]
+    cross_edges = [
+        {'caller': node.name, 'callee': callee, 'from': labels[node.name], 'to': labels[callee]}
+        for node in nodes.values() for callee in sorted(node.calls) if labels[callee] != labels[node.name]
+    ]
+    partitions: Dict[str, List[str]] = defaultdict(list)
+    for name in sorted(nodes, key=lambda name: nodes[name].line):
+        partitions[labels[name]].append(name)
+    return {
+        'source': str(db_file.relative_to(PROJECT_ROOT)),
+        'max_size': max_size,
+        'prior': prior,
+        'rounds': rounds,
+        'assignments': labels,
+        'partitions': dict(sorted(partitions.items())),
+        'moves': moves,
+        'cross_edges': cross_edges,
+        'metrics': {
+            'baseline': plan_metrics(nodes, baseline).to_dict(),
+            'planned': plan_metrics(nodes, labels).to_dict(),
+        },
+    }
+
+
+def load_plan(path: Path) -> Dict[str, str]:
+    """function name -> partition from a plan file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['assignments']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition server/db.ts functions into repositories')
+    parser.add_argument('--output', default=str(OUTPUT_FILE), help='plan file (default: repository-plan.json)')
+    parser.add_argument('--max-size', type=int, help='largest allowed partition (default: 1.2x the largest domain)')
+    parser.add_argument('--prior', type=float, default=DOMAIN_PRIOR,
+                        help=f'weight keeping functions in their name-based domain (default {DOMAIN_PRIOR})')
+    args = parser.parse_args()
+
+    print('🔍 Building call/table graph for server/db.ts...')
+    plan = build_plan(max_size=args.max_size, prior=args.prior)
+    baseline, planned = plan['metrics']['baseline'], plan['metrics']['planned']
+    print(f"   {len(plan['assignments'])} functions, {len(planned['partitions'])} partitions "
+          f"(cap {plan['max_size']}, {plan['rounds']} rounds)")
+
+    print('\n📊 Cut metrics:')
+    print(f"   {'':<34} {'baseline':>9} {'planned':>9}")
+    for key, label in (('cross_calls', 'cross-partition calls'), ('cross_imports', 'repository-to-repository imports'),
+                       ('table_imports', 'table imports'), ('duplicated_table_imports', 'duplicated table imports')):
+        print(f"   {label:<34} {baseline[key]:>9} {planned[key]:>9}")
+    print(f"   {'misc functions':<34} {baseline['partitions'].get(UNASSIGNED, 0):>9} "
+          f"{planned['partitions'].get(UNASSIGNED, 0):>9}")
+
+    if plan['moves']:
+        print(f"\n🔀 {len(plan['moves'])} functions move from their name-based domain:")
+        for move in plan['moves'][:25]:
+            print(f"   {move['function']}: {move['from']} -> {move['to']}")
+        if len(plan['moves']) > 25:
+            print(f"   ... {len(plan['moves']) - 25} more")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    print(f"\n✅ Plan written to {args.output} (use: python scripts/extract_repositories.py --plan {args.output})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+"""
+Static Query Catalog
+
+Walks every Drizzle call chain in server/db.ts and server/repositories/*.ts
+(db.select().from().innerJoin().where().orderBy().limit(), insert, update,
+delete and raw db.execute(sql`...`)) and records, per query: the table, join
+tables, filter columns with their operators, sort and group columns, limit and
+offset, aggregates and the owning function. This is the inventory the index
+advisor and the other database analyzers in scripts/ build on.
+
+Chains continued through a builder variable (`let query = db.select()...;
+query = query.where(...)`) and `where` clauses built from local variables
+(`conditions.push(eq(...))`, `const whereClause = and(...conditions)`) are
+followed within the owning function.
+
+Usage:
+    python scripts/query_catalog.py                      # writes query-catalog.json
+    python scripts/query_catalog.py --table tasks        # print the queries on one table
+    python scripts/query_catalog.py server/db.ts --output /tmp/catalog.json
+"""
+
+import argparse
+import json
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from drizzle_schema import Schema, load_schema
+from source_index import (
+    IDENT, TEMPLATE, TEMPLATE_HEAD, SourceIndex,
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_FILES = ('server/db.ts', 'server/repositories/*.ts')
+OUTPUT_FILE = PROJECT_ROOT / 'query-catalog.json'
+
+QUERY_ROOTS = {'select', 'selectDistinct', 'insert', 'update', 'delete', 'execute'}
+DB_HANDLES = {'db', 'tx'}
+ROOT_CANDIDATE = re.compile(
+    rb'\b(?:db|tx)\s*\.\s*(?:select|selectDistinct|insert|update|delete|execute)\s*\('
+)
+
+JOIN_METHODS = {'innerJoin': 'inner', 'leftJoin': 'left', 'rightJoin': 'right', 'fullJoin': 'full'}
+# Methods that keep returning a query builder; continuation chains only follow these
+BUILDER_METHODS = {
+    'from', 'where', 'having', 'orderBy', 'groupBy', 'limit', 'offset', 'set', 'values',
+    'onDuplicateKeyUpdate', '$dynamic', 'for', *JOIN_METHODS,
+}
+PREDICATE_OPS = {
+    'eq', 'ne', 'gt', 'gte', 'lt', 'lte', 'inArray', 'notInArray', 'like', 'notLike',
+    'ilike', 'isNull', 'isNotNull', 'between', 'notBetween', 'exists', 'notExists',
+}
+AGGREGATE_FUNCTIONS = {'count', 'countDistinct', 'sum', 'sumDistinct', 'avg', 'avgDistinct', 'min', 'max'}
+SQL_AGGREGATE = re.compile(r'\b(COUNT|SUM|AVG|MIN|MAX|GROUP_CONCAT)\s*\(', re.IGNORECASE)
+SQL_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)\b`?(?!\.)', re.IGNORECASE)
+TABLE_ALIAS = re.compile(rb'\b(?:const|let)\s+(\w+)\s*=\s*(\w+)\s*;')
+SQL_VERB = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b', re.IGNORECASE)
+
+
+@dataclass
+class Predicate:
+    """One comparison in a where/having/join condition"""
+    op: str                           # eq, inArray, like, ..., or 'sql' for raw fragments
+    column: Optional[str]             # table.column on the left-hand side
+    other_column: Optional[str] = None  # right-hand column for column-to-column comparisons
+    value: Optional[str] = None       # source text of the compared value (truncated)
+    conditional: bool = False         # only applied on some code paths (if / ternary)
+    line: int = 0
+
+
+@dataclass
+class Join:
+    kind: str                         # inner | left | right | full
+    table: Optional[str]
+    on: List[Predicate] = field(default_factory=list)
+
+
+@dataclass
+class SortKey:
+    column: str                       # table.column, or the rendered sql expression
+    direction: str                    # asc | desc
+
+
+@dataclass
+class SqlFragment:
+    """A sql`...` template, rendered with ? for parameters and `table`.`column` for column refs"""
+    text: str
+    clause: str                       # select | where | having | orderBy | groupBy | set | execute | ...
+    line: int
+    columns: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Query:
+    """One Drizzle query chain"""
+    file: str
+    function: str
+    owner: Optional[str]              # class name for repository methods
+    line: int
+    end_line: int
+    operation: str                    # select | insert | update | delete | execute
+    table: Optional[str]
+    sql_table: Optional[str] = None
+    handle: str = 'db'                # db | tx | this.db
+    distinct: bool = False
+    selected: List[str] = field(default_factory=list)   # ['*'] for select()
+    aggregates: List[str] = field(default_factory=list)
+    joins: List[Join] = field(default_factory=list)
+    filters: List[Predicate] = field(default_factory=list)
+    having: List[Predicate] = field(default_factory=list)
+    order_by: List[SortKey] = field(default_factory=list)
+    group_by: List[str] = field(default_factory=list)
+    limit: Optional[str] = None
+    offset: Optional[str] = None
+    set_columns: List[str] = field(default_factory=list)
+    bulk_insert: bool = False
+    upsert: bool = False
+    dynamic: bool = False             # continued through a builder variable
+    raw_tables: List[str] = field(default_factory=list)  # tables named in raw sql
+    sql: List[SqlFragment] = field(default_factory=list)
+    start: int = 0                    # byte span of the chain in the file
+    end: int = 0
+
+    @property
+    def filter_columns(self) -> List[str]:
+        return list(dict.fromkeys(p.column for p in self.filters if p.column))
+
+    @property
+    def tables(self) -> List[str]:
+        names = [self.table] + [join.table for join in self.joins] + self.raw_tables
+        return list(dict.fromkeys(name for name in names if name))
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['filter_columns'] = self.filter_columns
+        return data
+
+
+@dataclass
+class Catalog:
+    queries: List[Query]
+    files: List[str]
+
+    def for_table(self, table: str) -> List[Query]:
+        return [query for query in self.queries if table in query.tables]
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-table counts of operations, filter/sort/join columns and unlimited selects"""
+        tables: Dict[str, Dict] = defaultdict(lambda: {
+            'queries': 0, 'operations': Counter(), 'filter_columns': Counter(),
+            'sort_columns': Counter(), 'join_tables': Counter(), 'selects_without_limit': 0,
+        })
+        for query in self.queries:
+            if query.table:
+                entry = tables[query.table]
+                entry['queries'] += 1
+                entry['operations'][query.operation] += 1
+                if query.operation == 'select' and query.limit is None and not query.aggregates:
+                    entry['selects_without_limit'] += 1
+            for predicate in query.filters + [p for join in query.joins for p in join.on]:
+                for column in (predicate.column, predicate.other_column):
+                    if column:
+                        tables[column.split('.')[0]]['filter_columns'][column.split('.', 1)[1]] += 1
+            for key in query.order_by:
+                if '.' in key.column and not key.column.startswith('`'):
+                    tables[key.column.split('.')[0]]['sort_columns'][key.column.split('.', 1)[1]] += 1
+            for join in query.joins:
+                if query.table and join.table:
+                    tables[query.table]['join_tables'][join.table] += 1
+                    tables[join.table]['join_tables'][query.table] += 1
+        return {
+            name: {key: dict(value.most_common()) if isinstance(value, Counter) else value
+                   for key, value in entry.items()}
+            for name, entry in sorted(tables.items())
+        }
+
+
+class FileCatalog:
+    """Extracts the queries of one source file"""
+
+    def __init__(self, index: SourceIndex, rel_path: str, schema: Schema):
+        self.index = index
+        self.rel_path = rel_path
+        self.schema = schema
+        self.aliases = self._table_aliases()
+        self.functions = sorted(
+            ((symbol.start_token, symbol.end_token, owner.name if owner else None, symbol)
+             for owner, symbol in index.iter_functions()),
+            key=lambda entry: entry[0],
+        )
+        self._function_starts = [entry[0] for entry in self.functions]
+        self._locals_cache: Dict[int, Dict[str, List[Tuple[int, int]]]] = {}
+
+    def _table_aliases(self) -> Dict[str, str]:
+        """Local identifier -> schema table export name"""
+        aliases = {name: name for name in self.schema.tables}
+        for decl in self.index.imports:
+            if decl.module.endswith('drizzle/schema'):
+                for imported, local in decl.named:
+                    if imported in self.schema.tables:
+                        aliases[local] = imported
+        # const pmMembersTable = projectMembers;
+        for match in TABLE_ALIAS.finditer(self.index.source):
+            table = aliases.get(match.group(2).decode())
+            if table:
+                aliases.setdefault(match.group(1).decode(), table)
+        return aliases
+
+    # ------------------------------------------------------------------
+    # Token helpers
+    # ------------------------------------------------------------------
+
+    def _line(self, token: int) -> int:
+        return self.index.line_of(self.index.starts[token])
+
+    def table_at(self, i: int) -> Optional[str]:
+        """Table name when token i is a bare table identifier"""
+        index = self.index
+        if index.kinds[i] != IDENT or index.is_punct(i - 1, b'.'):
+            return None
+        return self.aliases.get(index.text(i))
+
+    def column_at(self, i: int) -> Optional[str]:
+        """`table.column` when tokens i..i+2 are a column reference"""
+        index = self.index
+        table = self.table_at(i)
+        if table is None or not index.is_punct(i + 1, b'.') or index.kinds[i + 2] != IDENT:
+            return None
+        if index.is_punct(i + 3, b'('):
+            return None
+        return f'{table}.{index.text(i + 2)}'
+
+    def split_args(self, first: int, last: int) -> List[Tuple[int, int]]:
+        """Top-level comma separated token ranges (inclusive) of an argument list"""
+        if first > last:
+            return []
+        index = self.index
+        depth = index.depths[first]
+        ranges = []
+        start = first
+        for i in range(first, last + 1):
+            if index.depths[i] == depth and index.is_punct(i, b','):
+                if start <= i - 1:
+                    ranges.append((start, i - 1))
+                start = i + 1
+        if start <= last:
+            ranges.append((start, last))
+        return ranges
+
+    def _value_text(self, arg: Optional[Tuple[int, int]]) -> Optional[str]:
+        if arg is None:
+            return None
+        text = ' '.join(self.index.token_span_text(*arg).split())
+        return text if len(text) <= 80 else text[:77] + '...'
+
+    def render_sql(self, i: int) -> Tuple[str, List[str], int]:
+        """Render a sql`...` template starting at token i; returns (text, columns, last token)"""
+        index = self.index
+        if index.kinds[i] == TEMPLATE:
+            return index.text(i)[1:-1], [], i
+        parts = index.template_parts(i)
+        pieces = []
+        columns = []
+        for n, part in enumerate(parts):
+            raw = index.text(part)
+            pieces.append(raw[1:-2] if n < len(parts) - 1 else raw[1:-1])
+            if n == len(parts) - 1:
+                break
+            first, last = part + 1, parts[n + 1] - 1
+            column = self.column_at(first) if last - first == 2 else None
+            table = self.table_at(first) if first == last else None
+            if column:
+                columns.append(column)
+                table_name, column_name = column.split('.', 1)
+                pieces.append(f'`{self.schema.tables[table_name].sql_name}`.`{column_name}`')
+            elif table:
+                pieces.append(f'`{self.schema.tables[table].sql_name}`')
+            else:
+                pieces.append('?')
+        return ''.join(pieces), columns, parts[-1]
+
+    def is_sql_tag(self, i: int) -> bool:
+        """Token i starts a template tagged with `sql` (or sql<T>)"""
+        index = self.index
+        if index.kinds[i] not in (TEMPLATE, TEMPLATE_HEAD):
+            return False
+        j = i - 1
+        if index.is_punct(j, b'>'):
+            while j > 0 and not index.is_punct(j, b'<'):
+                j -= 1
+            j -= 1
+        return index.is_ident(j, b'sql')
+
+    # ------------------------------------------------------------------
+    # Local variables of the owning function
+    # ------------------------------------------------------------------
+
+    def _locals(self, function_index: int) -> Dict[str, List[Tuple[int, int]]]:
+        """Variable name -> token ranges that contribute to its value (init, reassign, push)"""
+        cached = self._locals_cache.get(function_index)
+        if cached is not None:
+            return cached
+        index = self.index
+        start, end = self.functions[function_index][0], self.functions[function_index][1]
+        found: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        i = start
+        while i < end:
+            if index.kinds[i] == IDENT and not index.is_punct(i - 1, b'.'):
+                name = index.text(i)
+                if index.is_punct(i + 1, b'=') and not index.is_punct(i - 1, b'...'):
+                    found[name].append((i + 2, self._expression_end(i + 2, end)))
+                elif (index.is_punct(i + 1, b'.') and index.is_ident(i + 2, b'push')
+                      and index.is_punct(i + 3, b'(')):
+                    found[name].append((i + 4, index.match(i + 3) - 1))
+            i += 1
+        self._locals_cache[function_index] = found
+        return found
+
+    def _expression_end(self, i: int, limit: int) -> int:
+        """Last token of the expression starting at i (up to `;`, `,` or a closing bracket)"""
+        index = self.index
+        depth = index.depths[i]
+        j = i
+        while j < limit:
+            if index.depths[j] < depth:
+                return j - 1
+            if index.depths[j] == depth and (index.is_punct(j, b';') or index.is_punct(j, b',')):
+                return j - 1
+            if index.match(j) > j:
+                j = index.match(j)
+            j += 1
+        return limit
+
+    # ------------------------------------------------------------------
+    # Predicates
+    # ------------------------------------------------------------------
+
+    def predicates(self, first: int, last: int, function_index: int, clause: str, query: Query,
+                   conditional: bool = False, seen: Optional[Set[str]] = None) -> List[Predicate]:
+        index = self.index
+        seen = set() if seen is None else seen
+        body_depth = index.depths[self.functions[function_index][3].body_token] + 1 \
+            if self.functions[function_index][3].body_token >= 0 else 0
+        found: List[Predicate] = []
+        i = first
+        while i <= last:
+            kind = index.kinds[i]
+            if self.is_sql_tag(i):
+                text, columns, end = self.render_sql(i)
+                query.sql.append(SqlFragment(text=text, clause=clause, line=self._line(i), columns=columns))
+                for column in columns or [None]:
+                    found.append(Predicate(op='sql', column=column, value=self._value_text((i, end)),
+                                           conditional=conditional, line=self._line(i)))
+                i = end + 1
+                continue
+            if kind == IDENT and not index.is_punct(i - 1, b'.'):
+                name = index.text(i)
+                if name in PREDICATE_OPS and index.is_punct(i + 1, b'('):
+                    close = index.match(i + 1)
+                    args = self.split_args(i + 2, close - 1)
+                    column = self.column_at(args[0][0]) if args and args[0][1] - args[0][0] == 2 else None
+                    other = None
+                    value = None
+                    if len(args) > 1:
+                        other = self.column_at(args[1][0]) if args[1][1] - args[1][0] == 2 else None
+                        value = self._value_text((args[1][0], args[-1][1]))
+                    if column is None and other is not None:
+                        column, other = other, None
+                    found.append(Predicate(op=name, column=column, other_column=other, value=value,
+                                           conditional=conditional, line=self._line(i)))
+                    i = close + 1
+                    continue
+                if (name not in seen and not index.is_punct(i + 1, b'(') and not index.is_punct(i + 1, b'.')
+                        and not index.is_punct(i + 1, b':')):
+                    ranges = self._locals(function_index).get(name)
+                    if ranges:
+                        seen.add(name)
+                        for range_first, range_last in ranges:
+                            nested = conditional or index.depths[range_first] > body_depth + 1
+                            found.extend(self.predicates(range_first, range_last, function_index, clause,
+                                                         query, nested, seen))
+            i += 1
+        return found
+
+    # ------------------------------------------------------------------
+    # Chains
+    # ------------------------------------------------------------------
+
+    def walk_chain(self, i: int, methods: Optional[Set[str]] = None) -> Tuple[List[Tuple[str, int, int]], int]:
+        """`.name(args)` calls following token i; returns ([(name, first, last)], last token)"""
+        index = self.index
+        calls = []
+        pos = i + 1
+        last = i
+        while (index.is_punct(pos, b'.') and index.kinds[pos + 1] == IDENT
+               and index.is_punct(pos + 2, b'(')):
+            name = index.text(pos + 1)
+            if methods is not None and name not in methods:
+                break
+            close = index.match(pos + 2)
+            calls.append((name, pos + 3, close - 1))
+            last = close
+            pos = close + 1
+        return calls, last
+
+    def _binding(self, root: int) -> Optional[str]:
+        """Builder variable for `let/const name = db.select()...` (not awaited)"""
+        index = self.index
+        if index.is_ident(root - 1, b'await') or not index.is_punct(root - 1, b'='):
+            return None
+        if index.kinds[root - 2] != IDENT or index.text(root - 3) not in ('let', 'const', 'var'):
+            return None
+        return index.text(root - 2)
+
+    def _continuations(self, name: str, after: int, function_index: int) -> List[Tuple[str, int, int, bool]]:
+        """Builder calls made later through the variable: query = query.where(...)"""
+        index = self.index
+        end = self.functions[function_index][1]
+        symbol = self.functions[function_index][3]
+        body_depth = index.depths[symbol.body_token] + 1 if symbol.body_token >= 0 else 0
+        calls = []
+        name_bytes = name.encode()
+        for i in range(after + 1, end):
+            if not index.is_ident(i, name_bytes) or index.is_punct(i - 1, b'.'):
+                continue
+            chain, _ = self.walk_chain(i, BUILDER_METHODS)
+            conditional = index.depths[i] > body_depth or index.is_punct(i - 1, b'?') or index.is_punct(i - 1, b':')
+            calls.extend((method, first, last, conditional) for method, first, last in chain)
+        return calls
+
+    def function_for(self, token: int) -> Optional[int]:
+        position = bisect_right(self._function_starts, token) - 1
+        if position >= 0 and self.functions[position][0] <= token <= self.functions[position][1]:
+            return position
+        return None
+
+    def queries(self) -> List[Query]:
+        index = self.index
+        found = []
+        for match in ROOT_CANDIDATE.finditer(index.source):
+            handle_token = index.token_at(match.start())
+            if index.starts[handle_token] != match.start() or index.text(handle_token) not in DB_HANDLES:
+                continue
+            handle = index.text(handle_token)
+            root = handle_token
+            if index.is_punct(handle_token - 1, b'.'):
+                if not index.is_ident(handle_token - 2, b'this'):
+                    continue
+                handle = 'this.db'
+                root = handle_token - 2
+            function_index = self.function_for(handle_token)
+            if function_index is None:
+                continue
+            query = self.build_query(root, handle_token, handle, function_index)
+            if query is not None:
+                found.append(query)
+        return found
+
+    def build_query(self, root: int, handle_token: int, handle: str, function_index: int) -> Optional[Query]:
+        index = self.index
+        calls, last = self.walk_chain(handle_token)
+        if not calls or calls[0][0] not in QUERY_ROOTS:
+            return None
+        _, _, owner, symbol = self.functions[function_index]
+        query = Query(
+            file=self.rel_path,
+            function=symbol.name,
+            owner=owner,
+            line=self._line(root),
+            end_line=self._line(last),
+            operation=calls[0][0],
+            table=None,
+            handle=handle,
+            start=index.starts[root],
+            end=index.ends[last],
+        )
+        chain = [(method, first, end, False) for method, first, end in calls]
+        variable = self._binding(root)
+        if variable:
+            continuation = self._continuations(variable, last, function_index)
+            if continuation:
+                query.dynamic = True
+                chain.extend(continuation)
+        if query.operation == 'selectDistinct':
+            query.operation = 'select'
+            query.distinct = True
+
+        for method, first, end, conditional in chain:
+            self.apply_call(query, method, first, end, conditional, function_index)
+        query.group_by = list(dict.fromkeys(query.group_by))
+        if query.table in self.schema.tables:
+            query.sql_table = self.schema.tables[query.table].sql_name
+        return query
+
+    def apply_call(self, query: Query, method: str, first: int, last: int, conditional: bool,
+                   function_index: int) -> None:
+        index = self.index
+        if method in ('select', 'selectDistinct'):
+            self._select_fields(query, first, last)
+        elif method in ('insert', 'update', 'delete', 'from'):
+            if first <= last:
+                query.table = self.table_at(first) if first == last else query.table
+        elif method == 'execute':
+            self._execute(query, first, last)
+        elif method in JOIN_METHODS:
+            args = self.split_args(first, last)
+            table = self.table_at(args[0][0]) if args and args[0][0] == args[0][1] else None
+            join = Join(kind=JOIN_METHODS[method], table=table)
+            if len(args) > 1:
+                join.on = self.predicates(args[1][0], args[1][1], function_index, 'join', query, conditional)
+            query.joins.append(join)
+        elif method == 'where':
+            query.filters.extend(self.predicates(first, last, function_index, 'where', query, conditional))
+        elif method == 'having':
+            query.having.extend(self.predicates(first, last, function_index, 'having', query, conditional))
+        elif method == 'orderBy':
+            self._order_by(query, first, last)
+        elif method == 'groupBy':
+            for arg_first, arg_last in self.split_args(first, last):
+                column = self.column_at(arg_first) if arg_last - arg_first == 2 else None
+                query.group_by.append(column or index.token_span_text(arg_first, arg_last))
+        elif method == 'limit':
+            query.limit = self._value_text((first, last))
+        elif method == 'offset':
+            query.offset = self._value_text((first, last))
+        elif method == 'set':
+            query.set_columns.extend(self._object_keys(first, last))
+        elif method == 'values':
+            query.bulk_insert = index.is_punct(first, b'[')
+            query.set_columns.extend(self._object_keys(first, last))
+        elif method == 'onDuplicateKeyUpdate':
+            query.upsert = True
+
+    def _object_keys(self, first: int, last: int) -> List[str]:
+        """Keys of an object literal argument ({ a: 1, b } -> [a, b])"""
+        index = self.index
+        if first > last or not index.is_punct(first, b'{'):
+            return []
+        keys = []
+        for arg_first, arg_last in self.split_args(first + 1, index.match(first) - 1):
+            if index.kinds[arg_first] == IDENT and (arg_first == arg_last or index.is_punct(arg_first + 1, b':')):
+                keys.append(index.text(arg_first))
+        return keys
+
+    def _select_fields(self, query: Query, first: int, last: int) -> None:
+        index = self.index
+        if first > last:
+            query.selected = ['*']
+            return
+        if not index.is_punct(first, b'{'):
+            query.selected = [index.token_span_text(first, last)]
+            return
+        i = first + 1
+        close = index.match(first)
+        while i < close:
+            if self.is_sql_tag(i):
+                text, columns, end = self.render_sql(i)
+                query.sql.append(SqlFragment(text=text, clause='select', line=self._line(i), columns=columns))
+                if SQL_AGGREGATE.search(text):
+                    query.aggregates.append(text)
+                i = end + 1
+                continue
+            name = index.text(i)
+            if (name in AGGREGATE_FUNCTIONS and index.kinds[i] == IDENT and index.is_punct(i + 1, b'(')
+                    and not index.is_punct(i - 1, b'.')):
+                call_close = index.match(i + 1)
+                column = self.column_at(i + 2) if call_close - (i + 2) == 3 else None
+                query.aggregates.append(f'{name}({column or ("*" if call_close == i + 2 else "?")})')
+                i = call_close + 1
+                continue
+            column = self.column_at(i)
+            if column:
+                query.selected.append(column)
+                i += 3
+                continue
+            table = self.table_at(i)
+            if table and not index.is_punct(i - 1, b'.') and not index.is_punct(i + 1, b':') \
+                    and not index.is_punct(i + 1, b'.'):
+                query.selected.append(f'{table}.*')
+            i += 1
+
+    def _order_by(self, query: Query, first: int, last: int) -> None:
+        index = self.index
+        for arg_first, arg_last in self.split_args(first, last):
+            direction = 'asc'
+            inner_first, inner_last = arg_first, arg_last
+            if (index.text(arg_first) in ('asc', 'desc') and index.is_punct(arg_first + 1, b'(')
+                    and index.match(arg_first + 1) == arg_last):
+                direction = index.text(arg_first)
+                inner_first, inner_last = arg_first + 2, arg_last - 1
+            column = self.column_at(inner_first) if inner_last - inner_first == 2 else None
+            if column is None and index.is_ident(inner_first, b'sql') and self.is_sql_tag(inner_first + 1):
+                text, _, _ = self.render_sql(inner_first + 1)
+                query.sql.append(SqlFragment(text=text, clause='orderBy', line=self._line(inner_first)))
+                column = text
+            query.order_by.append(SortKey(column=column or index.token_span_text(inner_first, inner_last),
+                                          direction=direction))
+
+    def _execute(self, query: Query, first: int, last: int) -> None:
+        index = self.index
+        if index.is_ident(first, b'sql'):
+            first += 1
+        if first > last or not self.is_sql_tag(first):
+            return
+        text, columns, _ = self.render_sql(first)
+        query.sql.append(SqlFragment(text=text, clause='execute', line=self._line(first), columns=columns))
+        verb = SQL_VERB.match(text)
+        if verb and verb.group(1).lower() in ('select', 'insert', 'update', 'delete'):
+            query.operation = verb.group(1).lower()
+        for sql_name in SQL_TABLE_REF.findall(text):
+            table = self.schema.by_sql_name(sql_name)
+            # tables missing from schema.ts are kept by their SQL name
+            name = table.name if table else sql_name
+            if name not in query.raw_tables:
+                query.raw_tables.append(name)
+        if query.raw_tables:
+            query.table = query.raw_tables.pop(0)
+        if SQL_AGGREGATE.search(text):
+            query.aggregates.append('sql')
+        if re.search(r'\bLIMIT\b', text, re.IGNORECASE):
+            query.limit = 'sql'
+
+
+def resolve_files(patterns: Sequence[str], root: Path = PROJECT_ROOT) -> List[Path]:
+    files = []
+    for pattern in patterns:
+        path = root / pattern
+        files.extend(sorted(root.glob(pattern)) if any(ch in pattern for ch in '*?[') else [path])
+    return [path for path in files if path.is_file()]
+
+
+def build_catalog(patterns: Sequence[str] = DEFAULT_FILES, schema: Optional[Schema] = None,
+                  root: Path = PROJECT_ROOT) -> Catalog:
+    """Catalog every Drizzle query in the given files (globs relative to the project root)"""
+    schema = schema or load_schema()
+    queries: List[Query] = []
+    files = resolve_files(patterns, root)
+    for path in files:
+        rel_path = path.resolve().relative_to(root.resolve()).as_posix()
+        queries.extend(FileCatalog(SourceIndex.load(path, root), rel_path, schema).queries())
+    return Catalog(queries=queries, files=[path.relative_to(root).as_posix() for path in files])
+
+
+def write_catalog(catalog: Catalog, output: Path = OUTPUT_FILE) -> None:
+    data = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'files': catalog.files,
+        'total_queries': len(catalog.queries),
+        'tables': catalog.summary(),
+        'queries': [query.to_dict() for query in catalog.queries],
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def print_query(query: Query) -> None:
+    owner = f'{query.owner}.' if query.owner else ''
+    print(f"   {query.file}:{query.line} {owner}{query.function}: {query.operation} {query.table or '?'}")
+    for join in query.joins:
+        on = ', '.join(f'{p.column} = {p.other_column}' if p.other_column else f'{p.op}({p.column})' for p in join.on)
+        print(f"      {join.kind} join {join.table}: {on}")
+    if query.filters:
+        print(f"      where: {', '.join(f'{p.op}({p.column})' + ('?' if p.conditional else '') for p in query.filters)}")
+    if query.order_by:
+        print(f"      order: {', '.join(f'{k.column} {k.direction}' for k in query.order_by)}")
+    if query.group_by:
+        print(f"      group: {', '.join(query.group_by)}")
+    if query.limit:
+        print(f"      limit: {query.limit}" + (f" offset {query.offset}" if query.offset else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catalog Drizzle queries in the server code')
+    parser.add_argument('files', nargs='*', help=f"files or globs (default: {' '.join(DEFAULT_FILES)})")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE, help='catalog JSON path')
+    parser.add_argument('--table', help='print the queries touching one table')
+    args = parser.parse_args()
+
+    print("🔍 Cataloging Drizzle queries...")
+    catalog = build_catalog(args.files or DEFAULT_FILES)
+
+    if args.table:
+        for query in catalog.for_table(args.table):
+            print_query(query)
+        return
+
+    write_catalog(catalog, args.output)
+    operations = Counter(query.operation for query in catalog.queries)
+    print(f"\n📊 {len(catalog.queries)} queries in {len(catalog.files)} files")
+    for operation, count in operations.most_common():
+        print(f"   {operation:<8} {count}")
+
+    print("\n🔥 Most queried tables:")
+    summary = catalog.summary()
+    for name, entry in sorted(summary.items(), key=lambda item: -item[1]['queries'])[:15]:
+        columns = ', '.join(list(entry['filter_columns'])[:5])
+        print(f"   {name:<28} {entry['queries']:>4} queries  filters: {columns}")
+
+    print(f"\n✅ Catalog saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Query Log Report
+
+Aggregates the .manus/db query captures by statement shape. Every capture is
+read with the streaming scanner in db_query_log.py (the `rows` payload is
+counted and measured, never loaded), its query is reduced to a literal-free
+fingerprint (sql_access.fingerprint) and the captures are grouped per
+fingerprint: executions, failures, returned rows, result payload size,
+execution time and the first/last capture time taken from the file names.
+
+Files are scanned in batches on a process pool; each worker returns partial
+aggregates that are merged in the parent, so the work scales with the number
+of cores rather than the size of the captures. The report is written to
+query-log-report.json.
+
+Usage:
+    python scripts/query_log_report.py
+    python scripts/query_log_report.py --top 30 --jobs 8
+    python scripts/query_log_report.py --log-dir /tmp/captures --output captures.json
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from db_query_log import LOG_DIR, log_files, scan_entry
+from sql_access import SQL_KEYWORDS, fingerprint, fingerprint_id
+
+PROJECT_ROOT = Path(__file__).parent.parent
+OUTPUT_FILE = PROJECT_ROOT / 'query-log-report.json'
+
+BATCH_SIZE = 256
+SAMPLE_LENGTH = 400
+_IF_EXISTS = r'(?:\s+IF(?:\s+NOT)?\s+EXISTS)?'
+TABLE_REF = re.compile(rf'\b(?:FROM|JOIN|INTO|UPDATE|DESCRIBE|DESC|TABLE{_IF_EXISTS}|INDEX{_IF_EXISTS}\s+[\w$]+\s+ON)'
+                       r'\s+([A-Za-z_$][\w$]*)')
+
+
+@dataclass
+class FingerprintStats:
+    """Aggregate of every capture sharing one fingerprint"""
+    fingerprint: str
+    verb: str
+    tables: List[str]
+    sample: str
+    count: int = 0
+    failed: int = 0
+    rows_total: int = 0
+    rows_max: int = 0
+    result_chars: int = 0
+    timed: int = 0
+    time_total_ms: float = 0.0
+    time_max_ms: float = 0.0
+    first_seen: str = ''
+    last_seen: str = ''
+    files: List[str] = field(default_factory=list)   # first and last capture
+
+    def merge(self, other: 'FingerprintStats') -> None:
+        self.count += other.count
+        self.failed += other.failed
+        self.rows_total += other.rows_total
+        self.rows_max = max(self.rows_max, other.rows_max)
+        self.result_chars += other.result_chars
+        self.timed += other.timed
+        self.time_total_ms += other.time_total_ms
+        self.time_max_ms = max(self.time_max_ms, other.time_max_ms)
+        if other.first_seen < self.first_seen:
+            self.first_seen, self.sample = other.first_seen, other.sample
+            self.files[0] = other.files[0]
+        if other.last_seen > self.last_seen:
+            self.last_seen = other.last_seen
+            self.files[-1] = other.files[-1]
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': fingerprint_id(self.fingerprint),
+            'verb': self.verb,
+            'tables': self.tables,
+            'count': self.count,
+            'failed': self.failed,
+            'rows': {'total': self.rows_total, 'max': self.rows_max,
+                     'avg': round(self.rows_total / self.count, 1) if self.count else 0},
+            'result_chars': self.result_chars,
+            'execution_ms': ({'total': round(self.time_total_ms, 1), 'max': round(self.time_max_ms, 1),
+                              'avg': round(self.time_total_ms / self.timed, 1)} if self.timed else None),
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'files': list(dict.fromkeys(self.files)),
+            'fingerprint': self.fingerprint,
+            'sample': self.sample,
+        }
+
+
+@lru_cache(maxsize=4096)
+def _shape(query: str) -> tuple:
+    """(fingerprint, verb, tables) of a query; captures repeat exact query text often"""
+    text = fingerprint(query)
+    verb = text.split(' ', 1)[0].upper() if text else ''
+    tables = list(dict.fromkeys(name for name in TABLE_REF.findall(text) if name.upper() not in SQL_KEYWORDS))
+    return text, verb, tables
+
+
+def analyze_batch(paths: List[str]) -> Dict:
+    """Partial aggregates for one batch of capture files (runs in a worker process)"""
+    stats: Dict[str, FingerprintStats] = {}
+    unreadable: List[str] = []
+    for path in paths:
+        entry = scan_entry(Path(path))
+        if entry is None:
+            unreadable.append(Path(path).name)
+            continue
+        text, verb, tables = _shape(entry.query)
+        seen = entry.timestamp.isoformat(timespec='seconds')
+        item = stats.get(text)
+        if item is None:
+            item = stats[text] = FingerprintStats(
+                fingerprint=text, verb=verb, tables=tables, sample=entry.query.strip()[:SAMPLE_LENGTH],
+                first_seen=seen, last_seen=seen, files=[entry.path.name, entry.path.name])
+        item.count += 1
+        item.failed += entry.failed
+        item.rows_total += entry.row_count
+        item.rows_max = max(item.rows_max, entry.row_count)
+        item.result_chars += entry.result_chars
+        if isinstance(entry.execution_time_ms, (int, float)):
+            item.timed += 1
+            item.time_total_ms += entry.execution_time_ms
+            item.time_max_ms = max(item.time_max_ms, entry.execution_time_ms)
+        if seen > item.last_seen:
+            item.last_seen = seen
+            item.files[-1] = entry.path.name
+    return {'stats': stats, 'unreadable': unreadable}
+
+
+def aggregate(paths: List[Path], jobs: int, batch_size: int = BATCH_SIZE) -> Dict:
+    """Scan every capture (in parallel when there is more than one batch) and merge the partials"""
+    batches = [[str(path) for path in paths[i:i + batch_size]] for i in range(0, len(paths), batch_size)]
+    if jobs <= 1 or len(batches) <= 1:
+        partials = [analyze_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            partials = list(pool.map(analyze_batch, batches))
+
+    merged: Dict[str, FingerprintStats] = {}
+    unreadable: List[str] = []
+    for partial in partials:
+        unreadable.extend(partial['unreadable'])
+        for text, item in partial['stats'].items():
+            if text in merged:
+                merged[text].merge(item)
+            else:
+                merged[text] = item
+    return {'stats': merged, 'unreadable': unreadable}
+
+
+def build_report(log_dir: Path = LOG_DIR, jobs: int = 1, batch_size: int = BATCH_SIZE) -> Dict:
+    paths = log_files(log_dir)
+    result = aggregate(paths, jobs, batch_size)
+    stats = sorted(result['stats'].values(), key=lambda item: (-item.count, -item.result_chars, item.fingerprint))
+    verbs: Dict[str, Dict[str, int]] = {}
+    for item in stats:
+        summary = verbs.setdefault(item.verb, {'fingerprints': 0, 'count': 0, 'failed': 0, 'rows': 0})
+        summary['fingerprints'] += 1
+        summary['count'] += item.count
+        summary['failed'] += item.failed
+        summary['rows'] += item.rows_total
+    try:
+        source = str(log_dir.relative_to(PROJECT_ROOT))
+    except ValueError:
+        source = str(log_dir)
+    return {
+        'source': source,
+        'files': len(paths),
+        'captures': sum(item.count for item in stats),
+        'unreadable': result['unreadable'],
+        'first_seen': min((item.first_seen for item in stats), default=None),
+        'last_seen': max((item.last_seen for item in stats), default=None),
+        'by_verb': dict(sorted(verbs.items(), key=lambda pair: -pair[1]['count'])),
+        'fingerprints': [item.to_dict() for item in stats],
+    }
+
+
+def _shorten(text: str, width: int = 90) -> str:
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate .manus/db query captures by fingerprint')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='capture directory (default: .manus/db)')
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE, help='report path')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='capture files per worker task')
+    parser.add_argument('--top', type=int, default=15, help='fingerprints to print')
+    args = parser.parse_args()
+
+    print(f"🔍 Scanning {args.log_dir}...")
+    report = build_report(args.log_dir, args.jobs, args.batch_size)
+    fingerprints = report['fingerprints']
+    print(f"   {report['captures']} captures in {len(fingerprints)} fingerprints "
+          f"({report['first_seen']} .. {report['last_seen']})")
+    if report['unreadable']:
+        print(f"⚠️  {len(report['unreadable'])} unreadable captures")
+
+    print("\n📊 By statement type:")
+    for verb, summary in report['by_verb'].items():
+        print(f"   {verb or '?':<10} {summary['count']:>6} captures  {summary['fingerprints']:>4} fingerprints  "
+              f"{summary['failed']:>4} failed  {summary['rows']:>8} rows")
+
+    print(f"\n📈 Top {min(args.top, len(fingerprints))} fingerprints:")
+    for item in fingerprints[:args.top]:
+        failed = f", {item['failed']} failed" if item['failed'] else ''
+        print(f"   {item['count']:>5}x  {item['id']}  rows avg {item['rows']['avg']:g} max {item['rows']['max']}{failed}")
+        print(f"          {_shorten(item['fingerprint'])}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Schema Timeline
+
+Replays the DDL captured in the .manus/db query logs (CREATE/ALTER/DROP
+TABLE, CREATE/DROP INDEX) in timestamp order on an in-memory table model,
+and folds in what the database itself reported along the way: DESCRIBE /
+SHOW COLUMNS output replaces the replayed columns (and records where the
+replay had diverged), SHOW INDEX output replaces the indexes, SHOW TABLES
+lists the tables that exist. Failed captures are skipped. The result is the
+columns and indexes of every table at every point in the log.
+
+The final state is then diffed against drizzle/schema.ts and against the
+drizzle/*.sql migrations replayed in file order. Index drift (declared
+indexes the database does not have, indexes the database has that nothing
+declares, renamed or re-uniqued indexes, duplicates) is reported separately
+from column drift. Comparisons only go as far as the replay knows: a table
+that was only ever ALTERed is not reported as missing columns.
+
+Usage:
+    python scripts/schema_timeline.py
+    python scripts/schema_timeline.py --table tasks --history
+    python scripts/schema_timeline.py --at 2025-11-15T12:00 --table defects
+"""
+
+import argparse
+import json
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db_query_log import LOG_DIR, LogEntry, iter_entries
+from drizzle_schema import Schema, load_schema
+from sql_ddl import ColumnDef, DdlOp, IndexDef, TableState, apply_op, normalize_type, parse_statement, split_statements
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MIGRATIONS_DIR = PROJECT_ROOT / 'drizzle'
+REPORT_FILE = PROJECT_ROOT / 'schema-timeline.json'
+
+# drizzle column builder -> MySQL type family
+BUILDER_TYPES = {'mysqlEnum': 'enum', 'boolean': 'tinyint', 'serial': 'bigint'}
+
+
+@dataclass
+class TimelineEvent:
+    """One schema change or observation"""
+    timestamp: str
+    source: str                 # capture file or migration file
+    table: str
+    kind: str                   # DDL operation kind, or observe_columns / observe_indexes / observe_tables
+    detail: str
+    note: Optional[str] = None  # why it did not apply as written, or what the observation contradicted
+
+
+@dataclass
+class Timeline:
+    tables: Dict[str, TableState] = field(default_factory=dict)
+    events: List[TimelineEvent] = field(default_factory=list)
+    # leading column -> DESCRIBE key flag (PRI/UNI/MUL) from the latest full DESCRIBE of a table
+    key_flags: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    observed_tables: Optional[List[str]] = None     # latest SHOW TABLES
+    captures: int = 0
+    skipped_failed: int = 0
+
+    def history(self, table: str) -> List[TimelineEvent]:
+        return [event for event in self.events if event.table == table]
+
+
+@dataclass
+class Drift:
+    table: str
+    kind: str
+    detail: str
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def _describe(op: DdlOp) -> str:
+    if op.column is not None and op.kind in ('add_column', 'modify_column', 'change_column'):
+        null = '' if op.column.nullable else ' NOT NULL'
+        return f"{op.column.name} {op.column.type}{null}"
+    if op.index is not None:
+        kind = 'PRIMARY' if op.index.primary else 'UNIQUE ' if op.index.unique else ''
+        return f"{kind}{op.index.name} ({', '.join(op.index.columns)})".strip()
+    if op.new_name:
+        return f"{op.name} -> {op.new_name}"
+    if op.kind == 'create_table':
+        return f"{len(op.columns)} columns, {len(op.indexes)} indexes"
+    return op.name or op.text[:80]
+
+
+def _apply_sql(timeline: Timeline, sql: str, timestamp: str, source: str) -> int:
+    """Apply every DDL statement in a script; returns the number applied"""
+    applied = 0
+    for tokens in split_statements(sql):
+        statement = parse_statement(tokens)
+        if statement is None:
+            continue
+        applied += 1
+        for op in statement.ops:
+            before = timeline.tables.get(op.table)
+            leading = before.indexes.get(op.name or '') if before is not None and op.kind == 'drop_index' else None
+            note = apply_op(timeline.tables, op)
+            timeline.events.append(TimelineEvent(timestamp, source, op.table, op.kind, _describe(op), note))
+            flags = timeline.key_flags.get(op.table)
+            if flags is None:
+                continue
+            if op.kind == 'add_index' and op.index is not None and op.index.columns:
+                flags.setdefault(op.index.columns[0], 'UNI' if op.index.unique else 'MUL')
+            elif op.kind == 'drop_index' and leading is not None and leading.columns:
+                state = timeline.tables.get(op.table)
+                if state is not None and not any(index.columns[:1] == leading.columns[:1]
+                                                 for index in state.indexes.values()):
+                    flags.pop(leading.columns[0], None)
+            elif op.kind == 'drop_table':
+                timeline.key_flags.pop(op.table, None)
+    return applied
+
+
+def _statement_words(tokens) -> List[str]:
+    return [token.upper for token in tokens[:4]]
+
+
+def _observed_column(row: Dict) -> ColumnDef:
+    default = row.get('Default')
+    return ColumnDef(
+        name=row.get('Field', ''),
+        type=normalize_type(row.get('Type', '')),
+        nullable=row.get('Null') == 'YES',
+        default=None if default in (None, 'NULL') else default,
+        auto_increment='auto_increment' in (row.get('Extra') or ''),
+    )
+
+
+def _observe_columns(timeline: Timeline, table: str, rows: List[Dict], full: bool, timestamp: str, source: str) -> None:
+    observed = [_observed_column(row) for row in rows if isinstance(row, dict) and row.get('Field')]
+    if not observed:
+        return
+    state = timeline.tables.get(table)
+    notes = []
+    if state is not None and state.columns_complete and full:
+        replayed, actual = set(state.columns), {column.name for column in observed}
+        if replayed - actual:
+            notes.append(f"replay had {', '.join(sorted(replayed - actual))}")
+        if actual - replayed:
+            notes.append(f"database also has {', '.join(sorted(actual - replayed))}")
+    if state is not None:
+        for column in observed:
+            known = state.columns.get(column.name)
+            if known is not None and known.type and known.type != column.type:
+                notes.append(f"{column.name} is {column.type}, replay had {known.type}")
+    if state is None:
+        state = timeline.tables[table] = TableState(name=table)
+    if full:
+        state.columns = {column.name: column for column in observed}
+        state.columns_complete = True
+        timeline.key_flags[table] = {row['Field']: row['Key'] for row in rows
+                                     if isinstance(row, dict) and row.get('Key') and row.get('Field')}
+        if any(row.get('Key') == 'PRI' for row in rows if isinstance(row, dict)):
+            primary = [row['Field'] for row in rows if isinstance(row, dict) and row.get('Key') == 'PRI']
+            state.indexes.setdefault('PRIMARY', IndexDef('PRIMARY', primary, unique=True, primary=True))
+    else:
+        for column in observed:
+            state.columns[column.name] = column
+    timeline.events.append(TimelineEvent(timestamp, source, table, 'observe_columns',
+                                         f"{len(observed)} columns{'' if full else ' (filtered)'}",
+                                         '; '.join(notes) or None))
+
+
+def _observe_indexes(timeline: Timeline, table: str, rows: List[Dict], full: bool, timestamp: str, source: str) -> None:
+    grouped: Dict[str, List[Tuple[int, str]]] = {}
+    unique: Dict[str, bool] = {}
+    for row in rows:
+        if not isinstance(row, dict) or not row.get('Key_name'):
+            continue
+        name = row['Key_name']
+        grouped.setdefault(name, []).append((int(row.get('Seq_in_index') or 0), row.get('Column_name', '')))
+        unique[name] = str(row.get('Non_unique')) == '0'
+    observed = {name: IndexDef(name, [column for _, column in sorted(parts)], unique=unique[name],
+                               primary=name == 'PRIMARY')
+                for name, parts in grouped.items()}
+    if not observed and not full:
+        return
+    state = timeline.tables.get(table)
+    if state is None:
+        state = timeline.tables[table] = TableState(name=table)
+    notes = []
+    for name, index in observed.items():
+        known = state.indexes.get(name)
+        if known is not None and known.columns != index.columns:
+            notes.append(f"{name} is ({', '.join(index.columns)}), replay had ({', '.join(known.columns)})")
+    if full:
+        if state.indexes_complete:
+            missing = sorted(set(state.indexes) - set(observed))
+            if missing:
+                notes.append(f"replay had {', '.join(missing)}")
+        state.indexes = observed
+        state.indexes_complete = True
+    else:
+        state.indexes.update(observed)
+    timeline.events.append(TimelineEvent(timestamp, source, table, 'observe_indexes',
+                                         f"{len(observed)} indexes{'' if full else ' (filtered)'}",
+                                         '; '.join(notes) or None))
+
+
+def _observe(timeline: Timeline, tokens, rows: List[Dict], timestamp: str, source: str) -> bool:
+    """Fold a DESCRIBE / SHOW result into the timeline; False when the statement is not an observation"""
+    words = _statement_words(tokens)
+    uppers = [token.upper for token in tokens]
+    filtered = 'LIKE' in uppers or 'WHERE' in uppers
+    if words[:1] in (['DESCRIBE'], ['DESC'], ['EXPLAIN']) and len(tokens) >= 2 and tokens[1].kind == 'word':
+        if words[1] in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'):
+            return False
+        _observe_columns(timeline, tokens[1].text, rows, len(tokens) == 2, timestamp, source)
+        return True
+    if words[:1] != ['SHOW']:
+        return False
+    rest = [word for word in words[1:] if word not in ('FULL', 'EXTENDED')]
+    table_at = next((i for i, token in enumerate(tokens) if token.upper in ('FROM', 'IN')), None)
+    table = tokens[table_at + 1].text if table_at is not None and table_at + 1 < len(tokens) else None
+    if rest[:1] in (['COLUMNS'], ['FIELDS']) and table:
+        _observe_columns(timeline, table, rows, not filtered, timestamp, source)
+    elif rest[:1] in (['INDEX'], ['INDEXES'], ['KEYS']) and table:
+        _observe_indexes(timeline, table, rows, not filtered, timestamp, source)
+    elif rest[:2] == ['CREATE', 'TABLE'] and rows and isinstance(rows[0], dict):
+        statement = parse_statement(split_statements(rows[0].get('Create Table', ''))[0]) \
+            if rows[0].get('Create Table') else None
+        if statement is None or not statement.ops or not statement.ops[0].columns:
+            return True     # the mysql client only captured the first line
+        timeline.tables.pop(statement.table, None)
+        _apply_sql(timeline, rows[0]['Create Table'], timestamp, source)
+    elif rest[:1] == ['TABLES'] and not filtered:
+        names = sorted(str(value) for row in rows if isinstance(row, dict) for value in row.values())
+        if names:
+            unknown = [name for name in names if name not in timeline.tables and not name.startswith('__')]
+            gone = [name for name in timeline.tables if name not in names]
+            note = '; '.join(part for part in (
+                f"not replayed: {', '.join(unknown)}" if unknown else '',
+                f"replayed but absent: {', '.join(sorted(gone))}" if gone else '') if part)
+            timeline.observed_tables = names
+            timeline.events.append(TimelineEvent(timestamp, source, '*', 'observe_tables',
+                                                 f"{len(names)} tables", note or None))
+    else:
+        return False
+    return True
+
+
+def replay_logs(entries: Iterable[LogEntry], until: Optional[datetime] = None) -> Timeline:
+    """Apply the captured DDL and observations in timestamp order"""
+    timeline = Timeline()
+    for entry in entries:
+        if until is not None and entry.timestamp > until:
+            break
+        statements = split_statements(entry.query)
+        if not statements:
+            continue
+        words = _statement_words(statements[0])
+        if not words or words[0] not in ('CREATE', 'ALTER', 'DROP', 'RENAME', 'DESCRIBE', 'DESC', 'SHOW'):
+            continue
+        if entry.failed:
+            timeline.skipped_failed += 1
+            continue
+        timeline.captures += 1
+        timestamp = entry.timestamp.isoformat(timespec='seconds')
+        rows = entry.rows if isinstance(entry.rows, list) else []
+        if len(statements) == 1 and _observe(timeline, statements[0], rows, timestamp, entry.path.name):
+            continue
+        _apply_sql(timeline, entry.query, timestamp, entry.path.name)
+    return timeline
+
+
+def migration_files(directory: Path = MIGRATIONS_DIR) -> List[Path]:
+    """drizzle/*.sql in name order (numbered migrations first, then the hand-written scripts)"""
+    return sorted(directory.glob('*.sql'), key=lambda path: (not path.name[:1].isdigit(), path.name))
+
+
+def replay_migrations(directory: Path = MIGRATIONS_DIR) -> Timeline:
+    timeline = Timeline()
+    for path in migration_files(directory):
+        timeline.captures += _apply_sql(timeline, path.read_text(encoding='utf-8'), '', path.name)
+    return timeline
+
+
+def schema_tables(schema: Schema) -> Dict[str, TableState]:
+    """drizzle/schema.ts as table states keyed by SQL table name"""
+    tables = {}
+    for table in schema.tables.values():
+        state = TableState(name=table.sql_name, columns_complete=True, indexes_complete=True)
+        for column in table.columns.values():
+            state.columns[column.sql_name] = ColumnDef(
+                name=column.sql_name,
+                type=BUILDER_TYPES.get(column.type, column.type.lower()),
+                nullable=not column.not_null,
+                auto_increment=column.auto_increment,
+            )
+        for index in table.all_indexes():
+            state.indexes[index.name] = IndexDef(index.name, list(index.columns), index.unique, index.primary)
+        tables[table.sql_name] = state
+    return tables
+
+
+# ----------------------------------------------------------------------
+# Diff
+# ----------------------------------------------------------------------
+
+def _types_differ(actual: str, expected: str) -> bool:
+    if '(' in actual and '(' in expected:
+        return actual != expected
+    return actual.split('(', 1)[0] != expected.split('(', 1)[0]
+
+
+def diff_indexes(actual: TableState, expected: TableState, key_flags: Optional[Dict[str, str]]) -> List[Drift]:
+    drift = []
+    table = expected.name
+    by_signature: Dict[Tuple[str, ...], List[IndexDef]] = {}
+    for index in actual.indexes.values():
+        by_signature.setdefault(index.signature, []).append(index)
+    for signature, indexes in by_signature.items():
+        if len(indexes) > 1:
+            drift.append(Drift(table, 'duplicate_index',
+                               f"{', '.join(index.name for index in indexes)} all cover ({', '.join(signature)})"))
+
+    expected_by_signature: Dict[Tuple[str, ...], List[IndexDef]] = {}
+    for index in expected.indexes.values():
+        expected_by_signature.setdefault(index.signature, []).append(index)
+    for signature, declared in expected_by_signature.items():
+        index = declared[0]
+        columns = ', '.join(signature)
+        found = by_signature.get(signature)
+        if not found:
+            if actual.indexes_complete:
+                drift.append(Drift(table, 'missing_index', f"{index.name} ({columns}) is declared but not in the database"))
+            elif key_flags is not None and signature and signature[0] not in key_flags:
+                drift.append(Drift(table, 'missing_index',
+                                   f"{index.name} ({columns}) is declared but DESCRIBE shows no key on {signature[0]}"))
+            continue
+        names = {candidate.name for candidate in declared}
+        match = next((candidate for candidate in found if candidate.name in names), found[0])
+        if match.name not in names and not index.primary:
+            drift.append(Drift(table, 'renamed_index', f"({columns}) is {match.name} in the database, declared {index.name}"))
+        if match.unique != any(candidate.unique for candidate in declared) and not index.primary:
+            drift.append(Drift(table, 'index_uniqueness',
+                               f"{match.name} ({columns}) is {'UNIQUE' if match.unique else 'non-unique'}, "
+                               f"declared {'non-unique' if match.unique else 'UNIQUE'}"))
+    for index in actual.indexes.values():
+        if index.signature not in expected_by_signature:
+            drift.append(Drift(table, 'extra_index', f"{index.name} ({', '.join(index.columns)}) is not declared"))
+    if key_flags is not None and not actual.indexes_complete:
+        declared_leading = {index.columns[0] for index in expected.indexes.values() if index.columns}
+        known_leading = {index.columns[0] for index in actual.indexes.values() if index.columns}
+        for column, flag in sorted(key_flags.items()):
+            if column not in declared_leading and column not in known_leading:
+                drift.append(Drift(table, 'extra_index', f"DESCRIBE shows a {flag} key on {column}; nothing declared leads with it"))
+    return drift
+
+
+def diff_columns(actual: TableState, expected: TableState) -> List[Drift]:
+    drift = []
+    table = expected.name
+    for name, column in expected.columns.items():
+        found = actual.columns.get(name)
+        if found is None:
+            if actual.columns_complete:
+                drift.append(Drift(table, 'missing_column', f"{name} {column.type}"))
+            continue
+        if found.type and column.type and _types_differ(found.type, column.type):
+            drift.append(Drift(table, 'column_type', f"{name} is {found.type}, expected {column.type}"))
+        if found.nullable != column.nullable and not column.auto_increment:
+            drift.append(Drift(table, 'nullability',
+                               f"{name} is {'NULL' if found.nullable else 'NOT NULL'}, expected "
+                               f"{'NULL' if column.nullable else 'NOT NULL'}"))
+    if expected.columns_complete:
+        for name, column in actual.columns.items():
+            if name not in expected.columns:
+                drift.append(Drift(table, 'extra_column', f"{name} {column.type}"))
+    return drift
+
+
+def diff_timeline(timeline: Timeline, expected: Dict[str, TableState], tables_complete: bool = False) -> Dict[str, List[Drift]]:
+    """Drift of the replayed state against an expected schema, split into table, column and index drift"""
+    result: Dict[str, List[Drift]] = {'tables': [], 'columns': [], 'indexes': []}
+    present = set(timeline.tables)
+    known = set(timeline.observed_tables) if timeline.observed_tables is not None else None
+    for name in sorted(expected):
+        if name in present:
+            continue
+        if tables_complete or (known is not None and name not in known):
+            result['tables'].append(Drift(name, 'missing_table', 'declared but not in the database'))
+    for name in sorted(present):
+        if name not in expected:
+            result['tables'].append(Drift(name, 'extra_table', 'in the database but not declared'))
+            continue
+        actual = timeline.tables[name]
+        result['columns'].extend(diff_columns(actual, expected[name]))
+        result['indexes'].extend(diff_indexes(actual, expected[name], timeline.key_flags.get(name)))
+    return result
+
+
+# ----------------------------------------------------------------------
+# Report
+# ----------------------------------------------------------------------
+
+def table_to_dict(state: TableState) -> Dict:
+    return {
+        'columns': [asdict(column) for column in state.columns.values()],
+        'indexes': [asdict(index) for index in state.indexes.values()],
+        'columns_complete': state.columns_complete,
+        'indexes_complete': state.indexes_complete,
+    }
+
+
+def build_report(log_dir: Path = LOG_DIR, until: Optional[datetime] = None) -> Tuple[Dict, Timeline]:
+    timeline = replay_logs(iter_entries(log_dir), until)
+    migrations = replay_migrations()
+    declared = schema_tables(load_schema())
+    drift = {
+        'schema.ts': diff_timeline(timeline, declared),
+        'migrations': diff_timeline(timeline, migrations.tables),
+    }
+    report = {
+        'until': until.isoformat() if until else None,
+        'captures': timeline.captures,
+        'skipped_failed': timeline.skipped_failed,
+        'observed_tables': timeline.observed_tables,
+        'tables': {
+            name: {**table_to_dict(state), 'history': [asdict(event) for event in timeline.history(name)]}
+            for name, state in sorted(timeline.tables.items())
+        },
+        'drift': {
+            target: {kind: [asdict(item) for item in items] for kind, items in result.items()}
+            for target, result in drift.items()
+        },
+        'migrations': {
+            'files': [path.name for path in migration_files()],
+            'notes': [asdict(event) for event in migrations.events if event.note],
+        },
+    }
+    return report, timeline
+
+
+def _print_table(name: str, state: TableState) -> None:
+    completeness = ', '.join(part for part, on in (('columns known', state.columns_complete),
+                                                   ('indexes known', state.indexes_complete)) if on) or 'partial'
+    print(f"   {name} ({completeness})")
+    for column in state.columns.values():
+        print(f"      {column.name:<28} {column.type}{'' if column.nullable else ' NOT NULL'}")
+    for index in state.indexes.values():
+        kind = 'PRIMARY KEY' if index.primary else 'UNIQUE' if index.unique else 'INDEX'
+        print(f"      {kind} {index.name} ({', '.join(index.columns)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured DDL into a schema timeline and diff it')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='capture directory (default: .manus/db)')
+    parser.add_argument('--at', type=datetime.fromisoformat, help='replay only up to this time (ISO format)')
+    parser.add_argument('--table', action='append', dest='tables', help='print this table (repeatable)')
+    parser.add_argument('--history', action='store_true', help='print the change history of the printed tables')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Replaying captured DDL...")
+    report, timeline = build_report(args.log_dir, args.at)
+    kinds = Counter(event.kind for event in timeline.events)
+    print(f"   {timeline.captures} captures ({timeline.skipped_failed} failed DDL captures skipped), "
+          f"{len(timeline.tables)} tables")
+    print(f"   {sum(n for kind, n in kinds.items() if not kind.startswith('observe'))} schema changes, "
+          f"{sum(n for kind, n in kinds.items() if kind.startswith('observe'))} observations")
+    contradictions = [event for event in timeline.events if event.kind.startswith('observe') and event.note]
+    if contradictions:
+        print(f"\n🔎 {len(contradictions)} observations contradicted the replay:")
+        for event in contradictions:
+            print(f"   {event.timestamp} {event.table}: {event.note}")
+
+    for target, result in report['drift'].items():
+        print(f"\n⚠️  Index drift against {target}: {len(result['indexes'])}")
+        for item in result['indexes']:
+            print(f"   {item['table']}: [{item['kind']}] {item['detail']}")
+        print(f"📊 Column drift against {target}: {len(result['columns'])}, table drift: {len(result['tables'])}")
+        for item in result['tables']:
+            print(f"   {item['table']}: [{item['kind']}] {item['detail']}")
+
+    for name in args.tables or []:
+        state = timeline.tables.get(name)
+        if state is None:
+            print(f"\n❌ {name} is not in the replayed schema")
+            continue
+        print()
+        _print_table(name, state)
+        if args.history:
+            for event in timeline.history(name):
+                note = f"  ({event.note})" if event.note else ''
+                print(f"      {event.timestamp} {event.kind:<16} {event.detail}{note}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
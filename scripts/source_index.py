@@ -0,0 +1,853 @@
+#!/usr/bin/env python3
+"""
+Shared Source Index
+
+Tokenizes a TypeScript source file once and keeps:
+  - a compact token stream (kind / start / end / bracket depth / matching
+    bracket, stored in arrays) with template literals split into
+    head/middle/tail parts so `${...}` expressions are tokenized too
+  - a bisect-able line-offset table
+  - a top-level symbol table (functions, const/arrow exports, classes with
+    their members, interfaces, types, enums) and the import declarations
+
+All offsets are byte offsets into the UTF-8 source, so spans can be sliced
+from a shared memoryview without decoding the file. Indexes are persisted
+under .cache/source-index/ keyed by content hash, so every analyzer and
+codemod in the repo can reuse them across runs.
+
+Usage:
+    from source_index import SourceIndex
+    index = SourceIndex.load('server/db.ts')
+    for symbol in index.symbols: ...
+
+    python scripts/source_index.py server/db.ts   # print the symbol table
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / '.cache' / 'source-index'
+
+# Bump when the lexer or symbol extraction changes so stale caches are ignored
+INDEX_VERSION = 1
+
+# Token kinds
+IDENT = 1
+NUMBER = 2
+STRING = 3
+TEMPLATE = 4          # `no substitutions`
+TEMPLATE_HEAD = 5     # `text${
+TEMPLATE_MIDDLE = 6   # }text${
+TEMPLATE_TAIL = 7     # }text`
+REGEX = 8
+PUNCT = 9
+
+KIND_NAMES = {
+    IDENT: 'ident', NUMBER: 'number', STRING: 'string', TEMPLATE: 'template',
+    TEMPLATE_HEAD: 'template_head', TEMPLATE_MIDDLE: 'template_middle',
+    TEMPLATE_TAIL: 'template_tail', REGEX: 'regex', PUNCT: 'punct',
+}
+
+OPENERS = {b'(': b')', b'[': b']', b'{': b'}'}
+CLOSERS = {b')', b']', b'}'}
+
+# Keywords after which a `/` starts a regex literal rather than a division
+REGEX_PREFIX_KEYWORDS = {
+    b'return', b'typeof', b'instanceof', b'in', b'of', b'new', b'delete', b'void',
+    b'throw', b'case', b'do', b'else', b'yield', b'await',
+}
+
+STATEMENT_KEYWORDS = {
+    'export', 'import', 'const', 'let', 'var', 'function', 'async', 'class',
+    'interface', 'type', 'enum', 'declare', 'abstract',
+}
+
+MEMBER_MODIFIERS = {
+    'public', 'private', 'protected', 'static', 'readonly', 'async', 'override',
+    'abstract', 'declare', 'get', 'set', 'accessor',
+}
+
+WHITESPACE = re.compile(rb'[ \t\r\n\f\v]+|\xc2\xa0|\xef\xbb\xbf|\xe2\x80[\xa8\xa9]')
+LINE_COMMENT = re.compile(rb'//[^\n]*')
+BLOCK_COMMENT = re.compile(rb'/\*[\s\S]*?(?:\*/|\Z)')
+IDENTIFIER = re.compile(rb'(?:[A-Za-z_$]|[\x80-\xff])(?:[\w$]|[\x80-\xff])*')
+NUMBER_LITERAL = re.compile(
+    rb'0[xX][0-9a-fA-F_]+n?|0[bB][01_]+n?|0[oO][0-7_]+n?'
+    rb'|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?'
+)
+SINGLE_QUOTED = re.compile(rb"'(?:[^'\\\n]|\\[\s\S])*'?")
+DOUBLE_QUOTED = re.compile(rb'"(?:[^"\\\n]|\\[\s\S])*"?')
+TEMPLATE_CHUNK = re.compile(rb'(?:[^`\\$]|\\[\s\S]|\$(?!\{))*(`|\$\{|\Z)')
+REGEX_LITERAL = re.compile(rb'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+PUNCTUATOR = re.compile(
+    rb'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||\?\?'
+    rb'|\?\.(?!\d)|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|>>|\*\*|[{}()\[\];,<>+\-*/%&|^!~?:=.@#]'
+)
+
+
+@dataclass
+class Symbol:
+    """A top-level declaration (or class member) with its span"""
+    name: str
+    kind: str                  # function | arrow | const | class | method | property | interface | type | enum
+    exported: bool
+    is_async: bool
+    start: int                 # byte offset of the first token (incl. `export`)
+    end: int                   # byte offset just past the last token
+    start_line: int
+    end_line: int
+    start_token: int
+    end_token: int             # inclusive
+    body_token: int = -1       # `{` of the function/method/class body, if any
+    members: List['Symbol'] = field(default_factory=list)
+
+
+@dataclass
+class ImportDecl:
+    """An `import ... from "module"` declaration"""
+    module: str
+    default: Optional[str]
+    namespace: Optional[str]
+    named: List[Tuple[str, str]]   # (imported, local)
+    type_only: bool
+    start: int
+    end: int
+    start_line: int
+
+
+class Lexer:
+    """Single forward pass producing the token arrays"""
+
+    def __init__(self, source: bytes):
+        self.source = source
+        self.kinds = bytearray()
+        self.starts = array('I')
+        self.ends = array('I')
+        self.depths = array('H')
+        self.pairs = array('i')
+        self.comments: List[Tuple[int, int]] = []
+
+    def _emit(self, kind: int, start: int, end: int, depth: int) -> int:
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.depths.append(min(depth, 0xFFFF))
+        self.pairs.append(-1)
+        return len(self.kinds) - 1
+
+    def _regex_allowed(self) -> bool:
+        if not self.kinds:
+            return True
+        kind = self.kinds[-1]
+        text = self.source[self.starts[-1]:self.ends[-1]]
+        if kind == IDENT:
+            return text in REGEX_PREFIX_KEYWORDS
+        if kind in (NUMBER, STRING, TEMPLATE, TEMPLATE_TAIL, REGEX):
+            return False
+        return text not in (b')', b']', b'}', b'++', b'--')
+
+    def _template(self, pos: int, depth: int, stack: List[Tuple[int, bool]], continuing: bool) -> int:
+        """Lex a template chunk starting at "`" (or at "}" when continuing after `${...}`)"""
+        match = TEMPLATE_CHUNK.match(self.source, pos + 1)
+        end = match.end()
+        terminator = match.group(1)
+        if terminator == b'${':
+            kind = TEMPLATE_MIDDLE if continuing else TEMPLATE_HEAD
+            index = self._emit(kind, pos, end, depth)
+            if continuing:
+                self.pairs[stack[-1][0]] = index
+                stack.pop()
+            stack.append((index, True))
+        else:
+            kind = TEMPLATE_TAIL if continuing else TEMPLATE
+            index = self._emit(kind, pos, end, depth)
+            if continuing:
+                self.pairs[stack[-1][0]] = index
+                stack.pop()
+        return end
+
+    def run(self) -> 'Lexer':
+        source = self.source
+        length = len(source)
+        pos = 0
+        stack: List[Tuple[int, bool]] = []   # (opener token index, is template `${`)
+
+        while pos < length:
+            byte = source[pos:pos + 1]
+
+            match = WHITESPACE.match(source, pos)
+            if match:
+                pos = match.end()
+                continue
+
+            if byte == b'/':
+                nxt = source[pos + 1:pos + 2]
+                if nxt == b'/':
+                    end = LINE_COMMENT.match(source, pos).end()
+                    self.comments.append((pos, end))
+                    pos = end
+                    continue
+                if nxt == b'*':
+                    end = BLOCK_COMMENT.match(source, pos).end()
+                    self.comments.append((pos, end))
+                    pos = end
+                    continue
+                if self._regex_allowed():
+                    match = REGEX_LITERAL.match(source, pos)
+                    if match:
+                        self._emit(REGEX, pos, match.end(), len(stack))
+                        pos = match.end()
+                        continue
+
+            if byte == b'`':
+                pos = self._template(pos, len(stack), stack, continuing=False)
+                continue
+
+            if byte == b'}' and stack and stack[-1][1]:
+                pos = self._template(pos, len(stack) - 1, stack, continuing=True)
+                continue
+
+            if byte == b"'" or byte == b'"':
+                match = (SINGLE_QUOTED if byte == b"'" else DOUBLE_QUOTED).match(source, pos)
+                self._emit(STRING, pos, match.end(), len(stack))
+                pos = match.end()
+                continue
+
+            match = IDENTIFIER.match(source, pos)
+            if match:
+                self._emit(IDENT, pos, match.end(), len(stack))
+                pos = match.end()
+                continue
+
+            match = NUMBER_LITERAL.match(source, pos)
+            if match and match.end() > pos:
+                self._emit(NUMBER, pos, match.end(), len(stack))
+                pos = match.end()
+                continue
+
+            match = PUNCTUATOR.match(source, pos)
+            if match:
+                text = match.group(0)
+                end = match.end()
+                if text in OPENERS:
+                    index = self._emit(PUNCT, pos, end, len(stack))
+                    stack.append((index, False))
+                elif text in CLOSERS:
+                    # Pop to the matching opener; tolerate stray closers
+                    matched = None
+                    for depth in range(len(stack) - 1, -1, -1):
+                        opener, is_template = stack[depth]
+                        if not is_template and OPENERS[source[self.starts[opener]:self.ends[opener]]] == text:
+                            matched = depth
+                            break
+                    if matched is None:
+                        self._emit(PUNCT, pos, end, len(stack))
+                    else:
+                        del stack[matched + 1:]
+                        opener = stack.pop()[0]
+                        index = self._emit(PUNCT, pos, end, len(stack))
+                        self.pairs[opener] = index
+                        self.pairs[index] = opener
+                else:
+                    self._emit(PUNCT, pos, end, len(stack))
+                pos = end
+                continue
+
+            # Unknown byte (stray backslash, JSX text, ...): skip it
+            pos += 1
+
+        return self
+
+
+def build_line_starts(source: bytes) -> array:
+    """Byte offset of the first byte of every line"""
+    starts = array('I', [0])
+    find = source.find
+    pos = find(b'\n')
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find(b'\n', pos + 1)
+    return starts
+
+
+class SourceIndex:
+    """Token stream, line table and symbol table for one source file"""
+
+    def __init__(self, path: str, source: bytes, digest: str, lexer: Optional[Lexer] = None,
+                 state: Optional[Dict] = None):
+        self.path = path
+        self.source = source
+        self.digest = digest
+        self.view = memoryview(source)
+        if state is not None:
+            self.__dict__.update(state)
+            return
+        assert lexer is not None
+        self.kinds = lexer.kinds
+        self.starts = lexer.starts
+        self.ends = lexer.ends
+        self.depths = lexer.depths
+        self.pairs = lexer.pairs
+        self.comments = lexer.comments
+        self.line_starts = build_line_starts(source)
+        self.symbols: List[Symbol] = []
+        self.imports: List[ImportDecl] = []
+        SymbolTableBuilder(self).run()
+
+    # ------------------------------------------------------------------
+    # Construction and caching
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_bytes(cls, source: bytes, path: str = '<memory>') -> 'SourceIndex':
+        digest = hashlib.sha256(source).hexdigest()
+        return cls(path, source, digest, lexer=Lexer(source).run())
+
+    @classmethod
+    def load(cls, path: Union[str, Path], root: Path = PROJECT_ROOT, use_cache: bool = True) -> 'SourceIndex':
+        """Index a file, reusing the on-disk cache when the content hash matches"""
+        file_path = Path(path)
+        if not file_path.is_absolute():
+            file_path = root / file_path
+        source = file_path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        try:
+            rel_path = file_path.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            rel_path = str(file_path)
+
+        memo_key = (rel_path, digest)
+        cached = _MEMO.get(memo_key)
+        if cached is not None:
+            return cached
+
+        cache_file = CACHE_DIR / f'{digest}.v{INDEX_VERSION}.pickle'
+        if use_cache and cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    state = pickle.load(f)
+                index = cls(rel_path, source, digest, state=state)
+                _MEMO[memo_key] = index
+                return index
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+
+        index = cls(rel_path, source, digest, lexer=Lexer(source).run())
+        if use_cache:
+            index._save(cache_file)
+        _MEMO[memo_key] = index
+        return index
+
+    def _save(self, cache_file: Path) -> None:
+        state = {
+            'kinds': self.kinds, 'starts': self.starts, 'ends': self.ends,
+            'depths': self.depths, 'pairs': self.pairs, 'comments': self.comments,
+            'line_starts': self.line_starts, 'symbols': self.symbols, 'imports': self.imports,
+        }
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass  # the cache is an optimization only
+
+    # ------------------------------------------------------------------
+    # Tokens
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def tok(self, i: int) -> bytes:
+        """Raw bytes of token i"""
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def text(self, i: int) -> str:
+        """Decoded text of token i ('' when out of range)"""
+        if i < 0 or i >= len(self.kinds):
+            return ''
+        return self.source[self.starts[i]:self.ends[i]].decode('utf-8', 'replace')
+
+    def slice(self, start: int, end: int) -> str:
+        """Decoded source between two byte offsets"""
+        return self.source[start:end].decode('utf-8', 'replace')
+
+    def token_span_text(self, first: int, last: int) -> str:
+        """Decoded source from the start of token `first` to the end of token `last`"""
+        return self.slice(self.starts[first], self.ends[last])
+
+    def is_ident(self, i: int, text: Optional[bytes] = None) -> bool:
+        if i < 0 or i >= len(self.kinds) or self.kinds[i] != IDENT:
+            return False
+        return text is None or self.tok(i) == text
+
+    def is_punct(self, i: int, text: bytes) -> bool:
+        return 0 <= i < len(self.kinds) and self.kinds[i] == PUNCT and self.tok(i) == text
+
+    def match(self, i: int) -> int:
+        """Index of the bracket matching token i, or -1"""
+        return self.pairs[i]
+
+    def enclosing_bracket(self, i: int) -> int:
+        """Index of the innermost bracket opened before token i and still open there, or -1"""
+        j = i - 1
+        while j >= 0:
+            if self.kinds[j] == PUNCT:
+                text = self.tok(j)
+                if text in (b')', b']', b'}') and self.pairs[j] != -1:
+                    j = self.pairs[j] - 1
+                    continue
+                if text in (b'(', b'[', b'{'):
+                    return j
+            j -= 1
+        return -1
+
+    def token_at(self, offset: int) -> int:
+        """Index of the token containing (or following) a byte offset"""
+        return bisect_right(self.starts, offset) - 1
+
+    def newline_between(self, i: int, j: int) -> bool:
+        """True when a line break separates the end of token i from the start of token j"""
+        return self.source.find(b'\n', self.ends[i], self.starts[j]) != -1
+
+    def identifiers(self, first: int = 0, last: Optional[int] = None) -> Set[str]:
+        """Distinct identifier texts in a token range (inclusive)"""
+        last = len(self.kinds) - 1 if last is None else last
+        found = set()
+        for i in range(first, last + 1):
+            if self.kinds[i] == IDENT:
+                found.add(self.text(i))
+        return found
+
+    def iter_tokens(self, first: int = 0, last: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """Yield (index, kind, text) for a token range (inclusive)"""
+        last = len(self.kinds) - 1 if last is None else last
+        for i in range(first, last + 1):
+            yield i, self.kinds[i], self.text(i)
+
+    def template_parts(self, i: int) -> List[int]:
+        """For a template token, the head/middle/tail token indexes in order"""
+        parts = [i]
+        while self.kinds[parts[-1]] in (TEMPLATE_HEAD, TEMPLATE_MIDDLE) and self.pairs[parts[-1]] != -1:
+            parts.append(self.pairs[parts[-1]])
+        return parts
+
+    # ------------------------------------------------------------------
+    # Lines
+    # ------------------------------------------------------------------
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number of a byte offset"""
+        return bisect_right(self.line_starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, column) of a byte offset; column counts characters"""
+        line = bisect_right(self.line_starts, offset)
+        line_start = self.line_starts[line - 1]
+        column = len(self.source[line_start:offset].decode('utf-8', 'replace')) + 1
+        return line, column
+
+    def line_text(self, line: int) -> str:
+        start = self.line_starts[line - 1]
+        end = self.line_starts[line] - 1 if line < len(self.line_starts) else len(self.source)
+        return self.slice(start, end)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    # ------------------------------------------------------------------
+    # Symbols
+    # ------------------------------------------------------------------
+
+    def symbol(self, name: str) -> Optional[Symbol]:
+        for symbol in self.symbols:
+            if symbol.name == name:
+                return symbol
+        return None
+
+    def iter_functions(self, include_methods: bool = True) -> Iterator[Tuple[Optional[Symbol], Symbol]]:
+        """Yield (owning class or None, function symbol) for every function-like symbol"""
+        for symbol in self.symbols:
+            if symbol.kind in ('function', 'arrow'):
+                yield None, symbol
+            elif symbol.kind == 'class' and include_methods:
+                for member in symbol.members:
+                    if member.kind == 'method':
+                        yield symbol, member
+
+    def enclosing_function(self, token: int) -> Optional[Tuple[Optional[Symbol], Symbol]]:
+        """The (class, function) whose span contains a token"""
+        for owner, symbol in self.iter_functions():
+            if symbol.start_token <= token <= symbol.end_token:
+                return owner, symbol
+        return None
+
+
+class SymbolTableBuilder:
+    """Walks depth-0 tokens to collect declarations and imports"""
+
+    def __init__(self, index: SourceIndex):
+        self.index = index
+        self.n = len(index.kinds)
+
+    def run(self) -> None:
+        index = self.index
+        i = 0
+        while i < self.n:
+            if index.depths[i] != 0 or index.kinds[i] != IDENT:
+                i = self._skip_statement(i)
+                continue
+            i = self._declaration(i, depth=0, into=index.symbols) + 1
+
+    # --------------------------------------------------------------
+
+    def _symbol(self, name: str, kind: str, exported: bool, is_async: bool,
+                first: int, last: int, body: int = -1) -> Symbol:
+        index = self.index
+        start = index.starts[first]
+        end = index.ends[last]
+        return Symbol(
+            name=name, kind=kind, exported=exported, is_async=is_async,
+            start=start, end=end,
+            start_line=index.line_of(start), end_line=index.line_of(max(start, end - 1)),
+            start_token=first, end_token=last, body_token=body,
+        )
+
+    def _skip_statement(self, i: int) -> int:
+        """Index of the first token after the statement starting at i"""
+        return self._statement_end(i) + 1
+
+    def _statement_end(self, i: int) -> int:
+        """Last token of the statement starting at i (`;` or ASI before a new declaration)"""
+        index = self.index
+        depth = index.depths[i]
+        j = i
+        while j < self.n:
+            if index.depths[j] < depth:
+                return j - 1
+            tok = index.tok(j)
+            if index.kinds[j] == PUNCT and tok == b';':
+                return j
+            if j > i and index.kinds[j] == IDENT and index.depths[j] == depth \
+                    and index.text(j) in STATEMENT_KEYWORDS and index.newline_between(j - 1, j) \
+                    and not self._continues_expression(j - 1):
+                return j - 1
+            if index.kinds[j] == PUNCT and tok in OPENERS and index.pairs[j] != -1:
+                j = index.pairs[j] + 1
+                continue
+            if index.kinds[j] in (TEMPLATE_HEAD, TEMPLATE_MIDDLE) and index.pairs[j] != -1:
+                j = index.pairs[j] + 1
+                continue
+            j += 1
+        return self.n - 1
+
+    def _continues_expression(self, i: int) -> bool:
+        """True when token i leaves an expression open (binary operator, `=`, `,` ...)"""
+        index = self.index
+        if index.kinds[i] != PUNCT:
+            return index.text(i) in ('extends', 'implements', 'new', 'typeof', 'keyof', 'as')
+        return index.tok(i) not in (b')', b']', b'}', b'++', b'--', b';')
+
+    def _find_body(self, j: int) -> Tuple[int, int]:
+        """
+        After a parameter list, find the body `{` (skipping return type
+        annotations such as `Promise<{ a: number }>`). Returns (body, last);
+        body is -1 for overload signatures ending in `;`.
+        """
+        index = self.index
+        angle = 0
+        prev = b')'
+        while j < self.n:
+            tok = index.tok(j)
+            kind = index.kinds[j]
+            if kind == PUNCT:
+                if tok == b';' and angle == 0:
+                    return -1, j
+                if tok == b'<':
+                    angle += 1
+                elif tok in (b'>', b'>>', b'>>>'):
+                    angle = max(0, angle - len(tok))
+                elif tok == b'{':
+                    if angle == 0 and prev not in (b':', b'|', b'&', b'=>', b',', b'<', b'(', b'[', b'?'):
+                        return j, index.pairs[j] if index.pairs[j] != -1 else self.n - 1
+                    if index.pairs[j] != -1:
+                        j = index.pairs[j]
+                        prev = b'}'
+                        j += 1
+                        continue
+                elif tok in (b'(', b'[') and index.pairs[j] != -1:
+                    j = index.pairs[j]
+                    prev = index.tok(j)
+                    j += 1
+                    continue
+            prev = tok
+            j += 1
+        return -1, self.n - 1
+
+    def _declaration(self, i: int, depth: int, into: List[Symbol]) -> int:
+        """Parse one statement at `depth`; returns its last token index"""
+        index = self.index
+        first = i
+        exported = False
+        if index.text(i) == 'export':
+            exported = True
+            i += 1
+            if index.text(i) == 'default':
+                i += 1
+            if index.is_punct(i, b'{') or index.is_punct(i, b'*') or index.text(i) == 'type' and index.is_punct(i + 1, b'{'):
+                return self._statement_end(first)
+        while index.text(i) in ('declare', 'abstract'):
+            i += 1
+
+        word = index.text(i)
+        if word == 'import' and not exported and not index.is_punct(i + 1, b'(') and not index.is_punct(i + 1, b'.'):
+            last = self._statement_end(first)
+            self._import(first, last)
+            return last
+
+        is_async = False
+        if word == 'async' and index.text(i + 1) == 'function':
+            is_async = True
+            i += 1
+            word = 'function'
+
+        if word == 'function':
+            i += 1
+            if index.is_punct(i, b'*'):
+                i += 1
+            if index.kinds[i] != IDENT:
+                return self._statement_end(first)
+            name = index.text(i)
+            params = i + 1
+            while params < self.n and not index.is_punct(params, b'('):
+                params += 1
+            if params >= self.n or index.pairs[params] == -1:
+                return self._statement_end(first)
+            body, last = self._find_body(index.pairs[params] + 1)
+            into.append(self._symbol(name, 'function', exported, is_async, first, last, body))
+            return last
+
+        if word in ('const', 'let', 'var'):
+            i += 1
+            if word == 'const' and index.text(i) == 'enum':
+                return self._enum(first, i + 1, exported, into)
+            last = self._statement_end(first)
+            if index.kinds[i] != IDENT:
+                return last  # destructuring
+            name = index.text(i)
+            kind, value_async, body = self._classify_value(i + 1, last)
+            into.append(self._symbol(name, kind, exported, value_async, first, last, body))
+            return last
+
+        if word == 'class':
+            i += 1
+            name = index.text(i) if index.kinds[i] == IDENT else 'default'
+            j = i
+            while j < self.n and not index.is_punct(j, b'{'):
+                j += 1
+            if j >= self.n or index.pairs[j] == -1:
+                return self._statement_end(first)
+            last = index.pairs[j]
+            symbol = self._symbol(name, 'class', exported, False, first, last, j)
+            self._class_members(j, symbol)
+            into.append(symbol)
+            return last
+
+        if word == 'interface' and index.kinds[i + 1] == IDENT:
+            j = i + 2
+            while j < self.n and not index.is_punct(j, b'{'):
+                j += 1
+            last = index.pairs[j] if j < self.n and index.pairs[j] != -1 else self._statement_end(first)
+            into.append(self._symbol(index.text(i + 1), 'interface', exported, False, first, last, j))
+            return last
+
+        if word == 'type' and index.kinds[i + 1] == IDENT:
+            last = self._statement_end(first)
+            into.append(self._symbol(index.text(i + 1), 'type', exported, False, first, last))
+            return last
+
+        if word == 'enum':
+            return self._enum(first, i + 1, exported, into)
+
+        return self._statement_end(first)
+
+    def _enum(self, first: int, i: int, exported: bool, into: List[Symbol]) -> int:
+        index = self.index
+        j = i
+        while j < self.n and not index.is_punct(j, b'{'):
+            j += 1
+        last = index.pairs[j] if j < self.n and index.pairs[j] != -1 else self._statement_end(first)
+        into.append(self._symbol(index.text(i), 'enum', exported, False, first, last, j))
+        return last
+
+    def _classify_value(self, i: int, last: int) -> Tuple[str, bool, int]:
+        """Classify `const x[: T] = value` as arrow/function or plain const"""
+        index = self.index
+        j = i
+        # skip an optional type annotation up to the top-level `=`
+        while j <= last and not (index.is_punct(j, b'=') and index.depths[j] == index.depths[i]):
+            if index.kinds[j] == PUNCT and index.tok(j) in OPENERS and index.pairs[j] != -1:
+                j = index.pairs[j]
+            j += 1
+        j += 1
+        if j > last:
+            return 'const', False, -1
+        is_async = False
+        if index.text(j) == 'async':
+            is_async = True
+            j += 1
+        if index.text(j) == 'function':
+            params = j + 1
+            while params <= last and not index.is_punct(params, b'('):
+                params += 1
+            if params <= last and index.pairs[params] != -1:
+                body, _ = self._find_body(index.pairs[params] + 1)
+                return 'arrow', is_async, body
+            return 'arrow', is_async, -1
+        if index.is_punct(j, b'<'):
+            while j <= last and not index.is_punct(j, b'('):
+                j += 1
+        if index.is_punct(j, b'(') and index.pairs[j] != -1:
+            k = index.pairs[j] + 1
+            # optional return type before `=>`
+            while k <= last and not index.is_punct(k, b'=>'):
+                if index.is_punct(k, b';') or index.is_punct(k, b','):
+                    return 'const', False, -1
+                if index.kinds[k] == PUNCT and index.tok(k) in OPENERS and index.pairs[k] != -1:
+                    k = index.pairs[k]
+                k += 1
+            if k <= last:
+                body = k + 1 if index.is_punct(k + 1, b'{') else -1
+                return 'arrow', is_async, body
+        elif index.kinds[j] == IDENT and index.is_punct(j + 1, b'=>'):
+            body = j + 2 if index.is_punct(j + 2, b'{') else -1
+            return 'arrow', is_async, body
+        return 'const', False, -1
+
+    def _class_members(self, open_brace: int, owner: Symbol) -> None:
+        index = self.index
+        close = index.pairs[open_brace]
+        depth = index.depths[open_brace] + 1
+        i = open_brace + 1
+        while i < close:
+            if index.depths[i] != depth or index.is_punct(i, b';'):
+                i += 1
+                continue
+            first = i
+            is_async = False
+            while index.kinds[i] == IDENT and index.text(i) in MEMBER_MODIFIERS \
+                    and not index.is_punct(i + 1, b'(') and not index.is_punct(i + 1, b'<') \
+                    and not index.is_punct(i + 1, b'=') and not index.is_punct(i + 1, b':'):
+                if index.text(i) == 'async':
+                    is_async = True
+                i += 1
+            if index.is_punct(i, b'*'):
+                i += 1
+            if index.is_punct(i, b'@'):
+                # decorator: skip `@name(...)`
+                i += 2
+                if index.is_punct(i, b'(') and index.pairs[i] != -1:
+                    i = index.pairs[i] + 1
+                continue
+            if index.kinds[i] not in (IDENT, STRING) and not index.is_punct(i, b'#'):
+                i += 1
+                continue
+            if index.is_punct(i, b'#'):
+                i += 1
+            name = index.text(i).strip('\'"')
+            j = i + 1
+            if index.is_punct(j, b'?') or index.is_punct(j, b'!'):
+                j += 1
+            if index.is_punct(j, b'<'):
+                while j < close and not index.is_punct(j, b'('):
+                    j += 1
+            if index.is_punct(j, b'(') and index.pairs[j] != -1:
+                body, last = self._find_body(index.pairs[j] + 1)
+                last = min(last, close - 1)
+                owner.members.append(self._symbol(name, 'method', True, is_async, first, last, body))
+                i = last + 1
+                continue
+            last = min(self._statement_end(first), close - 1)
+            kind, value_async, body = self._classify_value(j, last) if index.is_punct(j, b'=') or index.is_punct(j, b':') else ('const', False, -1)
+            member_kind = 'method' if kind == 'arrow' else 'property'
+            owner.members.append(self._symbol(name, member_kind, True, value_async, first, last, body))
+            i = last + 1
+
+    def _import(self, first: int, last: int) -> None:
+        index = self.index
+        i = first + 1
+        type_only = False
+        if index.text(i) == 'type' and not index.is_punct(i + 1, b',') and index.text(i + 1) != 'from':
+            type_only = True
+            i += 1
+        default = namespace = None
+        named: List[Tuple[str, str]] = []
+        module = ''
+        while i <= last:
+            kind = index.kinds[i]
+            if kind == STRING:
+                module = index.text(i)[1:-1]
+                break
+            if index.is_punct(i, b'*') and index.text(i + 1) == 'as':
+                namespace = index.text(i + 2)
+                i += 3
+                continue
+            if index.is_punct(i, b'{') and index.pairs[i] != -1:
+                close = index.pairs[i]
+                j = i + 1
+                while j < close:
+                    if index.kinds[j] == IDENT:
+                        if index.text(j) == 'type' and index.kinds[j + 1] == IDENT and index.text(j + 1) != 'as':
+                            j += 1
+                        imported = index.text(j)
+                        local = imported
+                        if index.text(j + 1) == 'as':
+                            local = index.text(j + 2)
+                            j += 2
+                        named.append((imported, local))
+                    j += 1
+                i = close + 1
+                continue
+            if kind == IDENT and index.text(i) != 'from' and default is None and not named:
+                default = index.text(i)
+            i += 1
+        start = index.starts[first]
+        index.imports.append(ImportDecl(
+            module=module, default=default, namespace=namespace, named=named,
+            type_only=type_only, start=start, end=index.ends[last],
+            start_line=index.line_of(start),
+        ))
+
+
+_MEMO: Dict[Tuple[str, str], SourceIndex] = {}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: python scripts/source_index.py <file.ts> [...]')
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        index = SourceIndex.load(path)
+        print(f"📄 {index.path}: {len(index)} tokens, {index.line_count} lines, "
+              f"{len(index.symbols)} symbols, {len(index.imports)} imports")
+        for symbol in index.symbols:
+            flags = ' '.join(f for f, on in (('export', symbol.exported), ('async', symbol.is_async)) if on)
+            print(f"   {symbol.kind:<9} {symbol.name:<40} L{symbol.start_line}-{symbol.end_line} {flags}")
+            for member in symbol.members:
+                print(f"      {member.kind:<9} {member.name:<37} L{member.start_line}-{member.end_line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,44 @@ Automated Router Splitting Script
 
 This script automatically splits server/routers.ts into feature-based modules
 to improve maintainability and reduce file complexity.
+
+With --lazy, feature routers are mounted with tRPC's lazy() so their modules
+load on the first call into them, and heavy helpers (PDF/Excel export) are
+imported inside the procedures that use them. --report compares the startup
+module graph of the eager and lazy outputs without writing any files.
+
+Each router file imports only the identifiers its body references (one token
+pass, resolved against the monolith's own imports); --repositories routes
+`db.fn()` calls to the repository facade when every call has a repository method.
+
+Usage:
+    python scripts/split_routers.py                # eager imports (default)
+    python scripts/split_routers.py --lazy [--repositories]
+    python scripts/split_routers.py --report [--measure 5]
 """
 
+import argparse
+import json
 import re
 import os
+import subprocess
 from pathlib import Path
-from typing import List, Dict, Tuple
+from statistics import median
+from typing import List, Dict, Optional, Set, Tuple
+
+from source_index import IDENT, SourceIndex
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SERVER_DIR = PROJECT_ROOT / 'server'
+REPORT_FILE = PROJECT_ROOT / 'router-startup-report.json'
+
+# Helpers that pull in large dependency trees (exceljs, pdf generation) -> module under server/
+HEAVY_HELPERS = {
+    'generateProjectExport': 'downloadProject',
+    'generateProjectReport': 'downloadProject',
+    'generateArchiveExcel': 'excelExport',
+}
+NAMED_IMPORT = re.compile(r'import\s*\{([^}]*)\}\s*from\s*"([^"]+)";?[ \t]*\n?')
 
 class RouterDefinition:
     def __init__(self, name: str, start_line: int, end_line: int, content: str):
@@ -43,11 +75,16 @@ def parse_routers_file(file_path: str) -> Dict:
     routers = []
     app_router_start = -1
     
-    # Find end of imports
+    # Find end of imports (the first router, or appRouter once routers are already split out)
     for i, line in enumerate(lines):
         if router_pattern.match(line):
             imports_end = i - 1
             break
+        if app_router_pattern.match(line):
+            # keep up to the last import statement; the generator adds its own headings
+            imports_end = max((j for j in range(i) if re.search(r'\bfrom\s+["\'][^"\']+["\'];?\s*$', lines[j])),
+                              default=-1)
+            break
     
     imports = '\n'.join(lines[:imports_end + 1])
     
@@ -89,67 +126,399 @@ def parse_routers_file(file_path: str) -> Dict:
         'type_export': type_export if app_router_start != -1 else ''
     }
 
-def detect_required_imports(content: str) -> List[str]:
-    """Detect which imports are needed based on content"""
-    imports = []
-    
-    # Always include base imports
-    imports.append('import { z } from "zod";')
-    imports.append('import { TRPCError } from "@trpc/server";')
-    imports.append('import { protectedProcedure, publicProcedure, router, roleBasedProcedure } from "../_core/trpc";')
-    imports.append('import * as db from "../db";')
-    
-    # Conditional imports
-    if any(func in content for func in ['validateTaskCreateInput', 'validateTaskUpdateInput', 
-                                         'validateInspectionSubmission', 'validateDefectCreateInput', 
-                                         'validateDefectUpdateInput']):
-        imports.append('import { validateTaskCreateInput, validateTaskUpdateInput, validateInspectionSubmission, validateDefectCreateInput, validateDefectUpdateInput } from "@shared/validationUtils";')
-    
-    if 'canEditDefect' in content or 'canDeleteDefect' in content:
-        imports.append('import { canEditDefect, canDeleteDefect } from "@shared/permissions";')
-    
-    if 'boolToInt' in content:
-        imports.append('import { boolToInt } from "../utils/typeHelpers.js";')
-    
-    if any(func in content for func in ['getTaskDisplayStatus', 'getTaskDisplayStatusLabel', 'getTaskDisplayStatusColor']):
-        imports.append('import { getTaskDisplayStatus, getTaskDisplayStatusLabel, getTaskDisplayStatusColor } from "../taskStatusHelper";')
-    
-    if 'storagePut' in content:
-        imports.append('import { storagePut } from "../storage";')
-    
-    if 'notifyOwner' in content:
-        imports.append('import { notifyOwner } from "../_core/notification";')
-    
-    if 'emitNotification' in content:
-        imports.append('import { emitNotification } from "../_core/socket";')
-    
-    if 'createNotification' in content:
-        imports.append('import { createNotification } from "../notificationService";')
-    
-    if 'analyticsService' in content:
-        imports.append('import * as analyticsService from "../services/analytics.service";')
-    
-    if 'generateProjectExport' in content or 'generateProjectReport' in content:
-        imports.append('import { generateProjectExport, generateProjectReport } from "../downloadProject";')
-    
-    if 'generateArchiveExcel' in content:
-        imports.append('import { generateArchiveExcel } from "../excelExport";')
-    
-    if 'checkArchiveWarnings' in content:
-        imports.append('import { checkArchiveWarnings } from "../archiveNotifications";')
-    
-    if 'logger' in content:
-        imports.append('import { logger } from "../logger";')
-    
-    if 'projectSchema' in content or 'taskSchema' in content or 'defectSchema' in content or 'inspectionSchema' in content:
-        imports.append('import { projectSchema, taskSchema, defectSchema, inspectionSchema } from "@shared/validations";')
-    
-    return imports
+# Where identifiers used by split routers come from, relative to server/routers/.
+# Overridden by whatever the monolith's own header imports (see header_import_table).
+KNOWN_IMPORTS = {
+    'z': 'zod',
+    'TRPCError': '@trpc/server',
+    'protectedProcedure': '../_core/trpc', 'publicProcedure': '../_core/trpc',
+    'router': '../_core/trpc', 'roleBasedProcedure': '../_core/trpc',
+    'validateTaskCreateInput': '@shared/validationUtils', 'validateTaskUpdateInput': '@shared/validationUtils',
+    'validateInspectionSubmission': '@shared/validationUtils', 'validateDefectCreateInput': '@shared/validationUtils',
+    'validateDefectUpdateInput': '@shared/validationUtils',
+    'canEditDefect': '@shared/permissions', 'canDeleteDefect': '@shared/permissions',
+    'boolToInt': '../utils/typeHelpers.js',
+    'getTaskDisplayStatus': '../taskStatusHelper', 'getTaskDisplayStatusLabel': '../taskStatusHelper',
+    'getTaskDisplayStatusColor': '../taskStatusHelper',
+    'storagePut': '../storage',
+    'notifyOwner': '../_core/notification',
+    'emitNotification': '../_core/socket',
+    'createNotification': '../notificationService',
+    'generateProjectExport': '../downloadProject', 'generateProjectReport': '../downloadProject',
+    'generateArchiveExcel': '../excelExport',
+    'checkArchiveWarnings': '../archiveNotifications',
+    'logger': '../logger',
+    'projectSchema': '@shared/validations', 'taskSchema': '@shared/validations',
+    'defectSchema': '@shared/validations', 'inspectionSchema': '@shared/validations',
+}
+NAMESPACE_IMPORTS = {'db': '../db', 'analyticsService': '../services/analytics.service'}
+REPOSITORIES_DIR = SERVER_DIR / 'repositories'
+DECLARATION_KEYWORDS = (b'const', b'let', b'var', b'function', b'class')
+# Keywords, TypeScript builtin types and runtime globals: free but never imported
+BUILTIN_IDENTIFIERS = set('''
+    async await break case catch class const continue default delete do else export extends false finally
+    for function if import in instanceof let new null of return super switch this throw true try typeof
+    undefined var void while yield as satisfies type interface keyof readonly is
+    any unknown never string number boolean bigint object symbol Record Partial Required Pick Omit
+    ReturnType Awaited Exclude Extract NonNullable Parameters Readonly Array ReadonlyArray Promise
+    Date Math JSON Object Number String Boolean Error TypeError RangeError Map Set WeakMap WeakSet RegExp
+    Symbol BigInt Intl Infinity NaN isNaN isFinite parseInt parseFloat encodeURIComponent decodeURIComponent
+    console process Buffer setTimeout clearTimeout setInterval clearInterval setImmediate structuredClone
+    globalThis require module URL URLSearchParams TextEncoder TextDecoder fetch AbortController
+'''.split())
+
+def _rebase(module: str) -> str:
+    """Module specifier from server/routers.ts rewritten for a file in server/routers/"""
+    if module.startswith('./'):
+        return '../' + module[2:]
+    if module.startswith('../'):
+        return '../' + module
+    return module
+
+def header_import_table(imports: str) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, str]]:
+    """
+    (named, namespaces) from the monolith's import block: local name ->
+    (module, imported name) and namespace name -> module, rebased for server/routers/
+    """
+    index = SourceIndex.from_bytes(imports.encode('utf-8'))
+    named: Dict[str, Tuple[str, str]] = {}
+    namespaces: Dict[str, str] = {}
+    for decl in index.imports:
+        if decl.type_only:
+            continue
+        module = _rebase(decl.module)
+        for imported, local in decl.named:
+            named[local] = (module, imported)
+        if decl.default:
+            named[decl.default] = (module, 'default')
+        if decl.namespace:
+            namespaces[decl.namespace] = module
+    return named, namespaces
+
+def _scope_end(index: SourceIndex, i: int, anchor: Optional[int] = None) -> int:
+    """
+    Last token of the arrow/function body that follows token i (the end of a
+    parameter list or a lone parameter); an expression body ends with the
+    bracket enclosing `anchor` (the parameter list or name)
+    """
+    anchor = i if anchor is None else anchor
+    j = i + 1
+    while j < len(index) and not (index.is_punct(j, b'=>') or index.is_punct(j, b'{')):
+        if index.is_punct(j, b';') or (index.text(j) in (')', ']', '}') and index.match(j) < i):
+            return j - 1
+        j = index.match(j) + 1 if index.text(j) in ('(', '[') and index.match(j) > j else j + 1
+    if index.is_punct(j, b'=>'):
+        j += 1
+    if index.is_punct(j, b'{'):
+        return index.match(j)
+    opener = index.enclosing_bracket(anchor)
+    return index.match(opener) if opener >= 0 else len(index) - 1
+
+def _declaration_scopes(index: SourceIndex) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Name -> token spans where it is declared: `const`/`let`/`var`/`function`/`class`
+    (incl. destructuring) scope to their enclosing block, parameters of arrows,
+    functions and `catch` to the body, `for (const x ...)` to the loop.
+    """
+    scopes: Dict[str, List[Tuple[int, int]]] = {}
+
+    def declare(name: str, first: int, last: int) -> None:
+        scopes.setdefault(name, []).append((first, last))
+
+    def block_of(i: int) -> Tuple[int, int]:
+        opener = index.enclosing_bracket(i)
+        if opener < 0:
+            return 0, len(index) - 1
+        if index.is_punct(opener, b'(') and index.is_ident(opener - 1, b'for'):
+            body = index.match(opener) + 1
+            return opener, index.match(body) if index.is_punct(body, b'{') else _scope_end(index, opener - 1)
+        return opener, index.match(opener)
+
+    for i in range(len(index)):
+        if index.kinds[i] != IDENT:
+            continue
+        if index.tok(i) in DECLARATION_KEYWORDS:
+            target = i + 1
+            if index.kinds[target] == IDENT:
+                declare(index.text(target), *block_of(i))
+            elif index.text(target) in ('{', '['):
+                first, last = block_of(i)
+                for j in range(target + 1, index.match(target)):
+                    if index.kinds[j] == IDENT and not index.is_punct(j + 1, b':') \
+                            and not index.is_punct(j - 1, b'.') and not index.is_punct(j - 1, b'='):
+                        declare(index.text(j), first, last)
+        elif index.is_punct(i + 1, b'=>') and not index.is_punct(i - 1, b'.'):
+            declare(index.text(i), i, _scope_end(index, i))     # `x => ...`
+    for i in range(len(index)):
+        if not index.is_punct(i, b'(') or index.match(i) <= i:
+            continue
+        close = index.match(i)
+        after = close + 1
+        while index.is_punct(after, b':'):          # return type annotation
+            after += 1
+            while after < len(index) and not (index.is_punct(after, b'=>') or index.is_punct(after, b'{')):
+                after = index.match(after) + 1 if index.match(after) > after else after + 1
+        is_params = (index.is_punct(after, b'=>') or index.is_ident(i - 1, b'function')
+                     or index.is_ident(i - 1, b'catch') or index.is_ident(i - 2, b'function'))
+        if not is_params:
+            continue
+        last = _scope_end(index, close, i)
+        in_annotation = False       # after a top-level `:` (type) or `=` (default value)
+        for j in range(i + 1, close):
+            top = index.enclosing_bracket(j) == i
+            if top and index.is_punct(j, b','):
+                in_annotation = False
+            elif top and (index.is_punct(j, b':') or index.is_punct(j, b'=')):
+                in_annotation = True
+            elif (index.kinds[j] == IDENT and not in_annotation and (top or not index.is_punct(j + 1, b':'))
+                  and not index.is_punct(j - 1, b'.') and not index.is_punct(j - 1, b'=')):
+                declare(index.text(j), i, last)
+    return scopes
 
-def generate_router_file(router: RouterDefinition) -> str:
+def referenced_identifiers(content: str) -> Tuple[Set[str], Dict[str, Set[str]], Set[str]]:
+    """
+    One token pass: (free identifiers, members accessed per identifier, names declared locally).
+
+    Property names (`a.b`), object keys (`{ key: ... }`) and identifiers
+    inside strings, comments and templates are not references. A name is
+    free unless a declaration of it is in scope at that reference, so a
+    `const x` inside one procedure does not hide an import of `x` used by another.
+    """
+    index = SourceIndex.from_bytes(content.encode('utf-8'))
+    scopes = _declaration_scopes(index)
+    used: Set[str] = set()
+    members: Dict[str, Set[str]] = {}
+    for i in range(len(index)):
+        if index.kinds[i] != IDENT or index.is_punct(i - 1, b'.') or index.is_punct(i - 1, b'?.'):
+            continue
+        name = index.text(i)
+        if index.is_punct(i + 1, b':') and (index.is_punct(i - 1, b'{') or index.is_punct(i - 1, b',')
+                                            or index.is_punct(i - 1, b';')):
+            continue      # object key, or a member of an inline `{ a: T; b: U }` type
+        if any(first <= i <= last for first, last in scopes.get(name, ())):
+            continue
+        used.add(name)
+        if (index.is_punct(i + 1, b'.') or index.is_punct(i + 1, b'?.')) and index.kinds[i + 2] == IDENT:
+            members.setdefault(name, set()).add(index.text(i + 2))
+    return used, members, set(scopes)
+
+def repository_methods(directory: Path = REPOSITORIES_DIR) -> Dict[str, str]:
+    """Repository method name -> facade instance exposing it (getTaskById -> taskRepository)"""
+    facade = directory / 'facade.ts'
+    exported = facade.read_text(encoding='utf-8') if facade.is_file() else ''
+    methods: Dict[str, str] = {}
+    for path in sorted(directory.glob('*.repository.ts')):
+        instance = path.name.split('.')[0] + 'Repository'
+        if not re.search(rf'\b{instance}\b', exported):
+            continue
+        for symbol in SourceIndex.load(path).symbols:
+            if symbol.kind == 'class':
+                for member in symbol.members:
+                    if member.kind == 'method':
+                        methods.setdefault(member.name, instance)
+    return methods
+
+def route_db_to_repositories(content: str, methods: Dict[str, str]) -> Optional[Tuple[str, Set[str]]]:
+    """
+    Rewrite `db.fn(...)` to `fnRepository.fn(...)` when every db member used
+    has a repository method; None when any call has to stay on db.ts.
+    """
+    source = content.encode('utf-8')
+    index = SourceIndex.from_bytes(source)
+    edits: List[Tuple[int, int, str]] = []
+    for i in range(len(index)):
+        if not index.is_ident(i, b'db') or index.is_punct(i - 1, b'.'):
+            continue
+        if not index.is_punct(i + 1, b'.') or index.kinds[i + 2] != IDENT:
+            return None   # db passed around as a value
+        instance = methods.get(index.text(i + 2))
+        if instance is None:
+            return None
+        edits.append((index.starts[i], index.ends[i], instance))
+    out: List[bytes] = []
+    pos = 0
+    for start, end, replacement in edits:
+        out.append(source[pos:start])
+        out.append(replacement.encode('utf-8'))
+        pos = end
+    out.append(source[pos:])
+    return b''.join(out).decode('utf-8'), {replacement for _, _, replacement in edits}
+
+def detect_required_imports(content: str,
+                            header: Optional[Tuple[Dict[str, Tuple[str, str]], Dict[str, str]]] = None,
+                            label: str = 'router') -> List[str]:
+    """
+    Minimal imports for a router body: one token pass collects the free
+    identifiers, which are resolved against the monolith's header imports
+    (falling back to KNOWN_IMPORTS). Only names actually referenced are
+    imported, so a router that never touches db.ts does not load it.
+    Free identifiers that resolve nowhere are printed as warnings.
+    """
+    used, _, _ = referenced_identifiers(content)
+    named, namespaces = header or ({}, {})
+    namespaces = {**NAMESPACE_IMPORTS, **namespaces}
+
+    # keep the header's module order, then KNOWN_IMPORTS order
+    order = list(dict.fromkeys([module for module, _ in named.values()] + list(KNOWN_IMPORTS.values())))
+    by_module: Dict[str, List[str]] = {}
+    namespace_lines = []
+    unresolved: List[str] = []
+    for name in sorted(used):
+        if name in namespaces:
+            namespace_lines.append(f'import * as {name} from "{namespaces[name]}";')
+        elif name in named and named[name][1] == 'default':
+            namespace_lines.append(f'import {name} from "{named[name][0]}";')
+        elif name in named:
+            module, imported = named[name]
+            by_module.setdefault(module, []).append(name if imported == name else f'{imported} as {name}')
+        elif name in KNOWN_IMPORTS:
+            by_module.setdefault(KNOWN_IMPORTS[name], []).append(name)
+        elif name not in BUILTIN_IDENTIFIERS:
+            unresolved.append(name)
+    if unresolved:
+        print(f'   ⚠️  {label}: no import found for {", ".join(unresolved)}')
+    modules = sorted(by_module, key=lambda module: order.index(module) if module in order else len(order))
+    return [f'import {{ {", ".join(by_module[module])} }} from "{module}";' for module in modules] + namespace_lines
+
+def drop_named_imports(imports: str, names: Set[str]) -> str:
+    """Remove names from `import { ... } from "..."` statements, dropping statements left empty"""
+    def rewrite(match: re.Match) -> str:
+        specifiers = [s.strip() for s in match.group(1).split(',') if s.strip()]
+        kept = [s for s in specifiers if s.split(' as ')[-1].strip() not in names]
+        if len(kept) == len(specifiers):
+            return match.group(0)
+        if not kept:
+            return ''
+        return f'import {{ {", ".join(kept)} }} from "{match.group(2)}";\n'
+    return NAMED_IMPORT.sub(rewrite, imports)
+
+def defer_heavy_helpers(content: str, prefix: str) -> Tuple[str, Set[str]]:
+    """
+    Import HEAVY_HELPERS inside the procedures that call them.
+
+    Each awaited call makes its enclosing (async) function body start with
+    `const { helper } = await import("<prefix>module");`, the pattern the
+    routers already use for criticalPath and exportPDF. A helper is only
+    deferred when every reference to it is such a call; the names returned
+    are the ones whose static import can be dropped.
+    """
+    source = content.encode('utf-8')
+    index = SourceIndex.from_bytes(source)
+    calls: Dict[str, List[int]] = {}
+    blocked: Set[str] = set()
+    for i in range(len(index)):
+        name = index.text(i)
+        if index.kinds[i] != IDENT or name not in HEAVY_HELPERS or index.is_punct(i - 1, b'.'):
+            continue
+        if index.is_ident(i - 1, b'await') and index.is_punct(i + 1, b'('):
+            calls.setdefault(name, []).append(i)
+        else:
+            blocked.add(name)   # passed around as a value: keep the static import
+
+    # function body `{` token -> module -> helper names
+    bodies: Dict[int, Dict[str, List[str]]] = {}
+    for name, tokens in calls.items():
+        if name in blocked:
+            continue
+        for i in tokens:
+            body = _function_body(index, i)
+            if body == -1:
+                blocked.add(name)
+                break
+            names = bodies.setdefault(body, {}).setdefault(HEAVY_HELPERS[name], [])
+            if name not in names:
+                names.append(name)
+    deferred = {name for name in calls if name not in blocked}
+
+    out: List[bytes] = []
+    pos = 0
+    for body in sorted(bodies):
+        statements = [f'const {{ {", ".join(names)} }} = await import("{prefix}{module}");'
+                      for module, names in bodies[body].items() if all(name in deferred for name in names)]
+        if not statements:
+            continue
+        line_start = index.source.rfind(b'\n', 0, index.starts[body + 1]) + 1
+        indent = re.match(rb'[ \t]*', index.source[line_start:]).group(0).decode()
+        insert = ''.join(f'\n{indent}{statement}' for statement in statements)
+        out.append(source[pos:index.ends[body]])
+        out.append(insert.encode('utf-8'))
+        pos = index.ends[body]
+    out.append(source[pos:])
+    return b''.join(out).decode('utf-8'), deferred
+
+def _function_body(index: SourceIndex, i: int) -> int:
+    """`{` token of the innermost arrow/function body around token i, or -1"""
+    j = i - 1
+    while j >= 0:
+        text = index.text(j)
+        if text in (')', ']', '}') and index.match(j) != -1:
+            j = index.match(j) - 1
+            continue
+        if text == '{' and (index.is_punct(j - 1, b'=>') or index.is_punct(j - 1, b')')):
+            return j
+        j -= 1
+    return -1
+
+def router_import_modules(imports: str) -> Dict[str, Tuple[str, str]]:
+    """Routers imported from relative modules: local name -> (module, exported name)"""
+    modules: Dict[str, Tuple[str, str]] = {}
+    for match in NAMED_IMPORT.finditer(imports):
+        module = match.group(2)
+        if not module.startswith('.'):
+            continue
+        for specifier in match.group(1).split(','):
+            parts = [part.strip() for part in specifier.split(' as ')]
+            if parts[-1].endswith('Router'):
+                modules[parts[-1]] = (module, parts[0])
+    return modules
+
+def lazy_router_entries(app_router_content: str, modules: Dict[str, Tuple[str, str]]) -> Tuple[str, Set[str]]:
+    """
+    Replace `key: xRouter` entries with `key: lazy(() => import(...))`.
+
+    Returns the new content and the router names that are no longer
+    referenced directly, so their static imports can be dropped.
+    """
+    source = app_router_content.encode('utf-8')
+    index = SourceIndex.from_bytes(source)
+    edits: List[Tuple[int, int, str]] = []
+    direct: Set[str] = set()
+    for i in range(len(index)):
+        name = index.text(i)
+        if index.kinds[i] != IDENT or name not in modules or index.is_punct(i - 1, b'.'):
+            continue
+        if index.is_punct(i - 1, b':') and (index.is_punct(i + 1, b',') or index.is_punct(i + 1, b'}')):
+            module, exported = modules[name]
+            edits.append((index.starts[i], index.ends[i],
+                          f'lazy(() => import("{module}").then((m) => m.{exported}))'))
+        else:
+            direct.add(name)
+    out: List[bytes] = []
+    pos = 0
+    lazy_names: Set[str] = set()
+    for start, end, replacement in edits:
+        out.append(source[pos:start])
+        out.append(replacement.encode('utf-8'))
+        lazy_names.add(source[start:end].decode('utf-8'))
+        pos = end
+    out.append(source[pos:])
+    return b''.join(out).decode('utf-8'), lazy_names - direct
+
+def generate_router_file(router: RouterDefinition, lazy: bool = False,
+                         header: Optional[Tuple[Dict[str, Tuple[str, str]], Dict[str, str]]] = None,
+                         repositories: Optional[Dict[str, str]] = None) -> str:
     """Generate individual router file content"""
-    imports = detect_required_imports(router.content)
-    imports_str = '\n'.join(imports)
+    content = router.content
+    if lazy:
+        content, _ = defer_heavy_helpers(content, '../')
+    if repositories:
+        routed = route_db_to_repositories(content, repositories)
+        if routed is not None:
+            content, instances = routed
+            named = dict(header[0]) if header else {}
+            named.update({instance: ('../repositories/facade', instance) for instance in instances})
+            header = (named, header[1] if header else {})
+    imports_str = '\n'.join(detect_required_imports(content, header, router.name))
     
     router_name_display = router.name.replace('Router', '').title()
     
@@ -159,23 +528,50 @@ def generate_router_file(router: RouterDefinition) -> str:
  * {router_name_display} Router
  * Auto-generated from server/routers.ts
  */
-export {router.content}
+export {content}
 """
 
+def add_trpc_lazy_import(imports: str) -> str:
+    """Add `lazy` to the existing @trpc/server import, or import it"""
+    for match in NAMED_IMPORT.finditer(imports):
+        if match.group(2) == '@trpc/server':
+            specifiers = [s.strip() for s in match.group(1).split(',') if s.strip()]
+            if 'lazy' in specifiers:
+                return imports
+            replacement = f'import {{ {", ".join(specifiers + ["lazy"])} }} from "@trpc/server";\n'
+            return imports[:match.start()] + replacement + imports[match.end():]
+    return 'import { lazy } from "@trpc/server";\n' + imports
+
 def generate_main_routers_file(imports: str, router_names: List[str], 
-                                app_router_content: str, type_export: str) -> str:
+                                app_router_content: str, type_export: str,
+                                lazy: bool = False) -> str:
     """Generate new main routers.ts file"""
+    lazy_names: Set[str] = set()
+    if lazy:
+        modules = router_import_modules(imports)
+        for name in router_names:
+            modules[name] = (f'./routers/{name[0].lower() + name[1:]}', name)
+        app_router_content, lazy_names = lazy_router_entries(app_router_content, modules)
+        app_router_content, deferred = defer_heavy_helpers(app_router_content, './')
+        imports = drop_named_imports(imports + '\n', lazy_names | deferred).rstrip('\n')
+        imports = add_trpc_lazy_import(imports)
+
     # Generate router imports
     router_imports = []
     for name in router_names:
+        if name in lazy_names:
+            continue
         file_name = name[0].lower() + name[1:]
         router_imports.append(f'import {{ {name} }} from "./routers/{file_name}";')
     
     router_imports_str = '\n'.join(router_imports)
+    heading = ('// Feature routers are mounted with lazy() and load on their first call'
+               if lazy else '// Import feature-based routers')
+    imports = '\n'.join(line for line in imports.split('\n') if line != '// Import feature-based routers')
     
     return f"""{imports}
 
-// Import feature-based routers
+{heading}
 {router_imports_str}
 
 /**
@@ -187,7 +583,163 @@ def generate_main_routers_file(imports: str, router_names: List[str],
 {type_export}
 """
 
+# ----------------------------------------------------------------------
+# Startup report
+# ----------------------------------------------------------------------
+
+RE_EXPORT = re.compile(rb'^[ \t]*export\s+(?:\*(?:\s+as\s+\w+)?|\{[^}]*\})\s*from\s*["\']([^"\']+)["\']', re.MULTILINE)
+LAZY_IMPORT = re.compile(r'lazy\(\(\) => import\("([^"]+)"\)')
+MODULE_SUFFIXES = ('', '.ts', '.tsx', '/index.ts', '/index.tsx')
+NODE_BUILTINS = {
+    'assert', 'buffer', 'child_process', 'crypto', 'events', 'fs', 'http', 'https', 'net', 'os', 'path',
+    'perf_hooks', 'querystring', 'readline', 'stream', 'tls', 'url', 'util', 'v8', 'worker_threads', 'zlib',
+}
+
+def _resolve_module(spec: str, importer: Path) -> Optional[Path]:
+    """File behind a relative or @shared/ import, None for packages"""
+    if spec.startswith('@shared/'):
+        base = PROJECT_ROOT / 'shared' / spec[len('@shared/'):]
+    elif spec.startswith('.'):
+        base = importer.parent / spec
+    else:
+        return None
+    base = Path(os.path.normpath(base))
+    if base.suffix == '.js':
+        base = base.with_suffix('')
+    for suffix in MODULE_SUFFIXES:
+        candidate = Path(str(base) + suffix)
+        if candidate.is_file():
+            return candidate
+    return None
+
+def _package_name(spec: str) -> Optional[str]:
+    if spec.startswith(('.', '@shared/', 'node:')):
+        return None
+    parts = spec.split('/')
+    name = '/'.join(parts[:2]) if spec.startswith('@') else parts[0]
+    return None if name in NODE_BUILTINS else name
+
+def static_graph(entry: Path, overrides: Dict[Path, str], seen: Optional[Set[Path]] = None) -> Tuple[Set[Path], Set[str], int]:
+    """
+    Modules evaluated when `entry` is imported: static value imports and
+    re-exports, transitively. `import type` and `await import()` are not
+    followed. Returns (files, packages, bytes) excluding anything in `seen`.
+    """
+    seen = set(seen or ())
+    files: Set[Path] = set()
+    packages: Set[str] = set()
+    size = 0
+    stack = [entry]
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        files.add(path)
+        if path in overrides:
+            source = overrides[path].encode('utf-8')
+            index = SourceIndex.from_bytes(source, str(path))
+        else:
+            source = path.read_bytes()
+            index = SourceIndex.load(path)
+        size += len(source)
+        specs = [decl.module for decl in index.imports if not decl.type_only]
+        specs += [match.group(1).decode() for match in RE_EXPORT.finditer(source)]
+        for spec in specs:
+            target = _resolve_module(spec, path)
+            if target is not None:
+                stack.append(target)
+            elif _package_name(spec):
+                packages.add(_package_name(spec))
+    return files, packages, size
+
+def _graph_summary(files: Set[Path], packages: Set[str], size: int) -> Dict:
+    return {'modules': len(files), 'kb': round(size / 1024, 1), 'packages': sorted(packages)}
+
+def measure_startup(content: str, variant: str, runs: int) -> Optional[float]:
+    """Median ms to import a routers.ts variant in a fresh `node --import tsx` process"""
+    probe = SERVER_DIR / f'.startup-probe-{variant}.ts'
+    probe.write_text(content, encoding='utf-8')
+    script = (f'const t = performance.now(); await import({json.dumps(probe.as_uri())}); '
+              'console.log(performance.now() - t); process.exit(0);')
+    times = []
+    try:
+        for _ in range(runs):
+            result = subprocess.run(['node', '--import', 'tsx', '--input-type=module', '-e', script],
+                                    cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120)
+            lines = result.stdout.strip().splitlines()
+            if result.returncode != 0 or not lines:
+                print(f'   ⚠️  {variant}: {(result.stderr.strip().splitlines() or ["import failed"])[-1]}')
+                return None
+            times.append(float(lines[-1]))
+    except (OSError, subprocess.TimeoutExpired, ValueError) as error:
+        print(f'   ⚠️  {variant}: {error}')
+        return None
+    finally:
+        probe.unlink(missing_ok=True)
+    return round(median(times), 1)
+
+def startup_report(parsed: Dict, measure_runs: int = 0) -> Dict:
+    """Startup module graphs (and optionally import times) of the eager and lazy outputs"""
+    routers_file = SERVER_DIR / 'routers.ts'
+    router_names = [router.name for router in parsed['routers']]
+    report: Dict = {}
+    variants = {}
+    for variant, lazy in (('eager', False), ('lazy', True)):
+        header = header_import_table(parsed['imports'])
+        overrides = {SERVER_DIR / 'routers' / f'{router.name[0].lower() + router.name[1:]}.ts':
+                     generate_router_file(router, lazy, header) for router in parsed['routers']}
+        main_content = generate_main_routers_file(parsed['imports'], router_names, parsed['app_router_content'],
+                                                  parsed['type_export'], lazy)
+        overrides[routers_file] = main_content
+        files, packages, size = static_graph(routers_file, overrides)
+        report[variant] = _graph_summary(files, packages, size)
+        variants[variant] = (main_content, files, overrides)
+
+    # what each lazy router costs on its first call
+    main_content, startup_files, overrides = variants['lazy']
+    deferred = {}
+    for spec in dict.fromkeys(LAZY_IMPORT.findall(main_content)):
+        target = _resolve_module(spec, routers_file)
+        if target is not None:
+            deferred[spec] = _graph_summary(*static_graph(target, overrides, startup_files))
+    report['lazy']['on_first_call'] = deferred
+
+    if measure_runs:
+        report['measured_ms'] = {variant: measure_startup(variants[variant][0], variant, measure_runs)
+                                 for variant in ('eager', 'lazy')}
+    return report
+
+def print_startup_report(report: Dict) -> None:
+    eager, lazy = report['eager'], report['lazy']
+    print('\n📊 Startup module graph (static imports from server/routers.ts):')
+    print(f'   {"":<8} {"modules":>8} {"KB":>9} {"packages":>9}')
+    for name, graph in (('eager', eager), ('lazy', lazy)):
+        print(f'   {name:<8} {graph["modules"]:>8} {graph["kb"]:>9} {len(graph["packages"]):>9}')
+    dropped = sorted(set(eager['packages']) - set(lazy['packages']))
+    if dropped:
+        print(f'   Packages no longer loaded at startup: {", ".join(dropped)}')
+    heaviest = sorted(lazy['on_first_call'].items(), key=lambda item: -item[1]['kb'])[:5]
+    if heaviest:
+        print('   Heaviest lazy routers (loaded on first call):')
+        for spec, graph in heaviest:
+            print(f'      {spec}: +{graph["modules"]} modules, +{graph["kb"]} KB')
+    if 'measured_ms' in report:
+        for name, ms in report['measured_ms'].items():
+            print(f'   ⏱️  import {name}: {ms if ms is not None else "n/a"} ms (median)')
+
 def main():
+    parser = argparse.ArgumentParser(description='Split server/routers.ts into feature routers')
+    parser.add_argument('--lazy', action='store_true',
+                        help='mount feature routers with lazy() and import heavy helpers on first call')
+    parser.add_argument('--repositories', action='store_true',
+                        help='call per-domain repositories instead of db.ts when every db.* call has a repository method')
+    parser.add_argument('--report', action='store_true',
+                        help=f'compare eager and lazy startup graphs, write {REPORT_FILE.name}, change nothing')
+    parser.add_argument('--measure', type=int, default=0, metavar='RUNS',
+                        help='with --report, also time importing each variant with tsx (median of RUNS)')
+    args = parser.parse_args()
+
     # Setup paths
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -201,6 +753,14 @@ def main():
     print(f'✅ Found {len(routers)} router definitions:')
     for router in routers:
         print(f'   - {router.name} (lines {router.start_line + 1}-{router.end_line + 1})')
+
+    if args.report:
+        report = startup_report(parsed, args.measure)
+        print_startup_report(report)
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'\n💾 Report saved to {REPORT_FILE.name}')
+        return
     
     # Create routers directory
     routers_dir.mkdir(exist_ok=True)
@@ -209,11 +769,13 @@ def main():
     # Generate individual router files
     print('\n📝 Generating router files...')
     router_names = []
+    header = header_import_table(parsed['imports'])
+    repositories = repository_methods() if args.repositories else None
     
     for router in routers:
         file_name = router.name[0].lower() + router.name[1:] + '.ts'
         file_path = routers_dir / file_name
-        file_content = generate_router_file(router)
+        file_content = generate_router_file(router, args.lazy, header, repositories)
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(file_content)
@@ -234,7 +796,8 @@ def main():
         parsed['imports'],
         router_names,
         parsed['app_router_content'],
-        parsed['type_export']
+        parsed['type_export'],
+        args.lazy
     )
     
     with open(routers_file, 'w', encoding='utf-8') as f:
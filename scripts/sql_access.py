@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+SQL Access Patterns
+
+Small tokenizer-based reader for the raw SQL found in the .manus/db query logs
+and in db.execute(sql`...`) fragments. It does not validate SQL; it extracts
+what index analysis needs: the tables (with aliases), equality and range
+predicates, join columns, ORDER BY and GROUP BY columns and the LIMIT.
+Column names are resolved against drizzle/schema.ts when a schema is given.
+fingerprint() reduces a statement to its literal-free shape for grouping.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from drizzle_schema import Schema
+
+SQL_TOKEN = re.compile(
+    r"""(?P<space>\s+)
+      |(?P<comment>--[^\n]*|\#[^\n]*|/\*[\s\S]*?\*/)
+      |(?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")
+      |(?P<quoted>`[^`]+`)
+      |(?P<number>\d+(?:\.\d+)?)
+      |(?P<word>[A-Za-z_$][\w$]*)
+      |(?P<variable>@@?[\w$.]+)
+      |(?P<param>\?)
+      |(?P<op><=>|<=|>=|<>|!=|[=<>(),.;*+\-/%])
+    """,
+    re.VERBOSE,
+)
+
+CLAUSE_KEYWORDS = {'WHERE', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'UNION', 'FOR', 'ON', 'SET', 'VALUES'}
+JOIN_KEYWORDS = {'JOIN', 'INNER', 'LEFT', 'RIGHT', 'CROSS', 'OUTER', 'STRAIGHT_JOIN', 'NATURAL'}
+COMPARISON_OPS = {'=', '<=>', '<', '>', '<=', '>=', '<>', '!='}
+EQUALITY_OPS = {'=', '<=>', 'IN', 'IS'}
+OPERAND_KEYWORDS = {
+    'AND', 'OR', 'NOT', 'NULL', 'TRUE', 'FALSE', 'IS', 'IN', 'LIKE', 'BETWEEN', 'EXISTS',
+    'SELECT', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'INTERVAL', 'DISTINCT',
+}
+
+
+@dataclass
+class Token:
+    kind: str       # string | quoted | number | word | variable | param | op
+    text: str
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper() if self.kind == 'word' else self.text
+
+
+@dataclass
+class SqlPredicate:
+    table: Optional[str]          # schema table name (export name) when resolved
+    column: str
+    op: str                       # =, IN, IS, LIKE, <, >, BETWEEN, ...
+    value: Optional[str] = None   # literal text for LIKE patterns and constants
+    negated: bool = False
+
+
+@dataclass
+class SqlAccess:
+    """What one SELECT/UPDATE/DELETE statement reads"""
+    verb: str
+    tables: Dict[str, str] = field(default_factory=dict)   # alias -> table name
+    predicates: List[SqlPredicate] = field(default_factory=list)
+    join_columns: List[Tuple[str, str]] = field(default_factory=list)  # (table, column)
+    order_by: List[Tuple[str, str, str]] = field(default_factory=list)  # (table, column, direction)
+    group_by: List[Tuple[str, str]] = field(default_factory=list)
+    limit: Optional[str] = None
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(dict.fromkeys(self.tables.values()))
+
+
+def tokenize(sql: str) -> List[Token]:
+    """SQL tokens without whitespace and comments; backquotes are stripped from identifiers"""
+    tokens = []
+    for match in SQL_TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        text = match.group()
+        if kind == 'quoted':
+            kind, text = 'word', text[1:-1]
+        tokens.append(Token(kind, text))
+    return tokens
+
+
+class _Reader:
+    def __init__(self, tokens: List[Token], schema: Optional[Schema]):
+        self.tokens = tokens
+        self.schema = schema
+        self.access = SqlAccess(verb=tokens[0].upper if tokens else '')
+
+    def _table_name(self, sql_name: str) -> str:
+        if self.schema is not None:
+            table = self.schema.by_sql_name(sql_name) or self.schema.tables.get(sql_name)
+            if table is not None:
+                return table.name
+        return sql_name
+
+    def _upper(self, i: int) -> str:
+        return self.tokens[i].upper if 0 <= i < len(self.tokens) else ''
+
+    def _skip_parens(self, i: int) -> int:
+        depth = 0
+        while i < len(self.tokens):
+            if self.tokens[i].text == '(':
+                depth += 1
+            elif self.tokens[i].text == ')':
+                depth -= 1
+                if depth == 0:
+                    return i
+            i += 1
+        return i
+
+    def _resolve(self, qualifier: Optional[str], column: str) -> Tuple[Optional[str], str]:
+        if qualifier is not None:
+            return self.access.tables.get(qualifier, self._table_name(qualifier)), column
+        tables = self.access.table_names
+        if len(tables) == 1:
+            return tables[0], column
+        if self.schema is not None:
+            owners = [name for name in tables
+                      if name in self.schema.tables and column in self.schema.tables[name].columns]
+            if len(owners) == 1:
+                return owners[0], column
+        return None, column
+
+    def _column_at(self, i: int) -> Tuple[Optional[Tuple[Optional[str], str]], int]:
+        """((table, column), next index) for `col` or `alias.col` at i"""
+        tokens = self.tokens
+        if i >= len(tokens) or tokens[i].kind != 'word':
+            return None, i
+        if i + 2 < len(tokens) and tokens[i + 1].text == '.' and tokens[i + 2].kind == 'word':
+            return self._resolve(tokens[i].text, tokens[i + 2].text), i + 3
+        if i + 1 < len(tokens) and tokens[i + 1].text == '(':
+            return None, i
+        return self._resolve(None, tokens[i].text), i + 1
+
+    def read_tables(self) -> None:
+        """FROM / JOIN / UPDATE / INTO table references with aliases"""
+        tokens = self.tokens
+        i = 0
+        expecting = False
+        while i < len(tokens):
+            word = self._upper(i)
+            if word in ('FROM', 'JOIN', 'UPDATE', 'INTO') or (expecting and tokens[i].text == ','):
+                i += 1
+                if i < len(tokens) and tokens[i].text == '(':
+                    i = self._skip_parens(i) + 1
+                    expecting = word == 'FROM'
+                    continue
+                if i < len(tokens) and tokens[i].kind == 'word':
+                    name = tokens[i].text
+                    if i + 2 < len(tokens) and tokens[i + 1].text == '.':
+                        i += 2   # schema-qualified: db.table
+                        name = tokens[i].text
+                    table = self._table_name(name)
+                    alias = name
+                    j = i + 1
+                    if self._upper(j) == 'AS':
+                        j += 1
+                    if (j < len(tokens) and tokens[j].kind == 'word'
+                            and self._upper(j) not in CLAUSE_KEYWORDS | JOIN_KEYWORDS | {'SELECT'}):
+                        alias = tokens[j].text
+                        i = j
+                    self.access.tables[alias] = table
+                    self.access.tables.setdefault(name, table)
+                expecting = word == 'FROM' or (expecting and word == ',')
+            elif word in CLAUSE_KEYWORDS or word in JOIN_KEYWORDS:
+                expecting = False
+            i += 1
+
+    def read_conditions(self, start: int, stop_words: set, into_joins: bool) -> int:
+        """Predicates until one of the stop words at depth 0; returns the stop index"""
+        tokens = self.tokens
+        i = start
+        depth = 0
+        negated = False
+        while i < len(tokens):
+            text = tokens[i].text
+            word = self._upper(i)
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                if depth == 0:
+                    return i
+                depth -= 1
+            elif depth == 0 and (word in stop_words or text == ';'):
+                return i
+            elif word == 'NOT':
+                negated = True
+            elif word in ('AND', 'OR'):
+                negated = False
+            column, after = self._column_at(i)
+            if column is not None and word not in OPERAND_KEYWORDS:
+                op = self._upper(after)
+                if op == 'NOT':
+                    negated, after = True, after + 1
+                    op = self._upper(after)
+                if op in COMPARISON_OPS or op in ('IN', 'LIKE', 'BETWEEN', 'IS', 'REGEXP'):
+                    other, other_after = self._column_at(after + 1)
+                    if op == '=' and other is not None and other[0] is not None and (other_after >= len(tokens)
+                                                                                       or tokens[other_after].text != '('):
+                        if into_joins or other[0] != column[0]:
+                            self.access.join_columns.extend([column, other])
+                        i = other_after
+                        continue
+                    value = tokens[after + 1].text if after + 1 < len(tokens) else None
+                    if op == 'IS' and self._upper(after + 1) == 'NOT':
+                        negated, value = True, 'NULL'
+                    if column[1].upper() not in CLAUSE_KEYWORDS:
+                        self.access.predicates.append(SqlPredicate(
+                            table=column[0], column=column[1], op=op, value=value, negated=negated))
+                    i = after + 1
+                    continue
+            i += 1
+        return i
+
+    def read_column_list(self, start: int, with_direction: bool) -> int:
+        tokens = self.tokens
+        i = start
+        while i < len(tokens):
+            column, after = self._column_at(i)
+            if column is None:
+                return i
+            direction = 'asc'
+            if self._upper(after) in ('ASC', 'DESC'):
+                direction = self._upper(after).lower()
+                after += 1
+            if with_direction:
+                self.access.order_by.append((column[0], column[1], direction))
+            else:
+                self.access.group_by.append(column)
+            if after < len(tokens) and tokens[after].text == ',':
+                i = after + 1
+                continue
+            return after
+        return i
+
+    def run(self) -> SqlAccess:
+        self.read_tables()
+        tokens = self.tokens
+        i = 0
+        depth = 0
+        while i < len(tokens):
+            text = tokens[i].text
+            word = self._upper(i)
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+            elif depth == 0 and word == 'WHERE':
+                i = self.read_conditions(i + 1, {'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'UNION', 'FOR'}, False)
+                continue
+            elif depth == 0 and word == 'ON':
+                i = self.read_conditions(i + 1, CLAUSE_KEYWORDS | JOIN_KEYWORDS, True)
+                continue
+            elif depth == 0 and word in ('ORDER', 'GROUP') and self._upper(i + 1) == 'BY':
+                i = self.read_column_list(i + 2, word == 'ORDER')
+                continue
+            elif depth == 0 and word == 'LIMIT' and i + 1 < len(tokens):
+                self.access.limit = tokens[i + 1].text
+            i += 1
+        return self.access
+
+
+def read_access(sql: str, schema: Optional[Schema] = None) -> Optional[SqlAccess]:
+    """Access pattern of a SELECT/UPDATE/DELETE statement, None for other statements"""
+    tokens = tokenize(sql)
+    if not tokens or tokens[0].upper not in ('SELECT', 'UPDATE', 'DELETE', 'WITH'):
+        return None
+    return _Reader(tokens, schema).run()
+
+
+LITERAL_KINDS = {'string', 'number', 'param'}
+# Upper-cased in fingerprints; other words (identifiers) keep their case
+SQL_KEYWORDS = CLAUSE_KEYWORDS | JOIN_KEYWORDS | OPERAND_KEYWORDS | {
+    'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'FROM', 'INTO', 'BY', 'AS', 'ASC', 'DESC', 'OFFSET',
+    'ALTER', 'CREATE', 'DROP', 'TRUNCATE', 'RENAME', 'TABLE', 'TABLES', 'COLUMN', 'COLUMNS', 'ADD', 'MODIFY',
+    'CHANGE', 'AFTER', 'FIRST', 'TO', 'INDEX', 'KEY', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'REFERENCES',
+    'CONSTRAINT', 'CASCADE', 'DEFAULT', 'AUTO_INCREMENT', 'IF', 'DESCRIBE', 'SHOW', 'EXPLAIN', 'USE',
+    'DATABASE', 'ENUM', 'INT', 'BIGINT', 'VARCHAR', 'TEXT', 'BOOLEAN', 'TIMESTAMP', 'DATETIME', 'DATE',
+    'DECIMAL', 'JSON', 'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'COALESCE', 'NOW', 'CURRENT_TIMESTAMP',
+    'DUPLICATE', 'IGNORE', 'ALL', 'ANY', 'REGEXP',
+}
+_NO_SPACE_BEFORE = {',', ')', '.', ';'}
+_NO_SPACE_AFTER = {'(', '.'}
+
+
+def _collapse_lists(parts: List[str]) -> List[str]:
+    """`(?, ?, ?)` -> `(?+)` and repeated `(?+), (?+)` value tuples -> `(?+)...`"""
+    out: List[str] = []
+    i = 0
+    while i < len(parts):
+        if parts[i] == '(':
+            j = i + 1
+            while j + 1 < len(parts) and parts[j] == '?' and parts[j + 1] == ',':
+                j += 2
+            if j + 1 < len(parts) and parts[j] == '?' and parts[j + 1] == ')':
+                tuple_text = '(?+)'
+                if out[-2:] == [tuple_text, ','] or out[-2:] == [tuple_text + '...', ',']:
+                    out[-2:] = [tuple_text + '...']
+                else:
+                    out.append(tuple_text)
+                i = j + 2
+                continue
+        out.append(parts[i])
+        i += 1
+    return out
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Literal-free shape of a statement: strings, numbers and parameters become `?`,
+    literal lists collapse to `(?+)`, comments and whitespace are dropped and
+    keywords are upper-cased, so executions differing only in values group together.
+    """
+    parts = ['?' if token.kind in LITERAL_KINDS else token.upper if token.upper in SQL_KEYWORDS else token.text
+             for token in tokenize(sql)]
+    parts = _collapse_lists(parts)
+    while parts and parts[-1] == ';':
+        parts.pop()
+    text = []
+    for i, part in enumerate(parts):
+        if i and part not in _NO_SPACE_BEFORE and parts[i - 1] not in _NO_SPACE_AFTER:
+            text.append(' ')
+        text.append(part)
+    return ''.join(text)
+
+
+def fingerprint_id(fingerprint_text: str) -> str:
+    """Short stable identifier of a fingerprint"""
+    return hashlib.sha1(fingerprint_text.encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+SQL DDL Reader
+
+Parses the MySQL DDL found in the drizzle/ migrations, the hand-written *.sql
+files and the .manus/db query logs into a flat list of operations
+(create_table, add_column, modify_column, add_index, drop_index, ...) plus a
+small table model the operations can be applied to. Built on the tokenizer
+in sql_access.py; like it, this reads DDL rather than validating it, and
+anything it does not understand becomes an `other` operation instead of an
+error.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sql_access import Token, tokenize
+
+# Words that end the type part of a column definition
+COLUMN_ATTRIBUTES = {
+    'NOT', 'NULL', 'DEFAULT', 'AUTO_INCREMENT', 'PRIMARY', 'UNIQUE', 'KEY', 'COMMENT', 'ON', 'REFERENCES',
+    'COLLATE', 'CHARACTER', 'CHARSET', 'GENERATED', 'AS', 'CHECK', 'FIRST', 'AFTER', 'VISIBLE', 'INVISIBLE',
+}
+INDEX_WORDS = {'INDEX', 'KEY'}
+# int(11) -> int; tinyint(1) is how MySQL reports BOOLEAN, so it keeps its width
+DISPLAY_WIDTH = re.compile(r'^(tinyint|smallint|mediumint|int|integer|bigint)\((?!1\))\d+\)')
+
+
+@dataclass
+class ColumnDef:
+    name: str
+    type: str                         # normalized: varchar(255), int, enum('a','b'), tinyint(1)
+    nullable: bool = True
+    default: Optional[str] = None
+    auto_increment: bool = False
+
+    @property
+    def family(self) -> str:
+        """Type without its arguments (varchar, enum, int, ...)"""
+        return self.type.split('(', 1)[0].split(' ', 1)[0]
+
+
+@dataclass
+class IndexDef:
+    name: str
+    columns: List[str]
+    unique: bool = False
+    primary: bool = False
+
+    @property
+    def signature(self) -> Tuple[str, ...]:
+        return tuple(self.columns)
+
+
+@dataclass
+class DdlOp:
+    """One change to one table"""
+    kind: str               # create_table, drop_table, rename_table, add_column, drop_column, modify_column,
+                            # change_column, rename_column, alter_default, add_index, drop_index, rename_index,
+                            # add_foreign_key, drop_foreign_key, table_option, other
+    table: str
+    column: Optional[ColumnDef] = None
+    index: Optional[IndexDef] = None
+    name: Optional[str] = None          # dropped/renamed object; new table name for rename_table
+    new_name: Optional[str] = None
+    position: Optional[str] = None      # FIRST / AFTER <column>
+    if_exists: bool = False             # IF [NOT] EXISTS guard
+    columns: List[ColumnDef] = field(default_factory=list)      # create_table
+    indexes: List[IndexDef] = field(default_factory=list)       # create_table
+    text: str = ''
+
+
+@dataclass
+class DdlStatement:
+    verb: str               # CREATE TABLE, ALTER TABLE, CREATE INDEX, DROP INDEX, DROP TABLE, RENAME TABLE
+    table: str
+    ops: List[DdlOp]
+    text: str
+
+
+def normalize_type(text: str) -> str:
+    text = re.sub(r'\s*([(),])\s*', r'\1', text.strip().lower())
+    if text in ('boolean', 'bool'):
+        return 'tinyint(1)'
+    return DISPLAY_WIDTH.sub(r'\1', text)
+
+
+def _join(tokens: List[Token]) -> str:
+    """Statement text from tokens, spaced for reading"""
+    out = []
+    for i, token in enumerate(tokens):
+        if i and token.text not in (',', ')', '(', '.') and tokens[i - 1].text not in ('(', '.'):
+            out.append(' ')
+        out.append(token.text)
+    return ''.join(out)
+
+
+def split_statements(sql: str) -> List[List[Token]]:
+    """Token lists of the `;`-separated statements (comments and drizzle breakpoints are dropped)"""
+    statements: List[List[Token]] = []
+    current: List[Token] = []
+    depth = 0
+    for token in tokenize(sql):
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+        if token.text == ';' and depth <= 0:
+            if current:
+                statements.append(current)
+            current, depth = [], 0
+            continue
+        current.append(token)
+    if current:
+        statements.append(current)
+    return statements
+
+
+class _Parser:
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.i = 0
+
+    def upper(self, offset: int = 0) -> str:
+        j = self.i + offset
+        return self.tokens[j].upper if 0 <= j < len(self.tokens) else ''
+
+    def text(self, offset: int = 0) -> str:
+        j = self.i + offset
+        return self.tokens[j].text if 0 <= j < len(self.tokens) else ''
+
+    def at_end(self) -> bool:
+        return self.i >= len(self.tokens)
+
+    def accept(self, *words: str) -> bool:
+        """Consume the words if they follow in order"""
+        if all(self.upper(k) == word for k, word in enumerate(words)):
+            self.i += len(words)
+            return True
+        return False
+
+    def if_exists(self) -> bool:
+        return self.accept('IF', 'NOT', 'EXISTS') or self.accept('IF', 'EXISTS')
+
+    def name(self) -> str:
+        """Identifier, skipping a `db.` qualifier"""
+        name = self.text()
+        self.i += 1
+        if self.text() == '.' and self.i + 1 < len(self.tokens):
+            name = self.text(1)
+            self.i += 2
+        return name
+
+    def group(self) -> List[Token]:
+        """Tokens inside the parenthesized group at the cursor (cursor moves past it)"""
+        if self.text() != '(':
+            return []
+        depth = 0
+        start = self.i
+        while not self.at_end():
+            if self.text() == '(':
+                depth += 1
+            elif self.text() == ')':
+                depth -= 1
+                if depth == 0:
+                    self.i += 1
+                    return self.tokens[start + 1:self.i - 1]
+            self.i += 1
+        return self.tokens[start + 1:]
+
+    def skip_item(self) -> List[Token]:
+        """Tokens up to the next `,` at depth 0 (cursor stops on it)"""
+        start = self.i
+        depth = 0
+        while not self.at_end():
+            text = self.text()
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif text == ',' and depth == 0:
+                break
+            self.i += 1
+        return self.tokens[start:self.i]
+
+    def column_list(self) -> List[str]:
+        columns = []
+        for item in _split_commas(self.group()):
+            words = [token.text for token in item if token.kind == 'word']
+            if words:
+                columns.append(words[0])    # drops ASC/DESC and prefix lengths
+        return columns
+
+    def column_def(self) -> Tuple[ColumnDef, Optional[str], bool, bool]:
+        """(column, position, inline primary key, inline unique)"""
+        column = ColumnDef(name=self.name(), type='')
+        type_tokens: List[Token] = []
+        while not self.at_end() and self.text() not in (',', ')') and self.upper() not in COLUMN_ATTRIBUTES:
+            if self.text() == '(':
+                start = self.i
+                self.group()
+                type_tokens.extend(self.tokens[start:self.i])
+            else:
+                type_tokens.append(self.tokens[self.i])
+                self.i += 1
+        column.type = normalize_type(_join(type_tokens))
+        position = None
+        primary = unique = False
+        while not self.at_end() and self.text() not in (',', ')'):
+            if self.accept('NOT', 'NULL'):
+                column.nullable = False
+            elif self.accept('NULL'):
+                column.nullable = True
+            elif self.accept('DEFAULT'):
+                if self.text() == '(':
+                    start = self.i
+                    self.group()
+                    column.default = _join(self.tokens[start:self.i])
+                else:
+                    value = self.tokens[self.i]
+                    column.default = value.text[1:-1] if value.kind == 'string' else value.text
+                    self.i += 1
+                    if self.text() == '(':      # CURRENT_TIMESTAMP(3)
+                        self.group()
+            elif self.accept('AUTO_INCREMENT'):
+                column.auto_increment = True
+            elif self.accept('PRIMARY', 'KEY'):
+                primary = True
+                column.nullable = False
+            elif self.accept('UNIQUE'):
+                self.accept('KEY')
+                unique = True
+            elif self.accept('FIRST'):
+                position = 'FIRST'
+            elif self.accept('AFTER'):
+                position = f'AFTER {self.name()}'
+            elif self.text() == '(':
+                self.group()
+            else:
+                self.i += 1
+        if column.auto_increment:
+            column.nullable = False
+        return column, position, primary, unique
+
+    def index_def(self, unique: bool = False, primary: bool = False, name: Optional[str] = None) -> IndexDef:
+        """`[name] [USING x] (columns)` after INDEX/KEY/UNIQUE/PRIMARY KEY"""
+        if self.text() != '(':
+            name = self.name()
+        if self.accept('USING'):
+            self.i += 1
+        columns = self.column_list()
+        if primary:
+            name = 'PRIMARY'
+        return IndexDef(name=name or (columns[0] if columns else ''), columns=columns, unique=unique or primary,
+                        primary=primary)
+
+    def table_element(self, table: str) -> Tuple[Optional[ColumnDef], List[IndexDef], Optional[DdlOp]]:
+        """One element of a CREATE TABLE body or ALTER ... ADD: column, index or constraint"""
+        constraint = None
+        if self.accept('CONSTRAINT'):
+            if self.upper() not in ('PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK'):
+                constraint = self.name()
+        if self.accept('PRIMARY', 'KEY'):
+            return None, [self.index_def(primary=True)], None
+        if self.accept('UNIQUE'):
+            self.accept('INDEX') or self.accept('KEY')
+            self.if_exists()
+            return None, [self.index_def(unique=True, name=constraint)], None
+        if self.upper() in ('FULLTEXT', 'SPATIAL'):
+            self.i += 1
+            self.accept('INDEX') or self.accept('KEY')
+            return None, [self.index_def(name=constraint)], None
+        if self.upper() in INDEX_WORDS:
+            self.i += 1
+            self.if_exists()
+            return None, [self.index_def(name=constraint)], None
+        if self.accept('FOREIGN', 'KEY'):
+            if self.text() != '(':
+                constraint = constraint or self.name()
+            columns = self.column_list()
+            text = _join(self.skip_item())
+            return None, [], DdlOp(kind='add_foreign_key', table=table, name=constraint,
+                                   index=IndexDef(name=constraint or '', columns=columns), text=text)
+        if self.upper() == 'CHECK':
+            self.skip_item()
+            return None, [], DdlOp(kind='other', table=table, text='CHECK')
+        column, _, primary, unique = self.column_def()
+        indexes = []
+        if primary:
+            indexes.append(IndexDef(name='PRIMARY', columns=[column.name], unique=True, primary=True))
+        if unique:
+            indexes.append(IndexDef(name=column.name, columns=[column.name], unique=True))
+        return column, indexes, None
+
+
+def _split_commas(tokens: List[Token]) -> List[List[Token]]:
+    items: List[List[Token]] = [[]]
+    depth = 0
+    for token in tokens:
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+        if token.text == ',' and depth == 0:
+            items.append([])
+        else:
+            items[-1].append(token)
+    return [item for item in items if item]
+
+
+def _create_table(p: _Parser, text: str) -> Optional[DdlStatement]:
+    guarded = p.if_exists()
+    table = p.name()
+    if p.accept('LIKE') or p.text() != '(':
+        return DdlStatement('CREATE TABLE', table, [DdlOp(kind='other', table=table, text=text)], text)
+    op = DdlOp(kind='create_table', table=table, if_exists=guarded, text=text)
+    extra: List[DdlOp] = []
+    body = _Parser(p.group())
+    while not body.at_end():
+        column, indexes, constraint = body.table_element(table)
+        if column is not None:
+            op.columns.append(column)
+        op.indexes.extend(indexes)
+        if constraint is not None:
+            extra.append(constraint)
+        body.skip_item()
+        body.i += 1
+    return DdlStatement('CREATE TABLE', table, [op] + extra, text)
+
+
+def _alter_table(p: _Parser, text: str) -> DdlStatement:
+    table = p.name()
+    ops: List[DdlOp] = []
+    while not p.at_end():
+        start = p.i
+        op = _alter_spec(p, table)
+        p.skip_item()
+        op.text = _join(p.tokens[start:p.i])
+        ops.append(op)
+        p.i += 1
+    return DdlStatement('ALTER TABLE', table, ops, text)
+
+
+def _alter_spec(p: _Parser, table: str) -> DdlOp:
+    if p.accept('ADD'):
+        if p.upper() in ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'INDEX', 'KEY', 'FOREIGN', 'FULLTEXT', 'SPATIAL', 'CHECK'):
+            guarded = p.upper() in INDEX_WORDS and p.upper(1) == 'IF'
+            _, indexes, constraint = p.table_element(table)
+            if constraint is not None:
+                return constraint
+            return DdlOp(kind='add_index', table=table, index=indexes[0] if indexes else None, if_exists=guarded)
+        p.accept('COLUMN')
+        guarded = p.if_exists()
+        if p.text() == '(':
+            column = _Parser(p.group()).column_def()[0]
+            return DdlOp(kind='add_column', table=table, column=column, if_exists=guarded)
+        column, position, _, _ = p.column_def()
+        return DdlOp(kind='add_column', table=table, column=column, position=position, if_exists=guarded)
+    if p.accept('DROP'):
+        if p.accept('PRIMARY', 'KEY'):
+            return DdlOp(kind='drop_index', table=table, name='PRIMARY')
+        if p.accept('FOREIGN', 'KEY'):
+            guarded = p.if_exists()
+            return DdlOp(kind='drop_foreign_key', table=table, name=p.name(), if_exists=guarded)
+        if p.upper() in INDEX_WORDS:
+            p.i += 1
+            guarded = p.if_exists()
+            return DdlOp(kind='drop_index', table=table, name=p.name(), if_exists=guarded)
+        if p.accept('CONSTRAINT') or p.accept('CHECK'):
+            return DdlOp(kind='other', table=table, name=p.name())
+        p.accept('COLUMN')
+        guarded = p.if_exists()
+        return DdlOp(kind='drop_column', table=table, name=p.name(), if_exists=guarded)
+    if p.accept('MODIFY'):
+        p.accept('COLUMN')
+        column, position, _, _ = p.column_def()
+        return DdlOp(kind='modify_column', table=table, column=column, name=column.name, position=position)
+    if p.accept('CHANGE'):
+        p.accept('COLUMN')
+        old = p.name()
+        column, position, _, _ = p.column_def()
+        return DdlOp(kind='change_column', table=table, column=column, name=old, new_name=column.name,
+                     position=position)
+    if p.accept('RENAME'):
+        if p.accept('COLUMN'):
+            old = p.name()
+            p.accept('TO')
+            return DdlOp(kind='rename_column', table=table, name=old, new_name=p.name())
+        if p.upper() in INDEX_WORDS:
+            p.i += 1
+            old = p.name()
+            p.accept('TO')
+            return DdlOp(kind='rename_index', table=table, name=old, new_name=p.name())
+        p.accept('TO') or p.accept('AS')
+        return DdlOp(kind='rename_table', table=table, name=table, new_name=p.name())
+    if p.accept('ALTER'):
+        if p.upper() in INDEX_WORDS:
+            return DdlOp(kind='other', table=table)     # ALTER INDEX x VISIBLE/INVISIBLE
+        p.accept('COLUMN')
+        name = p.name()
+        default = None
+        if p.accept('SET', 'DEFAULT'):
+            value = p.tokens[p.i] if not p.at_end() else None
+            default = value.text[1:-1] if value is not None and value.kind == 'string' else value.text if value else None
+        return DdlOp(kind='alter_default', table=table, name=name,
+                     column=ColumnDef(name=name, type='', default=default))
+    return DdlOp(kind='table_option', table=table)
+
+
+def parse_statement(tokens: List[Token]) -> Optional[DdlStatement]:
+    """DDL statement for a token list, None for anything that is not DDL"""
+    if not tokens:
+        return None
+    p = _Parser(tokens)
+    text = _join(tokens)
+    if p.accept('CREATE'):
+        p.accept('OR', 'REPLACE')
+        p.accept('TEMPORARY')
+        if p.accept('TABLE'):
+            return _create_table(p, text)
+        unique = p.accept('UNIQUE')
+        p.accept('FULLTEXT') or p.accept('SPATIAL')
+        if p.accept('INDEX'):
+            guarded = p.if_exists()
+            name = p.name()
+            if p.accept('USING'):
+                p.i += 1
+            if not p.accept('ON'):
+                return None
+            table = p.name()
+            index = IndexDef(name=name, columns=p.column_list(), unique=unique)
+            return DdlStatement('CREATE INDEX', table, [DdlOp(kind='add_index', table=table, index=index,
+                                                              if_exists=guarded, text=text)], text)
+        return None
+    if p.accept('ALTER'):
+        p.accept('ONLINE') or p.accept('IGNORE')
+        if p.accept('TABLE'):
+            return _alter_table(p, text)
+        return None
+    if p.accept('DROP'):
+        p.accept('TEMPORARY')
+        if p.accept('TABLE'):
+            guarded = p.if_exists()
+            ops = []
+            while not p.at_end():
+                name = p.name()
+                ops.append(DdlOp(kind='drop_table', table=name, name=name, if_exists=guarded, text=text))
+                if not p.accept(','):
+                    break
+            return DdlStatement('DROP TABLE', ops[0].table if ops else '', ops, text)
+        if p.accept('INDEX'):
+            guarded = p.if_exists()
+            name = p.name()
+            if not p.accept('ON'):
+                return None
+            table = p.name()
+            return DdlStatement('DROP INDEX', table, [DdlOp(kind='drop_index', table=table, name=name,
+                                                            if_exists=guarded, text=text)], text)
+        return None
+    if p.accept('RENAME', 'TABLE'):
+        ops = []
+        while not p.at_end():
+            old = p.name()
+            p.accept('TO')
+            ops.append(DdlOp(kind='rename_table', table=old, name=old, new_name=p.name(), text=text))
+            if not p.accept(','):
+                break
+        return DdlStatement('RENAME TABLE', ops[0].table if ops else '', ops, text)
+    return None
+
+
+def parse_ddl(sql: str) -> List[DdlStatement]:
+    """Every DDL statement in a SQL script, in order"""
+    statements = []
+    for tokens in split_statements(sql):
+        statement = parse_statement(tokens)
+        if statement is not None:
+            statements.append(statement)
+    return statements
+
+
+# ----------------------------------------------------------------------
+# Table model
+# ----------------------------------------------------------------------
+
+@dataclass
+class TableState:
+    """Columns and indexes of one table as far as they are known"""
+    name: str
+    columns: Dict[str, ColumnDef] = field(default_factory=dict)
+    indexes: Dict[str, IndexDef] = field(default_factory=dict)
+    columns_complete: bool = False      # every column is known (CREATE TABLE or a full DESCRIBE)
+    indexes_complete: bool = False      # every index is known (CREATE TABLE, SHOW CREATE, full SHOW INDEX)
+
+    def copy(self) -> 'TableState':
+        return TableState(
+            name=self.name,
+            columns={name: ColumnDef(**vars(column)) for name, column in self.columns.items()},
+            indexes={name: IndexDef(index.name, list(index.columns), index.unique, index.primary)
+                     for name, index in self.indexes.items()},
+            columns_complete=self.columns_complete,
+            indexes_complete=self.indexes_complete,
+        )
+
+
+def _insert_column(state: TableState, column: ColumnDef, position: Optional[str]) -> None:
+    if position is None or column.name in state.columns:
+        state.columns[column.name] = column
+        return
+    items = list(state.columns.items())
+    if position == 'FIRST':
+        at = 0
+    else:
+        anchor = position.split(' ', 1)[1]
+        names = [name for name, _ in items]
+        at = names.index(anchor) + 1 if anchor in names else len(items)
+    items.insert(at, (column.name, column))
+    state.columns = dict(items)
+
+
+def apply_op(tables: Dict[str, TableState], op: DdlOp) -> Optional[str]:
+    """Apply one operation; returns a note when it could not be applied as written"""
+    state = tables.get(op.table)
+    if op.kind == 'create_table':
+        if state is not None and op.if_exists:
+            return 'table exists, CREATE TABLE IF NOT EXISTS is a no-op'
+        state = TableState(name=op.table, columns_complete=True, indexes_complete=True)
+        for column in op.columns:
+            state.columns[column.name] = ColumnDef(**vars(column))
+        for index in op.indexes:
+            state.indexes[index.name] = IndexDef(index.name, list(index.columns), index.unique, index.primary)
+        tables[op.table] = state
+        return None
+    if op.kind == 'drop_table':
+        return None if tables.pop(op.table, None) is not None or op.if_exists else 'table not known'
+    if op.kind == 'rename_table':
+        if state is None:
+            return 'table not known'
+        state.name = op.new_name or state.name
+        tables[state.name] = tables.pop(op.table)
+        return None
+    if op.kind in ('other', 'table_option', 'add_foreign_key', 'drop_foreign_key'):
+        return None
+    if state is None:
+        state = tables[op.table] = TableState(name=op.table)
+    if op.kind == 'add_column' and op.column is not None:
+        if op.column.name in state.columns and op.if_exists:
+            return f'column {op.column.name} exists'
+        _insert_column(state, ColumnDef(**vars(op.column)), op.position)
+    elif op.kind == 'drop_column':
+        if state.columns.pop(op.name, None) is None and state.columns_complete and not op.if_exists:
+            return f'column {op.name} not known'
+        for index in list(state.indexes.values()):
+            if op.name in index.columns:
+                index.columns.remove(op.name)
+                if not index.columns:
+                    del state.indexes[index.name]
+    elif op.kind in ('modify_column', 'change_column', 'rename_column'):
+        old = op.name or ''
+        if op.kind == 'rename_column':
+            column = state.columns.get(old)
+            if column is None:
+                return f'column {old} not known'
+            new = ColumnDef(**vars(column))
+            new.name = op.new_name or old
+        else:
+            new = ColumnDef(**vars(op.column))
+        items = [(new.name, new) if name == old else (name, column) for name, column in state.columns.items()]
+        if old not in state.columns:
+            items.append((new.name, new))
+        state.columns = dict(items)
+        if op.position is not None:
+            del state.columns[new.name]
+            _insert_column(state, new, op.position)
+        if new.name != old:
+            for index in state.indexes.values():
+                index.columns = [new.name if column == old else column for column in index.columns]
+    elif op.kind == 'alter_default' and op.column is not None:
+        column = state.columns.get(op.name or '')
+        if column is not None:
+            column.default = op.column.default
+    elif op.kind == 'add_index' and op.index is not None:
+        if op.index.name in state.indexes and op.if_exists:
+            return f'index {op.index.name} exists'
+        state.indexes[op.index.name] = IndexDef(op.index.name, list(op.index.columns), op.index.unique,
+                                                op.index.primary)
+    elif op.kind == 'drop_index':
+        if state.indexes.pop(op.name or '', None) is None and state.indexes_complete and not op.if_exists:
+            return f'index {op.name} not known'
+    elif op.kind == 'rename_index':
+        index = state.indexes.pop(op.name or '', None)
+        if index is not None:
+            index.name = op.new_name or index.name
+            state.indexes[index.name] = index
+    return None
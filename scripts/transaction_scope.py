@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Transaction Scope Analyzer
+
+The flip side of analyze_refactor.py's "functions needing transactions":
+transactions that are too fat. Every `db.transaction(async (tx) => ...)`,
+`withTransaction(...)` and `withTransactionRetry(...)` callback in
+server/db.ts, the services and the repositories is walked for work that
+keeps the transaction (and the row locks its writes have taken) open:
+
+  * external I/O      notifications (createNotification, emitNotification,
+                      push), email, storagePut/storageGet, PDF/Excel
+                      generation, LLM/image/transcription calls, fetch and
+                      data-API requests, virus scans
+  * second connection a `db` handle other than the callback's tx, or a call
+                      into a function that opens its own getDb() connection:
+                      it reads outside the transaction's snapshot and, with
+                      every pooled connection inside a transaction, deadlocks
+                      the pool
+  * per-row loops     tx statements issued inside for/while/forEach/map
+
+Calls are followed through the functions of server/**/*.ts (local calls,
+named, namespace and `await import()` imports, `this.` methods) so a helper
+that sends an email three calls down is still found, with its call path.
+
+Each step gets a rough cost (COSTS below, loops counted as --loop-rows
+iterations) and the report estimates how long the transaction stays open and
+how long the locks taken by its writes are held: work after the first write
+holds those row locks until commit. I/O inside withTransactionRetry is also
+repeated on every retry, and none of it is undone by a rollback.
+
+Usage:
+    python scripts/transaction_scope.py
+    python scripts/transaction_scope.py --loop-rows 100
+    python scripts/transaction_scope.py server/services/*.ts --output /tmp/tx-scope.json
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from drizzle_schema import load_schema
+from query_catalog import FileCatalog, Query, resolve_files
+from source_index import IDENT, SourceIndex
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCAN_FILES = ('server/db.ts', 'server/services/*.ts', 'server/repositories/*.ts')
+GRAPH_FILES = ('server/*.ts', 'server/**/*.ts')
+REPORT_FILE = PROJECT_ROOT / 'transaction-scope.json'
+
+TRANSACTION_HELPERS = {'withTransaction': False, 'withTransactionRetry': True}   # name -> retried
+STATEMENT_METHODS = {'select', 'selectDistinct', 'insert', 'update', 'delete', 'execute', 'query'}
+LOOP_KEYWORDS = {'for', 'while', 'do'}
+LOOP_METHODS = {'forEach', 'map', 'flatMap', 'reduce', 'filter', 'some', 'every'}
+LOOP_ROWS = 20
+MAX_DEPTH = 6
+
+# Estimated wall time per step (ms): LAN round trip for a statement, typical latency
+# of the external services this app calls
+COSTS = {
+    'statement': 2,
+    'second-connection': 5,
+    'socket': 1,
+    'notification': 20,
+    'storage': 150,
+    'http': 200,
+    'push': 200,
+    'email': 300,
+    'document': 500,
+    'scan': 1000,
+    'llm': 3000,
+}
+SINKS = (
+    (re.compile(r'^(?:fetch|callDataApi|makeRequest)$'), 'http'),
+    (re.compile(r'^(?:invokeLLM|generateImage|transcribeAudio)$'), 'llm'),
+    (re.compile(r'^storage(?:Put|Get)$'), 'storage'),
+    (re.compile(r'^send\w*(?:Email|Mail)s?$'), 'email'),
+    (re.compile(r'^(?:sendPushNotification\w*|notifyOwner)$'), 'push'),
+    (re.compile(r'^(?:emitNotification|broadcastNotification|sendNotificationToUsers?)$'), 'socket'),
+    (re.compile(r'^(?:createNotifications?|notify[A-Z]\w*)$'), 'notification'),
+    (re.compile(r'(?:PDF|Pdf|Excel|Xlsx|Workbook|ProgressReport)'), 'document'),
+    (re.compile(r'^(?:scanFile|scanBuffer)$'), 'scan'),
+)
+MEMBER_SINKS = {'axios': 'http', 'transporter': 'email', 'puppeteer': 'document', 'ExcelJS': 'document'}
+BLOCKING_CATEGORIES = {'storage', 'http', 'push', 'email', 'document', 'scan', 'llm'}
+SIDE_EFFECTS = {'socket', 'notification', 'storage', 'http', 'push', 'email', 'llm'}
+DYNAMIC_IMPORT = re.compile(rb'\{([^{}]*)\}\s*=\s*await\s+import\(\s*["\']([^"\']+)["\']\s*\)')
+
+
+@dataclass
+class Step:
+    """Slow work inside a transaction callback"""
+    kind: str                 # io | second-connection | loop
+    category: str             # COSTS key
+    call: str
+    line: int
+    estimate_ms: float
+    per_row: bool = False     # inside a loop (estimate already multiplied)
+    holds: List[str] = field(default_factory=list)    # tables written before this step
+    path: List[str] = field(default_factory=list)     # call path to the sink
+
+
+@dataclass
+class Transaction:
+    file: str
+    line: int
+    end_line: int
+    function: str
+    entry: str                # db.transaction | withTransaction | withTransactionRetry
+    retried: bool
+    statements: int = 0
+    writes: List[str] = field(default_factory=list)   # tables in write order
+    steps: List[Step] = field(default_factory=list)
+    open_ms: float = 0.0      # estimated time the transaction stays open
+    lock_hold_ms: float = 0.0  # of which after the first write (row locks held)
+    suggestions: List[str] = field(default_factory=list)
+
+    @property
+    def severity(self) -> str:
+        blocking = [s for s in self.steps if s.category in BLOCKING_CATEGORIES]
+        if any(s.holds for s in blocking) or self.lock_hold_ms >= 500:
+            return 'high'
+        if (blocking or self.lock_hold_ms >= 100
+                or any(s.kind == 'second-connection' or (s.per_row and s.holds) for s in self.steps)):
+            return 'medium'
+        return 'low' if self.steps else 'ok'
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['severity'] = self.severity
+        data['location'] = f'{self.file}:{self.line}'
+        return data
+
+
+# ----------------------------------------------------------------------
+# Call graph over server/
+# ----------------------------------------------------------------------
+
+def _module_path(importer: Path, module: str, root: Path) -> Optional[Path]:
+    if not module.startswith('.'):
+        return None
+    base = (importer.parent / module).resolve()
+    if base.suffix == '.js':
+        base = base.with_suffix('')
+    for candidate in (base.with_name(base.name + '.ts'), base / 'index.ts', base):
+        if candidate.suffix == '.ts' and candidate.is_file():
+            return candidate
+    return None
+
+
+@dataclass
+class Function:
+    key: str                  # file:Owner.name
+    rel_path: str
+    index: SourceIndex
+    owner: Optional[str]
+    name: str
+    first: int                # token span of the body
+    last: int
+
+
+class CallGraph:
+    """Functions of server/**/*.ts and the call targets visible from each module"""
+
+    def __init__(self, patterns: Sequence[str] = GRAPH_FILES, root: Path = PROJECT_ROOT):
+        self.root = root.resolve()
+        self.functions: Dict[str, Function] = {}
+        self.modules: Dict[Path, Dict[str, str]] = {}    # file -> top-level name -> key
+        self.members: Dict[Path, Dict[str, Dict[str, str]]] = {}   # file -> class -> method -> key
+        self.scopes: Dict[Path, Tuple[Dict[str, str], Dict[str, Path]]] = {}
+        self._work: Dict[str, List[Step]] = {}
+        for path in dict.fromkeys(p.resolve() for p in resolve_files(patterns, root)):
+            if path.name.endswith(('.test.ts', '.spec.ts', '.d.ts')) or '__tests__' in path.parts:
+                continue
+            self._add(path)
+
+    def _add(self, path: Path) -> SourceIndex:
+        index = SourceIndex.load(path, self.root)
+        rel_path = path.relative_to(self.root).as_posix()
+        top: Dict[str, str] = {}
+        classes: Dict[str, Dict[str, str]] = {}
+        for owner, symbol in index.iter_functions():
+            key = f"{rel_path}:{owner.name + '.' if owner else ''}{symbol.name}"
+            self.functions[key] = Function(key, rel_path, index, owner.name if owner else None, symbol.name,
+                                           symbol.start_token, symbol.end_token)
+            if owner is None:
+                top[symbol.name] = key
+            else:
+                classes.setdefault(owner.name, {})[symbol.name] = key
+        self.modules[path] = top
+        self.members[path] = classes
+        return index
+
+    def _scope(self, path: Path, index: SourceIndex) -> Tuple[Dict[str, str], Dict[str, Path]]:
+        """(local name -> function key, namespace -> module file) for one file"""
+        if path in self.scopes:
+            return self.scopes[path]
+        named: Dict[str, str] = dict(self.modules.get(path, {}))
+        namespaces: Dict[str, Path] = {}
+        imports = [(decl.module, decl.named, decl.namespace) for decl in index.imports if not decl.type_only]
+        for match in DYNAMIC_IMPORT.finditer(index.source):
+            names = []
+            for part in match.group(1).decode('utf-8', 'replace').split(','):
+                imported, _, local = part.partition(':')
+                if imported.strip():
+                    names.append((imported.strip(), (local or imported).strip()))
+            imports.append((match.group(2).decode('utf-8', 'replace'), names, None))
+        for module, names, namespace in imports:
+            target = _module_path(path, module, self.root)
+            if target is None:
+                continue
+            if target not in self.modules:
+                self._add(target)
+            if namespace:
+                namespaces[namespace] = target
+            for imported, local in names:
+                if imported in self.modules[target]:
+                    named[local] = self.modules[target][imported]
+        self.scopes[path] = (named, namespaces)
+        return named, namespaces
+
+    def resolve(self, function: Function, i: int) -> Optional[str]:
+        """Function key called at token i (`name(`, `ns.name(`, `this.name(`)"""
+        index = function.index
+        path = self.root / function.rel_path
+        named, namespaces = self._scope(path, index)
+        name = index.text(i)
+        if index.is_punct(i - 1, b'.'):
+            receiver = index.text(i - 2)
+            if receiver == 'this' and function.owner:
+                return self.members[path].get(function.owner, {}).get(name)
+            if receiver in namespaces and not index.is_punct(i - 3, b'.'):
+                return self.modules[namespaces[receiver]].get(name)
+            return None
+        return named.get(name)
+
+    def function_at(self, rel_path: str, token: int) -> Optional[Function]:
+        best = None
+        for function in self.functions.values():
+            if function.rel_path == rel_path and function.first <= token <= function.last:
+                if best is None or function.first > best.first:
+                    best = function
+        return best
+
+    def work(self, key: str, depth: int = 0, seen: Optional[Set[str]] = None) -> List[Step]:
+        """Slow work anywhere below a function (steps carry the call path from it)"""
+        if key in self._work:
+            return self._work[key]
+        seen = seen or set()
+        if key in seen or depth > MAX_DEPTH or key not in self.functions:
+            return []
+        seen = seen | {key}
+        function = self.functions[key]
+        index = function.index
+        found: List[Step] = []
+        for i in range(function.first, function.last + 1):
+            if index.kinds[i] != IDENT or not index.is_punct(i + 1, b'('):
+                continue
+            label = _callee_label(index, i)
+            line = index.line_of(index.starts[i])
+            category = sink_category(index, i)
+            if category:
+                found.append(Step('io', category, label, line, COSTS[category], path=[_short(key), label]))
+                continue
+            if index.text(i) == 'getDb' and not index.is_punct(i - 1, b'.'):
+                found.append(Step('second-connection', 'second-connection', label, line,
+                                  COSTS['second-connection'], path=[_short(key), 'getDb']))
+                continue
+            callee = self.resolve(function, i)
+            if callee and callee != key:
+                for step in self.work(callee, depth + 1, seen):
+                    found.append(Step(step.kind, step.category, step.call, step.line, step.estimate_ms,
+                                      path=[_short(key)] + step.path))
+        unique: Dict[Tuple[str, str], Step] = {}
+        for step in found:
+            unique.setdefault((step.category, step.path[-1]), step)
+        result = list(unique.values())
+        if depth == 0 or not seen - {key}:
+            self._work[key] = result
+        return result
+
+
+def _short(key: str) -> str:
+    return key.split(':', 1)[1]
+
+
+def _callee_label(index: SourceIndex, i: int) -> str:
+    if index.is_punct(i - 1, b'.') and index.kinds[i - 2] == IDENT:
+        return f'{index.text(i - 2)}.{index.text(i)}'
+    return index.text(i)
+
+
+def sink_category(index: SourceIndex, i: int) -> Optional[str]:
+    """External-I/O category of the call at token i, if it is one"""
+    name = index.text(i)
+    if index.is_punct(i - 1, b'.'):
+        receiver = index.text(i - 2)
+        if receiver in MEMBER_SINKS:
+            return MEMBER_SINKS[receiver]
+        if receiver in ('db', 'tx', 'console', 'logger', 'Math', 'JSON', 'Object', 'Array', 'Promise'):
+            return None
+    for pattern, category in SINKS:
+        if pattern.search(name):
+            return category
+    return None
+
+
+# ----------------------------------------------------------------------
+# Transactions
+# ----------------------------------------------------------------------
+
+def loop_spans(index: SourceIndex, first: int, last: int) -> List[Tuple[int, int]]:
+    """Token spans of loop bodies (for/while/do blocks and iteration callbacks)"""
+    spans = []
+    for i in range(first, last + 1):
+        if index.kinds[i] != IDENT:
+            continue
+        word = index.text(i)
+        if word in LOOP_KEYWORDS and not index.is_punct(i - 1, b'.'):
+            j = i + 1
+            if word != 'do' and index.is_punct(j, b'('):
+                j = index.match(j) + 1
+            if index.is_punct(j, b'{'):
+                spans.append((j, index.match(j)))
+            else:
+                end = j
+                while end <= last and not index.is_punct(end, b';'):
+                    end = index.match(end) + 1 if index.match(end) > end else end + 1
+                spans.append((j, end))
+        elif word in LOOP_METHODS and index.is_punct(i - 1, b'.') and index.is_punct(i + 1, b'('):
+            spans.append((i + 1, index.match(i + 1)))
+    return spans
+
+
+def _callback(index: SourceIndex, open_paren: int) -> Optional[Tuple[str, int, int]]:
+    """(tx parameter, body first, body last) of an inline `async (tx) => {...}` argument"""
+    i = open_paren + 1
+    if index.is_ident(i, b'async'):
+        i += 1
+    if index.is_ident(i, b'function'):
+        i += 1
+    if index.is_punct(i, b'('):
+        close = index.match(i)
+        param = index.text(i + 1) if index.kinds[i + 1] == IDENT else None
+        i = close + 1
+    elif index.kinds[i] == IDENT and index.is_punct(i + 1, b'=>'):
+        param = index.text(i)
+        i += 1
+    else:
+        return None
+    if index.is_punct(i, b'=>'):
+        i += 1
+    if param is None or not index.is_punct(i, b'{'):
+        return None
+    return param, i, index.match(i)
+
+
+def find_transactions(index: SourceIndex) -> List[Tuple[str, bool, int, str, int, int]]:
+    """(entry, retried, first token, tx name, body first, body last) for every transaction callback"""
+    found = []
+    for i in range(1, len(index) - 1):
+        if index.kinds[i] != IDENT or not index.is_punct(i + 1, b'('):
+            continue
+        name = index.text(i)
+        if name == 'transaction' and index.is_punct(i - 1, b'.'):
+            entry, retried = f'{index.text(i - 2)}.transaction', False
+        elif name in TRANSACTION_HELPERS and not index.is_punct(i - 1, b'.'):
+            entry, retried = name, TRANSACTION_HELPERS[name]
+        else:
+            continue
+        callback = _callback(index, i + 1)
+        if callback:
+            found.append((entry, retried, i) + callback)
+    return found
+
+
+class TransactionScanner:
+    def __init__(self, graph: CallGraph, loop_rows: int = LOOP_ROWS):
+        self.graph = graph
+        self.loop_rows = loop_rows
+        self.schema = load_schema()
+
+    def scan_file(self, path: Path, rel_path: str) -> List[Transaction]:
+        index = SourceIndex.load(path, self.graph.root)
+        if not find_transactions(index):
+            return []
+        queries = FileCatalog(index, rel_path, self.schema).queries()
+        return [self.scan(index, rel_path, queries, *found) for found in find_transactions(index)]
+
+    def scan(self, index: SourceIndex, rel_path: str, queries: Sequence[Query], entry: str, retried: bool,
+             start: int, tx: str, first: int, last: int) -> Transaction:
+        enclosing = self.graph.function_at(rel_path, start)
+        function = (f'{enclosing.owner}.{enclosing.name}' if enclosing and enclosing.owner
+                    else enclosing.name if enclosing else '?')
+        transaction = Transaction(file=rel_path, line=index.line_of(index.starts[start]),
+                                  end_line=index.line_of(index.starts[last]), function=function,
+                                  entry=entry, retried=retried)
+        loops = loop_spans(index, first, last)
+        writes: List[Tuple[int, str]] = []          # (offset, table) of tx writes
+        for query in queries:
+            if (query.handle == tx and index.starts[first] <= query.start < index.ends[last]
+                    and query.operation in ('insert', 'update', 'delete') and query.table):
+                writes.append((query.start, query.table))
+        writes.sort()
+        transaction.writes = list(dict.fromkeys(table for _, table in writes))
+
+        def holds(offset: int) -> List[str]:
+            return list(dict.fromkeys(table for start, table in writes if start < offset))
+
+        def in_loop(i: int) -> bool:
+            return any(a <= i <= b for a, b in loops)
+
+        timeline: List[Tuple[int, float]] = []      # (offset, ms) of every step incl. statements
+        for i in range(first, last + 1):
+            if index.kinds[i] != IDENT or not index.is_punct(i + 1, b'('):
+                continue
+            offset = index.starts[i]
+            line = index.line_of(offset)
+            repeat = self.loop_rows if in_loop(i) else 1
+            label = _callee_label(index, i)
+            receiver = index.text(i - 2) if index.is_punct(i - 1, b'.') else None
+            if receiver is not None and index.text(i) in STATEMENT_METHODS and index.kinds[i - 2] == IDENT:
+                if receiver == tx:
+                    transaction.statements += repeat
+                    timeline.append((offset, COSTS['statement'] * repeat))
+                    if repeat > 1:
+                        transaction.steps.append(Step('loop', 'statement', label, line, COSTS['statement'] * repeat,
+                                                      per_row=True, holds=holds(offset)))
+                    continue
+                if receiver == 'db' and not index.is_punct(i - 3, b'.'):
+                    cost = COSTS['second-connection'] * repeat
+                    timeline.append((offset, cost))
+                    transaction.steps.append(Step('second-connection', 'second-connection', label, line, cost,
+                                                  per_row=repeat > 1, holds=holds(offset)))
+                    continue
+            category = sink_category(index, i)
+            steps: List[Step] = []
+            if category:
+                steps = [Step('io', category, label, line, COSTS[category], path=[label])]
+            elif enclosing is not None:
+                callee = self.graph.resolve(enclosing, i)
+                if callee:
+                    steps = [Step(step.kind, step.category, step.call, line, step.estimate_ms,
+                                  path=[label] + step.path[1:])
+                             for step in self.graph.work(callee)]
+            for step in steps:
+                step.estimate_ms *= repeat
+                step.per_row = repeat > 1
+                step.holds = holds(offset)
+                timeline.append((offset, step.estimate_ms))
+                transaction.steps.append(step)
+
+        first_write = writes[0][0] if writes else None
+        transaction.open_ms = sum(ms for _, ms in timeline)
+        transaction.lock_hold_ms = sum(ms for offset, ms in timeline
+                                       if first_write is not None and offset >= first_write)
+        transaction.suggestions = self.suggest(transaction)
+        return transaction
+
+    def suggest(self, transaction: Transaction) -> List[str]:
+        tips = []
+        io = [s for s in transaction.steps if s.kind == 'io']
+        if io:
+            calls = ', '.join(dict.fromkeys(s.path[0] for s in io))
+            tips.append(f'move {calls} after the transaction resolves: return what they need from the callback '
+                        f'(or write an outbox row inside it and deliver after commit)')
+        second = [s for s in transaction.steps if s.kind == 'second-connection']
+        if second:
+            calls = ', '.join(dict.fromkeys(s.path[0] if s.path else s.call for s in second))
+            tips.append(f'{calls} uses its own connection: pass tx through, or compute it before the transaction')
+        loops = [s for s in transaction.steps if s.per_row and s.kind == 'loop']
+        if loops:
+            lines = ', '.join(str(s.line) for s in loops)
+            tips.append(f'per-row statements (line {lines}): build the rows first and issue one multi-row '
+                        f'insert / inArray update')
+        if transaction.retried and any(s.category in SIDE_EFFECTS for s in io):
+            tips.append('withTransactionRetry repeats these side effects on every retry; '
+                        'rollback does not undo them')
+        return tips
+
+
+def scan_files(patterns: Sequence[str] = SCAN_FILES, loop_rows: int = LOOP_ROWS,
+               root: Path = PROJECT_ROOT) -> List[Transaction]:
+    graph = CallGraph(root=root)
+    scanner = TransactionScanner(graph, loop_rows)
+    found = []
+    for path in dict.fromkeys(p.resolve() for p in resolve_files(patterns, root)):
+        if path.name.endswith(('.test.ts', '.spec.ts')):
+            continue
+        found.extend(scanner.scan_file(path, path.relative_to(root.resolve()).as_posix()))
+    order = {'high': 0, 'medium': 1, 'low': 2, 'ok': 3}
+    return sorted(found, key=lambda t: (order[t.severity], -t.lock_hold_ms, -t.open_ms, t.file, t.line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find slow work inside database transactions')
+    parser.add_argument('files', nargs='*', help=f"files or globs (default: {' '.join(SCAN_FILES)})")
+    parser.add_argument('--loop-rows', type=int, default=LOOP_ROWS, help='iterations assumed for a loop')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Scanning transaction callbacks...")
+    transactions = scan_files(args.files or SCAN_FILES, args.loop_rows)
+    flagged = [t for t in transactions if t.steps]
+    print(f"   {len(transactions)} transactions, {len(flagged)} with slow work")
+
+    if not flagged:
+        print("\n✅ No slow work inside transactions")
+    for transaction in flagged:
+        print(f"\n   [{transaction.severity}] {transaction.file}:{transaction.line} {transaction.function} "
+              f"({transaction.entry})")
+        print(f"      📊 ~{transaction.open_ms:.0f} ms open, ~{transaction.lock_hold_ms:.0f} ms holding locks on "
+              f"{', '.join(transaction.writes) or 'nothing'} ({transaction.statements} statements)")
+        for step in transaction.steps:
+            rows = f' x{args.loop_rows}' if step.per_row else ''
+            held = f"  [holds {', '.join(step.holds)}]" if step.holds else ''
+            label = step.kind if step.category == step.kind else f'{step.kind}/{step.category}'
+            print(f"      line {step.line}: {label} {' -> '.join(step.path) or step.call}"
+                  f"{rows} ~{step.estimate_ms:.0f} ms{held}")
+        for tip in transaction.suggestions:
+            print(f"      💡 {tip}")
+
+    report = {
+        'loop_rows': args.loop_rows,
+        'costs_ms': COSTS,
+        'transactions': [transaction.to_dict() for transaction in transactions],
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+tsserver Client
+
+Speaks the tsserver stdio protocol so one TypeScript language service stays
+alive across edits. After a codemod rewrites files, only those files are
+re-synced and checked with `semanticDiagnosticsSync`/`syntacticDiagnosticsSync`,
+which takes milliseconds instead of a full `tsc --noEmit` over the project.
+
+Usage:
+    python scripts/tsserver_client.py server/db.ts server/routers.ts
+"""
+
+import json
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class TsServerError(Exception):
+    """Raised when tsserver cannot be started or a request fails"""
+
+
+@dataclass
+class Diagnostic:
+    """A single diagnostic reported by tsserver"""
+    file: str
+    line: int
+    column: int
+    code: int
+    category: str
+    message: str
+
+    def format(self, root: Optional[Path] = None) -> str:
+        """Render in the same shape as `tsc --noEmit` output"""
+        file_path = self.file
+        if root is not None:
+            try:
+                file_path = str(Path(self.file).relative_to(root))
+            except ValueError:
+                pass
+        return f"{file_path}({self.line},{self.column}): {self.category} TS{self.code}: {self.message}"
+
+
+def find_tsserver(project_root: Path) -> List[str]:
+    """Locate a tsserver command, preferring the project's own TypeScript"""
+    local = project_root / 'node_modules' / 'typescript' / 'lib' / 'tsserver.js'
+    if local.exists() and shutil.which('node'):
+        return ['node', str(local)]
+    if shutil.which('tsserver'):
+        return ['tsserver']
+    if shutil.which('pnpm'):
+        return ['pnpm', 'exec', 'tsserver']
+    raise TsServerError('tsserver not found (run pnpm install first)')
+
+
+class TsServerClient:
+    """Long-lived tsserver process with synchronous request/response helpers"""
+
+    def __init__(self, project_root: Path, command: Optional[List[str]] = None, timeout: float = 120.0):
+        self.project_root = Path(project_root).resolve()
+        self.command = command or find_tsserver(self.project_root)
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[int, 'queue.Queue[Dict[str, Any]]'] = {}
+        self._open_files: set = set()
+        self._reader: Optional[threading.Thread] = None
+        self._exited = False
+
+    # ------------------------------------------------------------------
+    # Process lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'TsServerClient':
+        if self._proc is not None:
+            return self
+        try:
+            self._proc = subprocess.Popen(
+                self.command + ['--disableAutomaticTypingAcquisition'],
+                cwd=str(self.project_root),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise TsServerError(f"could not start {' '.join(self.command)}: {e}") from e
+        self._exited = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        try:
+            self.request('configure', {'preferences': {'includeCompletionsForModuleExports': False}})
+        except TsServerError:
+            self.close()
+            raise
+        return self
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            self._send({'seq': self._next_seq(), 'type': 'request', 'command': 'exit'})
+            self._proc.wait(timeout=5)
+        except (TsServerError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
+        self._open_files.clear()
+
+    def __enter__(self) -> 'TsServerClient':
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+
+    def _next_seq(self) -> int:
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        assert self._proc is not None and self._proc.stdin is not None
+        try:
+            self._proc.stdin.write((json.dumps(message) + '\n').encode('utf-8'))
+            self._proc.stdin.flush()
+        except OSError as e:    # BrokenPipeError once the server has died
+            raise TsServerError(f"tsserver stdin closed: {e}") from e
+
+    def _read_loop(self) -> None:
+        """Parse `Content-Length` framed messages and route responses by request_seq"""
+        assert self._proc is not None and self._proc.stdout is not None
+        stdout = self._proc.stdout
+        while True:
+            header = stdout.readline()
+            if not header:
+                break
+            header = header.strip()
+            if not header.startswith(b'Content-Length:'):
+                continue
+            length = int(header.split(b':', 1)[1])
+            stdout.readline()  # blank separator line
+            body = stdout.read(length)
+            try:
+                message = json.loads(body.decode('utf-8'))
+            except ValueError:
+                continue
+            if message.get('type') != 'response':
+                continue  # events (projectLoadingStart, telemetry, ...) are not needed
+            waiter = self._pending.pop(message.get('request_seq'), None)
+            if waiter is not None:
+                waiter.put(message)
+
+        # Process exited: wake anyone still waiting; later requests fail at once
+        with self._lock:
+            self._exited = True
+            waiters = list(self._pending.values())
+            self._pending.clear()
+        for waiter in waiters:
+            waiter.put({'success': False, 'message': 'tsserver exited'})
+
+    def request(self, command: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a request and block until its response arrives"""
+        if self._proc is None:
+            raise TsServerError('tsserver is not running')
+        seq = self._next_seq()
+        waiter: 'queue.Queue[Dict[str, Any]]' = queue.Queue(maxsize=1)
+        with self._lock:
+            if self._exited:
+                raise TsServerError(f'{command} failed: tsserver exited')
+            self._pending[seq] = waiter
+        message: Dict[str, Any] = {'seq': seq, 'type': 'request', 'command': command}
+        if arguments is not None:
+            message['arguments'] = arguments
+        try:
+            self._send(message)
+        except TsServerError:
+            self._pending.pop(seq, None)
+            raise
+        try:
+            response = waiter.get(timeout=self.timeout)
+        except queue.Empty:
+            self._pending.pop(seq, None)
+            raise TsServerError(f'{command} timed out after {self.timeout}s')
+        if not response.get('success', False):
+            raise TsServerError(f"{command} failed: {response.get('message', 'unknown error')}")
+        return response.get('body')
+
+    # ------------------------------------------------------------------
+    # File sync and diagnostics
+    # ------------------------------------------------------------------
+
+    def _abs(self, file_path: str) -> str:
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = self.project_root / path
+        return str(path.resolve())
+
+    def sync_file(self, file_path: str) -> str:
+        """Open a file, or reload it from disk if it was rewritten since"""
+        abs_path = self._abs(file_path)
+        if abs_path in self._open_files:
+            self.request('reload', {'file': abs_path, 'tmpfile': abs_path})
+        else:
+            # `open` gets no response; tsserver handles messages in order, so the next request runs after it
+            if self._exited:
+                raise TsServerError('open failed: tsserver exited')
+            self._send({'seq': self._next_seq(), 'type': 'request', 'command': 'open',
+                        'arguments': {'file': abs_path, 'projectRootPath': str(self.project_root)}})
+            self._open_files.add(abs_path)
+        return abs_path
+
+    def diagnostics(self, files: Iterable[str], semantic: bool = True) -> Dict[str, List[Diagnostic]]:
+        """Sync the given files and return their syntactic (+ semantic) diagnostics"""
+        results: Dict[str, List[Diagnostic]] = {}
+        for file_path in files:
+            abs_path = self.sync_file(file_path)
+            commands = ['syntacticDiagnosticsSync'] + (['semanticDiagnosticsSync'] if semantic else [])
+            found: List[Diagnostic] = []
+            for command in commands:
+                body = self.request(command, {'file': abs_path, 'includeLinePosition': False}) or []
+                for diag in body:
+                    start = diag.get('start', {})
+                    found.append(Diagnostic(
+                        file=abs_path,
+                        line=start.get('line', 0),
+                        column=start.get('offset', 0),
+                        code=diag.get('code', 0),
+                        category=diag.get('category', 'error'),
+                        message=diag.get('text', ''),
+                    ))
+            results[file_path] = found
+        return results
+
+
+def main():
+    project_root = Path(__file__).parent.parent
+    files = sys.argv[1:]
+    if not files:
+        print('Usage: python scripts/tsserver_client.py <file.ts> [...]')
+        sys.exit(1)
+
+    with TsServerClient(project_root) as client:
+        start = time.perf_counter()
+        results = client.diagnostics(files)
+        first_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        client.diagnostics(files)
+        warm_ms = (time.perf_counter() - start) * 1000
+
+    total = 0
+    for file_path, diags in results.items():
+        print(f"📝 {file_path}: {len(diags)} diagnostics")
+        for diag in diags:
+            print(f"   {diag.format(client.project_root)}")
+        total += len(diags)
+
+    print(f"\n✅ {total} diagnostics in {len(files)} files")
+    print(f"⏱️  First check (incl. project load): {first_ms:.0f} ms, warm re-check: {warm_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Unbounded Result-Set Detector
+
+Flags every select reachable from a tRPC list procedure (list*, getAll*,
+search*, all*) that can return a whole table: no limit/offset, no cursor
+predicate, not an aggregate, not a primary/unique key lookup and no count
+guard (a count() on the same table earlier in the same function).
+
+Procedures are read from the router files with the shared SourceIndex. Their
+`db.fn()` and `xxxRepository.fn()` calls are followed through the call graph
+of server/db.ts and the repository classes, and the selects met on the way
+come from the static query catalog (query_catalog.py). Findings are ranked by
+the row count of the table they read: from a stats file (getDatabaseStats
+output, information_schema.TABLES rows or {table: rows}) or, without one,
+from the COUNT(*) queries captured in .manus/db. Procedures that page the
+result in memory (`rows.slice(offset, offset + limit)`) are marked: the
+response is paged but the whole set is still loaded.
+
+Queries written inline in router files on a local `getDb()` handle are not
+in the catalog and are not followed.
+
+Usage:
+    python scripts/unbounded_selects.py
+    python scripts/unbounded_selects.py --stats db-stats.json --limit 20
+    python scripts/unbounded_selects.py --all-procedures --include-guarded
+"""
+
+import argparse
+import json
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from db_query_log import LOG_DIR
+from ddl_risk import LARGE_TABLE_ROWS, load_stats, row_counts_from_logs
+from drizzle_schema import Schema, Table, load_schema
+from query_catalog import DEFAULT_FILES, Query, build_catalog, resolve_files
+from source_index import IDENT, SourceIndex
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPORT_FILE = PROJECT_ROOT / 'unbounded-selects.json'
+ROUTER_FILES = ('server/routers.ts', 'server/routers/*.ts', 'server/*Router.ts', 'server/*/*Router.ts')
+
+LIST_PROCEDURE = re.compile(r'^(?:list|getAll|search|all)(?![a-z])')
+PROCEDURE_KINDS = {'query', 'mutation', 'subscription'}
+CURSOR_OPS = {'gt', 'gte', 'lt', 'lte'}
+CURSOR_VALUE = re.compile(r'cursor|after|before|lastId|sinceId', re.IGNORECASE)
+MEDIUM_TABLE_ROWS = 10_000
+
+
+@dataclass
+class Procedure:
+    """One tRPC procedure and the data-layer functions it calls directly"""
+    router: str                       # router export name, dotted for nested routers
+    name: str
+    file: str
+    line: int
+    kind: str                         # query | mutation | subscription
+    calls: List[str] = field(default_factory=list)
+    pages_in_memory: bool = False     # slices the fetched rows itself
+    start: int = 0                    # byte span of the entry in the router file
+    end: int = 0
+
+    @property
+    def path(self) -> str:
+        return f'{self.router}.{self.name}'
+
+
+@dataclass
+class Finding:
+    """An unbounded select and the list procedures that reach it"""
+    file: str
+    line: int
+    function: str
+    table: Optional[str]
+    joins: List[str]
+    filters: List[str]                # unconditional filter columns
+    table_rows: Optional[int]
+    guarded: Optional[str] = None     # bound that only holds at runtime (count-guard)
+    procedures: List[str] = field(default_factory=list)
+    call_path: List[str] = field(default_factory=list)
+    pages_in_memory: bool = False
+
+    @property
+    def severity(self) -> str:
+        if self.table_rows is None:
+            return 'unknown'
+        if self.table_rows >= LARGE_TABLE_ROWS or (not self.filters and self.table_rows >= MEDIUM_TABLE_ROWS):
+            return 'high'
+        return 'medium' if self.table_rows >= MEDIUM_TABLE_ROWS or not self.filters else 'low'
+
+    def to_dict(self) -> Dict:
+        return {
+            'severity': self.severity,
+            'location': f'{self.file}:{self.line}',
+            'function': self.function,
+            'table': self.table,
+            'table_rows': self.table_rows,
+            'joins': self.joins,
+            'filters': self.filters,
+            'guarded': self.guarded,
+            'pages_in_memory': self.pages_in_memory,
+            'procedures': self.procedures,
+            'call_path': self.call_path,
+        }
+
+
+def function_key(file: str, owner: Optional[str], name: str) -> str:
+    return f"{file}:{owner + '.' if owner else ''}{name}"
+
+
+def _is_db_module(module: str) -> bool:
+    return module.rstrip('/').split('/')[-1] in ('db', 'db.ts', 'db.js')
+
+
+# ----------------------------------------------------------------------
+# Data-layer call graph
+# ----------------------------------------------------------------------
+
+class DataLayer:
+    """Functions of server/db.ts and the repository classes, with their direct calls"""
+
+    def __init__(self, files: Sequence[Path], root: Path = PROJECT_ROOT):
+        self.db_functions: Dict[str, str] = {}          # db.ts export -> key
+        self.methods: Dict[str, Dict[str, str]] = {}    # repository instance -> method -> key
+        self.services: Dict[str, Dict[str, str]] = {}   # service module (analytics.service) -> export -> key
+        self.calls: Dict[str, Set[str]] = {}
+        indexes = []
+        for path in files:
+            rel_path = path.resolve().relative_to(root.resolve()).as_posix()
+            index = SourceIndex.load(path, root)
+            indexes.append((rel_path, index))
+            for owner, symbol in index.iter_functions():
+                key = function_key(rel_path, owner.name if owner else None, symbol.name)
+                if owner is None and rel_path.endswith('server/db.ts') and symbol.exported:
+                    self.db_functions[symbol.name] = key
+                elif owner is not None and path.name.endswith('.repository.ts'):
+                    instance = path.name.split('.')[0] + 'Repository'
+                    self.methods.setdefault(instance, {})[symbol.name] = key
+                elif owner is None and path.name.endswith('.service.ts') and symbol.exported:
+                    self.services.setdefault(path.name[:-len('.ts')], {})[symbol.name] = key
+        for rel_path, index in indexes:
+            local = {symbol.name: function_key(rel_path, None, symbol.name)
+                     for owner, symbol in index.iter_functions() if owner is None}
+            for owner, symbol in index.iter_functions():
+                key = function_key(rel_path, owner.name if owner else None, symbol.name)
+                own = {member.name: function_key(rel_path, owner.name, member.name)
+                       for member in owner.members} if owner else {}
+                self.calls[key] = self._direct_calls(index, symbol.start_token, symbol.end_token, local, own) - {key}
+
+    @staticmethod
+    def _direct_calls(index: SourceIndex, first: int, last: int, local: Dict[str, str],
+                      own: Dict[str, str]) -> Set[str]:
+        """Module functions called by name and sibling methods called through `this`"""
+        found = set()
+        for i in range(first, last + 1):
+            if index.kinds[i] != IDENT or not index.is_punct(i + 1, b'('):
+                continue
+            name = index.text(i)
+            if index.is_punct(i - 1, b'.'):
+                if index.is_ident(i - 2, b'this') and name in own:
+                    found.add(own[name])
+            elif name in local:
+                found.add(local[name])
+        return found
+
+    def resolve(self, index: SourceIndex, i: int, namespaces: Set[str], named: Dict[str, str],
+                services: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Data-layer function called at token i (db.fn(), fn() imported from db, xxxRepository.fn(),
+        xxxService.fn() for a namespace import of a loaded service module)"""
+        if index.kinds[i] != IDENT or index.is_punct(i - 1, b'.'):
+            return None
+        name = index.text(i)
+        if name in named and index.is_punct(i + 1, b'('):
+            return self.db_functions.get(named[name])
+        if not index.is_punct(i + 1, b'.') or index.kinds[i + 2] != IDENT:
+            return None
+        if name in namespaces and index.is_punct(i + 3, b'('):
+            return self.db_functions.get(index.text(i + 2))
+        if services and name in services and index.is_punct(i + 3, b'('):
+            return self.services.get(services[name], {}).get(index.text(i + 2))
+        if name in self.methods and index.is_punct(i + 3, b'('):
+            return self.methods[name].get(index.text(i + 2))
+        if (name == 'repositories' and index.is_punct(i + 3, b'.') and index.kinds[i + 4] == IDENT
+                and index.is_punct(i + 5, b'(')):
+            return self.methods.get(index.text(i + 2) + 'Repository', {}).get(index.text(i + 4))
+        return None
+
+    def reachable(self, roots: Sequence[str]) -> Dict[str, List[str]]:
+        """Function -> shortest call path from one of the roots"""
+        paths = {root: [root] for root in roots}
+        queue = deque(roots)
+        while queue:
+            key = queue.popleft()
+            for callee in sorted(self.calls.get(key, ())):
+                if callee not in paths:
+                    paths[callee] = paths[key] + [callee]
+                    queue.append(callee)
+        return paths
+
+
+# ----------------------------------------------------------------------
+# Router procedures
+# ----------------------------------------------------------------------
+
+def _entries(index: SourceIndex, open_brace: int) -> List[Tuple[int, int]]:
+    """Top-level comma separated token ranges (inclusive) of an object literal"""
+    close = index.match(open_brace)
+    ranges = []
+    start = open_brace + 1
+    i = start
+    while i < close:
+        if index.is_punct(i, b','):
+            if start < i:
+                ranges.append((start, i - 1))
+            start = i + 1
+        elif index.match(i) > i:
+            i = index.match(i)
+        i += 1
+    if start < close:
+        ranges.append((start, close - 1))
+    return ranges
+
+
+def _router_object(index: SourceIndex, i: int) -> int:
+    """`{` of `router({ ... })` when token i is that `router` call, else -1"""
+    if (index.is_ident(i, b'router') and not index.is_punct(i - 1, b'.')
+            and index.is_punct(i + 1, b'(') and index.is_punct(i + 2, b'{')):
+        return i + 2
+    return -1
+
+
+class RouterFile:
+    """The procedures declared in one router module"""
+
+    def __init__(self, path: Path, rel_path: str, layer: DataLayer, root: Path = PROJECT_ROOT):
+        self.index = SourceIndex.load(path, root)
+        self.rel_path = rel_path
+        self.layer = layer
+        self.namespaces = {decl.namespace for decl in self.index.imports
+                           if decl.namespace and _is_db_module(decl.module)}
+        self.named = {local: imported for decl in self.index.imports if _is_db_module(decl.module)
+                      for imported, local in decl.named}
+        self.services = {decl.namespace: decl.module.rstrip('/').split('/')[-1] for decl in self.index.imports
+                         if decl.namespace and decl.module.endswith('.service')}
+
+    def procedures(self) -> List[Procedure]:
+        index = self.index
+        found: List[Procedure] = []
+        for i in range(2, len(index)):
+            open_brace = _router_object(index, i)
+            # top-level `const xRouter = router({...})`; nested routers are walked from their parent
+            if open_brace >= 0 and index.is_punct(i - 1, b'=') and index.kinds[i - 2] == IDENT:
+                self._walk(open_brace, index.text(i - 2), found)
+        return found
+
+    def _walk(self, open_brace: int, prefix: str, found: List[Procedure]) -> None:
+        index = self.index
+        for first, last in _entries(index, open_brace):
+            if index.kinds[first] != IDENT or not index.is_punct(first + 1, b':'):
+                continue
+            name = index.text(first)
+            nested = _router_object(index, first + 2)
+            if nested >= 0:
+                self._walk(nested, f'{prefix}.{name}', found)
+                continue
+            kind = self._kind(first + 2, last)
+            if kind is None:
+                continue
+            procedure = Procedure(router=prefix, name=name, file=self.rel_path,
+                                  line=index.line_of(index.starts[first]), kind=kind,
+                                  start=index.starts[first], end=index.ends[last])
+            for i in range(first + 2, last + 1):
+                key = self.layer.resolve(index, i, self.namespaces, self.named, self.services)
+                if key and key not in procedure.calls:
+                    procedure.calls.append(key)
+                if index.is_punct(i, b'.') and index.is_ident(i + 1, b'slice') and index.is_punct(i + 2, b'('):
+                    procedure.pages_in_memory = True
+            found.append(procedure)
+
+    def _kind(self, first: int, last: int) -> Optional[str]:
+        """query/mutation/subscription when the entry value is a procedure builder chain"""
+        index = self.index
+        depth = index.depths[first]
+        for i in range(first, last):
+            if (index.depths[i] == depth and index.is_punct(i, b'.')
+                    and index.text(i + 1) in PROCEDURE_KINDS and index.is_punct(i + 2, b'(')):
+                return index.text(i + 1)
+        return None
+
+
+def load_procedures(layer: DataLayer, patterns: Sequence[str] = ROUTER_FILES,
+                    root: Path = PROJECT_ROOT) -> List[Procedure]:
+    procedures = []
+    for path in dict.fromkeys(path.resolve() for path in resolve_files(patterns, root)):
+        if path.name.endswith(('.test.ts', '.spec.ts')):
+            continue
+        rel_path = path.relative_to(root.resolve()).as_posix()
+        procedures.extend(RouterFile(path, rel_path, layer, root).procedures())
+    return procedures
+
+
+# ----------------------------------------------------------------------
+# Bounds
+# ----------------------------------------------------------------------
+
+def _key_lookup(query: Query, table: Table) -> bool:
+    """Unconditional equality on every column of a primary or unique key"""
+    columns = set()
+    for predicate in query.filters:
+        if predicate.op == 'eq' and not predicate.conditional and predicate.column:
+            owner, name = predicate.column.split('.', 1)
+            if owner == query.table and name in table.columns:
+                columns.add(table.columns[name].sql_name)
+    return any((index.unique or index.primary) and set(index.columns) <= columns
+               for index in table.all_indexes())
+
+
+def bound(query: Query, schema: Schema, siblings: Sequence[Query]) -> Optional[str]:
+    """Why a select cannot return the whole table (None when nothing bounds it)"""
+    if query.limit is not None or query.offset is not None:
+        return 'limit'
+    if query.aggregates:
+        return 'aggregate'
+    if any(p.op in CURSOR_OPS and p.value and CURSOR_VALUE.search(p.value) for p in query.filters):
+        return 'cursor'
+    table = schema.tables.get(query.table) if query.table else None
+    if table is not None and _key_lookup(query, table):
+        return 'key'
+    for other in siblings:
+        if (other is not query and other.table == query.table and other.line < query.line
+                and any(aggregate.startswith(('count', 'COUNT')) or aggregate == 'sql'
+                        for aggregate in other.aggregates)):
+            return 'count-guard'
+    return None
+
+
+def table_rows(table: Optional[str], schema: Schema, stats: Dict[str, int]) -> Optional[int]:
+    if table is None:
+        return None
+    if table in stats:
+        return stats[table]
+    sql_name = schema.tables[table].sql_name if table in schema.tables else None
+    return stats.get(sql_name) if sql_name else None
+
+
+def detect(procedures: Sequence[Procedure], layer: DataLayer, queries: Sequence[Query], schema: Schema,
+           stats: Dict[str, int], include_guarded: bool = False) -> List[Finding]:
+    by_function: Dict[str, List[Query]] = {}
+    for query in queries:
+        by_function.setdefault(function_key(query.file, query.owner, query.function), []).append(query)
+
+    findings: Dict[Tuple[str, int], Finding] = {}
+    for procedure in procedures:
+        for key, path in layer.reachable(procedure.calls).items():
+            siblings = by_function.get(key, [])
+            for query in siblings:
+                if query.operation != 'select':
+                    continue
+                reason = bound(query, schema, siblings)
+                if reason is not None and not (include_guarded and reason == 'count-guard'):
+                    continue
+                finding = findings.get((query.file, query.line))
+                if finding is None:
+                    finding = findings[(query.file, query.line)] = Finding(
+                        file=query.file, line=query.line, function=key.split(':', 1)[1], table=query.table,
+                        joins=[join.table for join in query.joins if join.table],
+                        filters=list(dict.fromkeys(p.column for p in query.filters if p.column and not p.conditional)),
+                        table_rows=table_rows(query.table, schema, stats), guarded=reason,
+                        call_path=[procedure.path] + [step.split(':', 1)[1] for step in path])
+                if procedure.path not in finding.procedures:
+                    finding.procedures.append(procedure.path)
+                finding.pages_in_memory = finding.pages_in_memory or procedure.pages_in_memory
+    return sorted(findings.values(), key=lambda f: (f.table_rows is None, -(f.table_rows or 0), bool(f.filters),
+                                                   -len(f.procedures), f.file, f.line))
+
+
+def build_report(stats_file: Optional[Path] = None, log_dir: Path = LOG_DIR, all_procedures: bool = False,
+                 include_guarded: bool = False) -> Dict:
+    schema = load_schema()
+    catalog = build_catalog(DEFAULT_FILES, schema)
+    layer = DataLayer(resolve_files(DEFAULT_FILES))
+    procedures = load_procedures(layer)
+    selected = [procedure for procedure in procedures
+                if all_procedures and procedure.kind == 'query' or LIST_PROCEDURE.match(procedure.name)]
+    stats = load_stats(stats_file) if stats_file else row_counts_from_logs(log_dir)
+    findings = detect(selected, layer, catalog.queries, schema, stats, include_guarded)
+    return {
+        'row_counts': str(stats_file) if stats_file else 'query log COUNT(*) captures',
+        'procedures': len(procedures),
+        'list_procedures': [procedure.path for procedure in selected],
+        'unreached': [procedure.path for procedure in selected if not procedure.calls],
+        'findings': [finding.to_dict() for finding in findings],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find unbounded selects behind tRPC list procedures')
+    parser.add_argument('--stats', type=Path, help='table row counts (getDatabaseStats / information_schema JSON)')
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR, help='captures for COUNT(*) row counts')
+    parser.add_argument('--all-procedures', action='store_true', help='check every query procedure, not only list ones')
+    parser.add_argument('--include-guarded', action='store_true', help='also report selects behind a count guard')
+    parser.add_argument('--limit', type=int, default=20, help='findings to print')
+    parser.add_argument('--output', type=Path, default=REPORT_FILE, help='report path')
+    args = parser.parse_args()
+
+    print("🔍 Following list procedures into the data layer...")
+    report = build_report(args.stats, args.log_dir, args.all_procedures, args.include_guarded)
+    findings = report['findings']
+    print(f"   {len(report['list_procedures'])} of {report['procedures']} procedures checked, "
+          f"{len(report['unreached'])} without data-layer calls")
+    print(f"   row counts from {report['row_counts']}")
+
+    if not findings:
+        print("\n✅ No unbounded selects")
+    else:
+        print(f"\n⚠️  {len(findings)} unbounded selects:")
+        for finding in findings[:args.limit]:
+            rows = f"{finding['table_rows']:,} rows" if finding['table_rows'] is not None else 'rows unknown'
+            where = f"where {', '.join(finding['filters'])}" if finding['filters'] else 'no filter'
+            notes = [note for note, on in (('pages in memory', finding['pages_in_memory']),
+                                           (finding['guarded'], bool(finding['guarded']))) if on]
+            print(f"   [{finding['severity']}] {finding['table'] or '?'} ({rows}, {where})"
+                  + (f"  [{'; '.join(notes)}]" if notes else ''))
+            print(f"      {finding['location']}  {' -> '.join(finding['call_path'])}")
+            if len(finding['procedures']) > 1:
+                print(f"      also reached from {len(finding['procedures']) - 1} more procedures")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,17 @@
 import { drizzle } from "drizzle-orm/mysql2";
 import type { Pool } from "mysql2/promise";
 
+export type Database = ReturnType<typeof drizzle>;
+
+type LoadWaiter<V> = {
+  resolve: (rows: V[]) => void;
+  reject: (error: unknown) => void;
+};
+
+type PendingLoad<K, V> = {
+  waiters: Map<K, LoadWaiter<V>[]>;
+};
+
 /**
  * Base Repository Class
  * 
@@ -8,9 +19,14 @@ import type { Pool } from "mysql2/promise";
  * All domain repositories should extend this class
  */
 export abstract class BaseRepository {
-  protected db: ReturnType<typeof drizzle> | null = null;
+  protected db: Database | null = null;
 
-  constructor(db: ReturnType<typeof drizzle> | null) {
+  /**
+   * Keys queued by load()/loadMany() in the current tick, per batch name
+   */
+  private pendingLoads = new Map<string, PendingLoad<any, any>>();
+
+  constructor(db: Database | null) {
     this.db = db;
   }
 
@@ -36,4 +52,109 @@ export abstract class BaseRepository {
   protected warnDatabaseUnavailable(operation: string): void {
     console.warn(`[${this.constructor.name}] Cannot ${operation}: database not available`);
   }
+
+  /**
+   * Prepared statement for this repository's connection
+   *
+   * Generated repositories keep a module-level `prepare(db)` function and a
+   * WeakMap per hot query; the statement is prepared on first use and reused
+   * for every later call on the same connection.
+   */
+  protected prepared<S>(statements: WeakMap<Database, S>, prepare: (db: Database) => S): S {
+    this.ensureDatabaseAvailable();
+    const db = this.db!;
+    let statement = statements.get(db);
+    if (statement === undefined) {
+      statement = prepare(db);
+      statements.set(db, statement);
+    }
+    return statement;
+  }
+
+  /**
+   * Load the single row for `key`, coalescing concurrent calls
+   *
+   * All load() calls with the same batch name made in the same tick are
+   * answered by one `loadMany(keys)` query (e.g. getTasksByIds). Nothing is
+   * cached after the batch resolves, so results are never shared across requests.
+   */
+  protected load<K, V>(
+    batch: string,
+    key: K,
+    loadMany: (keys: K[]) => Promise<V[]>,
+    keyOf: (row: V) => K
+  ): Promise<V | undefined> {
+    return this.loadMany(batch, key, loadMany, keyOf).then((rows) => rows[0]);
+  }
+
+  /**
+   * Load every row whose key column equals `key`, coalescing concurrent calls
+   * (by-foreign-key variant of load(), e.g. getDefectsByTaskIds)
+   */
+  protected loadMany<K, V>(
+    batch: string,
+    key: K,
+    loadMany: (keys: K[]) => Promise<V[]>,
+    keyOf: (row: V) => K
+  ): Promise<V[]> {
+    let pending = this.pendingLoads.get(batch) as PendingLoad<K, V> | undefined;
+    if (!pending) {
+      const created: PendingLoad<K, V> = { waiters: new Map() };
+      this.pendingLoads.set(batch, created);
+      queueMicrotask(() => {
+        void this.dispatchLoad(batch, created, loadMany, keyOf);
+      });
+      pending = created;
+    }
+
+    const waiters = pending.waiters;
+    return new Promise<V[]>((resolve, reject) => {
+      const queued = waiters.get(key);
+      if (queued) {
+        queued.push({ resolve, reject });
+      } else {
+        waiters.set(key, [{ resolve, reject }]);
+      }
+    });
+  }
+
+  /**
+   * Run one batched query for the queued keys and route rows back to each caller
+   */
+  private async dispatchLoad<K, V>(
+    batch: string,
+    pending: PendingLoad<K, V>,
+    loadMany: (keys: K[]) => Promise<V[]>,
+    keyOf: (row: V) => K
+  ): Promise<void> {
+    if (this.pendingLoads.get(batch) === pending) {
+      this.pendingLoads.delete(batch);
+    }
+
+    try {
+      const rows = await loadMany(Array.from(pending.waiters.keys()));
+      const byKey = new Map<K, V[]>();
+      for (const row of rows) {
+        const rowKey = keyOf(row);
+        const matched = byKey.get(rowKey);
+        if (matched) {
+          matched.push(row);
+        } else {
+          byKey.set(rowKey, [row]);
+        }
+      }
+      for (const [key, waiters] of pending.waiters) {
+        const matched = byKey.get(key) ?? [];
+        for (const waiter of waiters) {
+          waiter.resolve(matched);
+        }
+      }
+    } catch (error) {
+      for (const waiters of pending.waiters.values()) {
+        for (const waiter of waiters) {
+          waiter.reject(error);
+        }
+      }
+    }
+  }
 }